@@ -0,0 +1,6 @@
+"""
+Benchmarks del procesamiento de notas con exports de Moodle sintéticos.
+
+Uso:
+    python -m benchmarks.run --sizes 1000,10000 --output benchmarks/results/base.json
+"""
@@ -0,0 +1,154 @@
+"""
+Generación de exports de Moodle sintéticos para los benchmarks.
+
+Los nombres salen de MoodleStudentRecordFactory (igual que en los tests),
+pero se generan una sola vez por alumno: los intentos, turnos y columnas de
+preguntas se arman con random para poder llegar al millón de filas.
+"""
+import csv
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+from tests.factories.student_factory import MoodleStudentRecordFactory, fake
+
+
+# Columnas de un export de Moodle antes de la calificación
+BASE_COLUMNS = ["Apellido(s)", "Nombre", "Número de ID", "Dirección de correo", "Estado"]
+GRADE_COLUMN = "Calificación/10,00"
+
+# Cantidad máxima de alumnos con nombre propio; el resto los reutiliza
+NAME_POOL_SIZE = 2000
+
+# Filas distintas de respuestas y tamaño de cada tanda de escritura
+ANSWER_VARIANTS = 256
+WRITE_BATCH = 10_000
+
+
+@dataclass
+class DatasetSpec:
+    """
+    Forma de los exports de un curso sintético.
+    
+    Attributes:
+        rows: Intentos por evaluación (sumando todos los turnos)
+        min_attempts: Mínimo de intentos por alumno
+        max_attempts: Máximo de intentos por alumno
+        shifts: Archivos (turnos) por evaluación
+        questions: Columnas de preguntas ("P. 1 /1,00", ...) por export
+        tps: Cantidad de TPs
+        exams: Cantidad de parciales
+        makeups: Cantidad de recuperatorios
+        course: Código del curso
+        seed: Semilla para que los exports sean reproducibles
+    """
+    rows: int
+    min_attempts: int = 1
+    max_attempts: int = 10
+    shifts: int = 2
+    questions: int = 10
+    tps: int = 2
+    exams: int = 1
+    makeups: int = 1
+    course: str = "1K1"
+    seed: int = 0
+    
+    @property
+    def evaluations(self) -> List[str]:
+        """Nombres base de las evaluaciones del curso (ej: "TP1_1K1")."""
+        names = [f"TP{i}" for i in range(1, self.tps + 1)]
+        names += [f"Parcial{i}" for i in range(1, self.exams + 1)]
+        names += [f"Recuperatorio{i}" for i in range(1, self.makeups + 1)]
+        return [f"{name}_{self.course}" for name in names]
+
+
+@dataclass
+class Dataset:
+    """
+    Exports generados para un DatasetSpec.
+    
+    Attributes:
+        spec: Forma de los exports
+        source_dir: Directorio con los CSV
+        files: Nombre base de la evaluación -> archivos de sus turnos
+        rows: Nombre base de la evaluación -> intentos escritos
+        bytes: Tamaño total de los exports
+    """
+    spec: DatasetSpec
+    source_dir: str
+    files: Dict[str, List[str]] = field(default_factory=dict)
+    rows: Dict[str, int] = field(default_factory=dict)
+    bytes: int = 0
+
+
+def build_students(spec: DatasetSpec, rnd: random.Random) -> List[Tuple[str, str, str, int]]:
+    """
+    Arma los alumnos del curso con su cantidad de intentos.
+    
+    Returns:
+        Lista de (apellido, nombre, ID, intentos) cuya suma de intentos es spec.rows
+    """
+    fake.seed_instance(spec.seed)
+    pool = [MoodleStudentRecordFactory.create_record() for _ in range(min(NAME_POOL_SIZE, spec.rows))]
+    
+    students = []
+    remaining = spec.rows
+    while remaining > 0:
+        attempts = min(remaining, rnd.randint(spec.min_attempts, spec.max_attempts))
+        record = pool[len(students) % len(pool)]
+        students.append((record["Apellido(s)"], record["Nombre"], str(100000 + len(students)), attempts))
+        remaining -= attempts
+    return students
+
+
+def write_dataset(spec: DatasetSpec, source_dir: str) -> Dataset:
+    """
+    Escribe los exports de todas las evaluaciones de un curso.
+    
+    Cada alumno rinde en un turno y sus intentos quedan mezclados con los de
+    los demás, como en un export real. Cada archivo termina con la fila
+    "Promedio general".
+    
+    Args:
+        spec: Forma de los exports
+        source_dir: Directorio donde escribir los CSV
+    
+    Returns:
+        Dataset con los archivos generados
+    """
+    os.makedirs(source_dir, exist_ok=True)
+    rnd = random.Random(spec.seed)
+    students = build_students(spec, rnd)
+    header = BASE_COLUMNS + [GRADE_COLUMN] + [f"P. {i} /1,00" for i in range(1, spec.questions + 1)]
+    # Las respuestas no afectan el cálculo: se reparten filas de un conjunto fijo
+    answers = [
+        [f"{rnd.randint(0, 100) / 100:.2f}".replace(".", ",") for _ in range(spec.questions)]
+        for _ in range(ANSWER_VARIANTS)
+    ]
+    grades = [f"{value / 100:.2f}".replace(".", ",") for value in range(1001)]
+    dataset = Dataset(spec, source_dir)
+    
+    for evaluation in spec.evaluations:
+        dataset.files[evaluation] = []
+        for shift in range(spec.shifts):
+            # Un índice de alumno por intento, mezclados entre sí
+            order = [index for index in range(shift, len(students), spec.shifts) for _ in range(students[index][3])]
+            rnd.shuffle(order)
+            
+            suffix = f"_{shift + 1}" if spec.shifts > 1 else ""
+            file_path = os.path.join(source_dir, f"{evaluation}{suffix}.csv")
+            with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                for start in range(0, len(order), WRITE_BATCH):
+                    rows = []
+                    for index in order[start:start + WRITE_BATCH]:
+                        last_name, first_name, student_id, _ = students[index]
+                        rows.append([last_name, first_name, student_id, f"{student_id}@example.com", "Finalizado",
+                                     grades[rnd.randint(0, 1000)], *answers[rnd.randrange(ANSWER_VARIANTS)]])
+                    writer.writerows(rows)
+                writer.writerow(["Promedio general", "", "", "", "", "5,00"] + [""] * spec.questions)
+            dataset.files[evaluation].append(file_path)
+            dataset.bytes += os.path.getsize(file_path)
+        dataset.rows[evaluation] = spec.rows
+    return dataset
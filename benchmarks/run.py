@@ -0,0 +1,264 @@
+"""
+Mide el tiempo, las filas por segundo y el pico de memoria de cada etapa del
+procesamiento con exports sintéticos, y guarda los resultados en JSON.
+
+    python -m benchmarks.run --sizes 1000,10000,100000 --output benchmarks/results/base.json
+    python -m benchmarks.run --sizes 100000 --engine numpy --compare benchmarks/results/base.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from src.generators import ReportGenerator
+from src.managers import ParcialManager, TPManager
+from src.utils import Settings, count_student_attempts, read_csv_with_best_grades
+from .datasets import Dataset, DatasetSpec, write_dataset
+
+
+# Etapas medidas, en el orden del informe
+STAGES = (
+    "read_csv_with_best_grades",
+    "count_student_attempts",
+    "consolidate_multiple_files",
+    "merge_tps",
+    "merge_exams",
+    "generate_final_report",
+)
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+@dataclass
+class StageResult:
+    """
+    Resultado de una etapa para un tamaño de export.
+    
+    Attributes:
+        size: Intentos por evaluación del dataset
+        stage: Nombre de la etapa
+        rows: Intentos que lee la etapa
+        seconds: Mejor tiempo de las repeticiones
+        rows_per_sec: rows / seconds
+        peak_memory_mb: Pico de memoria de Python durante la etapa (None si no se midió)
+    """
+    size: int
+    stage: str
+    rows: int
+    seconds: float
+    rows_per_sec: float
+    peak_memory_mb: Optional[float]
+
+
+def build_stages(dataset: Dataset, settings: Settings) -> Dict[str, tuple]:
+    """
+    Arma las etapas a medir sobre un dataset.
+    
+    Returns:
+        Nombre de etapa -> (función sin argumentos, intentos que lee)
+    """
+    spec = dataset.spec
+    course = spec.course
+    first = spec.evaluations[0]
+    tp_rows = sum(dataset.rows[name] for name in spec.evaluations[:spec.tps])
+    exam_rows = sum(dataset.rows[name] for name in spec.evaluations[spec.tps:])
+    shift_rows = dataset.rows[first] // spec.shifts
+    
+    def consolidate():
+        consolidator = TPManager(settings).consolidator
+        return consolidator.consolidate_multiple_files(first, course)
+    
+    def report():
+        return ReportGenerator(settings).generate_final_report(course, TPManager(settings), ParcialManager(settings))
+    
+    return {
+        "read_csv_with_best_grades": (
+            lambda: read_csv_with_best_grades(dataset.files[first][0], settings.header_map, settings.csv_encoding,
+                                              engine=settings.engine),
+            shift_rows,
+        ),
+        "count_student_attempts": (
+            lambda: count_student_attempts(dataset.files[first][0], settings.header_map, settings.csv_encoding),
+            shift_rows,
+        ),
+        "consolidate_multiple_files": (consolidate, dataset.rows[first]),
+        "merge_tps": (lambda: TPManager(settings).merge_tps(course), tp_rows),
+        "merge_exams": (lambda: ParcialManager(settings).merge_exams(course), exam_rows),
+        "generate_final_report": (report, tp_rows + exam_rows),
+    }
+
+
+def measure(function: Callable, repeat: int, memory: bool) -> tuple:
+    """
+    Mide una etapa descartando su salida por consola.
+    
+    Args:
+        function: Etapa a ejecutar
+        repeat: Repeticiones para el tiempo (se toma la mejor)
+        memory: Si True, ejecuta una vez más con tracemalloc para el pico de memoria
+    
+    Returns:
+        Tupla (mejor tiempo en segundos, pico de memoria en MB o None)
+    """
+    best = None
+    for _ in range(repeat):
+        with redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    
+    peak = None
+    if memory:
+        # Aparte del tiempo: tracemalloc hace mucho más lenta la ejecución
+        tracemalloc.start()
+        try:
+            with redirect_stdout(io.StringIO()):
+                function()
+            peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return best, peak
+
+
+def run_size(spec: DatasetSpec, work_dir: str, engine: str, repeat: int, memory: bool, stages: List[str]) -> List[StageResult]:
+    """
+    Genera el dataset de un tamaño y mide cada etapa.
+    
+    Returns:
+        Resultados de las etapas, en el orden de STAGES
+    """
+    print(f"📝 Generando {spec.rows:,} intentos por evaluación...")
+    dataset = write_dataset(spec, os.path.join(work_dir, "inputs"))
+    settings = Settings(
+        source_dir=dataset.source_dir,
+        output_dir=os.path.join(work_dir, "outputs"),
+        cantidad_tps=spec.tps,
+        cantidad_parciales=spec.exams,
+        cantidad_recuperatorios=spec.makeups,
+        output_format="xlsx",
+        engine=engine,
+    )
+    
+    results = []
+    for name, (function, rows) in build_stages(dataset, settings).items():
+        if name not in stages:
+            continue
+        seconds, peak = measure(function, repeat, memory)
+        result = StageResult(spec.rows, name, rows, seconds, rows / seconds if seconds else 0.0,
+                             round(peak, 2) if peak is not None else None)
+        results.append(result)
+        memory_text = f"{result.peak_memory_mb:>9.1f} MB" if peak is not None else ""
+        print(f"   {name:<28} {seconds:>9.3f} s {result.rows_per_sec:>14,.0f} filas/s {memory_text}")
+    return results
+
+
+def print_comparison(results: List[StageResult], baseline_path: str):
+    """
+    Muestra la relación de tiempos contra una corrida anterior guardada en JSON.
+    
+    Args:
+        results: Resultados de la corrida actual
+        baseline_path: JSON de una corrida anterior
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {(item["size"], item["stage"]): item for item in json.load(f)["results"]}
+    
+    print("")
+    print(f"📊 Comparación con {baseline_path} (>1 = más rápido ahora):")
+    for result in results:
+        previous = baseline.get((result.size, result.stage))
+        if previous is None or not result.seconds:
+            continue
+        print(f"   {result.size:>9,} {result.stage:<28} x{previous['seconds'] / result.seconds:.2f}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de argumentos de los benchmarks."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmarks de ACOCalculator.")
+    parser.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES), metavar="N,N,...",
+                        help="Intentos por evaluación de cada dataset (ej: 1000,10000,1000000)")
+    parser.add_argument("--attempts", default="1-10", metavar="MIN-MAX", help="Intentos por alumno (por defecto: 1-10)")
+    parser.add_argument("--shifts", type=int, default=2, help="Turnos (archivos) por evaluación")
+    parser.add_argument("--questions", type=int, default=10, help="Columnas de preguntas por export")
+    parser.add_argument("--engine", default="python", choices=("python", "numpy"), help="Motor de procesamiento")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por etapa (se toma la mejor)")
+    parser.add_argument("--no-memory", action="store_true", help="No medir el pico de memoria con tracemalloc")
+    parser.add_argument("--stage", action="append", choices=STAGES, help="Etapa a medir; se puede repetir (por defecto, todas)")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos sintéticos")
+    parser.add_argument("-o", "--output", metavar="RUTA", help="Archivo JSON donde guardar los resultados")
+    parser.add_argument("--compare", metavar="RUTA", help="JSON de una corrida anterior para comparar tiempos")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Ejecuta los benchmarks.
+    
+    Args:
+        argv: Argumentos de línea de comandos (None = sys.argv)
+    
+    Returns:
+        Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+        min_attempts, _, max_attempts = args.attempts.partition("-")
+        min_attempts = int(min_attempts)
+        max_attempts = int(max_attempts or min_attempts)
+    except ValueError:
+        print("❌ Error: --sizes y --attempts deben ser números (ej: --sizes 1000,10000 --attempts 1-10)")
+        return 2
+    if not 1 <= min_attempts <= max_attempts or any(size < 1 for size in sizes):
+        print("❌ Error: Los tamaños y los intentos deben ser mayores que cero (y MIN <= MAX)")
+        return 2
+    
+    stages = args.stage or list(STAGES)
+    results = []
+    for size in sizes:
+        spec = DatasetSpec(rows=size, min_attempts=min_attempts, max_attempts=max_attempts,
+                           shifts=args.shifts, questions=args.questions, seed=args.seed)
+        work_dir = tempfile.mkdtemp(prefix="acobench_")
+        try:
+            results.extend(run_size(spec, work_dir, args.engine, args.repeat, not args.no_memory, stages))
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    if args.output:
+        report = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "engine": args.engine,
+            "attempts": [min_attempts, max_attempts],
+            "shifts": args.shifts,
+            "questions": args.questions,
+            "repeat": args.repeat,
+            "seed": args.seed,
+            "results": [asdict(result) for result in results],
+        }
+        output_dir = os.path.dirname(args.output)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Resultados guardados en {args.output}")
+    
+    if args.compare:
+        print_comparison(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
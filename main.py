@@ -14,15 +14,20 @@ Características principales:
 - Fusión de TPs por curso
 - Fusión de Parciales y Recuperatorios por curso
 - Generación de planillas finales consolidadas en formato XLS
+- Generación en paralelo de las planillas de todos los cursos
+- Planilla única con una hoja por comisión
+- Línea de comandos no interactiva para scripts y tareas programadas
 
 Autor: Sistema ACOCalculator
 Versión: 1.0
 """
 
+import multiprocessing
 import os
 import sys
 import webbrowser
-from src import ConfigLoader, TPManager, ParcialManager, ReportGenerator
+from src import ConfigLoader, TPManager, ParcialManager, ReportGenerator, BatchReportGenerator
+from src.cli import run as run_cli
 
 
 def get_binary_directory():
@@ -183,6 +188,8 @@ def menu():
         print("="*60)
         print("1) Generar planilla de notas (XLS)")
         print("2) Operaciones intermedias")
+        print("3) Generar planillas de todos los cursos")
+        print("4) Generar planilla única con todos los cursos (una hoja por curso)")
         print("h) Ayuda - Abrir manual de usuario")
         print("q) Salir")
         print("="*60)
@@ -201,6 +208,30 @@ def menu():
         elif option == "2":
             intermediate_operations_submenu(config, tp_manager, exam_manager)
         
+        elif option == "3":
+            batch_generator = BatchReportGenerator(config)
+            courses = batch_generator.discover_courses()
+            if not courses:
+                print(f"⚠️ No se encontraron cursos en la carpeta '{config.get_source_dir()}'")
+                continue
+            print("\n" + "-"*60)
+            print(f"Cursos detectados: {', '.join(courses)}")
+            print("-"*60)
+            results = batch_generator.generate_all_reports(courses)
+            batch_generator.print_summary(results)
+        
+        elif option == "4":
+            batch_generator = BatchReportGenerator(config)
+            courses = batch_generator.discover_courses()
+            if not courses:
+                print(f"⚠️ No se encontraron cursos en la carpeta '{config.get_source_dir()}'")
+                continue
+            print("\n" + "-"*60)
+            print(f"Cursos detectados: {', '.join(courses)}")
+            print("-"*60)
+            results = batch_generator.generate_campus_report(courses)
+            batch_generator.print_summary(results)
+        
         elif option.lower() == "h":
             print("\n" + "="*60)
             print("📖 Abriendo manual de usuario en el navegador...")
@@ -222,10 +253,24 @@ def menu():
             print("❌ Opción no válida. Por favor, selecciona una opción del menú.")
 
 
-def main():
+def main(argv=None):
     """
     Función principal del programa.
+    
+    Con argumentos ejecuta la línea de comandos no interactiva (ver src/cli.py);
+    sin argumentos abre el menú interactivo.
+    
+    Args:
+        argv: Argumentos sin el nombre del programa (por defecto, sys.argv[1:])
+    
+    Returns:
+        int: Código de salida del proceso
     """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv:
+        return run_cli(argv)
+    
     print("\n" + "="*60)
     print(" ACOCalculator")
     print(" Versión 1.0")
@@ -240,7 +285,11 @@ def main():
         print(f"\n❌ Error inesperado: {e}")
         import traceback
         traceback.print_exc()
+        return 1
+    return 0
 
 
 if __name__ == "__main__":
-    main()
+    # Necesario para usar procesos en paralelo desde el binario de PyInstaller
+    multiprocessing.freeze_support()
+    sys.exit(main())
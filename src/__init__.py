@@ -2,10 +2,11 @@
 Sistema de Gestión de Calificaciones de Moodle.
 Procesamiento automatizado de trabajos prácticos, parciales y recuperatorios.
 """
+# Definida antes de importar los subpaquetes porque algunos módulos la utilizan
+__version__ = '1.0.0'
+
 from .utils import ConfigLoader
 from .managers import TPManager, ParcialManager
-from .generators import ReportGenerator
-
-__all__ = ['ConfigLoader', 'TPManager', 'ParcialManager', 'ReportGenerator']
-__version__ = '1.0.0'
+from .generators import ReportGenerator, BatchReportGenerator
 
+__all__ = ['ConfigLoader', 'TPManager', 'ParcialManager', 'ReportGenerator', 'BatchReportGenerator']
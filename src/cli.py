@@ -0,0 +1,378 @@
+"""
+Interfaz de línea de comandos no interactiva.
+
+Permite ejecutar las mismas operaciones del menú desde scripts o tareas
+programadas (cron), sin leer nada de la entrada estándar:
+
+    acocalculator report --course 1K2
+    acocalculator report --all --jobs 4
+    acocalculator report --all --campus
+    acocalculator filter TP1_1K2.csv
+    acocalculator merge-tps --course 1K2
+    acocalculator merge-exams --course 1K2
+    acocalculator watch
+    acocalculator ingest --db outputs/attempts.sqlite
+    acocalculator --metrics metrics.json report --all
+    acocalculator --profile --memprofile report --course 1K2
+
+Códigos de salida:
+    0: La operación terminó correctamente
+    1: La operación falló (o algún curso no se pudo generar)
+    2: Argumentos o configuración inválidos
+    130: Interrumpido por el usuario (Ctrl+C), salvo en watch donde es la forma de salir
+"""
+import argparse
+import configparser
+import os
+import sys
+from contextlib import contextmanager, redirect_stdout
+from typing import List, Optional
+from . import __version__
+from .generators import BatchReportGenerator, CourseWatcher, ReportGenerator
+from .managers import ParcialManager, TPManager
+from .utils import AttemptStore, ConfigLoader, Settings
+from .utils.attempt_store import DEFAULT_STORE_NAME
+from .utils.input_index import parse_evaluation_name
+from .utils.metrics import METRICS
+from .utils.profiling import DEFAULT_TOP, ProfileOptions, profile_course
+
+
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+DEFAULT_CONFIG_PATH = "config.ini"
+
+# Comandos que procesan cursos y por lo tanto admiten --profile y --memprofile
+PROFILED_COMMANDS = ("report", "merge-tps", "merge-exams")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Construye el parser de argumentos con todos los subcomandos.
+    
+    Returns:
+        Parser de argparse configurado
+    """
+    parser = argparse.ArgumentParser(
+        prog="acocalculator",
+        description="Sistema de Gestión de Calificaciones de Moodle (modo no interactivo).",
+        epilog="Sin argumentos se abre el menú interactivo.",
+    )
+    parser.add_argument(
+        "--config", default=DEFAULT_CONFIG_PATH, metavar="RUTA",
+        help=f"Archivo de configuración (por defecto: {DEFAULT_CONFIG_PATH})",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true",
+        help="No mostrar mensajes de progreso; los errores se informan por stderr",
+    )
+    parser.add_argument(
+        "--metrics", metavar="RUTA",
+        help="Medir tiempo, CPU y filas/bytes por etapa y curso; guarda un JSON y muestra un resumen al final",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="Perfilar cada curso con cProfile; guarda <output_dir>/<curso>/profile.pstats y un resumen profile.txt",
+    )
+    parser.add_argument(
+        "--memprofile", action="store_true",
+        help="Seguir el pico de memoria de cada curso con tracemalloc; guarda <output_dir>/<curso>/memprofile.txt",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=DEFAULT_TOP, metavar="N",
+        help=f"Funciones o líneas en los resúmenes de --profile y --memprofile (por defecto: {DEFAULT_TOP})",
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
+    
+    subparsers = parser.add_subparsers(dest="command", metavar="COMANDO", required=True)
+    
+    report = subparsers.add_parser("report", help="Generar la planilla final de uno o varios cursos")
+    target = report.add_mutually_exclusive_group(required=True)
+    target.add_argument(
+        "--course", action="append", metavar="CURSO",
+        help="Curso a generar (ej: 1K2); se puede repetir",
+    )
+    target.add_argument("--all", action="store_true", help="Generar todos los cursos detectados en el directorio de entrada")
+    report.add_argument(
+        "-j", "--jobs", type=int, default=None, metavar="N",
+        help="Procesos para generar varios cursos (por defecto, max_workers de la configuración; 0 = automático)",
+    )
+    report.add_argument(
+        "--campus", action="store_true",
+        help="Generar un único libro con una hoja 'Notas <curso>' por comisión",
+    )
+    report.add_argument(
+        "-o", "--output", metavar="RUTA",
+        help="Ruta del libro con --campus (por defecto: <output_dir>/Planilla_Campus.<formato>)",
+    )
+    report.set_defaults(handler=_run_report)
+    
+    filter_parser = subparsers.add_parser("filter", help="Filtrar la mejor calificación por alumno de un archivo")
+    filter_parser.add_argument("file", metavar="ARCHIVO", help="Nombre del archivo CSV dentro del directorio de entrada")
+    filter_parser.set_defaults(handler=_run_filter)
+    
+    merge_tps = subparsers.add_parser("merge-tps", help="Unificar los TPs de un curso")
+    merge_tps.add_argument("--course", required=True, metavar="CURSO", help="Curso a procesar (ej: 1K2)")
+    merge_tps.set_defaults(handler=_run_merge_tps)
+    
+    merge_exams = subparsers.add_parser("merge-exams", help="Unificar los parciales y recuperatorios de un curso")
+    merge_exams.add_argument("--course", required=True, metavar="CURSO", help="Curso a procesar (ej: 1K2)")
+    merge_exams.set_defaults(handler=_run_merge_exams)
+    
+    watch = subparsers.add_parser("watch", help="Regenerar automáticamente los cursos cuyos exports cambian")
+    watch.add_argument(
+        "--debounce", type=float, default=2.0, metavar="SEG",
+        help="Segundos sin cambios antes de procesar un lote de archivos (por defecto: 2)",
+    )
+    watch.add_argument(
+        "--interval", type=float, default=1.0, metavar="SEG",
+        help="Segundos entre revisiones cuando no se usa inotify (por defecto: 1)",
+    )
+    watch.add_argument("--polling", action="store_true", help="Revisar el directorio periódicamente en lugar de usar inotify")
+    watch.add_argument(
+        "-j", "--jobs", type=int, default=None, metavar="N",
+        help="Procesos para regenerar varios cursos (por defecto, max_workers de la configuración; 0 = automático)",
+    )
+    watch.set_defaults(handler=_run_watch)
+    
+    ingest = subparsers.add_parser("ingest", help="Cargar los exports del directorio de entrada en la base SQLite de intentos")
+    ingest.add_argument(
+        "--db", metavar="RUTA",
+        help=f"Base de intentos (por defecto, attempt_store de la configuración o <output_dir>/{DEFAULT_STORE_NAME})",
+    )
+    ingest.set_defaults(handler=_run_ingest)
+    
+    return parser
+
+
+def run(argv: Optional[List[str]] = None) -> int:
+    """
+    Ejecuta la línea de comandos.
+    
+    Args:
+        argv: Argumentos sin el nombre del programa (por defecto, sys.argv[1:])
+    
+    Returns:
+        Código de salida del proceso
+    """
+    parser = build_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        # argparse termina el proceso con --help, --version o argumentos inválidos
+        return e.code if isinstance(e.code, int) else EXIT_USAGE
+    
+    if args.command == "report" and args.output and not args.campus:
+        _error("--output sólo se puede usar junto con --campus")
+        return EXIT_USAGE
+    if getattr(args, "jobs", None) is not None and args.jobs < 0:
+        _error("--jobs debe ser un número mayor o igual a 0")
+        return EXIT_USAGE
+    if args.command == "watch" and (args.debounce < 0 or args.interval <= 0):
+        _error("--debounce no puede ser negativo y --interval debe ser mayor a 0")
+        return EXIT_USAGE
+    if (args.profile or args.memprofile) and args.command not in PROFILED_COMMANDS:
+        _error(f"--profile y --memprofile sólo se pueden usar con {', '.join(PROFILED_COMMANDS)}")
+        return EXIT_USAGE
+    if args.profile_top <= 0:
+        _error("--profile-top debe ser un número mayor a 0")
+        return EXIT_USAGE
+    
+    try:
+        with _output(args.quiet):
+            settings = _load_settings(args)
+            if settings is None:
+                return EXIT_USAGE
+            if not os.path.isdir(settings.source_dir):
+                _error(f"No existe el directorio de entrada '{settings.source_dir}'")
+                return EXIT_FAILURE
+            if not args.metrics:
+                return args.handler(settings, args)
+            METRICS.enable()
+            try:
+                return args.handler(settings, args)
+            finally:
+                _write_metrics(args.metrics)
+    except KeyboardInterrupt:
+        _error("Programa interrumpido por el usuario")
+        return EXIT_INTERRUPTED
+
+
+def _load_settings(args) -> Optional[Settings]:
+    """
+    Carga la configuración indicada en --config.
+    
+    Un archivo indicado explícitamente debe existir; con el valor por defecto
+    se mantiene el comportamiento del menú (usar la configuración embebida).
+    
+    Args:
+        args: Argumentos interpretados
+    
+    Returns:
+        Settings compilada, o None si la configuración es inválida
+    """
+    if args.config != DEFAULT_CONFIG_PATH and not os.path.exists(args.config):
+        _error(f"No existe el archivo de configuración '{args.config}'")
+        return None
+    try:
+        return ConfigLoader(args.config, quiet=args.quiet).get_settings()
+    except (configparser.Error, ValueError) as e:
+        _error(f"Configuración inválida en '{args.config}': {e}")
+        return None
+
+
+def _run_report(settings: Settings, args) -> int:
+    """Genera la planilla final de los cursos indicados."""
+    if args.campus:
+        return _run_campus_report(settings, args)
+    
+    if args.course and len(args.course) == 1:
+        course = args.course[0].upper()
+        print(f"📊 Generando planilla final para el curso {course}...")
+        with profile_course(settings.output_dir, course, _profile_options(args)):
+            output_file = ReportGenerator(settings).generate_final_report(
+                course, TPManager(settings), ParcialManager(settings)
+            )
+        if output_file is None:
+            _error(f"No se pudo generar la planilla del curso {course}")
+            return EXIT_FAILURE
+        return EXIT_OK
+    
+    batch_generator = BatchReportGenerator(settings, profile=_profile_options(args))
+    courses = args.course if args.course else batch_generator.discover_courses()
+    if not courses:
+        _error(f"No se encontraron cursos en '{settings.source_dir}'")
+        return EXIT_FAILURE
+    
+    results = batch_generator.generate_all_reports(courses, max_workers=args.jobs)
+    batch_generator.print_summary(results)
+    
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        _error(f"{result.course}: {result.error}")
+    return EXIT_FAILURE if failed else EXIT_OK
+
+
+def _run_campus_report(settings: Settings, args) -> int:
+    """Genera el libro único con una hoja por curso."""
+    batch_generator = BatchReportGenerator(settings, profile=_profile_options(args))
+    results = batch_generator.generate_campus_report(args.course, max_workers=args.jobs, output_file=args.output)
+    if not results:
+        _error(f"No se pudo generar la planilla única con los cursos de '{settings.source_dir}'")
+        return EXIT_FAILURE
+    batch_generator.print_summary(results)
+    
+    failed = [result for result in results if not result.ok]
+    for result in failed:
+        _error(f"{result.course}: {result.error}")
+    return EXIT_FAILURE if failed else EXIT_OK
+
+
+def _run_filter(settings: Settings, args) -> int:
+    """Filtra la mejor calificación por alumno de un archivo del directorio de entrada."""
+    file_name = os.path.basename(args.file)
+    parts = parse_evaluation_name(file_name)
+    course = parts[2].upper() if parts else None
+    if file_name.upper().startswith(settings.tp_prefix.upper()):
+        manager = TPManager(settings)
+    else:
+        manager = ParcialManager(settings)
+    
+    if manager.filter_best_grade(file_name, course) is None:
+        _error(f"No se pudo filtrar el archivo '{file_name}'")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _run_merge_tps(settings: Settings, args) -> int:
+    """Unifica los TPs de un curso."""
+    course = args.course.upper()
+    print(f"🔄 Procesando TPs para el curso {course}...")
+    with profile_course(settings.output_dir, course, _profile_options(args)):
+        result = TPManager(settings).merge_tps(course)
+    if result is None:
+        _error(f"No se pudieron unificar los TPs del curso {course}")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _run_merge_exams(settings: Settings, args) -> int:
+    """Unifica los parciales y recuperatorios de un curso."""
+    course = args.course.upper()
+    print(f"🔄 Procesando Parciales para el curso {course}...")
+    with profile_course(settings.output_dir, course, _profile_options(args)):
+        result = ParcialManager(settings).merge_exams(course)
+    if result is None:
+        _error(f"No se pudieron unificar los parciales del curso {course}")
+        return EXIT_FAILURE
+    return EXIT_OK
+
+
+def _run_watch(settings: Settings, args) -> int:
+    """Vigila el directorio de entrada hasta Ctrl+C, regenerando los cursos afectados."""
+    watcher = CourseWatcher(
+        settings, debounce=args.debounce, interval=args.interval,
+        use_inotify=not args.polling, max_workers=args.jobs,
+    )
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n👋 Vigilancia detenida")
+    return EXIT_OK
+
+
+def _run_ingest(settings: Settings, args) -> int:
+    """Carga en la base de intentos los exports nuevos o modificados."""
+    db_path = args.db or settings.attempt_store or os.path.join(settings.output_dir, DEFAULT_STORE_NAME)
+    try:
+        with AttemptStore(db_path, settings.header_map, settings.csv_encoding, settings.calculate_avg_grades) as store:
+            loaded = store.ingest_directory(settings.source_dir)
+    except (ValueError, KeyError) as e:
+        _error(f"No se pudieron cargar los exports: {e}")
+        return EXIT_FAILURE
+    print(f"✅ {loaded} archivo(s) cargado(s) en '{db_path}'")
+    return EXIT_OK
+
+
+def _write_metrics(file_path: str):
+    """
+    Muestra el resumen de tiempos por etapa y guarda las mediciones en JSON.
+    
+    Args:
+        file_path: Ruta del JSON indicada en --metrics
+    """
+    METRICS.disable()
+    print("")
+    print("⏱️  Tiempos por etapa:")
+    print(METRICS.summary_table())
+    try:
+        output_dir = os.path.dirname(file_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        METRICS.write_json(file_path)
+    except OSError as e:
+        _error(f"No se pudieron guardar las métricas en '{file_path}': {e}")
+        return
+    print(f"📈 Métricas guardadas en {file_path}")
+
+
+def _profile_options(args) -> ProfileOptions:
+    """Arma los perfiles pedidos con --profile, --memprofile y --profile-top."""
+    return ProfileOptions(cpu=args.profile, memory=args.memprofile, top=args.profile_top)
+
+
+@contextmanager
+def _output(quiet: bool):
+    """Descarta la salida estándar en modo silencioso."""
+    if not quiet:
+        yield
+        return
+    with open(os.devnull, "w", encoding="utf-8") as devnull, redirect_stdout(devnull):
+        yield
+
+
+def _error(message: str):
+    """Informa un error por stderr (visible también en modo silencioso)."""
+    print(f"❌ {message}", file=sys.stderr)
@@ -2,6 +2,8 @@
 Módulo de generadores para crear reportes consolidados.
 """
 from .report_generator import ReportGenerator
+from .batch_generator import BatchReportGenerator, CourseResult
+from .course_watcher import CourseWatcher
 
-__all__ = ['ReportGenerator']
+__all__ = ['ReportGenerator', 'BatchReportGenerator', 'CourseResult', 'CourseWatcher']
 
@@ -0,0 +1,344 @@
+"""
+Módulo para generar las planillas finales de todos los cursos en paralelo.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field
+from typing import Iterator, List, Optional, Tuple, Union
+from ..managers import TPManager, ParcialManager
+from ..utils import ConfigLoader, Settings, as_settings, discover_courses
+from ..utils.file_consolidator import natural_sort_key
+from ..utils.metrics import METRICS, StageStats, collect_metrics
+from ..utils.profiling import ProfileOptions, profile_course
+from .report_generator import XLS_MAX_COLUMNS, XLS_MAX_ROWS, CourseSheet, ReportGenerator
+
+
+@dataclass
+class CourseResult:
+    """
+    Resultado de generar la planilla final de un curso.
+    
+    Attributes:
+        course: Código del curso
+        output_file: Ruta de la planilla generada (None si no se generó)
+        error: Descripción del error si el curso falló
+        log: Salida por consola capturada durante el procesamiento
+        metrics: Mediciones por etapa del curso (vacía si no se midió)
+    """
+    course: str
+    output_file: Optional[str] = None
+    error: Optional[str] = None
+    log: str = ""
+    metrics: List[StageStats] = field(default_factory=list)
+    
+    @property
+    def ok(self) -> bool:
+        """True si la planilla se generó correctamente."""
+        return self.error is None and self.output_file is not None
+
+
+def generate_course_report(settings: Settings, course: str, measure: bool = False,
+                           profile: Optional[ProfileOptions] = None) -> CourseResult:
+    """
+    Genera la planilla final de un curso capturando su salida por consola.
+    
+    Es una función de módulo para poder ejecutarse en procesos hijos, que
+    reciben la configuración ya compilada en lugar de volver a leer config.ini.
+    Nunca lanza excepciones: cualquier error queda registrado en el resultado
+    para que un curso con problemas no detenga al resto.
+    
+    Args:
+        settings: Configuración compilada
+        course: Código del curso (ej: "1K2")
+        measure: Si True, devuelve las mediciones por etapa en CourseResult.metrics
+        profile: Perfiles de CPU o memoria a guardar en la carpeta del curso
+    
+    Returns:
+        CourseResult con la planilla generada o el error ocurrido
+    """
+    result = CourseResult(course=course.upper())
+    buffer = io.StringIO()
+    with redirect_stdout(buffer), collect_metrics(measure) as metrics, \
+            profile_course(settings.output_dir, course, profile):
+        try:
+            report_generator = ReportGenerator(settings)
+            result.output_file = report_generator.generate_final_report(
+                course, TPManager(settings), ParcialManager(settings)
+            )
+            if result.output_file is None:
+                result.error = "No se generó la planilla (sin datos de alumnos)"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+    result.log = buffer.getvalue()
+    result.metrics = metrics
+    return result
+
+
+def compute_course_sheet(settings: Settings, course: str, measure: bool = False,
+                         profile: Optional[ProfileOptions] = None) -> Tuple[CourseResult, Optional[CourseSheet]]:
+    """
+    Calcula las filas de la hoja de un curso para la planilla única del campus.
+    
+    Igual que generate_course_report, es una función de módulo que se ejecuta
+    en procesos hijos, captura la salida por consola y nunca lanza excepciones.
+    
+    Args:
+        settings: Configuración compilada
+        course: Código del curso (ej: "1K2")
+        measure: Si True, devuelve las mediciones por etapa en CourseResult.metrics
+        profile: Perfiles de CPU o memoria a guardar en la carpeta del curso
+    
+    Returns:
+        Tupla (resultado del curso, hoja calculada o None si falló)
+    """
+    result = CourseResult(course=course.upper())
+    sheet = None
+    buffer = io.StringIO()
+    with redirect_stdout(buffer), collect_metrics(measure) as metrics, \
+            profile_course(settings.output_dir, course, profile):
+        try:
+            sheet = ReportGenerator(settings).build_course_sheet(
+                course, TPManager(settings), ParcialManager(settings)
+            )
+            if sheet is None:
+                result.error = "No se generó la hoja (sin datos de alumnos)"
+        except Exception as e:
+            result.error = f"{type(e).__name__}: {e}"
+    result.log = buffer.getvalue()
+    result.metrics = metrics
+    return result, sheet
+
+
+class BatchReportGenerator:
+    """Clase para generar las planillas finales de todos los cursos de inputs/."""
+    
+    def __init__(self, config: Union[ConfigLoader, Settings], profile: Optional[ProfileOptions] = None):
+        """
+        Inicializa el generador por lotes.
+        
+        Args:
+            config: Instancia de ConfigLoader o Settings con la configuración del sistema
+            profile: Perfiles de CPU o memoria a tomar en cada curso (por defecto, ninguno)
+        """
+        settings = as_settings(config)
+        self.config = config
+        self.settings = settings
+        self.source_dir = settings.source_dir
+        self.max_workers = settings.max_workers
+        self.prefixes = settings.evaluation_prefixes
+        self.profile = profile
+    
+    def discover_courses(self) -> List[str]:
+        """
+        Detecta todos los cursos con exports en el directorio de entrada.
+        
+        Returns:
+            Lista de cursos en orden natural (1K2 antes que 1K10)
+        """
+        return discover_courses(self.source_dir, self.prefixes)
+    
+    def generate_all_reports(self, courses: List[str] = None, max_workers: int = None) -> List[CourseResult]:
+        """
+        Genera las planillas finales de varios cursos en paralelo.
+        
+        Cada curso se procesa en un proceso independiente; los errores de un
+        curso se reportan en su resultado sin interrumpir a los demás.
+        
+        Args:
+            courses: Cursos a procesar (por defecto, todos los detectados en inputs/)
+            max_workers: Cantidad de procesos (por defecto, la configurada; 0 = automático)
+        
+        Returns:
+            Lista de CourseResult en el orden de los cursos
+        """
+        if courses is None:
+            courses = self.discover_courses()
+        courses = [course.upper() for course in courses]
+        
+        if not courses:
+            print(f"⚠️ No se encontraron cursos en '{self.source_dir}'")
+            return []
+        
+        workers = self._resolve_workers(max_workers, len(courses))
+        print(f"🚀 Generando {len(courses)} cursos con {workers} proceso(s)...")
+        
+        if workers == 1:
+            results = []
+            for course in courses:
+                result = generate_course_report(self.settings, course, METRICS.enabled, self.profile)
+                METRICS.merge(result.metrics)
+                self._print_progress(result)
+                results.append(result)
+            return results
+        
+        results = {}
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(generate_course_report, self.settings, course, METRICS.enabled, self.profile): course
+                for course in courses
+            }
+            for future in as_completed(futures):
+                course = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # El proceso hijo terminó de forma inesperada
+                    result = CourseResult(course=course, error=f"{type(e).__name__}: {e}")
+                METRICS.merge(result.metrics)
+                self._print_progress(result)
+                results[course] = result
+        
+        return [results[course] for course in courses]
+    
+    def generate_campus_report(self, courses: List[str] = None, max_workers: int = None,
+                               output_file: str = None) -> List[CourseResult]:
+        """
+        Genera un único libro con una hoja "Notas <curso>" por comisión.
+        
+        Las filas de cada curso se calculan en paralelo en procesos hijos y
+        las hojas se escriben en el orden de los cursos a medida que están
+        listas: mientras se escribe un curso, los siguientes se siguen calculando.
+        
+        Args:
+            courses: Cursos a incluir (por defecto, todos los detectados en inputs/)
+            max_workers: Cantidad de procesos (por defecto, la configurada; 0 = automático)
+            output_file: Ruta del libro (por defecto, <output_dir>/Planilla_Campus.<formato>)
+        
+        Returns:
+            Lista de CourseResult en el orden de los cursos; los cursos incluidos
+            tienen como output_file la ruta del libro
+        """
+        if courses is None:
+            courses = self.discover_courses()
+        courses = [course.upper() for course in courses]
+        
+        if not courses:
+            print(f"⚠️ No se encontraron cursos en '{self.source_dir}'")
+            return []
+        
+        report_generator = ReportGenerator(self.settings)
+        if not report_generator.check_output_format():
+            return []
+        # Las columnas son las mismas en todas las hojas: se validan una sola vez
+        if self.settings.output_format == "xls" and len(report_generator.build_columns()) > XLS_MAX_COLUMNS:
+            print(f"❌ Error: La planilla supera el límite de {XLS_MAX_COLUMNS} columnas de XLS.")
+            print("   Usa output_format = xlsx en config.ini")
+            return []
+        
+        if output_file is None:
+            output_file = os.path.join(self.settings.output_dir, f"Planilla_Campus.{self.settings.output_format}")
+        
+        workers = self._resolve_workers(max_workers, len(courses))
+        print(f"🏫 Generando planilla única de {len(courses)} cursos con {workers} proceso(s)...")
+        
+        results = []
+        workbook = None
+        try:
+            for result, sheet in self._iter_course_sheets(courses, workers):
+                if sheet is not None:
+                    if self.settings.output_format == "xls" and len(sheet.rows) + 1 > XLS_MAX_ROWS:
+                        result.error = f"La hoja supera las {XLS_MAX_ROWS} filas de XLS (usa output_format = xlsx)"
+                    else:
+                        if workbook is None:
+                            # El libro se crea con la primera hoja: sin cursos válidos no se genera
+                            os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+                            workbook = report_generator.open_workbook(output_file)
+                        report_generator.write_sheet(workbook, sheet.course, sheet.rows)
+                        result.output_file = output_file
+                self._print_progress(result)
+                results.append(result)
+        except BaseException:
+            # Incluye Ctrl+C: no se deja un libro a medio escribir
+            if workbook is not None:
+                workbook.abort()
+            raise
+        
+        if workbook is not None:
+            workbook.close()
+            print(f"✅ Planilla única generada: {output_file}")
+        else:
+            print("⚠️ Ningún curso tiene datos: no se generó la planilla única")
+        return results
+    
+    def print_summary(self, results: List[CourseResult]):
+        """
+        Muestra un resumen de los cursos generados y los que fallaron.
+        
+        Args:
+            results: Resultados devueltos por generate_all_reports
+        """
+        succeeded = [r for r in results if r.ok]
+        failed = [r for r in results if not r.ok]
+        
+        print("\n" + "="*60)
+        print(f" RESUMEN: {len(succeeded)} generados, {len(failed)} con errores")
+        print("="*60)
+        for result in sorted(results, key=lambda r: natural_sort_key(r.course)):
+            if result.ok:
+                print(f"✅ {result.course}: {result.output_file}")
+            else:
+                print(f"❌ {result.course}: {result.error}")
+    
+    def _iter_course_sheets(self, courses: List[str], workers: int) -> Iterator[Tuple[CourseResult, Optional[CourseSheet]]]:
+        """
+        Calcula las hojas de los cursos y las entrega en el orden de los cursos.
+        
+        Args:
+            courses: Cursos a calcular
+            workers: Cantidad de procesos (1 = en el proceso actual)
+        
+        Yields:
+            Tuplas (resultado, hoja) en el mismo orden que courses
+        """
+        if workers == 1:
+            for course in courses:
+                result, sheet = compute_course_sheet(self.settings, course, METRICS.enabled, self.profile)
+                METRICS.merge(result.metrics)
+                yield result, sheet
+            return
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(compute_course_sheet, self.settings, course, METRICS.enabled, self.profile) for course in courses]
+            for index, course in enumerate(courses):
+                try:
+                    result, sheet = futures[index].result()
+                    METRICS.merge(result.metrics)
+                    yield result, sheet
+                except Exception as e:
+                    # El proceso hijo terminó de forma inesperada
+                    yield CourseResult(course=course, error=f"{type(e).__name__}: {e}"), None
+                # Liberar las filas ya escritas
+                futures[index] = None
+    
+    def _resolve_workers(self, max_workers: Optional[int], course_count: int) -> int:
+        """
+        Determina la cantidad de procesos a utilizar.
+        
+        Args:
+            max_workers: Cantidad solicitada (None = configurada, 0 = automático)
+            course_count: Cantidad de cursos a procesar
+        
+        Returns:
+            Cantidad de procesos, entre 1 y la cantidad de cursos
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        if not max_workers or max_workers < 1:
+            max_workers = os.cpu_count() or 1
+        return max(1, min(max_workers, course_count))
+    
+    def _print_progress(self, result: CourseResult):
+        """
+        Muestra la salida por consola capturada del curso terminado y su línea de progreso.
+        
+        La salida de cada curso se imprime completa al llegar su resultado, así
+        no se mezcla con la de los cursos que siguen procesándose en paralelo.
+        """
+        if result.log:
+            print(result.log, end="" if result.log.endswith("\n") else "\n")
+        if result.ok:
+            print(f"   ✅ {result.course}")
+        else:
+            print(f"   ❌ {result.course}: {result.error}")
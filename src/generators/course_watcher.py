@@ -0,0 +1,99 @@
+"""
+Módulo para regenerar automáticamente los cursos cuyos exports cambiaron.
+"""
+from typing import Iterable, List, Optional, Union
+from ..utils import ConfigLoader, InputIndex, Settings, as_settings
+from ..utils.directory_watcher import DirectoryWatcher
+from ..utils.file_consolidator import natural_sort_key
+from ..utils.input_index import parse_evaluation_name
+from .batch_generator import BatchReportGenerator, CourseResult
+
+
+class CourseWatcher:
+    """
+    Vigila el directorio de entrada y regenera sólo los cursos afectados.
+    
+    Cada archivo que cambia se traduce a su (evaluación, curso) a partir del
+    nombre, y de cada lote de cambios se regeneran los filtrados, unificados y
+    la planilla final únicamente de los cursos involucrados.
+    """
+    
+    def __init__(self, config: Union[ConfigLoader, Settings], debounce: float = 2.0,
+                 interval: float = 1.0, use_inotify: bool = True, max_workers: Optional[int] = None):
+        """
+        Inicializa el vigilante de cursos.
+        
+        Args:
+            config: Instancia de ConfigLoader o Settings con la configuración del sistema
+            debounce: Segundos sin cambios antes de procesar un lote
+            interval: Segundos entre revisiones cuando no hay inotify
+            use_inotify: Si False, revisa el directorio periódicamente en lugar de usar inotify
+            max_workers: Procesos para regenerar varios cursos (None = el configurado)
+        """
+        settings = as_settings(config)
+        self.settings = settings
+        self.source_dir = settings.source_dir
+        self.prefixes = {prefix.lower() for prefix in settings.evaluation_prefixes}
+        self.debounce = debounce
+        self.interval = interval
+        self.use_inotify = use_inotify
+        self.max_workers = max_workers
+        self.batch_generator = BatchReportGenerator(settings)
+    
+    def courses_for(self, file_names: Iterable[str]) -> List[str]:
+        """
+        Determina los cursos afectados por un conjunto de archivos.
+        
+        Args:
+            file_names: Nombres de los archivos que cambiaron
+        
+        Returns:
+            Cursos en mayúsculas y orden natural; los archivos que no son
+            exports de TPs, parciales o recuperatorios se ignoran
+        """
+        courses = set()
+        for name in file_names:
+            key = parse_evaluation_name(name)
+            if key is not None and key[0] in self.prefixes:
+                courses.add(key[2].upper())
+        return sorted(courses, key=natural_sort_key)
+    
+    def process_changes(self, file_names: Iterable[str]) -> List[CourseResult]:
+        """
+        Regenera los cursos afectados por un lote de cambios.
+        
+        Args:
+            file_names: Nombres de los archivos que cambiaron
+        
+        Returns:
+            Resultados de los cursos regenerados (vacío si ningún curso se vio afectado)
+        """
+        courses = self.courses_for(file_names)
+        if not courses:
+            return []
+        
+        # Un archivo reescrito en su lugar no cambia el mtime del directorio
+        InputIndex.for_directory(self.source_dir).refresh(force=True)
+        
+        print(f"\n🔄 Cambios en: {', '.join(sorted(file_names))}")
+        results = self.batch_generator.generate_all_reports(courses, max_workers=self.max_workers)
+        self.batch_generator.print_summary(results)
+        return results
+    
+    def run(self, max_batches: Optional[int] = None):
+        """
+        Vigila el directorio hasta que se interrumpa (Ctrl+C).
+        
+        Args:
+            max_batches: Cantidad de lotes a procesar antes de terminar (None = sin límite)
+        """
+        with DirectoryWatcher(self.source_dir, self.debounce, self.interval, self.use_inotify) as watcher:
+            mode = "inotify" if watcher.uses_inotify else f"revisión cada {self.interval:g}s"
+            print(f"👀 Vigilando '{self.source_dir}' ({mode}). Presiona Ctrl+C para salir.")
+            
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                changes = watcher.wait_for_changes()
+                if self.courses_for(changes):
+                    self.process_changes(changes)
+                    batches += 1
@@ -2,114 +2,320 @@
 Módulo para generar planillas finales consolidadas.
 """
 import os
-import csv
-from typing import Dict, Set
-from ..utils import ConfigLoader
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+from ..utils import ConfigLoader, Settings, as_settings
+from ..managers.merge_result import MergedGrades
+from ..utils.grade_conversion import MISSING_GRADE
+from ..utils.metrics import add_counts, timed
+from ..utils.xlsx_writer import STYLE_DEFAULT, STYLE_HEADER, XlsxWriter
+
+
+# Formatos de planilla soportados
+OUTPUT_FORMATS = ("xls", "xlsx")
+
+# Límites del formato XLS (BIFF8) que escribe xlwt
+XLS_MAX_ROWS = 65_536
+XLS_MAX_COLUMNS = 256
+
+
+@dataclass
+class CourseSheet:
+    """
+    Filas ya calculadas de la hoja de un curso.
+    
+    Sólo contiene tipos simples para poder enviarse desde un proceso hijo.
+    
+    Attributes:
+        course: Código del curso
+        rows: Filas de datos en el orden de ReportGenerator.build_columns()
+    """
+    course: str
+    rows: List[list]
+
+
+class _XlsSheet:
+    """Hoja de xlwt con la misma interfaz que XlsxSheet."""
+    
+    def __init__(self, worksheet, header_style, name: str):
+        self.name = name
+        self.row_count = 0
+        self._worksheet = worksheet
+        self._header_style = header_style
+    
+    def write_row(self, values: Iterable, style: int = STYLE_DEFAULT):
+        """
+        Agrega una fila al final de la hoja.
+        
+        Raises:
+            ValueError: Si se supera el límite de filas o columnas de XLS
+        """
+        values = list(values)
+        if self.row_count >= XLS_MAX_ROWS or len(values) > XLS_MAX_COLUMNS:
+            raise ValueError(
+                f"La hoja '{self.name}' supera los límites de XLS ({XLS_MAX_ROWS} filas, {XLS_MAX_COLUMNS} columnas)"
+            )
+        row = self.row_count
+        if style == STYLE_HEADER:
+            for col, value in enumerate(values):
+                self._worksheet.write(row, col, value, self._header_style)
+        else:
+            for col, value in enumerate(values):
+                self._worksheet.write(row, col, value)
+        self.row_count += 1
+    
+    def write_rows(self, rows: Iterable[Iterable], style: int = STYLE_DEFAULT):
+        """Agrega varias filas."""
+        for values in rows:
+            self.write_row(values, style)
+
+
+class _XlsWorkbook:
+    """
+    Libro de xlwt con la misma interfaz que XlsxWriter.
+    
+    xlwt arma el libro completo en memoria y lo guarda al cerrar, en
+    <ruta>.tmp y después en la ruta final.
+    """
+    
+    def __init__(self, file_path: str):
+        import xlwt
+        self.file_path = file_path
+        self._tmp_path = file_path + ".tmp"
+        self._workbook = xlwt.Workbook()
+        # Estilo para el encabezado
+        self._header_style = xlwt.easyxf('font: bold on; align: horiz center')
+    
+    def add_sheet(self, name: str) -> _XlsSheet:
+        """Agrega una hoja nueva."""
+        return _XlsSheet(self._workbook.add_sheet(name), self._header_style, name)
+    
+    def close(self):
+        """Guarda el libro."""
+        try:
+            self._workbook.save(self._tmp_path)
+        except BaseException:
+            self.abort()
+            raise
+        os.replace(self._tmp_path, self.file_path)
+    
+    def abort(self):
+        """Descarta el libro sin guardarlo."""
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
 
 
 class ReportGenerator:
-    """Clase para generar planillas finales consolidadas en formato XLS."""
+    """Clase para generar planillas finales consolidadas en formato XLS o XLSX."""
     
-    def __init__(self, config: ConfigLoader):
+    def __init__(self, config: Union[ConfigLoader, Settings]):
         """
         Inicializa el generador de reportes.
         
         Args:
-            config: Instancia de ConfigLoader con la configuración del sistema
+            config: Instancia de ConfigLoader o Settings con la configuración del sistema
         """
+        settings = as_settings(config)
         self.config = config
-        self.output_dir = config.get_output_dir()
-        self.encoding = config.get_csv_encoding()
-        self.output_format = config.get_output_format()
-        self.tp_count = config.get_cantidad_tps()
-        self.exam_count = config.get_cantidad_parciales()
-        self.makeup_count = config.get_cantidad_recuperatorios()
-        self.tp_prefix = config.get_tp_prefix()
-        self.exam_prefix = config.get_parcial_prefix()
-        self.makeup_prefix = config.get_recuperatorio_prefix()
+        self.settings = settings
+        self.output_dir = settings.output_dir
+        self.encoding = settings.csv_encoding
+        self.output_format = settings.output_format
+        self.tp_count = settings.cantidad_tps
+        self.exam_count = settings.cantidad_parciales
+        self.makeup_count = settings.cantidad_recuperatorios
+        self.tp_prefix = settings.tp_prefix
+        self.exam_prefix = settings.parcial_prefix
+        self.makeup_prefix = settings.recuperatorio_prefix
+        self.write_intermediate_files = settings.write_intermediate_files
     
+    @timed("generate_final_report", course_arg="course")
     def generate_final_report(self, course: str, tp_manager, exam_manager):
         """
-        Genera una planilla final consolidada combinando TPs y Parciales en formato XLS.
+        Genera una planilla final consolidada combinando TPs y Parciales.
         Incluye tanto las notas decimales de Moodle como las notas convertidas a enteros.
         
+        El formato se toma de output_format: "xls" (xlwt, hasta 65.536 filas) o
+        "xlsx" (escritura en streaming, sin dependencias y con memoria constante).
+        Para un único libro con todos los cursos ver
+        BatchReportGenerator.generate_campus_report.
+        
         Args:
             course: Código del curso (ej: "1K2", "1K4")
             tp_manager: Instancia de TPManager (para generar merges si es necesario)
             exam_manager: Instancia de ParcialManager (para generar merges si es necesario)
+        
+        Returns:
+            Ruta de la planilla generada, o None si no se pudo generar
         """
-        try:
-            import xlwt
-        except ImportError:
-            print("❌ Error: Se requiere la librería 'xlwt' para generar archivos XLS.")
-            print("   Instálala con: pip install xlwt")
-            return
+        if not self.check_output_format():
+            return None
         
         # Directorio de salida específico del curso (normalizar a mayúsculas)
         course = course.upper()
         output_course_dir = os.path.join(self.output_dir, course)
         
-        # Archivos mergeados de TPs y Parciales
-        tps_file = os.path.join(output_course_dir, "tps", f"{self.tp_prefix}s_{course}_unificado.csv")
-        exams_file = os.path.join(output_course_dir, "parciales", f"{self.exam_prefix}es_{course}_unificado.csv")
+        collected = self._collect_course_data(course, tp_manager, exam_manager)
+        if collected is None:
+            return None
+        all_ids, tps_result, exams_result = collected
         
-        # Variables para controlar qué datos están disponibles
-        tps_data = {}
-        exams_data = {}
-        has_tps = False
-        has_exams = False
-
-        # Obtener datos de TPs
-        if os.path.exists(tps_file):
-            os.remove(tps_file)
+        columns = self.build_columns()
+        if self.output_format == "xls" and (len(all_ids) + 1 > XLS_MAX_ROWS or len(columns) > XLS_MAX_COLUMNS):
+            print(f"❌ Error: La planilla supera los límites de XLS ({XLS_MAX_ROWS} filas, {XLS_MAX_COLUMNS} columnas).")
+            print("   Usa output_format = xlsx en config.ini")
+            return None
+        
+        os.makedirs(output_course_dir, exist_ok=True)
+        output_file = os.path.join(output_course_dir, f"Planilla_Final_{course}.{self.output_format}")
+        
+        with self.open_workbook(output_file) as workbook:
+            self.write_sheet(workbook, course, self.iter_student_rows(all_ids, tps_result, exams_result))
+        add_counts(rows_written=len(all_ids))
+        
+        print(f"✅ Planilla final generada: {output_file}")
+        print(f"   Total de alumnos: {len(all_ids)}")
+        print(f"   Columnas de TPs: {'Incluidas' if tps_result is not None else 'Vacías'}")
+        print(f"   Columnas de Parciales: {'Incluidas' if exams_result is not None else 'Vacías'}")
+        
+        return output_file
+    
+    @timed("build_course_sheet", course_arg="course")
+    def build_course_sheet(self, course: str, tp_manager, exam_manager) -> Optional[CourseSheet]:
+        """
+        Calcula las filas de la planilla de un curso sin escribir la planilla.
+        
+        Los unificados intermedios se escriben igual que en generate_final_report.
+        
+        Args:
+            course: Código del curso (ej: "1K2")
+            tp_manager: Instancia de TPManager
+            exam_manager: Instancia de ParcialManager
+        
+        Returns:
+            CourseSheet con las filas del curso, o None si no hay datos de alumnos
+        """
+        course = course.upper()
+        collected = self._collect_course_data(course, tp_manager, exam_manager)
+        if collected is None:
+            return None
+        return CourseSheet(course=course, rows=list(self.iter_student_rows(*collected)))
+    
+    def check_output_format(self) -> bool:
+        """
+        Verifica que el formato de salida sea soportado y sus dependencias estén instaladas.
+        
+        Returns:
+            True si se puede generar la planilla (los errores se informan por consola)
+        """
+        if self.output_format not in OUTPUT_FORMATS:
+            print(f"❌ Error: Formato de salida no soportado: '{self.output_format}'")
+            print(f"   Usa output_format = {' o '.join(OUTPUT_FORMATS)} en config.ini")
+            return False
+        
+        if self.output_format == "xls":
+            try:
+                import xlwt
+            except ImportError:
+                print("❌ Error: Se requiere la librería 'xlwt' para generar archivos XLS.")
+                print("   Instálala con: pip install xlwt (o usa output_format = xlsx)")
+                return False
+        return True
+    
+    def open_workbook(self, output_file: str):
+        """
+        Crea el libro de salida según output_format.
+        
+        Args:
+            output_file: Ruta de la planilla
+        
+        Returns:
+            XlsxWriter o libro de xlwt, ambos con add_sheet(), close(), abort()
+            y uso como context manager
+        """
+        if self.output_format == "xlsx":
+            return XlsxWriter(output_file)
+        return _XlsWorkbook(output_file)
+    
+    def write_sheet(self, workbook, course: str, rows: Iterable[list]):
+        """
+        Agrega la hoja "Notas <curso>" con encabezados y filas.
+        
+        Args:
+            workbook: Libro devuelto por open_workbook
+            course: Código del curso
+            rows: Filas de datos (se consumen de a una)
+        """
+        sheet = workbook.add_sheet(f'Notas {course}')
+        sheet.write_row(self.build_columns(), STYLE_HEADER)
+        sheet.write_rows(rows)
+    
+    def _collect_course_data(self, course: str, tp_manager, exam_manager) -> Optional[Tuple[set, Optional[MergedGrades], Optional[MergedGrades]]]:
+        """
+        Unifica TPs y Parciales de un curso en memoria.
+        
+        Args:
+            course: Código del curso en mayúsculas
+            tp_manager: Instancia de TPManager
+            exam_manager: Instancia de ParcialManager
+        
+        Returns:
+            Tupla (IDs de todos los alumnos, unificado de TPs, unificado de Parciales),
+            con None en los unificados sin datos, o None si el curso no tiene datos de alumnos
+        """
+        # Obtener datos de TPs directamente en memoria
         print(f"   Procesando TPs...")
-        tp_manager.merge_tps(course)
-        if os.path.exists(tps_file):
-            tps_data = self._read_csv_as_dict(tps_file)
-            has_tps = True
-        else:
+        tps_result = tp_manager.merge_tps(course, write_csv=self.write_intermediate_files)
+        has_tps = tps_result is not None
+        if not has_tps:
             print("⚠️ No hay datos de TPs disponibles. Continuando sin TPs...")
         
-        # Obtener datos de Parciales
-        if os.path.exists(exams_file):
-            os.remove(exams_file)
+        # Obtener datos de Parciales directamente en memoria
         print(f"   Procesando parciales...")
-        exam_manager.merge_exams(course)
-        if os.path.exists(exams_file):
-            exams_data = self._read_csv_as_dict(exams_file)
-            has_exams = True
-        else:
+        exams_result = exam_manager.merge_exams(course, write_csv=self.write_intermediate_files)
+        has_exams = exams_result is not None
+        if not has_exams:
             print("⚠️ No hay datos de Parciales disponibles. Continuando sin Parciales...")
         
         # Combinar todos los IDs únicos
-        all_ids = set(tps_data.keys()) | set(exams_data.keys())
+        all_ids = set(tps_result.records if has_tps else ()) | set(exams_result.records if has_exams else ())
         
         if not all_ids:
             print("⚠️ No hay datos de alumnos para generar la planilla final.")
             print("   Asegúrate de tener al menos un archivo de TP o Parcial con datos.")
-            return
+            return None
         
         # Informar al usuario sobre qué datos se incluirán
         print("")
         print(f"📊 Generando planilla final con:")
         if has_tps:
-            print(f"   ✅ {len(tps_data)} alumnos con datos de TPs")
+            print(f"   ✅ {len(tps_result)} alumnos con datos de TPs")
         else:
             print(f"   ⚠️  Sin datos de TPs (columnas estarán vacías)")
         if has_exams:
-            print(f"   ✅ {len(exams_data)} alumnos con datos de Parciales")
+            print(f"   ✅ {len(exams_result)} alumnos con datos de Parciales")
         else:
             print(f"   ⚠️  Sin datos de Parciales (columnas estarán vacías)")
         print("")
         
-        # Crear libro de Excel
-        wb = xlwt.Workbook()
-        ws = wb.add_sheet(f'Notas {course}')
-        
-        # Estilo para el encabezado
-        header_style = xlwt.easyxf('font: bold on; align: horiz center')
+        return all_ids, tps_result, exams_result
+    
+    def build_columns(self) -> List[str]:
+        """
+        Arma los encabezados de la planilla final según la configuración.
         
-        # Definir columnas dinámicamente
+        Returns:
+            Lista de nombres de columnas
+        """
         columns = ["Apellido(s)", "Nombre", "Número de ID"]
         
         # Agregar columnas de TPs (con intentos)
@@ -134,149 +340,55 @@ class ReportGenerator:
                 f"{self.makeup_prefix}{i}",
                 f"{self.makeup_prefix}{i}_Nota"
             ])
-        
-        # Escribir encabezados
-        for col, column in enumerate(columns):
-            ws.write(0, col, column, header_style)
-        
-        # Escribir datos
-        row = 1
-        for student_id in sorted(all_ids):
-            # Obtener datos de TPs (si existen)
-            tp_data = tps_data.get(student_id, {})
-            # Obtener datos de Parciales (si existen)
-            exam_data = exams_data.get(student_id, {})
-            
-            # Obtener información básica (priorizar TPs, luego Parciales)
-            last_name = tp_data.get("Apellido(s)", exam_data.get("Apellido(s)", ""))
-            first_name = tp_data.get("Nombre", exam_data.get("Nombre", ""))
-            
-            # Escribir fila
-            col_idx = 0
-            ws.write(row, col_idx, last_name)
-            col_idx += 1
-            ws.write(row, col_idx, first_name)
-            col_idx += 1
-            ws.write(row, col_idx, student_id)
-            col_idx += 1
-            
-            # TPs (con intentos)
-            approved_tps = 0
-            for i in range(1, self.tp_count + 1):
-                ws.write(row, col_idx, self._format_decimal_grade(tp_data.get(f"{self.tp_prefix}{i}", "")))
-                col_idx += 1
-                ws.write(row, col_idx, self._format_integer_grade(tp_data.get(f"{self.tp_prefix}{i}_Nota", "")))
-                col_idx += 1
-                ws.write(row, col_idx, self._format_attempts(tp_data.get(f"{self.tp_prefix}{i}_Intentos", "")))
-                col_idx += 1
-                grade = tp_data.get(f"{self.tp_prefix}{i}_Nota", "")
-                if grade and int(grade) >= 4:
-                    approved_tps += 1
-            ws.write(row, col_idx, approved_tps)
-            col_idx += 1
-            
-            # Parciales
-            for i in range(1, self.exam_count + 1):
-                ws.write(row, col_idx, self._format_decimal_grade(exam_data.get(f"{self.exam_prefix}{i}", "")))
-                col_idx += 1
-                ws.write(row, col_idx, self._format_integer_grade(exam_data.get(f"{self.exam_prefix}{i}_Nota", "")))
-                col_idx += 1
-            
-            # Recuperatorios
-            for i in range(1, self.makeup_count + 1):
-                ws.write(row, col_idx, self._format_decimal_grade(exam_data.get(f"{self.makeup_prefix}{i}", "")))
-                col_idx += 1
-                ws.write(row, col_idx, self._format_integer_grade(exam_data.get(f"{self.makeup_prefix}{i}_Nota", "")))
-                col_idx += 1
-            
-            row += 1
-        
-        # Guardar archivo
-        os.makedirs(output_course_dir, exist_ok=True)
-        output_file = os.path.join(output_course_dir, f"Planilla_Final_{course}.{self.output_format}")
-        wb.save(output_file)
-        
-        print(f"✅ Planilla final generada: {output_file}")
-        print(f"   Total de alumnos: {len(all_ids)}")
-        print(f"   Columnas de TPs: {'Incluidas' if has_tps else 'Vacías'}")
-        print(f"   Columnas de Parciales: {'Incluidas' if has_exams else 'Vacías'}")
+        return columns
     
-    def _read_csv_as_dict(self, file_path: str) -> Dict[str, Dict]:
+    def iter_student_rows(self, all_ids, tps: Optional[MergedGrades], exams: Optional[MergedGrades]) -> Iterator[list]:
         """
-        Lee un archivo CSV y retorna un diccionario indexado por ID de alumno.
+        Produce las filas de la planilla final, una por alumno y ordenadas por ID.
         
-        Args:
-            file_path: Ruta al archivo CSV
-            
-        Returns:
-            Diccionario con ID de alumno como clave y datos como valor
-        """
-        data = {}
-        with open(file_path, newline='', encoding=self.encoding) as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                student_id = row["Número de ID"]
-                data[student_id] = row
-        return data
-    
-    def _format_decimal_grade(self, value):
-        """
-        Formatea una nota decimal para Excel.
+        Es un generador: cada fila se arma recién cuando el escritor la pide.
+        Las columnas de cada evaluación se traducen una sola vez a posiciones
+        de las matrices de MergedGrades, así que por fila no se arman claves.
         
         Args:
-            value: Valor de la nota (puede ser string, float, o vacío)
-            
-        Returns:
-            Float redondeado a 2 decimales o string vacío
-        """
-        if not value or value == "":
-            return ""
+            all_ids: IDs de todos los alumnos del curso
+            tps: Unificado de TPs (de TPManager.merge_tps), o None si no hay
+            exams: Unificado de Parciales (de ParcialManager.merge_exams), o None si no hay
         
-        try:
-            if isinstance(value, str):
-                # Convertir string con coma o punto a float
-                num = float(value.replace(",", "."))
-            else:
-                num = float(value)
-            return round(num, 2)
-        except (ValueError, TypeError):
-            return ""
-    
-    def _format_integer_grade(self, value):
-        """
-        Formatea una nota convertida a entero para Excel.
-        
-        Args:
-            value: Valor de la nota convertida (puede ser int, string, o "FALTA")
-            
-        Returns:
-            Entero o string "FALTA" o vacío
+        Yields:
+            Lista de valores en el orden de build_columns()
         """
-        if not value or value == "":
-            return ""
+        tp_names = [f"{self.tp_prefix}{i}" for i in range(1, self.tp_count + 1)]
+        exam_names = [f"{self.exam_prefix}{i}" for i in range(1, self.exam_count + 1)]
+        exam_names += [f"{self.makeup_prefix}{i}" for i in range(1, self.makeup_count + 1)]
         
-        if value == "FALTA":
-            return "FALTA"
+        tp_records = tps.records if tps is not None else {}
+        exam_records = exams.records if exams is not None else {}
+        tp_positions = tps.positions(tp_names) if tps is not None else None
+        exam_positions = exams.positions(exam_names) if exams is not None else None
+        empty_tps = [""] * (3 * len(tp_names))
+        empty_exams = [""] * (2 * len(exam_names))
         
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return ""
-    
-    def _format_attempts(self, value):
-        """
-        Formatea la cantidad de intentos para Excel.
-        
-        Args:
-            value: Valor de intentos (puede ser int, string, o vacío)
+        for student_id in sorted(all_ids):
+            tp_record = tp_records.get(student_id)
+            exam_record = exam_records.get(student_id)
             
-        Returns:
-            Entero o string vacío
-        """
-        if not value or value == "":
-            return ""
-        
-        try:
-            return int(value)
-        except (ValueError, TypeError):
-            return ""
+            # Obtener información básica (priorizar TPs, luego Parciales)
+            names = tp_record or exam_record
+            row = [names.last_name, names.first_name, student_id]
+            
+            # TPs (con intentos), los valores ya vienen tipados desde el manager
+            if tp_record is not None:
+                row.extend(tps.values(tp_record, tp_positions, MISSING_GRADE))
+                row.append(tps.count_at_least(tp_record, 4, tp_positions))
+            else:
+                row.extend(empty_tps)
+                row.append(0)
+            
+            # Parciales y Recuperatorios
+            if exam_record is not None:
+                row.extend(exams.values(exam_record, exam_positions, MISSING_GRADE))
+            else:
+                row.extend(empty_exams)
+            
+            yield row
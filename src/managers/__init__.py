@@ -3,6 +3,8 @@ Módulo de managers para gestionar TPs y Parciales.
 """
 from .tp_manager import TPManager
 from .parcial_manager import ParcialManager
+from .merge_result import MergedGrades, StudentRecord
+from .evaluation_pool import EvaluationGrades
 
-__all__ = ['TPManager', 'ParcialManager']
+__all__ = ['TPManager', 'ParcialManager', 'MergedGrades', 'StudentRecord', 'EvaluationGrades']
 
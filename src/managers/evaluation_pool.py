@@ -0,0 +1,158 @@
+"""
+Módulo para procesar en paralelo las evaluaciones (TPs o Parciales) de un curso.
+"""
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Tuple
+from ..utils import ConsolidatedEvaluation, FileConsolidator, GradeConversionTable, Settings, get_col_name
+from ..utils.metrics import METRICS, StageStats, collect_metrics
+
+
+@dataclass
+class EvaluationGrades:
+    """
+    Notas de una evaluación de un curso, listas para unirse con las demás.
+    
+    Attributes:
+        evaluation: Nombre de la columna de la evaluación (ej: "TP1")
+        consolidated: Resultado de la consolidación, o None si no hay archivos
+        students: (ID, apellido, nombre, nota decimal, nota entera, intentos) de
+            cada alumno, en el orden del consolidado (nota decimal None si
+            ningún intento del alumno está calificado)
+        log: Salida por consola del proceso hijo que la calculó ("" si se calculó en el proceso actual)
+        metrics: Mediciones por etapa del proceso hijo (vacía si no se midió)
+    """
+    evaluation: str
+    consolidated: Optional[ConsolidatedEvaluation]
+    students: List[Tuple] = field(default_factory=list)
+    log: str = ""
+    metrics: List[StageStats] = field(default_factory=list)
+
+
+def grade_evaluation(consolidator: FileConsolidator, header_map: Dict, conversion_table: GradeConversionTable,
+                     evaluation: str, base_name: str, course: str, record_manifest: bool = True) -> EvaluationGrades:
+    """
+    Consolida una evaluación y arma las columnas de cada alumno.
+    
+    Args:
+        consolidator: FileConsolidator del tipo de evaluación
+        header_map: Mapeo de nombres de columnas
+        conversion_table: Tabla de conversión a nota entera
+        evaluation: Nombre de la columna de la evaluación (ej: "TP1")
+        base_name: Nombre base de los archivos (ej: "TP1_1K2")
+        course: Código del curso
+        record_manifest: Ver FileConsolidator.consolidate
+    
+    Returns:
+        EvaluationGrades de la evaluación
+    """
+    # Leer cada export una sola vez: mejores intentos, intentos por alumno
+    # y archivo filtrado salen de la misma pasada
+    consolidated = consolidator.consolidate(base_name, course, record_manifest)
+    if consolidated is None:
+        return EvaluationGrades(evaluation, None)
+    
+    last_name_col = get_col_name(consolidated.fieldnames, header_map["apellido"])
+    first_name_col = get_col_name(consolidated.fieldnames, header_map["nombre"])
+    id_col = get_col_name(consolidated.fieldnames, header_map["id"])
+    grade_col = get_col_name(consolidated.fieldnames, header_map["nota"])
+    attempts = consolidated.attempts
+    
+    # La nota ya viene como float, normalizada y redondeada a 2 decimales (None
+    # si el alumno no tiene intentos calificados): se convierten todas las notas
+    # enteras de la evaluación de una vez
+    best_rows = list(consolidated.best_attempts.values())
+    grades = [row[grade_col] for row in best_rows]
+    integer_grades = conversion_table.convert_many(grades)
+    
+    students = [
+        (row[id_col], row[last_name_col], row[first_name_col], None if grade is None else round(grade, 2),
+         integer_grade, attempts.get(row[id_col], 1))
+        for row, grade, integer_grade in zip(best_rows, grades, integer_grades)
+    ]
+    return EvaluationGrades(evaluation, consolidated, students)
+
+
+def _grade_in_worker(manager_class, settings: Settings, evaluation: str, base_name: str, course: str,
+                     measure: bool = False) -> EvaluationGrades:
+    """
+    Calcula una evaluación en un proceso hijo, capturando su salida por consola.
+    
+    El manifiesto incremental lo actualiza el proceso principal (ver grade_evaluations),
+    así que aquí no se registra. Con measure=True las mediciones por etapa
+    vuelven en EvaluationGrades.metrics.
+    """
+    buffer = io.StringIO()
+    with redirect_stdout(buffer), collect_metrics(measure) as metrics:
+        manager = manager_class(settings)
+        with manager.consolidator:
+            result = grade_evaluation(manager.consolidator, manager.header_map, manager.conversion_table,
+                                      evaluation, base_name, course, record_manifest=False)
+    if result.consolidated is not None:
+        # Las filas completas de los mejores intentos no hacen falta para unir
+        result.consolidated = replace(result.consolidated, best_attempts={})
+    result.log = buffer.getvalue()
+    result.metrics = metrics
+    return result
+
+
+def grade_evaluations(manager, evaluations: Dict[str, str], course: str) -> List[EvaluationGrades]:
+    """
+    Calcula todas las evaluaciones de un curso, en paralelo si está configurado.
+    
+    Cada evaluación es independiente hasta la unión final, así que con
+    settings.evaluation_workers distinto de 1 se reparten entre procesos. La
+    salida por consola de cada proceso queda en EvaluationGrades.log, para
+    mostrarla en orden de evaluación al unir.
+    
+    Args:
+        manager: TPManager o ParcialManager
+        evaluations: Nombre de columna -> nombre base de los archivos, en orden
+        course: Código del curso
+    
+    Returns:
+        EvaluationGrades de cada evaluación, en el orden de evaluations
+    """
+    workers = resolve_evaluation_workers(manager.settings.evaluation_workers, len(evaluations))
+    if workers == 1:
+        # La base de intentos (si está configurada) se cierra al terminar el curso
+        with manager.consolidator:
+            return [
+                grade_evaluation(manager.consolidator, manager.header_map, manager.conversion_table,
+                                 evaluation, base_name, course)
+                for evaluation, base_name in evaluations.items()
+            ]
+    
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_grade_in_worker, type(manager), manager.settings, evaluation, base_name, course,
+                            METRICS.enabled)
+            for evaluation, base_name in evaluations.items()
+        ]
+        results = []
+        for future in futures:
+            result = future.result()
+            METRICS.merge(result.metrics)
+            if result.consolidated is not None:
+                manager.consolidator.record(result.consolidated)
+            results.append(result)
+    return results
+
+
+def resolve_evaluation_workers(max_workers: int, evaluation_count: int) -> int:
+    """
+    Determina la cantidad de procesos para las evaluaciones de un curso.
+    
+    Args:
+        max_workers: Cantidad configurada (0 = automático)
+        evaluation_count: Cantidad de evaluaciones
+    
+    Returns:
+        Cantidad de procesos, entre 1 y la cantidad de evaluaciones
+    """
+    if max_workers < 1:
+        max_workers = os.cpu_count() or 1
+    return max(1, min(max_workers, evaluation_count))
@@ -0,0 +1,213 @@
+"""
+Resultado en memoria de la unificación de TPs o Parciales de un curso.
+"""
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+from ..utils.grade_conversion import MISSING_GRADE
+
+
+# Códigos de la matriz de notas enteras para las celdas sin número
+_EMPTY_CODE = -1
+_MISSING_CODE = -2
+_UNGRADED_CODE = -3
+
+# Columnas fijas de cada alumno en los unificados
+NAME_COLUMNS = ["Apellido(s)", "Nombre", "Número de ID"]
+
+
+class StudentRecord:
+    """
+    Datos fijos de un alumno y su fila en las matrices de MergedGrades.
+    
+    El ID y los nombres se internan: se repiten en todas las evaluaciones del
+    curso y así cada alumno guarda una única copia de cada texto.
+    
+    Attributes:
+        student_id: Número de ID del alumno
+        last_name: Apellido(s)
+        first_name: Nombre
+        index: Fila del alumno en las matrices, en orden de aparición
+    """
+    __slots__ = ("student_id", "last_name", "first_name", "index")
+    
+    def __init__(self, student_id: str, last_name: str, first_name: str, index: int):
+        self.student_id = sys.intern(student_id)
+        self.last_name = sys.intern(last_name)
+        self.first_name = sys.intern(first_name)
+        self.index = index
+    
+    def __repr__(self):
+        return f"StudentRecord({self.student_id!r}, {self.last_name!r}, {self.first_name!r}, {self.index})"
+
+
+@dataclass
+class MergedGrades:
+    """
+    Datos unificados de un curso, listos para generar la planilla final.
+    
+    Las notas se guardan en matrices planas indexadas por (alumno, evaluación):
+    nota decimal en array('d') (NaN si el alumno no la rindió o no tiene intentos
+    calificados), nota entera en array('h') e intentos en array('I') (0 si no
+    la rindió). Así no se arma un diccionario con claves de texto por alumno, y
+    el generador de reportes lee los valores ya tipados por posición.
+    
+    Attributes:
+        course: Código del curso normalizado (ej: "1K2")
+        fieldnames: Columnas del archivo unificado, en orden
+        evaluations: Nombres de las evaluaciones (ej: ["TP1", "TP2"]), en orden de columnas
+        with_attempts: Si True, cada evaluación tiene también la columna "_Intentos"
+        output_file: Ruta del CSV "_unificado.csv" si se escribió, None si no
+        records: ID de alumno -> StudentRecord, en orden de aparición
+    """
+    course: str
+    fieldnames: List[str]
+    evaluations: List[str]
+    with_attempts: bool = False
+    output_file: Optional[str] = None
+    records: Dict[str, StudentRecord] = field(default_factory=dict, init=False)
+    grades: array = field(default_factory=lambda: array('d'), init=False, repr=False)
+    integer_grades: array = field(default_factory=lambda: array('h'), init=False, repr=False)
+    attempts: array = field(default_factory=lambda: array('I'), init=False, repr=False)
+    
+    def __post_init__(self):
+        count = len(self.evaluations)
+        self._empty_grades = array('d', [float("nan")] * count)
+        self._empty_integers = array('h', [_EMPTY_CODE] * count)
+        self._empty_attempts = array('I', [0] * count)
+    
+    def __len__(self):
+        return len(self.records)
+    
+    def add_student(self, student_id: str, last_name: str, first_name: str) -> StudentRecord:
+        """
+        Agrega un alumno con todas sus evaluaciones vacías.
+        
+        Args:
+            student_id: Número de ID del alumno
+            last_name: Apellido(s)
+            first_name: Nombre
+        
+        Returns:
+            StudentRecord del alumno
+        """
+        record = StudentRecord(student_id, last_name, first_name, len(self.records))
+        self.records[record.student_id] = record
+        self.grades.extend(self._empty_grades)
+        self.integer_grades.extend(self._empty_integers)
+        self.attempts.extend(self._empty_attempts)
+        return record
+    
+    def set_grade(self, record: StudentRecord, evaluation_index: int, grade: float, integer_grade, attempts: int = 1):
+        """
+        Guarda el resultado de un alumno en una evaluación.
+        
+        Args:
+            record: StudentRecord del alumno
+            evaluation_index: Posición de la evaluación en evaluations
+            grade: Nota decimal, o None si ningún intento del alumno está calificado
+            integer_grade: Nota entera, o "FALTA"
+            attempts: Cantidad de intentos
+        """
+        position = record.index * len(self.evaluations) + evaluation_index
+        self.attempts[position] = attempts
+        if grade is None:
+            self.integer_grades[position] = _UNGRADED_CODE
+            return
+        self.grades[position] = grade
+        self.integer_grades[position] = _MISSING_CODE if integer_grade == MISSING_GRADE else integer_grade
+    
+    def positions(self, evaluations: List[str]) -> List[Optional[int]]:
+        """
+        Traduce nombres de evaluaciones a sus posiciones en las matrices.
+        
+        Args:
+            evaluations: Nombres de evaluaciones (ej: las columnas de la planilla)
+        
+        Returns:
+            Posición de cada evaluación, o None si no forma parte del unificado
+        """
+        index = {evaluation: i for i, evaluation in enumerate(self.evaluations)}
+        return [index.get(evaluation) for evaluation in evaluations]
+    
+    def values(self, record: StudentRecord, positions: Optional[List[Optional[int]]] = None,
+               ungraded: Any = "") -> List[Any]:
+        """
+        Retorna las columnas de evaluaciones de un alumno, ya tipadas.
+        
+        Args:
+            record: StudentRecord del alumno
+            positions: Evaluaciones a incluir (ver positions()); por defecto todas, en orden
+            ungraded: Nota entera de las evaluaciones con intentos pero ninguno calificado
+        
+        Returns:
+            Nota decimal, nota entera y (si with_attempts) intentos de cada
+            evaluación, con "" en las que el alumno no rindió. Si rindió pero
+            no tiene intentos calificados, la nota decimal queda en "", la
+            entera en ungraded y los intentos se informan
+        """
+        if positions is None:
+            positions = range(len(self.evaluations))
+        base = record.index * len(self.evaluations)
+        grades = self.grades
+        integer_grades = self.integer_grades
+        attempts = self.attempts
+        
+        values = []
+        append = values.append
+        for position in positions:
+            code = _EMPTY_CODE if position is None else integer_grades[base + position]
+            if code == _EMPTY_CODE:
+                append("")
+                append("")
+                if self.with_attempts:
+                    append("")
+                continue
+            if code == _UNGRADED_CODE:
+                append("")
+                append(ungraded)
+                if self.with_attempts:
+                    append(attempts[base + position])
+                continue
+            append(grades[base + position])
+            append(MISSING_GRADE if code == _MISSING_CODE else code)
+            if self.with_attempts:
+                append(attempts[base + position])
+        return values
+    
+    def count_at_least(self, record: StudentRecord, minimum: int, positions: Optional[List[Optional[int]]] = None) -> int:
+        """
+        Cuenta las evaluaciones de un alumno con nota entera mayor o igual a minimum.
+        
+        Args:
+            record: StudentRecord del alumno
+            minimum: Nota entera mínima (ej: 4 para aprobar)
+            positions: Evaluaciones a considerar (ver positions()); por defecto todas
+        
+        Returns:
+            Cantidad de evaluaciones que alcanzan la nota
+        """
+        base = record.index * len(self.evaluations)
+        if positions is None:
+            return sum(1 for code in self.integer_grades[base:base + len(self.evaluations)] if code >= minimum)
+        return sum(1 for position in positions if position is not None and self.integer_grades[base + position] >= minimum)
+    
+    def iter_rows(self) -> Iterator[Dict[str, Any]]:
+        """
+        Produce las filas del archivo unificado como diccionarios, de a una.
+        
+        Yields:
+            Fila indexada por fieldnames, en orden de aparición de los alumnos
+        """
+        for record in self.records.values():
+            yield dict(zip(self.fieldnames, [record.last_name, record.first_name, record.student_id] + self.values(record)))
+    
+    @property
+    def students(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Vista de los datos como ID de alumno -> fila indexada por columna.
+        
+        Se arma en cada acceso; para recorrer cursos grandes usar records y values().
+        """
+        return {row["Número de ID"]: row for row in self.iter_rows()}
@@ -2,38 +2,40 @@
 Módulo para gestionar los Trabajos Prácticos (TPs).
 """
 import os
-import csv
-import glob
-from typing import Dict, List
+from typing import Optional, Union
 from ..utils import (
     ConfigLoader,
     FileConsolidator,
-    get_col_name,
-    convert_grade_to_integer,
-    count_student_attempts,
-    save_csv
+    Settings,
+    as_settings,
+    create_parse_cache
 )
-from ..utils.file_consolidator import find_files_case_insensitive
+from ..utils.metrics import add_counts, timed
+from .evaluation_pool import grade_evaluations
+from .merge_result import NAME_COLUMNS, MergedGrades
 
 
 class TPManager:
     """Clase para gestionar los Trabajos Prácticos."""
     
-    def __init__(self, config: ConfigLoader):
+    def __init__(self, config: Union[ConfigLoader, Settings]):
         """
         Inicializa el gestor de TPs.
         
         Args:
-            config: Instancia de ConfigLoader con la configuración del sistema
+            config: Instancia de ConfigLoader o Settings con la configuración del sistema
         """
+        settings = as_settings(config)
         self.config = config
-        self.source_dir = config.get_source_dir()
-        self.output_dir = config.get_output_dir()
-        self.header_map = config.get_header_map()
-        self.encoding = config.get_csv_encoding()
-        self.tp_count = config.get_cantidad_tps()
-        self.tp_prefix = config.get_tp_prefix()
-        self.calculate_avg_grades = config.get_calculate_avg_grades()
+        self.settings = settings
+        self.source_dir = settings.source_dir
+        self.output_dir = settings.output_dir
+        self.header_map = settings.header_map
+        self.encoding = settings.csv_encoding
+        self.tp_count = settings.cantidad_tps
+        self.tp_prefix = settings.tp_prefix
+        self.calculate_avg_grades = settings.calculate_avg_grades
+        self.conversion_table = settings.conversion_table
         
         self.consolidator = FileConsolidator(
             self.source_dir,
@@ -41,10 +43,18 @@ class TPManager:
             self.header_map,
             "tps",
             self.encoding,
-            self.calculate_avg_grades
+            self.calculate_avg_grades,
+            settings.incremental,
+            settings.engine,
+            settings.attempt_store,
+            create_parse_cache(settings),
+            settings.parse_workers,
+            settings.shift_workers,
+            settings.shift_pool
         )
     
-    def merge_tps(self, course: str):
+    @timed("merge_tps", course_arg="course")
+    def merge_tps(self, course: str, write_csv: bool = True) -> Optional[MergedGrades]:
         """
         Fusiona todos los TPs de un curso en un único archivo CSV.
         Incluye columnas con la cantidad de intentos por alumno para cada TP.
@@ -52,6 +62,10 @@ class TPManager:
         
         Args:
             course: Código del curso (ej: "1K2", "1K4")
+            write_csv: Si True, escribe también el archivo "_unificado.csv"
+        
+        Returns:
+            MergedGrades con los datos unificados en memoria, o None si no hay datos
         """
         # Normalizar curso a mayúsculas para consistencia
         course = course.upper()
@@ -60,71 +74,8 @@ class TPManager:
         for i in range(1, self.tp_count + 1):
             files[f"{self.tp_prefix}{i}"] = f"{self.tp_prefix}{i}_{course}"
         
-        data = {}
-        attempts_data = {}  # Diccionario para almacenar intentos por TP
-        
-        # Directorio de salida específico del curso (ya normalizado)
-        output_course_dir = os.path.join(self.output_dir, course)
-        output_course_dir = os.path.join(output_course_dir, "tps")
-        
-        for tp, base_name in files.items():
-            filtered_file = os.path.join(output_course_dir, base_name + "_filtrado.csv")
-            
-            # Si no existe el filtrado, generarlo desde el/los source(s)
-            # if not os.path.exists(filtered_file):
-            #     print(f"⚠️ No se encontró el archivo filtrado para {base_name}. Generando desde archivos en inputs/...")
-            if not self.consolidator.consolidate_multiple_files(base_name, course):
-                print(f"⚠️ No se encontraron archivos en inputs/ para {base_name}. Se ignorará este TP.")
-                continue
-            
-            # Contar intentos de todos los archivos originales antes del filtrado
-            attempts = self._count_original_file_attempts(base_name, course)
-            attempts_data[tp] = attempts
-            
-            # Leer el archivo filtrado (ya existente o recién generado)
-            with open(filtered_file, newline='', encoding=self.encoding) as f:
-                reader = csv.DictReader(f)
-                last_name_col = get_col_name(reader.fieldnames, self.header_map["apellido"])
-                first_name_col = get_col_name(reader.fieldnames, self.header_map["nombre"])
-                id_col = get_col_name(reader.fieldnames, self.header_map["id"])
-                grade_col = get_col_name(reader.fieldnames, self.header_map["nota"])
-                
-                for row in reader:
-                    student_id = row[id_col]
-                    if student_id not in data:
-                        # Inicializar estructura de datos para el alumno
-                        data[student_id] = {
-                            "Apellido(s)": row[last_name_col],
-                            "Nombre": row[first_name_col],
-                            "Número de ID": student_id,
-                        }
-                        # Inicializar columnas de TPs
-                        for i in range(1, self.tp_count + 1):
-                            data[student_id][f"{self.tp_prefix}{i}"] = ""
-                            data[student_id][f"{self.tp_prefix}{i}_Nota"] = ""
-                            data[student_id][f"{self.tp_prefix}{i}_Intentos"] = ""
-                    
-                    # Guardar la nota decimal como float redondeado a 2 decimales
-                    grade_col_value = row[grade_col]
-                    if isinstance(grade_col_value, str):
-                        grade_decimal = float(grade_col_value.replace(",", "."))
-                    else:
-                        grade_decimal = float(grade_col_value)
-                    data[student_id][tp] = round(grade_decimal, 2)
-                    # Guardar la nota convertida a entero
-                    data[student_id][f"{tp}_Nota"] = convert_grade_to_integer(str(grade_decimal))
-                    # Guardar la cantidad de intentos
-                    data[student_id][f"{tp}_Intentos"] = attempts.get(student_id, 1)
-        
-        if not data:
-            print("⚠️ No se pudo unificar los TPs porque no hay datos disponibles.")
-            return
-        
-        os.makedirs(output_course_dir, exist_ok=True)
-        merge_file = os.path.join(output_course_dir, f"{self.tp_prefix}s_{course}_unificado.csv")
-        
         # Construir fieldnames dinámicamente
-        fieldnames = ["Apellido(s)", "Nombre", "Número de ID"]
+        fieldnames = list(NAME_COLUMNS)
         for i in range(1, self.tp_count + 1):
             fieldnames.extend([
                 f"{self.tp_prefix}{i}",
@@ -132,49 +83,72 @@ class TPManager:
                 f"{self.tp_prefix}{i}_Intentos"
             ])
         
-        save_csv(merge_file, fieldnames, list(data.values()), self.encoding)
+        # Las notas de cada alumno van a una fila de la matriz del resultado,
+        # en la columna del TP (sin armar claves de texto por alumno)
+        result = MergedGrades(course=course, fieldnames=fieldnames, evaluations=list(files), with_attempts=True)
+        records = result.records
+        sources = []  # Archivos de entrada de todas las evaluaciones, en orden de lectura
         
-        print(f"✅ Unificación de TPs completada: {merge_file}")
-    
-    def _count_original_file_attempts(self, base_name: str, course: str) -> Dict[str, int]:
-        """
-        Cuenta los intentos de cada alumno en todos los archivos originales de un TP.
-        Soporta búsqueda case-insensitive tanto para prefijos como para el curso.
+        # Directorio de salida específico del curso (ya normalizado)
+        output_course_dir = os.path.join(self.output_dir, course)
+        output_course_dir = os.path.join(output_course_dir, "tps")
         
-        Args:
-            base_name: Nombre base del TP (ej: "TP1_1K2")
-            course: Código del curso
+        # Cada TP se procesa por separado (en paralelo si está configurado) y
+        # después se unen todos por alumno, en orden de TP
+        for tp_index, graded in enumerate(grade_evaluations(self, files, course)):
+            tp = graded.evaluation
+            print(graded.log, end="")
+            if graded.consolidated is None:
+                print(f"⚠️ No se encontraron archivos en inputs/ para {files[tp]}. Se ignorará este TP.")
+                continue
+            sources.extend(graded.consolidated.sources)
             
-        Returns:
-            Diccionario con ID de alumno como clave y cantidad de intentos como valor
-        """
-        # Buscar archivos usando búsqueda case-insensitive
-        found_files = find_files_case_insensitive(self.source_dir, base_name)
+            for student_id, last_name, first_name, grade_decimal, integer_grade, attempts in graded.students:
+                record = records.get(student_id)
+                if record is None:
+                    record = result.add_student(student_id, last_name, first_name)
+                result.set_grade(record, tp_index, grade_decimal, integer_grade, attempts)
         
-        # Contador acumulado de intentos
-        total_attempts = {}
-        
-        for file in found_files:
-            attempts = count_student_attempts(file, self.header_map, self.encoding, self.calculate_avg_grades)
-            for student_id, count in attempts.items():
-                total_attempts[student_id] = total_attempts.get(student_id, 0) + count
+        merge_file = os.path.join(output_course_dir, f"{self.tp_prefix}s_{course}_unificado.csv")
         
-        return total_attempts
+        if not records:
+            print("⚠️ No se pudo unificar los TPs porque no hay datos disponibles.")
+            # Eliminar un unificado previo para no dejar datos desactualizados
+            if write_csv and os.path.exists(merge_file):
+                os.remove(merge_file)
+            return None
+        
+        if write_csv:
+            written = self.consolidator.save_derived_csv(
+                merge_file, fieldnames, result.iter_rows(), sources,
+                {"fieldnames": fieldnames, "conversion": self.conversion_table.bands}
+            )
+            result.output_file = merge_file
+            if written:
+                add_counts(rows_written=len(result))
+                print(f"✅ Unificación de TPs completada: {merge_file}")
+            else:
+                print(f"♻️  Sin cambios: {merge_file} (se reutiliza)")
+        
+        return result
     
-    def filter_best_grade(self, file_name: str, detected_course: str = None):
+    def filter_best_grade(self, file_name: str, detected_course: str = None) -> Optional[str]:
         """
         Filtra un archivo CSV individual manteniendo solo la mejor calificación por alumno.
         
         Args:
             file_name: Nombre del archivo a procesar
             detected_course: Curso detectado del nombre del archivo (opcional)
+        
+        Returns:
+            Ruta del archivo filtrado, o None si no se pudo procesar
         """
         input_path = os.path.join(self.source_dir, file_name)
         
         # Verificar que el archivo exista
         if not os.path.exists(input_path):
             print(f"❌ Error: El archivo '{file_name}' no existe")
-            return
+            return None
         
         # Detectar el curso del nombre del archivo si no se proporciona
         if detected_course is None:
@@ -217,9 +191,11 @@ class TPManager:
         try:
             self.consolidator._filter_best_grade(input_path, output_path)
             print(f"✅ Archivo procesado y guardado en '{output_path}'")
+            return output_path
         except ValueError as e:
             print(f"❌ Error al procesar '{file_name}': {e}")
         except KeyError as e:
             print(f"❌ Error al procesar '{file_name}': {e}")
         except Exception as e:
             print(f"❌ Error inesperado al procesar '{file_name}': {e}")
+        return None
@@ -1,8 +1,11 @@
 """
 Módulo de utilidades para el sistema de gestión de calificaciones.
 """
+from .attempt_store import AttemptStore
 from .config_loader import ConfigLoader
 from .csv_helpers import (
+    BestGradeAccumulator,
+    create_best_grade_accumulator,
     get_col_name,
     get_col_name_safe,
     is_average_row,
@@ -11,12 +14,39 @@ from .csv_helpers import (
     count_student_attempts,
     save_csv
 )
-from .file_consolidator import FileConsolidator, find_files_case_insensitive
+from .file_consolidator import (
+    ConsolidatedEvaluation,
+    FileConsolidator,
+    discover_courses,
+    find_files_case_insensitive
+)
+from .input_index import InputIndex, IndexedFile
+from .parallel_parse import PartialBest, merge_partials, parse_file_parallel
+from .parse_cache import ParseCache, ParsedExport, create_parse_cache
+from .build_manifest import BuildManifest
+from .grade_conversion import GradeConversionTable, DEFAULT_CONVERSION_TABLE
+from .settings import Settings, as_settings
 
 __all__ = [
+    'AttemptStore',
+    'BestGradeAccumulator',
+    'BuildManifest',
     'ConfigLoader',
+    'create_best_grade_accumulator',
+    'DEFAULT_CONVERSION_TABLE',
+    'ConsolidatedEvaluation',
     'FileConsolidator',
+    'GradeConversionTable',
+    'discover_courses',
     'find_files_case_insensitive',
+    'InputIndex',
+    'ParseCache',
+    'ParsedExport',
+    'create_parse_cache',
+    'IndexedFile',
+    'PartialBest',
+    'merge_partials',
+    'parse_file_parallel',
     'get_col_name',
     'get_col_name_safe',
     'is_average_row',
@@ -24,4 +54,6 @@ __all__ = [
     'read_csv_with_best_grades',
     'count_student_attempts',
     'save_csv',
+    'Settings',
+    'as_settings',
 ]
@@ -0,0 +1,422 @@
+"""
+Módulo con un almacén SQLite de los intentos de los exports de Moodle.
+"""
+import csv
+import json
+import os
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+from .build_manifest import config_fingerprint
+from .csv_helpers import (
+    BestGradeAccumulator,
+    _last_index,
+    _row_to_dict,
+    detect_grade_scale,
+    get_col_name,
+    get_col_name_safe
+)
+from .grade_parser import GradeIssue, parse_grade
+from .input_index import InputIndex, parse_evaluation_name
+
+
+# Nombre del archivo de la base cuando no se configura uno
+DEFAULT_STORE_NAME = "attempts.sqlite"
+
+# Segundos que se espera a que otro proceso libere la base antes de fallar
+BUSY_TIMEOUT = 30.0
+
+# Versión del esquema (PRAGMA user_version); una base de otra versión se vacía
+# y los exports se vuelven a cargar en el próximo ingest
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    course TEXT NOT NULL,
+    evaluation TEXT NOT NULL,
+    shift INTEGER,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    config_key TEXT NOT NULL,
+    fieldnames TEXT NOT NULL,
+    grade_col TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    course TEXT NOT NULL,
+    evaluation TEXT NOT NULL,
+    student_id TEXT NOT NULL,
+    line INTEGER NOT NULL,
+    grade REAL,
+    rounded_grade REAL,
+    invalid_grade TEXT,
+    row TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS attempts_lookup ON attempts (course, evaluation, student_id);
+CREATE INDEX IF NOT EXISTS attempts_source ON attempts (source_id);
+"""
+
+# Mejor intento por alumno, con la misma regla que BestGradeAccumulator: cada
+# intento reemplaza al guardado sólo si su nota supera a la guardada redondeada
+# a 2 decimales (rounded_grade, calculada con round() de Python al cargar).
+# Leyendo en orden, el primer intento con la mayor nota redondeada R pasa a ser
+# el mejor y después sólo lo reemplazan los intentos que también redondean a R
+# pero con una nota mayor que R: gana el último de ellos o, si no hay, el
+# primero con R. El orden del resultado es el de la primera aparición con nota
+# de cada alumno (los intentos sin calificar se descartan antes de las ventanas)
+BEST_ATTEMPTS_QUERY = """
+SELECT student_id, rounded_grade, row, source_id FROM (
+    SELECT a.student_id, a.rounded_grade, a.row, a.source_id,
+           ROW_NUMBER() OVER (
+               PARTITION BY a.student_id
+               ORDER BY a.rounded_grade DESC,
+                        a.grade > a.rounded_grade DESC,
+                        CASE WHEN a.grade > a.rounded_grade
+                             THEN -(s.rank * 4294967296 + a.line)
+                             ELSE s.rank * 4294967296 + a.line END
+           ) AS position,
+           MIN(s.rank * 4294967296 + a.line) OVER (PARTITION BY a.student_id) AS first_seen
+    FROM attempts a JOIN temp.selected s ON s.source_id = a.source_id
+    WHERE a.course = ? AND a.evaluation = ? AND a.grade IS NOT NULL
+)
+WHERE position = 1
+ORDER BY first_seen
+"""
+
+# Primer intento de los alumnos sin ningún intento calificado, en orden de aparición
+UNGRADED_ATTEMPTS_QUERY = """
+SELECT student_id, row, source_id FROM (
+    SELECT a.student_id, a.row, a.source_id,
+           ROW_NUMBER() OVER (PARTITION BY a.student_id ORDER BY s.rank, a.line) AS position,
+           MAX(a.grade IS NOT NULL) OVER (PARTITION BY a.student_id) AS graded,
+           s.rank * 4294967296 + a.line AS seen
+    FROM attempts a JOIN temp.selected s ON s.source_id = a.source_id
+    WHERE a.course = ? AND a.evaluation = ?
+)
+WHERE position = 1 AND NOT graded
+ORDER BY seen
+"""
+
+ATTEMPT_COUNTS_QUERY = """
+SELECT a.student_id, COUNT(*)
+FROM attempts a JOIN temp.selected s ON s.source_id = a.source_id
+WHERE a.course = ? AND a.evaluation = ?
+GROUP BY a.student_id
+ORDER BY MIN(s.rank * 4294967296 + a.line)
+"""
+
+ISSUES_QUERY = """
+SELECT a.source_id, a.line, a.student_id, a.invalid_grade
+FROM attempts a JOIN temp.selected s ON s.source_id = a.source_id
+WHERE a.course = ? AND a.evaluation = ? AND a.invalid_grade IS NOT NULL
+ORDER BY s.rank, a.line
+"""
+
+
+def evaluation_key(name: str) -> Tuple[str, str]:
+    """
+    Obtiene el curso y la evaluación con que se guardan los intentos de un archivo.
+    
+    Args:
+        name: Nombre del archivo o nombre base (ej: "TP1_1K2_1.csv", "Parcial2_1K15")
+    
+    Returns:
+        Tupla (curso en mayúsculas, evaluación en minúsculas), ej: ("1K2", "tp1");
+        si el nombre no respeta el formato, el curso es "" y la evaluación es el nombre
+    """
+    key = parse_evaluation_name(name)
+    if key is None:
+        stem = name[:-4] if name.lower().endswith('.csv') else name
+        return "", stem.lower()
+    prefix, number, course, _ = key
+    return course.upper(), f"{prefix}{number}"
+
+
+class AttemptStore:
+    """
+    Base SQLite local con todos los intentos de los exports de Moodle.
+    
+    Cada export se carga una vez (una fila por intento, con la nota ya
+    normalizada a escala 0-10) y sólo se vuelve a cargar si cambia su tamaño,
+    su fecha de modificación o la configuración de lectura. A partir de ahí el
+    mejor intento y la cantidad de intentos de una evaluación se obtienen con
+    consultas sobre el índice (curso, evaluación, ID de alumno), sin volver a
+    leer los CSV. Los archivos se identifican por su ruta absoluta, por lo que
+    una misma base puede conservar los exports de varios cuatrimestres.
+    
+    Igual que BestGradeAccumulator, los intentos sin calificar cuentan como
+    intentos pero nunca son el mejor, y las calificaciones no numéricas se
+    informan como GradeIssue.
+    """
+    
+    def __init__(self, db_path: str, header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False):
+        """
+        Abre (o crea) la base de intentos.
+        
+        Args:
+            db_path: Ruta del archivo SQLite
+            header_map: Mapeo de nombres de columnas
+            encoding: Encoding de los archivos CSV
+            calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.db_path = db_path
+        self.header_map = header_map
+        self.encoding = encoding
+        self.calculate_avg_grades = calculate_avg_grades
+        self.config_key = config_fingerprint({
+            "header_map": header_map,
+            "encoding": encoding,
+            "calculate_avg_grades": calculate_avg_grades,
+        })
+        self.connection = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT)
+        # WAL permite que otros procesos consulten mientras se carga un export
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            # Base creada con otro esquema: sólo contiene copias de los exports
+            self.connection.executescript("DROP TABLE IF EXISTS attempts; DROP TABLE IF EXISTS sources;")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.connection.executescript(SCHEMA)
+        self.connection.execute("CREATE TEMP TABLE IF NOT EXISTS selected (source_id INTEGER PRIMARY KEY, rank INTEGER NOT NULL)")
+    
+    def ingest_directory(self, directory: str) -> int:
+        """
+        Carga todos los exports de un directorio que cambiaron desde la última carga.
+        
+        Args:
+            directory: Directorio de entrada
+        
+        Returns:
+            Cantidad de archivos (re)cargados
+        """
+        files = [indexed.path for indexed in InputIndex.for_directory(directory).files() if indexed.key is not None]
+        return self.ingest(sorted(files))
+    
+    def ingest(self, files: Iterable[str]) -> int:
+        """
+        Carga los archivos indicados que no estén vigentes en la base.
+        
+        Todos los archivos se cargan en una única transacción: si alguno falla
+        (por ejemplo, porque no tiene la columna de calificación) la base queda
+        como estaba.
+        
+        Args:
+            files: Rutas de los archivos CSV
+        
+        Returns:
+            Cantidad de archivos (re)cargados
+        
+        Raises:
+            ValueError: Si un archivo está vacío o no tiene headers
+            KeyError: Si no se encuentran las columnas de ID o calificación
+        """
+        loaded = 0
+        with self.connection:
+            # Tomar el lock de escritura antes de consultar qué archivos están vigentes
+            self.connection.execute("BEGIN IMMEDIATE")
+            for file_path in files:
+                path = os.path.abspath(file_path)
+                stat = os.stat(path)
+                current = self.connection.execute(
+                    "SELECT id, size, mtime_ns, config_key FROM sources WHERE path = ?", (path,)
+                ).fetchone()
+                if current is not None and current[1:] == (stat.st_size, stat.st_mtime_ns, self.config_key):
+                    continue
+                if current is not None:
+                    self.connection.execute("DELETE FROM attempts WHERE source_id = ?", (current[0],))
+                    self.connection.execute("DELETE FROM sources WHERE id = ?", (current[0],))
+                self._load_file(path, stat)
+                loaded += 1
+        return loaded
+    
+    def best_attempts(self, course: str, evaluation: str, files: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Retorna el mejor intento de cada alumno en una evaluación.
+        
+        Args:
+            course: Código del curso (ej: "1K2")
+            evaluation: Evaluación (ej: "TP1", "parcial2")
+            files: Archivos a considerar, en orden de lectura (None = todos los
+                cargados de esa evaluación, primero el que no tiene turno)
+        
+        Returns:
+            ID de alumno -> registro del mejor intento, con la nota normalizada a
+            escala 0-10 y redondeada a 2 decimales, como BestGradeAccumulator.best_rows
+            (al final, los alumnos sin ningún intento calificado, con la nota en None)
+        """
+        sources = self._select(course, evaluation, files)
+        params = (course.upper(), evaluation.lower())
+        result = {}
+        for student_id, grade, row, source_id in self.connection.execute(BEST_ATTEMPTS_QUERY, params):
+            fieldnames, grade_col = sources[source_id][1:]
+            record = _row_to_dict(fieldnames, json.loads(row))
+            record[grade_col] = grade
+            result[student_id] = record
+        for student_id, row, source_id in self.connection.execute(UNGRADED_ATTEMPTS_QUERY, params):
+            fieldnames, grade_col = sources[source_id][1:]
+            record = _row_to_dict(fieldnames, json.loads(row))
+            record[grade_col] = None
+            result[student_id] = record
+        return result
+    
+    def attempt_counts(self, course: str, evaluation: str, files: Optional[List[str]] = None) -> Dict[str, int]:
+        """
+        Retorna la cantidad de intentos de cada alumno en una evaluación.
+        
+        Args:
+            course: Código del curso (ej: "1K2")
+            evaluation: Evaluación (ej: "TP1", "parcial2")
+            files: Archivos a considerar (None = todos los cargados de esa evaluación)
+        
+        Returns:
+            ID de alumno -> cantidad de intentos, en orden de primera aparición
+        """
+        self._select(course, evaluation, files)
+        return dict(self.connection.execute(ATTEMPT_COUNTS_QUERY, (course.upper(), evaluation.lower())))
+    
+    def grade_issues(self, course: str, evaluation: str, files: Optional[List[str]] = None) -> List[GradeIssue]:
+        """
+        Retorna las calificaciones no numéricas de una evaluación.
+        
+        Args:
+            course: Código del curso (ej: "1K2")
+            evaluation: Evaluación (ej: "TP1", "parcial2")
+            files: Archivos a considerar (None = todos los cargados de esa evaluación)
+        
+        Returns:
+            Lista de GradeIssue en orden de lectura
+        """
+        sources = self._select(course, evaluation, files)
+        return [
+            GradeIssue(sources[source_id][0], line, student_id, value)
+            for source_id, line, student_id, value in self.connection.execute(ISSUES_QUERY, (course.upper(), evaluation.lower()))
+        ]
+    
+    def fieldnames(self, file_path: str) -> Optional[List[str]]:
+        """
+        Retorna las columnas con que se cargó un archivo.
+        
+        Args:
+            file_path: Ruta del archivo CSV
+        
+        Returns:
+            Lista de nombres de columnas, o None si el archivo no está cargado
+        """
+        row = self.connection.execute(
+            "SELECT fieldnames FROM sources WHERE path = ?", (os.path.abspath(file_path),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def close(self):
+        """Cierra la conexión con la base."""
+        self.connection.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _load_file(self, path: str, stat: os.stat_result):
+        """
+        Inserta un archivo y todos sus intentos (con executemany).
+        
+        Args:
+            path: Ruta absoluta del archivo
+            stat: Resultado de os.stat del archivo
+        """
+        course, evaluation = evaluation_key(os.path.basename(path))
+        key = parse_evaluation_name(os.path.basename(path))
+        shift = int(key[3]) if key and key[3] is not None else None
+        
+        with open(path, newline='', encoding=self.encoding) as f:
+            reader = csv.reader(f)
+            fieldnames = BestGradeAccumulator._read_header(reader, path)
+            
+            id_col = get_col_name(fieldnames, self.header_map["id"])
+            grade_col = get_col_name(fieldnames, self.header_map["nota"])
+            id_idx = _last_index(fieldnames, id_col)
+            grade_idx = _last_index(fieldnames, grade_col)
+            
+            # Columna de apellido para detectar la fila "Promedio general"
+            surname_idx = None
+            if not self.calculate_avg_grades:
+                surname_col = get_col_name_safe(fieldnames, self.header_map["apellido"])
+                if surname_col:
+                    surname_idx = _last_index(fieldnames, surname_col)
+            
+            scale_divisor = 10.0 if detect_grade_scale(grade_col) == 100.0 else 1.0
+            
+            source_id = self.connection.execute(
+                "INSERT INTO sources (path, course, evaluation, shift, size, mtime_ns, config_key, fieldnames, grade_col)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, course, evaluation, shift, stat.st_size, stat.st_mtime_ns, self.config_key,
+                 json.dumps(fieldnames, ensure_ascii=False), grade_col)
+            ).lastrowid
+            
+            def attempts():
+                for row in reader:
+                    if not row:
+                        continue
+                    if surname_idx is not None and surname_idx < len(row) \
+                            and row[surname_idx].strip().lower() == "promedio general":
+                        continue
+                    
+                    grade_text = row[grade_idx]
+                    invalid = None
+                    rounded = None
+                    try:
+                        grade = parse_grade(grade_text)
+                    except ValueError:
+                        grade, invalid = None, grade_text
+                    if grade is not None:
+                        grade = grade / scale_divisor
+                        rounded = round(grade, 2)
+                    yield (source_id, course, evaluation, row[id_idx], reader.line_num, grade, rounded, invalid,
+                           json.dumps(row, ensure_ascii=False))
+            
+            self.connection.executemany(
+                "INSERT INTO attempts (source_id, course, evaluation, student_id, line, grade, rounded_grade,"
+                " invalid_grade, row) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                attempts()
+            )
+    
+    def _select(self, course: str, evaluation: str, files: Optional[List[str]]) -> Dict[int, Tuple[str, List[str], str]]:
+        """
+        Marca los archivos que participan de una consulta y su orden de lectura.
+        
+        Args:
+            course: Código del curso
+            evaluation: Evaluación
+            files: Archivos en orden de lectura (None = todos los de la evaluación)
+        
+        Returns:
+            ID de archivo -> (ruta, columnas, columna de nota)
+        """
+        if files is None:
+            rows = self.connection.execute(
+                "SELECT id, path, fieldnames, grade_col FROM sources WHERE course = ? AND evaluation = ?"
+                " ORDER BY shift IS NOT NULL, shift, path",
+                (course.upper(), evaluation.lower())
+            ).fetchall()
+        else:
+            by_path = {}
+            for path in files:
+                found = self.connection.execute(
+                    "SELECT id, path, fieldnames, grade_col FROM sources WHERE path = ?", (os.path.abspath(path),)
+                ).fetchone()
+                if found is not None:
+                    by_path.setdefault(found[1], found)
+            rows = list(by_path.values())
+        
+        with self.connection:
+            self.connection.execute("DELETE FROM temp.selected")
+            self.connection.executemany(
+                "INSERT INTO temp.selected (source_id, rank) VALUES (?, ?)",
+                ((row[0], rank) for rank, row in enumerate(rows))
+            )
+        return {row[0]: (row[1], json.loads(row[2]), row[3]) for row in rows}
@@ -0,0 +1,273 @@
+"""
+Módulo con el manifiesto de artefactos generados para el modo incremental.
+"""
+import hashlib
+import json
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+from .. import __version__
+
+
+# Incrementar cuando cambie la forma de generar los artefactos, para invalidar
+# manifiestos creados por versiones anteriores del código
+MANIFEST_FORMAT = 1
+
+CODE_VERSION = f"{__version__}/{MANIFEST_FORMAT}"
+
+
+def file_sha256(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+    
+    Args:
+        file_path: Ruta al archivo
+        chunk_size: Tamaño de los bloques de lectura
+    
+    Returns:
+        Hash en hexadecimal
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class SourceFingerprint:
+    """
+    Estado de un archivo fuente en el momento en que se leyó.
+    
+    Attributes:
+        path: Ruta absoluta al archivo
+        size: Tamaño en bytes
+        mtime_ns: Fecha de modificación en nanosegundos
+        sha256: Hash en hexadecimal del contenido leído (None si la lectura no lo calculó)
+    """
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: Optional[str] = None
+    
+    @classmethod
+    def from_stat(cls, file_path: str, stat: os.stat_result, sha256: Optional[str] = None) -> 'SourceFingerprint':
+        """
+        Crea el registro a partir de un os.stat tomado antes de leer el archivo.
+        
+        Args:
+            file_path: Ruta al archivo
+            stat: Resultado de os.stat u os.fstat
+            sha256: Hash del contenido leído, si se calculó en la misma lectura
+        
+        Returns:
+            SourceFingerprint del archivo
+        """
+        return cls(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns, sha256)
+
+
+def config_fingerprint(values: Dict[str, Any]) -> str:
+    """
+    Resume en un hash los valores de configuración que afectan a un artefacto.
+    
+    Args:
+        values: Valores de configuración relevantes (serializables a JSON)
+    
+    Returns:
+        Hash en hexadecimal
+    """
+    encoded = json.dumps(values, sort_keys=True, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class BuildManifest:
+    """
+    Registro de los artefactos generados y de las entradas con que se generaron.
+    
+    Para cada artefacto (un "_filtrado.csv" o un "_unificado.csv") guarda el
+    (tamaño, mtime_ns, hash del contenido) de cada archivo fuente, un hash de la
+    configuración relevante y la versión del código. Un artefacto sólo se
+    considera vigente si nada de eso cambió y el artefacto sigue intacto en disco.
+    Cuando cambia el mtime de una fuente pero no su tamaño, se compara el hash
+    del contenido antes de invalidar.
+    """
+    
+    FILE_NAME = ".manifest.json"
+    
+    def __init__(self, directory: str):
+        """
+        Inicializa el manifiesto de un directorio de salida.
+        
+        Args:
+            directory: Directorio de salida donde se guarda el manifiesto
+        """
+        self.directory = directory
+        self.path = os.path.join(directory, self.FILE_NAME)
+        self.entries: Dict[str, Dict] = {}
+        self._load()
+    
+    def is_fresh(self, artifact: str, sources: List[str], config_key: str) -> bool:
+        """
+        Indica si un artefacto está vigente respecto a sus fuentes y configuración.
+        
+        Args:
+            artifact: Ruta del artefacto generado
+            sources: Rutas de los archivos fuente, en orden de lectura
+            config_key: Hash de la configuración relevante
+        
+        Returns:
+            True si el artefacto puede reutilizarse sin regenerarlo
+        """
+        entry = self.entries.get(self._key(artifact))
+        if entry is None:
+            return False
+        if entry.get("version") != CODE_VERSION or entry.get("config") != config_key:
+            return False
+        if [source["path"] for source in entry["sources"]] != [os.path.abspath(s) for s in sources]:
+            return False
+        
+        # El artefacto no debe haber sido modificado ni eliminado
+        try:
+            stat = os.stat(artifact)
+        except FileNotFoundError:
+            return False
+        if [stat.st_size, stat.st_mtime_ns] != entry["artifact"]:
+            return False
+        
+        touched = False
+        for source in entry["sources"]:
+            try:
+                stat = os.stat(source["path"])
+            except FileNotFoundError:
+                return False
+            if stat.st_size != source["size"] or source["sha256"] is None:
+                return False
+            if stat.st_mtime_ns != source["mtime_ns"]:
+                # Misma longitud pero otra fecha: decidir por contenido
+                if file_sha256(source["path"]) != source["sha256"]:
+                    return False
+                source["mtime_ns"] = stat.st_mtime_ns
+                touched = True
+        
+        if touched:
+            # Evitar volver a calcular el hash en la próxima ejecución
+            self.save()
+        return True
+    
+    def sources(self, artifact: str) -> List[SourceFingerprint]:
+        """
+        Retorna el estado de las fuentes con que se generó un artefacto.
+        
+        Args:
+            artifact: Ruta del artefacto
+        
+        Returns:
+            SourceFingerprint de cada fuente registrada (vacía si no está registrado)
+        """
+        entry = self.entries.get(self._key(artifact))
+        if entry is None:
+            return []
+        return [SourceFingerprint(source["path"], source["size"], source["mtime_ns"], source["sha256"])
+                for source in entry["sources"]]
+    
+    def get_payload(self, artifact: str) -> Optional[Any]:
+        """
+        Retorna los datos adicionales guardados junto a un artefacto.
+        
+        Args:
+            artifact: Ruta del artefacto
+        
+        Returns:
+            Datos guardados al registrarlo, o None
+        """
+        entry = self.entries.get(self._key(artifact))
+        return entry.get("payload") if entry else None
+    
+    def record(self, artifact: str, sources: List[Union[str, SourceFingerprint]], config_key: str, payload: Any = None):
+        """
+        Registra un artefacto recién generado y guarda el manifiesto.
+        
+        Las fuentes deberían indicarse con el SourceFingerprint tomado al leerlas:
+        si un archivo se modificó mientras se generaba el artefacto, el registro
+        conserva el estado que realmente se leyó y el artefacto se regenera en la
+        próxima ejecución. Las fuentes sin hash se leen aquí sólo si no
+        cambiaron desde su lectura; si cambiaron quedan sin hash, y por lo tanto
+        desactualizadas.
+        
+        Args:
+            artifact: Ruta del artefacto generado
+            sources: Archivos fuente (SourceFingerprint o rutas), en orden de lectura
+            config_key: Hash de la configuración relevante
+            payload: Datos adicionales serializables a JSON (opcional)
+        """
+        previous = {
+            source["path"]: source
+            for source in self.entries.get(self._key(artifact), {}).get("sources", [])
+        }
+        source_entries = []
+        for source in sources:
+            if not isinstance(source, SourceFingerprint):
+                source = SourceFingerprint.from_stat(source, os.stat(source))
+            sha256 = source.sha256
+            if sha256 is None:
+                known = previous.get(source.path)
+                if known and known["size"] == source.size and known["mtime_ns"] == source.mtime_ns:
+                    sha256 = known["sha256"]
+                elif self._unchanged(source):
+                    sha256 = file_sha256(source.path)
+            source_entries.append({
+                "path": source.path,
+                "size": source.size,
+                "mtime_ns": source.mtime_ns,
+                "sha256": sha256,
+            })
+        
+        stat = os.stat(artifact)
+        self.entries[self._key(artifact)] = {
+            "version": CODE_VERSION,
+            "config": config_key,
+            "artifact": [stat.st_size, stat.st_mtime_ns],
+            "sources": source_entries,
+            "payload": payload,
+        }
+        self.save()
+    
+    def invalidate(self, artifact: str):
+        """
+        Elimina el registro de un artefacto.
+        
+        Args:
+            artifact: Ruta del artefacto
+        """
+        if self.entries.pop(self._key(artifact), None) is not None:
+            self.save()
+    
+    def save(self):
+        """Guarda el manifiesto de forma atómica."""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"format": MANIFEST_FORMAT, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+    
+    def _load(self):
+        """Carga el manifiesto si existe; uno corrupto o de otro formato se descarta."""
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("format") == MANIFEST_FORMAT:
+            self.entries = data.get("entries", {})
+    
+    def _unchanged(self, source: SourceFingerprint) -> bool:
+        """Indica si una fuente conserva el tamaño y la fecha que tenía al leerse."""
+        try:
+            stat = os.stat(source.path)
+        except FileNotFoundError:
+            return False
+        return stat.st_size == source.size and stat.st_mtime_ns == source.mtime_ns
+    
+    def _key(self, artifact: str) -> str:
+        """Clave de un artefacto dentro del manifiesto (nombre relativo al directorio)."""
+        return os.path.relpath(os.path.abspath(artifact), os.path.abspath(self.directory))
@@ -4,6 +4,8 @@ Módulo para cargar y gestionar la configuración del sistema.
 import configparser
 import os
 from io import StringIO
+from .grade_conversion import DEFAULT_CONVERSION_TABLE, GradeConversionTable
+from .settings import GRADE_HEADERS, Settings
 
 
 class ConfigLoader:
@@ -36,9 +38,20 @@ output_format = xls
 
 [Procesamiento]
 calculate_avg_grades = false
+write_intermediate_files = true
+max_workers = 0
+incremental = false
+engine = python
+attempt_store =
+parse_cache = false
+parse_cache_size_mb = 256
+parse_workers = 1
+shift_workers = 1
+shift_pool = thread
+evaluation_workers = 1
 """
     
-    def __init__(self, config_path="config.ini"):
+    def __init__(self, config_path="config.ini", quiet=False):
         """
         Inicializa el cargador de configuración.
         
@@ -48,6 +61,7 @@ calculate_avg_grades = false
         
         Args:
             config_path: Ruta al archivo de configuración externo
+            quiet: Si True, no muestra mensajes ni crea el config.ini por defecto
         """
         self.config = configparser.ConfigParser()
         self.config_path = config_path
@@ -58,12 +72,17 @@ calculate_avg_grades = false
         
         # Intentar cargar archivo externo (tiene prioridad)
         if os.path.exists(config_path):
-            print(f"✅ Usando configuración personalizada: {config_path}")
+            if not quiet:
+                print(f"✅ Usando configuración personalizada: {config_path}")
             self.config.read(config_path, encoding='utf-8')
         else:
-            print(f"ℹ️  No se encontró {config_path}, usando configuración por defecto")
             self.using_default = True
-            self._create_default_config_file(config_path)
+            if not quiet:
+                print(f"ℹ️  No se encontró {config_path}, usando configuración por defecto")
+                self._create_default_config_file(config_path)
+        
+        self._conversion_table = None
+        self._settings = None
     
     def get_source_dir(self):
         """Retorna el directorio de entrada."""
@@ -84,7 +103,7 @@ calculate_avg_grades = false
             "nombre": [s.strip() for s in self.config.get('Headers', 'header_nombre').split(',')],
             "id": [s.strip() for s in self.config.get('Headers', 'header_id').split(',')],
             # Soportar múltiples formatos de calificación (escala 0-10 y 0-100)
-            "nota": ["Calificación/10,00", "Calificación/100,00", "Calificación/10.00", "Calificación/100.00"],
+            "nota": list(GRADE_HEADERS),
         }
     
     def get_cantidad_tps(self):
@@ -117,12 +136,81 @@ calculate_avg_grades = false
     
     def get_output_format(self):
         """Retorna el formato de salida para planillas finales."""
-        return self.config.get('Formatos', 'output_format', fallback='xls')
+        return self.config.get('Formatos', 'output_format', fallback='xls').strip().lower()
+    
+    def get_conversion_table(self) -> GradeConversionTable:
+        """
+        Retorna la tabla de conversión de notas compilada desde la sección [Conversion].
+        
+        Si la sección existe reemplaza por completo a la tabla por defecto. La
+        tabla se compila una sola vez por instancia.
+        """
+        if self._conversion_table is None:
+            if self.config.has_section('Conversion') and self.config['Conversion']:
+                self._conversion_table = GradeConversionTable.from_config_items(dict(self.config['Conversion']))
+            else:
+                self._conversion_table = DEFAULT_CONVERSION_TABLE
+        return self._conversion_table
     
     def get_calculate_avg_grades(self):
         """Retorna si se deben calcular y mostrar los promedios generales de Moodle."""
         return self.config.getboolean('Procesamiento', 'calculate_avg_grades', fallback=False)
     
+    def get_write_intermediate_files(self):
+        """Retorna si se deben escribir los CSV unificados intermedios al generar la planilla final."""
+        return self.config.getboolean('Procesamiento', 'write_intermediate_files', fallback=True)
+    
+    def get_max_workers(self):
+        """Retorna la cantidad de procesos para generar varios cursos en paralelo (0 = automático)."""
+        return self.config.getint('Procesamiento', 'max_workers', fallback=0)
+    
+    def get_incremental(self):
+        """Retorna si se deben reutilizar los archivos generados cuyas fuentes no cambiaron."""
+        return self.config.getboolean('Procesamiento', 'incremental', fallback=False)
+    
+    def get_engine(self):
+        """Retorna el motor para calcular mejores notas ("python" o "numpy")."""
+        return self.config.get('Procesamiento', 'engine', fallback='python').strip().lower()
+    
+    def get_attempt_store(self):
+        """Retorna la ruta de la base SQLite de intentos ("" = leer los CSV directamente)."""
+        return self.config.get('Procesamiento', 'attempt_store', fallback='').strip()
+    
+    def get_parse_cache(self):
+        """Retorna si se deben guardar en caché los exports ya interpretados."""
+        return self.config.getboolean('Procesamiento', 'parse_cache', fallback=False)
+    
+    def get_parse_cache_size_mb(self):
+        """Retorna el tamaño máximo de la caché de exports en MB."""
+        return self.config.getint('Procesamiento', 'parse_cache_size_mb', fallback=256)
+    
+    def get_parse_workers(self):
+        """Retorna la cantidad de procesos para leer por partes un export grande (1 = no dividir, 0 = automático)."""
+        return self.config.getint('Procesamiento', 'parse_workers', fallback=1)
+    
+    def get_shift_workers(self):
+        """Retorna la cantidad de hilos o procesos para leer a la vez los turnos de una evaluación (1 = de a uno, 0 = automático)."""
+        return self.config.getint('Procesamiento', 'shift_workers', fallback=1)
+    
+    def get_shift_pool(self):
+        """Retorna el tipo de pool para leer los turnos ("thread" o "process")."""
+        return self.config.get('Procesamiento', 'shift_pool', fallback='thread').strip().lower()
+    
+    def get_evaluation_workers(self):
+        """Retorna la cantidad de procesos para calcular a la vez las evaluaciones de un curso (1 = de a una, 0 = automático)."""
+        return self.config.getint('Procesamiento', 'evaluation_workers', fallback=1)
+    
+    def get_settings(self) -> Settings:
+        """
+        Retorna la configuración compilada e inmutable (se compila una sola vez).
+        
+        Es la forma de pasar la configuración a procesos hijos sin volver a
+        construir un ConfigLoader en cada uno.
+        """
+        if self._settings is None:
+            self._settings = Settings.from_config(self)
+        return self._settings
+    
     def _create_default_config_file(self, config_path):
         """
         Crea un archivo de configuración por defecto para referencia del usuario.
@@ -3,7 +3,10 @@ Módulo con funciones auxiliares para manejo de archivos CSV.
 """
 import csv
 import os
-from typing import Dict, List
+from typing import Dict, Iterable, List
+from .grade_conversion import DEFAULT_CONVERSION_TABLE, MISSING_GRADE
+from .grade_parser import GradeIssue, parse_grade, _grade_cache
+from .metrics import add_counts, is_measuring, timed
 
 
 def is_average_row(row: Dict, header_map: Dict) -> bool:
@@ -16,7 +19,7 @@ def is_average_row(row: Dict, header_map: Dict) -> bool:
     Args:
         row: Fila del CSV como diccionario
         header_map: Mapeo de nombres de columnas
-        
+    
     Returns:
         True si es una fila de promedio general, False en caso contrario
     """
@@ -37,7 +40,7 @@ def get_col_name_safe(fieldnames, possible_names: List[str]) -> str:
     Args:
         fieldnames: Lista de nombres de columnas disponibles
         possible_names: Lista de posibles nombres para la columna buscada
-        
+    
     Returns:
         Nombre de la columna encontrada o None si no se encuentra
     """
@@ -54,10 +57,10 @@ def get_col_name(fieldnames: List[str], possible_names: List[str]) -> str:
     Args:
         fieldnames: Lista de nombres de columnas disponibles
         possible_names: Lista de posibles nombres para la columna buscada
-        
+    
     Returns:
         El nombre de la columna encontrada
-        
+    
     Raises:
         ValueError: Si fieldnames es None o está vacío
         KeyError: Si no se encuentra ninguna columna coincidente
@@ -79,7 +82,9 @@ def convert_grade_to_integer(grade_str: str, scale_max: float = 10.0) -> any:
     Convierte una nota decimal a su equivalente entero según la escala de calificación.
     
     Las notas de Moodle pueden venir en escala 0-10 o 0-100. Esta función las normaliza
-    a escala 0-100 y luego aplica la conversión a escala entera (2-10).
+    a escala 0-100 y luego aplica la tabla de conversión por defecto (2-10).
+    Para convertir notas ya parseadas, o con la tabla de [Conversion] de config.ini,
+    usar GradeConversionTable.convert / convert_many.
     
     Escala de conversión (base 100):
     - 0 a 54.44 -> 2
@@ -95,42 +100,19 @@ def convert_grade_to_integer(grade_str: str, scale_max: float = 10.0) -> any:
     Args:
         grade_str: Nota en formato string
         scale_max: Escala máxima (10.0 para escala 0-10, 100.0 para escala 0-100)
-        
+    
     Returns:
         Nota convertida a entero (2-10) o "FALTA"
     """
-    if not grade_str or grade_str.strip() == "":
-        return "FALTA"
+    if not grade_str:
+        return MISSING_GRADE
     
     try:
-        grade = float(grade_str)
+        grade = parse_grade(grade_str)
     except ValueError:
-        return "FALTA"
+        return MISSING_GRADE
     
-    # Normalizar a escala 0-100 según la escala de origen
-    if scale_max == 100.0:
-        grade_100 = grade  # Ya está en escala 0-100
-    else:
-        grade_100 = grade * 10  # Convertir de escala 0-10 a escala 0-100
-    
-    if 0 <= grade_100 <= 54.44:
-        return 2
-    elif 54.45 <= grade_100 <= 57.44:
-        return 4
-    elif 57.45 <= grade_100 <= 59.44:
-        return 5
-    elif 59.45 <= grade_100 <= 68.44:
-        return 6
-    elif 68.45 <= grade_100 <= 77.44:
-        return 7
-    elif 77.45 <= grade_100 <= 86.44:
-        return 8
-    elif 86.45 <= grade_100 <= 95.44:
-        return 9
-    elif 95.45 <= grade_100 <= 100:
-        return 10
-    else:
-        return "FALTA"
+    return DEFAULT_CONVERSION_TABLE.convert(grade, scale_max)
 
 
 def detect_grade_scale(grade_col_name: str) -> float:
@@ -139,7 +121,7 @@ def detect_grade_scale(grade_col_name: str) -> float:
     
     Args:
         grade_col_name: Nombre de la columna de calificación
-        
+    
     Returns:
         Escala máxima (10.0 o 100.0)
     """
@@ -156,7 +138,7 @@ def normalize_grade_to_scale_10(grade: float, scale_max: float) -> float:
     Args:
         grade: Calificación a normalizar
         scale_max: Escala máxima (10.0 o 100.0)
-        
+    
     Returns:
         Calificación normalizada en escala 0-10
     """
@@ -166,7 +148,349 @@ def normalize_grade_to_scale_10(grade: float, scale_max: float) -> float:
         return grade  # Ya está en escala 0-10
 
 
-def read_csv_with_best_grades(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False) -> Dict:
+# Motores disponibles para calcular mejores notas
+ENGINES = ('python', 'numpy')
+
+_numpy_warning_shown = False
+
+
+def _last_index(fieldnames: List[str], name: str) -> int:
+    """
+    Retorna la posición de una columna tal como la resuelve csv.DictReader.
+    
+    Si el header tiene columnas repetidas, DictReader conserva el valor de la
+    última, por lo que se usa su posición para obtener exactamente el mismo dato.
+    """
+    return len(fieldnames) - 1 - fieldnames[::-1].index(name)
+
+
+def _row_to_dict(fieldnames: List[str], row: List[str]) -> Dict:
+    """
+    Convierte una fila de csv.reader en un diccionario igual al de csv.DictReader.
+    
+    Las columnas faltantes quedan en None y los valores sobrantes se agrupan
+    bajo la clave None, como hace DictReader.
+    """
+    record = dict(zip(fieldnames, row))
+    if len(row) > len(fieldnames):
+        record[None] = row[len(fieldnames):]
+    elif len(row) < len(fieldnames):
+        for name in fieldnames[len(row):]:
+            record[name] = None
+    return record
+
+
+class BestGradeAccumulator:
+    """
+    Acumula el mejor intento y la cantidad de intentos por alumno sobre uno o
+    más archivos CSV de un mismo TP o Parcial (uno por turno).
+    
+    Cada archivo se recorre una única vez con csv.reader: las columnas de ID,
+    calificación y apellido se resuelven una vez por archivo y las filas se
+    manejan como listas. Sólo se arma un diccionario para el mejor intento
+    final de cada alumno. Ante notas iguales se conserva el primer intento leído.
+    
+    Los intentos sin calificar ("-" o vacíos) cuentan como intentos pero nunca
+    son el mejor. Las calificaciones no numéricas tampoco, y quedan registradas
+    en `issues` con su número de línea en lugar de interrumpir el proceso. Un
+    alumno sin ningún intento calificado conserva su primer intento, sin nota.
+    """
+    
+    def __init__(self, header_map: Dict, calculate_avg_grades: bool = False):
+        """
+        Inicializa el acumulador.
+        
+        Args:
+            header_map: Mapeo de nombres de columnas
+            calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        """
+        self.header_map = header_map
+        self.calculate_avg_grades = calculate_avg_grades
+        self.fieldnames = None
+        self.attempts: Dict[str, int] = {}
+        self.issues: List[GradeIssue] = []
+        # ID -> [nota normalizada y redondeada, fila, columnas del archivo, columna de nota]
+        self._best: Dict[str, list] = {}
+        # ID -> [fila, columnas del archivo, columna de nota] del primer intento sin
+        # calificar de los alumnos que todavía no tenían un intento calificado
+        self._ungraded: Dict[str, list] = {}
+    
+    def add_file(self, file_path: str, encoding: str = 'utf-8-sig') -> List[str]:
+        """
+        Recorre un archivo CSV acumulando mejores intentos e intentos por alumno.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            encoding: Encoding del archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        
+        Raises:
+            ValueError: Si el archivo está vacío o no tiene headers
+            KeyError: Si no se encuentran las columnas de ID o calificación
+        """
+        cached_grade = _grade_cache.get
+        
+        with open(file_path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f)
+            fieldnames = self._read_header(reader, file_path)
+            
+            id_col = get_col_name(fieldnames, self.header_map["id"])
+            grade_col = get_col_name(fieldnames, self.header_map["nota"])
+            id_idx = _last_index(fieldnames, id_col)
+            grade_idx = _last_index(fieldnames, grade_col)
+            
+            # Columna de apellido para detectar la fila "Promedio general"
+            surname_idx = None
+            if not self.calculate_avg_grades:
+                surname_col = get_col_name_safe(fieldnames, self.header_map["apellido"])
+                if surname_col:
+                    surname_idx = _last_index(fieldnames, surname_col)
+            
+            # Detectar escala de calificación
+            from_scale_100 = detect_grade_scale(grade_col) == 100.0
+            
+            best = self._best
+            ungraded = self._ungraded
+            attempts = self.attempts
+            
+            for row in reader:
+                if not row:
+                    # csv.DictReader también ignora las líneas vacías
+                    continue
+                
+                # Filtrar fila de "Promedio general" si está configurado
+                if surname_idx is not None and surname_idx < len(row) \
+                        and row[surname_idx].strip().lower() == "promedio general":
+                    continue
+                
+                student_id = row[id_idx]
+                attempts[student_id] = attempts.get(student_id, 0) + 1
+                
+                # Normalizar calificación a escala 0-10 para comparación consistente
+                grade_text = row[grade_idx]
+                normalized_grade = cached_grade(grade_text)
+                if normalized_grade is None:
+                    # Valor no memorizado todavía, o intento sin calificar
+                    try:
+                        normalized_grade = parse_grade(grade_text)
+                    except ValueError:
+                        self.issues.append(GradeIssue(file_path, reader.line_num, student_id, grade_text))
+                        normalized_grade = None
+                    if normalized_grade is None:
+                        if student_id not in best and student_id not in ungraded:
+                            ungraded[student_id] = [row, fieldnames, grade_col]
+                        continue
+                if from_scale_100:
+                    normalized_grade = normalized_grade / 10.0
+                
+                current = best.get(student_id)
+                if current is None or normalized_grade > current[0]:
+                    # Se compara contra la nota guardada, redondeada a 2 decimales
+                    best[student_id] = [round(normalized_grade, 2), row, fieldnames, grade_col]
+        
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def add_parsed(self, parsed) -> List[str]:
+        """
+        Acumula un export ya interpretado (ver ParseCache) sin leer el CSV.
+        
+        Sólo se leen del archivo las filas de los intentos que quedan como mejores.
+        
+        Args:
+            parsed: ParsedExport del archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        """
+        best = self._best
+        ungraded = self._ungraded
+        attempts = self.attempts
+        fieldnames = parsed.fieldnames
+        grade_col = parsed.grade_col
+        pending = []
+        pending_ungraded = []
+        
+        for index, (student_id, grade) in enumerate(zip(parsed.ids, parsed.grades)):
+            attempts[student_id] = attempts.get(student_id, 0) + 1
+            if grade != grade:
+                # NaN: intento sin calificar o con nota inválida
+                if student_id not in best and student_id not in ungraded:
+                    entry = ungraded[student_id] = [index, fieldnames, grade_col]
+                    pending_ungraded.append(entry)
+                continue
+            current = best.get(student_id)
+            if current is None or grade > current[0]:
+                entry = [round(grade, 2), index, fieldnames, grade_col]
+                best[student_id] = entry
+                pending.append(entry)
+        
+        self.issues.extend(parsed.grade_issues())
+        
+        # Leer sólo las filas de los intentos de este archivo que siguen siendo los mejores
+        winners = [entry for entry in pending if best.get(parsed.ids[entry[1]]) is entry]
+        rows = parsed.read_rows([entry[1] for entry in winners] + [entry[0] for entry in pending_ungraded])
+        for entry in winners:
+            entry[1] = rows[entry[1]]
+        for entry in pending_ungraded:
+            entry[0] = rows[entry[0]]
+        
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def add_file_parallel(self, file_path: str, encoding: str = 'utf-8-sig', max_workers: int = 0) -> List[str]:
+        """
+        Como add_file, pero repartiendo el archivo en rangos de bytes entre procesos.
+        
+        Los archivos chicos o con un encoding que no permite dividirlos se leen con add_file.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            encoding: Encoding del archivo
+            max_workers: Procesos a usar (0 = uno por núcleo)
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        
+        Raises:
+            ValueError: Si el archivo está vacío o no tiene headers
+            KeyError: Si no se encuentran las columnas de ID o calificación
+        """
+        from .parallel_parse import parse_file_parallel
+        
+        result = parse_file_parallel(file_path, self.header_map, encoding, self.calculate_avg_grades, max_workers)
+        if result is None:
+            return self.add_file(file_path, encoding)
+        fieldnames, grade_col, partial = result
+        return self.add_partial(file_path, encoding, fieldnames, grade_col, partial)
+    
+    def add_partial(self, file_path: str, encoding: str, fieldnames: List[str], grade_col: str, partial) -> List[str]:
+        """
+        Acumula el resumen de un archivo (ver parallel_parse.PartialBest).
+        
+        Cada alumno continúa desde su nota guardada de los archivos anteriores,
+        igual que si se leyera el archivo con add_file. Sólo se leen del archivo
+        las filas de los intentos que quedan como mejores.
+        
+        Args:
+            file_path: Ruta al archivo CSV resumido
+            encoding: Encoding del archivo
+            fieldnames: Columnas del archivo
+            grade_col: Columna de calificación del archivo
+            partial: PartialBest de todo el archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        """
+        from .parallel_parse import read_records, resolve_entry
+        
+        best = self._best
+        attempts = self.attempts
+        for student_id, count in partial.attempts.items():
+            attempts[student_id] = attempts.get(student_id, 0) + count
+        ungraded = []
+        for student_id, span in partial.ungraded.items():
+            if student_id not in best and student_id not in partial.best and student_id not in self._ungraded:
+                entry = self._ungraded[student_id] = [span, fieldnames, grade_col]
+                ungraded.append(entry)
+        winners = []
+        for student_id, entries in partial.best.items():
+            current = best.get(student_id)
+            entry = resolve_entry(entries, None if current is None else current[0])
+            if entry is not None:
+                winner = [entry[1], entry[2], fieldnames, grade_col]
+                best[student_id] = winner
+                winners.append(winner)
+        self.issues.extend(partial.issues)
+        
+        # Los resúmenes traen la posición en bytes de cada fila: leer sólo las ganadoras
+        rows = read_records(file_path, encoding, [winner[1] for winner in winners] + [entry[0] for entry in ungraded])
+        for winner, row in zip(winners, rows):
+            winner[1] = row
+        for entry, row in zip(ungraded, rows[len(winners):]):
+            entry[0] = row
+        
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def best_rows(self) -> Dict[str, Dict]:
+        """
+        Retorna el mejor intento de cada alumno como diccionario.
+        
+        Returns:
+            ID de alumno -> registro del mejor intento, con la nota normalizada a
+            escala 0-10 y redondeada a 2 decimales, en orden de primer intento
+            calificado. Al final, en orden de aparición, los alumnos sin ningún
+            intento calificado con su primer intento y la nota en None
+        """
+        result = {}
+        for student_id, (grade, row, fieldnames, grade_col) in self._best.items():
+            record = _row_to_dict(fieldnames, row)
+            record[grade_col] = grade
+            result[student_id] = record
+        for student_id, (row, fieldnames, grade_col) in self._ungraded.items():
+            if student_id not in result:
+                record = _row_to_dict(fieldnames, row)
+                record[grade_col] = None
+                result[student_id] = record
+        return result
+    
+    @staticmethod
+    def _read_header(reader, file_path: str) -> List[str]:
+        """Lee y valida la fila de encabezados."""
+        try:
+            fieldnames = next(reader)
+            # Igual que csv.DictReader, saltear líneas vacías iniciales
+            while fieldnames == []:
+                fieldnames = next(reader)
+        except StopIteration:
+            raise ValueError(f"El archivo '{file_path}' está vacío o no tiene headers")
+        return fieldnames
+
+
+def create_best_grade_accumulator(header_map: Dict, calculate_avg_grades: bool = False, engine: str = 'python') -> BestGradeAccumulator:
+    """
+    Crea el acumulador de mejores notas para el motor indicado.
+    
+    Args:
+        header_map: Mapeo de nombres de columnas
+        calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        engine: "python" o "numpy" (si NumPy no está instalado se usa "python")
+    
+    Returns:
+        Instancia de BestGradeAccumulator (o de su variante con NumPy)
+    
+    Raises:
+        ValueError: Si el motor no es válido
+    """
+    engine = (engine or 'python').strip().lower()
+    if engine not in ENGINES:
+        raise ValueError(f"Motor de procesamiento inválido: '{engine}' (opciones: {', '.join(ENGINES)})")
+    
+    if engine == 'numpy':
+        from .numpy_engine import NumpyBestGradeAccumulator, numpy_available
+        if numpy_available():
+            return NumpyBestGradeAccumulator(header_map, calculate_avg_grades)
+        _warn_numpy_missing()
+    
+    return BestGradeAccumulator(header_map, calculate_avg_grades)
+
+
+def _warn_numpy_missing():
+    """Avisa (una sola vez por proceso) que se usará el motor de Python."""
+    global _numpy_warning_shown
+    if not _numpy_warning_shown:
+        print("⚠️  NumPy no está instalado: se usa el motor de Python (pip install numpy)")
+        _numpy_warning_shown = True
+
+
+def read_csv_with_best_grades(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False,
+                              engine: str = 'python', max_workers: int = 1) -> Dict:
     """
     Lee un archivo CSV y retorna un diccionario con las mejores notas por alumno.
     Detecta automáticamente la escala de calificación (0-10 o 0-100) y normaliza.
@@ -176,51 +500,23 @@ def read_csv_with_best_grades(file_path: str, header_map: Dict, encoding: str =
         header_map: Mapeo de nombres de columnas
         encoding: Encoding del archivo
         calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
-        
+        engine: Motor de procesamiento ("python" o "numpy")
+        max_workers: Procesos para leer un archivo grande por partes (1 = un solo proceso, 0 = uno por núcleo)
+    
     Returns:
         Diccionario con ID de alumno como clave y su mejor registro como valor
     """
-    best_attempts = {}
-    
-    with open(file_path, newline='', encoding=encoding) as f:
-        reader = csv.DictReader(f)
-        id_col = get_col_name(reader.fieldnames, header_map["id"])
-        grade_col = get_col_name(reader.fieldnames, header_map["nota"])
-        
-        # Detectar escala de calificación
-        scale_max = detect_grade_scale(grade_col)
-        
-        for row in reader:
-            # Filtrar fila de "Promedio general" si está configurado
-            if not calculate_avg_grades and is_average_row(row, header_map):
-                continue
-            
-            student_id = row[id_col]
-            grade = float(row[grade_col].replace(",", "."))
-            
-            # Normalizar calificación a escala 0-10 para comparación consistente
-            normalized_grade = normalize_grade_to_scale_10(grade, scale_max)
-            
-            if student_id not in best_attempts:
-                # Guardar el registro pero con la nota normalizada a escala 0-10 (redondeada a 2 decimales)
-                normalized_row = row.copy()
-                normalized_row[grade_col] = round(normalized_grade, 2)
-                best_attempts[student_id] = normalized_row
-            else:
-                current_grade = best_attempts[student_id][grade_col]
-                if isinstance(current_grade, str):
-                    current_grade = float(current_grade.replace(",", "."))
-                
-                if normalized_grade > current_grade:
-                    # Actualizar con la nota normalizada a escala 0-10 (redondeada a 2 decimales)
-                    normalized_row = row.copy()
-                    normalized_row[grade_col] = round(normalized_grade, 2)
-                    best_attempts[student_id] = normalized_row
-    
-    return best_attempts
+    accumulator = create_best_grade_accumulator(header_map, calculate_avg_grades, engine)
+    if max_workers == 1:
+        accumulator.add_file(file_path, encoding)
+    else:
+        accumulator.add_file_parallel(file_path, encoding, max_workers)
+    return accumulator.best_rows()
 
 
-def count_student_attempts(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False) -> Dict[str, int]:
+@timed("count_student_attempts")
+def count_student_attempts(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False,
+                           cache=None) -> Dict[str, int]:
     """
     Cuenta la cantidad de intentos por alumno en un archivo CSV.
     
@@ -229,7 +525,8 @@ def count_student_attempts(file_path: str, header_map: Dict, encoding: str = 'ut
         header_map: Mapeo de nombres de columnas
         encoding: Encoding del archivo
         calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
-        
+        cache: ParseCache creada con la misma configuración (None = leer el CSV)
+    
     Returns:
         Diccionario con ID de alumno como clave y cantidad de intentos como valor
     """
@@ -238,29 +535,50 @@ def count_student_attempts(file_path: str, header_map: Dict, encoding: str = 'ut
     if not os.path.exists(file_path):
         return attempts
     
+    if cache is not None:
+        for student_id in cache.load(file_path).ids:
+            attempts[student_id] = attempts.get(student_id, 0) + 1
+        if is_measuring():
+            add_counts(rows_read=sum(attempts.values()))
+        return attempts
+    
     with open(file_path, newline='', encoding=encoding) as f:
-        reader = csv.DictReader(f)
-        id_col = get_col_name(reader.fieldnames, header_map["id"])
+        reader = csv.reader(f)
+        fieldnames = BestGradeAccumulator._read_header(reader, file_path)
+        id_idx = _last_index(fieldnames, get_col_name(fieldnames, header_map["id"]))
+        
+        # Columna de apellido para detectar la fila "Promedio general"
+        surname_idx = None
+        if not calculate_avg_grades:
+            surname_col = get_col_name_safe(fieldnames, header_map["apellido"])
+            if surname_col:
+                surname_idx = _last_index(fieldnames, surname_col)
         
         for row in reader:
+            if not row:
+                continue
+            
             # Filtrar fila de "Promedio general" si está configurado
-            if not calculate_avg_grades and is_average_row(row, header_map):
+            if surname_idx is not None and surname_idx < len(row) \
+                    and row[surname_idx].strip().lower() == "promedio general":
                 continue
             
-            student_id = row[id_col]
+            student_id = row[id_idx]
             attempts[student_id] = attempts.get(student_id, 0) + 1
     
+    if is_measuring():
+        add_counts(rows_read=sum(attempts.values()), bytes_read=os.path.getsize(file_path))
     return attempts
 
 
-def save_csv(file_path: str, fieldnames: List[str], data: List[Dict], encoding: str = 'utf-8-sig'):
+def save_csv(file_path: str, fieldnames: List[str], data: Iterable[Dict], encoding: str = 'utf-8-sig'):
     """
     Guarda datos en un archivo CSV.
     
     Args:
         file_path: Ruta del archivo de salida
         fieldnames: Lista de nombres de columnas
-        data: Lista de diccionarios con los datos
+        data: Diccionarios con los datos (lista o iterable)
         encoding: Encoding del archivo
     """
     # Asegurar que el directorio de salida exista
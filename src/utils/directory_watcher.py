@@ -0,0 +1,218 @@
+"""
+Módulo para detectar cambios en los CSV de un directorio de entrada.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+# Eventos de inotify (linux/inotify.h) que indican que un archivo cambió
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+INOTIFY_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+# Tamaño del buffer para vaciar la cola de eventos de inotify
+INOTIFY_BUFFER_SIZE = 64 * 1024
+
+
+def snapshot_directory(directory: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Toma una foto de los CSV de un directorio.
+    
+    Args:
+        directory: Directorio a inspeccionar
+    
+    Returns:
+        Diccionario nombre de archivo -> (tamaño, mtime_ns); vacío si el directorio no existe
+    """
+    snapshot = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith('.csv'):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # El archivo se borró o renombró durante el escaneo
+                    continue
+                snapshot[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def changed_files(before: Dict[str, Tuple[int, int]], after: Dict[str, Tuple[int, int]]) -> List[str]:
+    """
+    Compara dos fotos del directorio.
+    
+    Args:
+        before: Foto anterior
+        after: Foto actual
+    
+    Returns:
+        Nombres de los archivos agregados, modificados o eliminados, ordenados
+    """
+    return sorted(
+        name for name in before.keys() | after.keys()
+        if before.get(name) != after.get(name)
+    )
+
+
+class _InotifyBackend:
+    """Espera eventos del directorio con inotify (sólo Linux, vía ctypes)."""
+    
+    def __init__(self, directory: str):
+        """
+        Registra el directorio en inotify.
+        
+        Args:
+            directory: Directorio a vigilar
+        
+        Raises:
+            OSError: Si inotify no está disponible o no se pudo vigilar el directorio
+        """
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify sólo está disponible en Linux")
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            init = libc.inotify_init1
+            add_watch = libc.inotify_add_watch
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify no disponible: {e}")
+        
+        self.fd = init(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        
+        if add_watch(self.fd, os.fsencode(directory), INOTIFY_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, os.strerror(errno), directory)
+    
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Espera eventos del directorio.
+        
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+        
+        Returns:
+            True si llegaron eventos (la cola queda vacía)
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        # Sólo interesa saber que hubo actividad: qué cambió se decide comparando fotos
+        while True:
+            try:
+                if not os.read(self.fd, INOTIFY_BUFFER_SIZE):
+                    break
+            except BlockingIOError:
+                break
+        return True
+    
+    def close(self):
+        """Libera el descriptor de inotify."""
+        os.close(self.fd)
+
+
+class _PollingBackend:
+    """Alternativa sin inotify: duerme y deja que se comparen las fotos."""
+    
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        Duerme el tiempo indicado.
+        
+        Returns:
+            Siempre False: la actividad se detecta comparando fotos del directorio
+        """
+        time.sleep(timeout)
+        return False
+    
+    def close(self):
+        """No hay recursos que liberar."""
+
+
+class DirectoryWatcher:
+    """
+    Vigila los CSV de un directorio y agrupa ráfagas de cambios.
+    
+    Usa inotify cuando está disponible y, si no, revisa el directorio cada
+    `interval` segundos. En ambos casos lo que cambió se decide comparando
+    fotos (nombre, tamaño, mtime) del directorio, y un lote de cambios sólo se
+    entrega cuando el directorio quedó quieto durante `debounce` segundos,
+    para no procesar un export a medio copiar ni una ráfaga archivo por archivo.
+    """
+    
+    def __init__(self, directory: str, debounce: float = 2.0, interval: float = 1.0, use_inotify: bool = True):
+        """
+        Inicializa el vigilante tomando la foto inicial del directorio.
+        
+        Args:
+            directory: Directorio a vigilar
+            debounce: Segundos sin cambios necesarios para entregar un lote
+            interval: Segundos entre revisiones cuando no hay inotify
+            use_inotify: Si False, usa siempre la revisión periódica
+        """
+        self.directory = directory
+        self.debounce = debounce
+        self.interval = interval
+        self._backend = None
+        if use_inotify:
+            try:
+                self._backend = _InotifyBackend(directory)
+            except OSError:
+                self._backend = None
+        self.uses_inotify = self._backend is not None
+        if self._backend is None:
+            self._backend = _PollingBackend()
+        self._snapshot = snapshot_directory(directory)
+    
+    def wait_for_changes(self) -> List[str]:
+        """
+        Bloquea hasta que haya un lote de cambios estable.
+        
+        Returns:
+            Nombres de los CSV agregados, modificados o eliminados desde el lote anterior
+        """
+        while True:
+            self._backend.wait(None if self.uses_inotify else self.interval)
+            current = snapshot_directory(self.directory)
+            if current == self._snapshot:
+                continue
+            
+            # Esperar a que el directorio quede quieto antes de entregar el lote
+            while True:
+                while self._backend.wait(self.debounce):
+                    pass
+                latest = snapshot_directory(self.directory)
+                if latest == current:
+                    break
+                current = latest
+            
+            changes = changed_files(self._snapshot, current)
+            self._snapshot = current
+            if changes:
+                return changes
+    
+    def close(self):
+        """Deja de vigilar el directorio."""
+        self._backend.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
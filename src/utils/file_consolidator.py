@@ -1,13 +1,22 @@
 """
 Módulo para consolidar múltiples archivos de un mismo TP o Parcial.
 """
-import glob
-import os
 import csv
-from typing import Dict, List
-from .csv_helpers import get_col_name, save_csv, read_csv_with_best_grades, detect_grade_scale, normalize_grade_to_scale_10, is_average_row
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Union
+from .attempt_store import AttemptStore, evaluation_key
+from .build_manifest import BuildManifest, SourceFingerprint, config_fingerprint
+from .csv_helpers import _row_to_dict, create_best_grade_accumulator, get_col_name, save_csv
+from .grade_parser import GradeIssue, format_grade_issues, parse_grade
+from .input_index import InputIndex
+from .metrics import add_counts, is_measuring, timed
+from .parallel_parse import summarize_files
+from .parse_cache import ParseCache, ParsedExport, ascii_compatible, best_attempts_of, parse_export, write_best_rows
 
 
+@timed("find_files_case_insensitive")
 def find_files_case_insensitive(directory: str, base_pattern: str) -> List[str]:
     """
     Busca archivos en un directorio usando un patrón case-insensitive.
@@ -18,46 +27,89 @@ def find_files_case_insensitive(directory: str, base_pattern: str) -> List[str]:
     - Tp1_1K15_1.csv
     - etc.
     
+    La búsqueda se resuelve sobre el InputIndex compartido del directorio, que
+    sólo vuelve a listarlo cuando cambia su fecha de modificación.
+    
     Args:
         directory: Directorio donde buscar
         base_pattern: Patrón base (ej: "TP1_1K15", "Parcial2_1K2")
-        
+    
     Returns:
-        Lista de rutas completas a archivos que coinciden
+        Lista de rutas completas a archivos que coinciden, primero el archivo sin
+        turno y luego los turnos en orden numérico
+    """
+    files = InputIndex.for_directory(directory).find_base(base_pattern)
+    return [os.path.join(directory, indexed.name) for indexed in files]
+
+
+def natural_sort_key(text: str):
     """
-    if not os.path.exists(directory):
-        return []
+    Clave de ordenamiento que compara los números por valor (1K2 < 1K10).
     
-    # Obtener todos los archivos CSV del directorio
-    all_files = [f for f in os.listdir(directory) if f.lower().endswith('.csv')]
+    Args:
+        text: Texto a ordenar
     
-    # Normalizar el patrón base a minúsculas para comparación
-    base_pattern_lower = base_pattern.lower()
+    Returns:
+        Lista de partes comparables
+    """
+    return [int(part) if part.isdigit() else part.lower() for part in re.split(r'(\d+)', text)]
+
+
+def discover_courses(directory: str, prefixes: List[str]) -> List[str]:
+    """
+    Detecta los cursos presentes en un directorio de exports de Moodle.
     
-    matched_files = []
+    Reconoce archivos con el formato <prefijo><número>_<curso>[_<turno>].csv
+    (ej: TP1_1K2.csv, parcial2_1k15_1.csv) sin distinguir mayúsculas.
     
-    for filename in all_files:
-        filename_lower = filename[:-4].lower()  # Remover .csv y convertir a minúsculas
-        
-        # Verificar si el nombre del archivo coincide con el patrón base
-        # Puede ser exacto o con sufijo numérico (_1, _2, etc.)
-        if filename_lower == base_pattern_lower:
-            # Coincidencia exacta (ej: TP1_1K15.csv)
-            matched_files.append(os.path.join(directory, filename))
-        elif filename_lower.startswith(base_pattern_lower + "_"):
-            # Coincidencia con sufijo (ej: TP1_1K15_1.csv, TP1_1K15_2.csv)
-            # Verificar que lo que sigue sea un número
-            suffix = filename_lower[len(base_pattern_lower) + 1:]
-            if suffix.isdigit():
-                matched_files.append(os.path.join(directory, filename))
+    Args:
+        directory: Directorio donde buscar
+        prefixes: Prefijos de evaluación configurados (ej: ["TP", "Parcial"])
     
-    return matched_files
+    Returns:
+        Lista de cursos en mayúsculas, sin repetidos y en orden natural
+    """
+    courses = InputIndex.for_directory(directory).courses(prefixes)
+    return sorted(courses, key=natural_sort_key)
+
+
+@dataclass
+class ConsolidatedEvaluation:
+    """
+    Resultado de consolidar todos los archivos de un TP o Parcial de un curso.
+    
+    Se obtiene con una única lectura de cada export de Moodle y contiene todo lo
+    necesario para unificar la evaluación sin volver a leer el archivo filtrado.
+    
+    Attributes:
+        base_name: Nombre base de la evaluación (ej: "TP1_1K2")
+        source_files: Archivos de entrada consolidados, en orden de lectura
+        fieldnames: Columnas del primer archivo leído
+        best_attempts: ID de alumno -> registro del mejor intento (nota normalizada a escala 0-10)
+        attempts: ID de alumno -> cantidad de intentos en todos los archivos
+        output_file: Ruta del archivo "_filtrado.csv" generado
+        issues: Calificaciones no numéricas que se ignoraron
+        reused: True si se reutilizó un "_filtrado.csv" vigente (modo incremental)
+        sources: Estado de cada archivo de entrada al leerlo, para el manifiesto incremental
+    """
+    base_name: str
+    source_files: List[str]
+    fieldnames: List[str]
+    best_attempts: Dict[str, Dict] = field(default_factory=dict)
+    attempts: Dict[str, int] = field(default_factory=dict)
+    output_file: Optional[str] = None
+    issues: List[GradeIssue] = field(default_factory=list)
+    reused: bool = False
+    sources: List[SourceFingerprint] = field(default_factory=list)
 
 
 class FileConsolidator:
     """Clase para consolidar múltiples archivos CSV de un mismo TP o Parcial."""
     
-    def __init__(self, source_dir: str, output_dir: str, header_map: Dict, type: str, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False):
+    def __init__(self, source_dir: str, output_dir: str, header_map: Dict, type: str, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False,
+                 incremental: bool = False, engine: str = 'python', attempt_store: str = '',
+                 parse_cache: Optional[ParseCache] = None, parse_workers: int = 1, shift_workers: int = 1,
+                 shift_pool: str = 'thread'):
         """
         Inicializa el consolidador de archivos.
         
@@ -68,6 +120,13 @@ class FileConsolidator:
             type: Tipo de archivo ("tps" o "parciales")
             encoding: Encoding de archivos CSV
             calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+            incremental: Si True, reutiliza los archivos generados cuyas fuentes no cambiaron
+            engine: Motor para calcular mejores notas ("python" o "numpy")
+            attempt_store: Ruta de la base SQLite de intentos ("" = leer los CSV directamente)
+            parse_cache: Caché de exports interpretados (None = interpretar siempre los CSV)
+            parse_workers: Procesos para leer por partes un export grande (1 = no dividir, 0 = automático)
+            shift_workers: Hilos o procesos para leer a la vez los turnos (1 = de a uno, 0 = automático)
+            shift_pool: Tipo de pool para leer los turnos ("thread" o "process")
         """
         self.source_dir = source_dir
         self.output_dir = output_dir
@@ -75,6 +134,34 @@ class FileConsolidator:
         self.type = type
         self.encoding = encoding
         self.calculate_avg_grades = calculate_avg_grades
+        self.incremental = incremental
+        # El motor no forma parte de config_key: ambos generan el mismo resultado
+        self.engine = engine
+        self.attempt_store = attempt_store
+        self._store = None
+        self.parse_cache = parse_cache
+        self.parse_workers = parse_workers
+        self.shift_workers = shift_workers
+        self.shift_pool = shift_pool
+        self.config_key = config_fingerprint({
+            "type": type,
+            "header_map": header_map,
+            "encoding": encoding,
+            "calculate_avg_grades": calculate_avg_grades,
+        })
+        self._manifests: Dict[str, BuildManifest] = {}
+    
+    def close(self):
+        """Cierra la base de intentos si se abrió (se vuelve a abrir en la próxima consulta)."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def consolidate_multiple_files(self, base_name: str, course: str) -> bool:
         """
@@ -88,15 +175,34 @@ class FileConsolidator:
         Args:
             base_name: Nombre base sin extensión (ej: "Parcial1_1K2", "TP1_1K4")
             course: Código del curso (ej: "1K2", "1K4")
-            
+        
         Returns:
             bool: True si se encontraron y consolidaron archivos, False si no
         """
+        return self.consolidate(base_name, course) is not None
+    
+    @timed("consolidate", course_arg="course")
+    def consolidate(self, base_name: str, course: str, record_manifest: bool = True) -> Optional[ConsolidatedEvaluation]:
+        """
+        Consolida todos los archivos de un TP o Parcial leyendo cada export una sola vez.
+        
+        En la misma pasada se obtienen el mejor intento y la cantidad de intentos
+        por alumno, y se escribe el archivo "_filtrado.csv" correspondiente.
+        
+        Args:
+            base_name: Nombre base sin extensión (ej: "Parcial1_1K2", "TP1_1K4")
+            course: Código del curso (ej: "1K2", "1K4")
+            record_manifest: Si False, el filtrado generado no se registra en el
+                manifiesto incremental (lo hace después quien llama, con record)
+        
+        Returns:
+            ConsolidatedEvaluation con los datos en memoria, o None si no hay archivos
+        """
         # Buscar archivos usando búsqueda case-insensitive
         found_files = find_files_case_insensitive(self.source_dir, base_name)
         
         if not found_files:
-            return False
+            return None
         
         # Extraer el curso del base_name y crear el directorio de salida (case-insensitive)
         parts = base_name.split("_")
@@ -110,67 +216,311 @@ class FileConsolidator:
         os.makedirs(output_course_dir, exist_ok=True)
         output_file = os.path.join(output_course_dir, base_name + "_filtrado.csv")
         
-        # Si solo hay un archivo, procesarlo normalmente
+        if len(found_files) > 1:
+            print(f"📦 Encontrados {len(found_files)} archivos para {base_name}")
+            for file in found_files:
+                print(f"   - {os.path.basename(file)}")
+        
+        # En modo incremental, reutilizar el filtrado si ninguna fuente cambió
+        if self.incremental:
+            manifest = self.manifest_for(output_course_dir)
+            if manifest.is_fresh(output_file, found_files, self.config_key):
+                result = self._load_filtered(base_name, found_files, output_file, manifest.get_payload(output_file))
+                if result is not None:
+                    result.sources = manifest.sources(output_file)
+                    print(f"♻️  Sin cambios: {base_name}_filtrado.csv (se reutiliza)")
+                    if is_measuring():
+                        add_counts(rows_read=len(result.best_attempts), bytes_read=os.path.getsize(output_file))
+                    return result
+        
+        # Estado de las fuentes antes de leerlas, para que el manifiesto no registre
+        # cambios posteriores a la lectura (los exports interpretados traen además el hash)
+        read_stats = [SourceFingerprint.from_stat(file, os.stat(file)) for file in found_files]
+        
+        # Consolidar todos los archivos con la mejor nota y los intentos por alumno;
+        # si se puede, el filtrado se escribe copiando los bytes de los mejores intentos
+        result = self._scan_files(base_name, found_files, output_file)
+        if not result.sources:
+            result.sources = read_stats
+        if result.output_file is None:
+            result.output_file = output_file
+            save_csv(output_file, result.fieldnames, list(result.best_attempts.values()), self.encoding)
+        if is_measuring():
+            add_counts(rows_read=sum(result.attempts.values()), rows_written=len(result.best_attempts),
+                       bytes_read=sum(source.size for source in result.sources))
+        if record_manifest:
+            self.record(result)
+        
         if len(found_files) == 1:
-            file = found_files[0]
-            self._filter_best_grade(file, output_file)
-            print(f"✅ Procesado: {os.path.basename(file)}")
+            print(f"✅ Procesado: {os.path.basename(found_files[0])}")
+        else:
+            print(f"✅ Consolidado en: {base_name}_filtrado.csv ({len(result.best_attempts)} alumnos)")
+        return result
+    
+    def record(self, result: ConsolidatedEvaluation):
+        """
+        Registra en el manifiesto incremental un "_filtrado.csv" recién generado.
+        
+        Sólo hace falta llamarlo si se consolidó con record_manifest=False (por
+        ejemplo en un proceso hijo, para que un único proceso escriba el manifiesto).
+        
+        Args:
+            result: Resultado de consolidate
+        """
+        if self.incremental and not result.reused:
+            manifest = self.manifest_for(os.path.dirname(result.output_file))
+            manifest.record(result.output_file, result.sources or result.source_files, self.config_key,
+                            payload={"attempts": result.attempts})
+    
+    def save_derived_csv(self, output_file: str, fieldnames: List[str], rows: Iterable[Dict],
+                         sources: List[Union[str, SourceFingerprint]], config_values: Dict) -> bool:
+        """
+        Guarda un CSV derivado de los exports (ej: el "_unificado.csv" de un curso).
+        
+        En modo incremental el archivo no se reescribe si sus fuentes y la
+        configuración que lo afecta no cambiaron desde que se generó.
+        
+        Args:
+            output_file: Ruta del archivo a generar
+            fieldnames: Columnas del archivo
+            rows: Filas a escribir (se consumen de a una)
+            sources: Archivos de entrada de los que deriva, en orden de lectura (ver
+                ConsolidatedEvaluation.sources)
+            config_values: Valores de configuración adicionales que afectan al archivo
+        
+        Returns:
+            True si el archivo se escribió, False si se reutilizó el existente
+        """
+        if not self.incremental:
+            save_csv(output_file, fieldnames, rows, self.encoding)
             return True
         
-        # Si hay múltiples archivos, consolidarlos
-        print(f"📦 Encontrados {len(found_files)} archivos para {base_name}")
-        for file in found_files:
-            print(f"   - {os.path.basename(file)}")
+        manifest = self.manifest_for(os.path.dirname(output_file))
+        config_key = config_fingerprint({"base": self.config_key, "derived": config_values})
+        paths = [source.path if isinstance(source, SourceFingerprint) else source for source in sources]
+        if manifest.is_fresh(output_file, paths, config_key):
+            return False
         
-        # Consolidar todos los archivos en un diccionario con la mejor nota por alumno
-        best_attempts = {}
-        fieldnames = None
-        
-        for file in found_files:
-            with open(file, newline='', encoding=self.encoding) as f:
-                reader = csv.DictReader(f)
-                if fieldnames is None:
-                    fieldnames = reader.fieldnames
-                
-                id_col = get_col_name(reader.fieldnames, self.header_map["id"])
-                grade_col = get_col_name(reader.fieldnames, self.header_map["nota"])
-                
-                # Detectar escala de calificación
-                scale_max = detect_grade_scale(grade_col)
-                
-                for row in reader:
-                    # Filtrar fila de "Promedio general" si está configurado
-                    if not self.calculate_avg_grades and is_average_row(row, self.header_map):
-                        continue
-                    
-                    student_id = row[id_col]
-                    grade = float(row[grade_col].replace(",", "."))
-                    
-                    # Normalizar calificación a escala 0-10
-                    normalized_grade = normalize_grade_to_scale_10(grade, scale_max)
-                    
-                    if student_id not in best_attempts:
-                        # Guardar con nota normalizada (redondeada a 2 decimales)
-                        normalized_row = row.copy()
-                        normalized_row[grade_col] = round(normalized_grade, 2)
-                        best_attempts[student_id] = normalized_row
-                    else:
-                        current_grade = best_attempts[student_id][grade_col]
-                        if isinstance(current_grade, str):
-                            current_grade = float(current_grade.replace(",", "."))
-                        
-                        if normalized_grade > current_grade:
-                            # Actualizar con nota normalizada (redondeada a 2 decimales)
-                            normalized_row = row.copy()
-                            normalized_row[grade_col] = round(normalized_grade, 2)
-                            best_attempts[student_id] = normalized_row
-        
-        # Guardar el archivo consolidado
-        save_csv(output_file, fieldnames, list(best_attempts.values()), self.encoding)
-        
-        print(f"✅ Consolidado en: {base_name}_filtrado.csv ({len(best_attempts)} alumnos)")
+        save_csv(output_file, fieldnames, rows, self.encoding)
+        manifest.record(output_file, sources, config_key)
         return True
     
+    def manifest_for(self, output_course_dir: str) -> BuildManifest:
+        """
+        Retorna el manifiesto incremental de un directorio de salida.
+        
+        Args:
+            output_course_dir: Directorio de salida de un curso y tipo (ej: outputs/1K2/tps)
+        
+        Returns:
+            BuildManifest de ese directorio
+        """
+        key = os.path.abspath(output_course_dir)
+        if key not in self._manifests:
+            self._manifests[key] = BuildManifest(output_course_dir)
+        return self._manifests[key]
+    
+    def _load_filtered(self, base_name: str, source_files: List[str], filtered_file: str, payload: Optional[Dict]) -> Optional[ConsolidatedEvaluation]:
+        """
+        Reconstruye el resultado de una consolidación a partir de un filtrado vigente.
+        
+        Args:
+            base_name: Nombre base de la evaluación
+            source_files: Archivos de entrada de la evaluación
+            filtered_file: Ruta del "_filtrado.csv" existente
+            payload: Datos guardados en el manifiesto (intentos por alumno)
+        
+        Returns:
+            ConsolidatedEvaluation, o None si el filtrado no se puede reutilizar
+        """
+        if not payload or "attempts" not in payload:
+            return None
+        
+        best_attempts = {}
+        with open(filtered_file, newline='', encoding=self.encoding) as f:
+            reader = csv.DictReader(f)
+            fieldnames = reader.fieldnames
+            id_col = get_col_name(fieldnames, self.header_map["id"])
+            grade_col = get_col_name(fieldnames, self.header_map["nota"])
+            for row in reader:
+                # El filtrado guarda la nota ya normalizada a escala 0-10
+                row[grade_col] = parse_grade(row[grade_col])
+                best_attempts[row[id_col]] = row
+        
+        return ConsolidatedEvaluation(
+            base_name=base_name,
+            source_files=list(source_files),
+            fieldnames=fieldnames,
+            best_attempts=best_attempts,
+            attempts=payload["attempts"],
+            output_file=filtered_file,
+            reused=True
+        )
+    
+    def _scan_files(self, base_name: str, files: List[str], output_file: Optional[str] = None) -> ConsolidatedEvaluation:
+        """
+        Lee los archivos indicados una sola vez cada uno, en orden, acumulando
+        mejores intentos e intentos por alumno.
+        
+        Con output_file, el motor de Python, sin base de intentos ni lectura en
+        paralelo y un encoding compatible con ASCII, los exports se leen
+        registrando la posición en bytes de cada intento y el filtrado se
+        escribe copiando las filas originales de los mejores intentos (ver
+        parse_cache.write_best_rows). En los demás casos el filtrado lo escribe
+        quien llama, con save_csv.
+        
+        Args:
+            base_name: Nombre base de la evaluación
+            files: Rutas de los archivos a leer
+            output_file: Ruta del "_filtrado.csv" a escribir si se pueden copiar las filas
+        
+        Returns:
+            ConsolidatedEvaluation; output_file queda en None si no se escribió el filtrado,
+            y sources vacía si los archivos no se leyeron con parse_export ni desde la caché
+        """
+        if self.attempt_store:
+            return self._query_store(base_name, files)
+        
+        accumulator = create_best_grade_accumulator(self.header_map, self.calculate_avg_grades, self.engine)
+        # Estado de cada export al interpretarlo, si se leyó con parse_export o desde la caché
+        sources: List[SourceFingerprint] = []
+        if output_file is not None and self.engine == 'python' and ascii_compatible(self.encoding) \
+                and (self.parse_cache is not None or (self.parse_workers == 1 and self.shift_workers == 1)):
+            exports = [self._parse(file) for file in files]
+            sources = [parsed.source for parsed in exports]
+            result = self._slice_files(base_name, files, exports, output_file)
+            if result is not None:
+                return result
+            # Columnas distintas o repetidas: se acumulan los exports ya leídos
+            for parsed in exports:
+                accumulator.add_parsed(parsed)
+        elif self.shift_workers != 1 and len(files) > 1 and self.parse_cache is None and ascii_compatible(self.encoding):
+            # Los turnos se resumen a la vez y se combinan en el orden de los archivos
+            summaries = summarize_files(files, self.header_map, self.encoding, self.calculate_avg_grades,
+                                        self.shift_workers, self.shift_pool)
+            for file, (fieldnames, grade_col, partial) in zip(files, summaries):
+                accumulator.add_partial(file, self.encoding, fieldnames, grade_col, partial)
+        else:
+            for file in files:
+                if self.parse_cache is not None:
+                    parsed = self.parse_cache.load(file)
+                    sources.append(parsed.source)
+                    accumulator.add_parsed(parsed)
+                elif self.parse_workers != 1:
+                    accumulator.add_file_parallel(file, self.encoding, self.parse_workers)
+                else:
+                    accumulator.add_file(file, self.encoding)
+        
+        if accumulator.issues:
+            print(format_grade_issues(accumulator.issues))
+        
+        return ConsolidatedEvaluation(
+            base_name=base_name,
+            source_files=list(files),
+            fieldnames=accumulator.fieldnames,
+            best_attempts=accumulator.best_rows(),
+            attempts=accumulator.attempts,
+            issues=accumulator.issues,
+            sources=sources
+        )
+    
+    def _parse(self, file: str) -> ParsedExport:
+        """Interpreta un export registrando la posición en bytes de cada intento (desde la caché si está activa)."""
+        if self.parse_cache is not None:
+            return self.parse_cache.load(file)
+        return parse_export(file, self.header_map, self.encoding, self.calculate_avg_grades)[0]
+    
+    def _slice_files(self, base_name: str, files: List[str], exports: List[ParsedExport],
+                     output_file: str) -> Optional[ConsolidatedEvaluation]:
+        """
+        Consolida exports ya interpretados escribiendo el filtrado con sus bytes originales.
+        
+        Args:
+            base_name: Nombre base de la evaluación
+            files: Rutas de los archivos, en orden de lectura
+            exports: ParsedExport de cada archivo
+            output_file: Ruta del "_filtrado.csv"
+        
+        Returns:
+            ConsolidatedEvaluation con el filtrado escrito, o None si los exports
+            no tienen todos las mismas columnas (sin repetir)
+        """
+        fieldnames = exports[0].fieldnames
+        # Con columnas repetidas o distintas entre turnos, csv.DictWriter no conserva las filas originales
+        if len(set(fieldnames)) != len(fieldnames) or any(parsed.fieldnames != fieldnames for parsed in exports):
+            return None
+        
+        issues = [issue for parsed in exports for issue in parsed.grade_issues()]
+        if issues:
+            print(format_grade_issues(issues))
+        
+        attempts: Dict[str, int] = {}
+        for parsed in exports:
+            for student_id in parsed.ids:
+                attempts[student_id] = attempts.get(student_id, 0) + 1
+        
+        # Sólo se interpretan las filas de los mejores intentos, para el resultado en memoria
+        best = best_attempts_of(exports)
+        indices: Dict[int, List[int]] = {}
+        for _, number, index in best.values():
+            indices.setdefault(number, []).append(index)
+        rows = {number: exports[number].read_rows(positions) for number, positions in indices.items()}
+        best_attempts = {}
+        for student_id, (grade, number, index) in best.items():
+            record = _row_to_dict(fieldnames, rows[number][index])
+            record[exports[number].grade_col] = grade
+            best_attempts[student_id] = record
+        
+        if all(len(rows[number][index]) == len(fieldnames) for _, number, index in best.values()):
+            write_best_rows(output_file, exports, best)
+        else:
+            # Filas con celdas de más o de menos: csv.DictWriter las completa o las rechaza
+            save_csv(output_file, fieldnames, list(best_attempts.values()), self.encoding)
+        
+        return ConsolidatedEvaluation(
+            base_name=base_name,
+            source_files=list(files),
+            fieldnames=fieldnames,
+            best_attempts=best_attempts,
+            attempts=attempts,
+            output_file=output_file,
+            issues=issues,
+            sources=[parsed.source for parsed in exports]
+        )
+    
+    def _query_store(self, base_name: str, files: List[str]) -> ConsolidatedEvaluation:
+        """
+        Obtiene mejores intentos e intentos por alumno desde la base de intentos.
+        
+        Antes de consultar se cargan los archivos que cambiaron desde la última vez.
+        
+        Args:
+            base_name: Nombre base de la evaluación
+            files: Rutas de los archivos de la evaluación, en orden de lectura
+        
+        Returns:
+            ConsolidatedEvaluation sin archivo de salida asignado
+        """
+        if self._store is None:
+            self._store = AttemptStore(self.attempt_store, self.header_map, self.encoding, self.calculate_avg_grades)
+        store = self._store
+        store.ingest(files)
+        
+        course, evaluation = evaluation_key(base_name)
+        issues = store.grade_issues(course, evaluation, files)
+        if issues:
+            print(format_grade_issues(issues))
+        
+        return ConsolidatedEvaluation(
+            base_name=base_name,
+            source_files=list(files),
+            fieldnames=store.fieldnames(files[0]),
+            best_attempts=store.best_attempts(course, evaluation, files),
+            attempts=store.attempt_counts(course, evaluation, files),
+            issues=issues
+        )
+    
+    @timed("_filter_best_grade")
     def _filter_best_grade(self, input_file: str, output_file: str):
         """
         Filtra un archivo CSV manteniendo solo la mejor calificación por alumno.
@@ -178,24 +528,33 @@ class FileConsolidator:
         Args:
             input_file: Ruta al archivo CSV de entrada
             output_file: Ruta al archivo CSV de salida
-            
+        
         Raises:
             ValueError: Si el archivo está vacío o no tiene headers válidos
         """
-        # Verificar que el archivo no esté vacío y tenga headers
-        with open(input_file, newline='', encoding=self.encoding) as f:
-            reader = csv.DictReader(f)
-            fieldnames = reader.fieldnames
-            
-            # Validar fieldnames
-            if fieldnames is None:
-                raise ValueError(f"El archivo '{input_file}' está vacío o no tiene headers")
+        if ascii_compatible(self.encoding):
+            # Sólo se registra (nota, posición en bytes) del mejor intento de cada
+            # alumno y se copian sus filas originales cambiando la celda de nota
+            if self.parse_cache is not None:
+                parsed = self.parse_cache.load(input_file)
+            else:
+                parsed = parse_export(input_file, self.header_map, self.encoding, self.calculate_avg_grades)[0]
             
-            if not fieldnames:
-                raise ValueError(f"El archivo '{input_file}' no tiene columnas")
+            # Con columnas repetidas csv.DictWriter no conserva la fila original
+            if len(set(parsed.fieldnames)) == len(parsed.fieldnames):
+                issues = parsed.grade_issues()
+                if issues:
+                    print(format_grade_issues(issues))
+                best = parsed.best_attempts()
+                parsed.write_best_rows(output_file, best)
+                if is_measuring():
+                    add_counts(rows_read=len(parsed.ids), bytes_read=os.path.getsize(input_file), rows_written=len(best))
+                return
         
-        # Procesar archivo
-        best_attempts = read_csv_with_best_grades(input_file, self.header_map, self.encoding, self.calculate_avg_grades)
+        result = self._scan_files(os.path.splitext(os.path.basename(input_file))[0], [input_file])
         
         # Guardar resultado (incluso si está vacío)
-        save_csv(output_file, fieldnames, list(best_attempts.values()), self.encoding)
+        save_csv(output_file, result.fieldnames, list(result.best_attempts.values()), self.encoding)
+        if is_measuring():
+            add_counts(rows_read=sum(result.attempts.values()), bytes_read=os.path.getsize(input_file),
+                       rows_written=len(result.best_attempts))
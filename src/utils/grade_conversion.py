@@ -0,0 +1,150 @@
+"""
+Módulo con la tabla de conversión de notas decimales a notas enteras.
+"""
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple, Union
+
+
+# Tabla por defecto (escala 0-100): límite superior de cada banda -> nota entera
+DEFAULT_CONVERSION = (
+    (54.44, 2),
+    (57.44, 4),
+    (59.44, 5),
+    (68.44, 6),
+    (77.44, 7),
+    (86.44, 8),
+    (95.44, 9),
+    (100.00, 10),
+)
+
+# Valor que se asigna a las notas vacías, inválidas o fuera de rango
+MISSING_GRADE = "FALTA"
+
+# Prefijo de las claves de la sección [Conversion] (ej: conversion_54_44 = 2)
+CONVERSION_KEY_PREFIX = "conversion_"
+
+
+class GradeConversionTable:
+    """
+    Tabla de conversión compilada de nota decimal (escala 0-100) a nota entera.
+    
+    Cada banda va desde el límite superior de la banda anterior más 0,01 hasta
+    su propio límite superior (la primera empieza en 0). Los límites se guardan
+    ordenados, de modo que cada conversión es una búsqueda binaria con bisect
+    en lugar de recorrer una cadena de comparaciones.
+    """
+    
+    def __init__(self, bands: Iterable[Tuple[float, int]] = DEFAULT_CONVERSION):
+        """
+        Compila la tabla de conversión.
+        
+        Args:
+            bands: Pares (límite superior en escala 0-100, nota entera)
+        
+        Raises:
+            ValueError: Si la tabla está vacía o tiene límites repetidos
+        """
+        bands = sorted((float(upper), int(value)) for upper, value in bands)
+        if not bands:
+            raise ValueError("La tabla de conversión de notas está vacía")
+        
+        uppers = [upper for upper, _ in bands]
+        if len(set(uppers)) != len(uppers):
+            raise ValueError("La tabla de conversión de notas tiene límites repetidos")
+        
+        self.bands: Tuple[Tuple[float, int], ...] = tuple(bands)
+        self._uppers = uppers
+        self._lowers = [0.0] + [round(upper + 0.01, 2) for upper in uppers[:-1]]
+        self._values = [value for _, value in bands]
+    
+    @classmethod
+    def from_config_items(cls, items: Dict[str, str]) -> 'GradeConversionTable':
+        """
+        Compila la tabla a partir de las claves de la sección [Conversion].
+        
+        Args:
+            items: Claves y valores de la sección (ej: {"conversion_54_44": "2"})
+        
+        Returns:
+            Tabla de conversión compilada
+        
+        Raises:
+            ValueError: Si alguna clave o valor no tiene el formato esperado
+        """
+        bands = []
+        for key, value in items.items():
+            if not key.startswith(CONVERSION_KEY_PREFIX):
+                raise ValueError(f"Clave inválida en [Conversion]: '{key}' (se esperaba conversion_<entero>_<decimales>)")
+            bound = key[len(CONVERSION_KEY_PREFIX):]
+            try:
+                integer_part, _, decimal_part = bound.partition("_")
+                upper = float(f"{integer_part}.{decimal_part or '0'}")
+                grade = int(value)
+            except ValueError:
+                raise ValueError(f"Valor inválido en [Conversion]: {key} = {value}")
+            bands.append((upper, grade))
+        return cls(bands)
+    
+    def convert(self, grade: float, scale_max: float = 10.0) -> Union[int, str]:
+        """
+        Convierte una nota decimal a nota entera.
+        
+        Args:
+            grade: Nota decimal (None se considera ausente)
+            scale_max: Escala de la nota (10.0 para escala 0-10, 100.0 para escala 0-100)
+        
+        Returns:
+            Nota entera según la tabla, o "FALTA" si la nota es None o está fuera de rango
+        """
+        if grade is None:
+            return MISSING_GRADE
+        grade_100 = grade if scale_max == 100.0 else grade * 10
+        
+        index = bisect_left(self._uppers, grade_100)
+        # NaN no cumple ninguna comparación, igual que las notas de los huecos entre bandas
+        if index == len(self._uppers) or not grade_100 >= self._lowers[index]:
+            return MISSING_GRADE
+        return self._values[index]
+    
+    def convert_many(self, grades: Iterable[float], scale_max: float = 10.0) -> List[Union[int, str]]:
+        """
+        Convierte varias notas decimales a notas enteras.
+        
+        Args:
+            grades: Notas decimales (None se considera ausente)
+            scale_max: Escala de las notas (10.0 o 100.0)
+        
+        Returns:
+            Notas enteras en el mismo orden, con "FALTA" para las ausentes o fuera de rango
+        """
+        uppers = self._uppers
+        lowers = self._lowers
+        values = self._values
+        last = len(uppers)
+        factor = 1.0 if scale_max == 100.0 else 10.0
+        
+        result = []
+        append = result.append
+        for grade in grades:
+            if grade is None:
+                append(MISSING_GRADE)
+                continue
+            grade_100 = grade * factor
+            index = bisect_left(uppers, grade_100)
+            if index == last or not grade_100 >= lowers[index]:
+                append(MISSING_GRADE)
+            else:
+                append(values[index])
+        return result
+    
+    def __eq__(self, other):
+        return isinstance(other, GradeConversionTable) and self.bands == other.bands
+    
+    def __hash__(self):
+        return hash(self.bands)
+    
+    def __repr__(self):
+        return f"GradeConversionTable({list(self.bands)!r})"
+
+
+DEFAULT_CONVERSION_TABLE = GradeConversionTable()
@@ -0,0 +1,89 @@
+"""
+Módulo para interpretar las calificaciones de los exports de Moodle.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+# Celdas que Moodle usa para intentos sin calificar (en curso o sin corregir)
+UNGRADED_VALUES = frozenset({"", "-"})
+
+# Moodle exporta las notas con 2 decimales, por lo que hay pocos valores
+# distintos; el límite sólo evita que un archivo anómalo haga crecer la caché
+MAX_CACHED_GRADES = 65536
+
+_MISSING = object()
+_grade_cache: Dict[str, Optional[float]] = {}
+
+
+@dataclass(frozen=True)
+class GradeIssue:
+    """
+    Calificación que no se pudo interpretar y se ignoró.
+    
+    Attributes:
+        file_path: Archivo donde está la celda
+        line: Número de línea del archivo (None si no se pudo determinar)
+        student_id: ID del alumno de la fila
+        value: Contenido de la celda
+    """
+    file_path: str
+    line: Optional[int]
+    student_id: str
+    value: str
+    
+    def __str__(self):
+        location = f"{self.file_path}:{self.line}" if self.line is not None else self.file_path
+        return f"{location} (ID {self.student_id}): '{self.value}'"
+
+
+def parse_grade(text: str) -> Optional[float]:
+    """
+    Convierte una celda de calificación de Moodle a float.
+    
+    Acepta coma o punto decimal y espacios alrededor. Los resultados se
+    memorizan, así que cada valor distinto se interpreta una sola vez.
+    
+    Args:
+        text: Contenido de la celda (ej: "8,50", " 7.25 ", "-")
+    
+    Returns:
+        La nota como float, o None si el intento no está calificado ("-" o vacío)
+    
+    Raises:
+        ValueError: Si la celda no es una nota válida
+    """
+    value = _grade_cache.get(text, _MISSING)
+    if value is not _MISSING:
+        return value
+    
+    stripped = text.strip()
+    if stripped in UNGRADED_VALUES:
+        value = None
+    else:
+        value = float(stripped.replace(",", "."))
+        if not math.isfinite(value):
+            raise ValueError(f"Calificación inválida: '{text}'")
+    
+    if len(_grade_cache) < MAX_CACHED_GRADES:
+        _grade_cache[text] = value
+    return value
+
+
+def format_grade_issues(issues, limit: int = 10) -> str:
+    """
+    Arma el aviso de calificaciones ignoradas.
+    
+    Args:
+        issues: Lista de GradeIssue
+        limit: Cantidad máxima de celdas a detallar
+    
+    Returns:
+        Texto de varias líneas con el resumen y el detalle de las celdas
+    """
+    lines = [f"⚠️  {len(issues)} calificación(es) no numérica(s) ignorada(s):"]
+    lines.extend(f"   - {issue}" for issue in issues[:limit])
+    if len(issues) > limit:
+        lines.append(f"   ... y {len(issues) - limit} más")
+    return "\n".join(lines)
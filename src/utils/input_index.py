@@ -0,0 +1,275 @@
+"""
+Módulo con un índice en memoria de los exports de Moodle del directorio de entrada.
+"""
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Tuple
+
+
+# <prefijo><número>_<curso>[_<turno>], ej: "tp1_1k2", "parcial2_1k15_3"
+FILE_NAME_PATTERN = re.compile(r'^([^_]*?)(\d+)_([^_]+)(?:_(\d+))?$')
+
+# Margen para sistemas de archivos con mtime de baja resolución: si el directorio
+# se modificó muy cerca del escaneo, un cambio posterior podría no alterar su mtime
+RACY_WINDOW_NS = 2_000_000_000
+
+
+def parse_evaluation_name(name: str) -> Optional[Tuple[str, str, str, Optional[str]]]:
+    """
+    Separa un nombre de archivo (con o sin .csv) en sus partes.
+    
+    Args:
+        name: Nombre del archivo o nombre base (ej: "TP1_1K2_1.csv", "Parcial2_1K15")
+    
+    Returns:
+        Tupla (prefijo, número, curso, turno) en minúsculas, con turno None si no
+        tiene sufijo numérico; o None si el nombre no respeta el formato
+    """
+    stem = name[:-4] if name.lower().endswith('.csv') else name
+    match = FILE_NAME_PATTERN.match(stem.lower())
+    if not match:
+        return None
+    prefix, number, course, shift = match.groups()
+    return prefix, number, course, shift
+
+
+@dataclass(frozen=True)
+class IndexedFile:
+    """
+    Archivo CSV registrado en el índice de entrada.
+    
+    Attributes:
+        path: Ruta absoluta al archivo
+        name: Nombre original del archivo (respetando mayúsculas)
+        key: Clave (prefijo, número, curso, turno) en minúsculas, o None si el
+            nombre no respeta el formato <prefijo><número>_<curso>[_<turno>]
+        size: Tamaño en bytes al momento de la consulta
+        mtime_ns: Fecha de modificación (ns) al momento de la consulta
+    """
+    path: str
+    name: str
+    key: Optional[Tuple[str, str, str, Optional[str]]]
+    size: int
+    mtime_ns: int
+    
+    @property
+    def shift_order(self) -> Tuple[int, int]:
+        """Orden de lectura: primero el archivo sin turno, luego los turnos por número."""
+        shift = self.key[3] if self.key else None
+        return (0, 0) if shift is None else (1, int(shift))
+
+
+class InputIndex:
+    """
+    Índice de los archivos CSV de un directorio de entrada.
+    
+    Se construye con un único os.scandir y agrupa los archivos por
+    (prefijo, número de evaluación, curso), de modo que buscar todos los turnos
+    de una evaluación es una consulta O(1) en lugar de listar el directorio.
+    El índice sólo se vuelve a escanear cuando cambia el mtime del directorio.
+    Reescribir un archivo existente no cambia ese mtime, así que el tamaño y la
+    fecha de los archivos se vuelven a leer con os.stat en cada consulta.
+    """
+    
+    _instances: Dict[str, 'InputIndex'] = {}
+    _instances_lock = threading.Lock()
+    
+    def __init__(self, directory: str):
+        """
+        Inicializa el índice (el escaneo se realiza en la primera consulta).
+        
+        Args:
+            directory: Directorio de entrada a indexar
+        """
+        self.directory = os.path.abspath(directory)
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[str, str, str], List[IndexedFile]] = {}
+        self._files: List[IndexedFile] = []
+        self._dir_mtime_ns = None
+        self._scan_started_ns = 0
+        self.scan_count = 0
+    
+    @classmethod
+    def for_directory(cls, directory: str) -> 'InputIndex':
+        """
+        Retorna el índice compartido de un directorio, creándolo si no existe.
+        
+        Args:
+            directory: Directorio de entrada
+        
+        Returns:
+            Instancia de InputIndex para ese directorio
+        """
+        key = os.path.abspath(directory)
+        with cls._instances_lock:
+            index = cls._instances.get(key)
+            if index is None:
+                index = cls(key)
+                cls._instances[key] = index
+            return index
+    
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Vuelve a escanear el directorio si cambió desde el último escaneo.
+        
+        Args:
+            force: Si True, escanea aunque el directorio no haya cambiado
+        
+        Returns:
+            True si se realizó un nuevo escaneo
+        """
+        with self._lock:
+            try:
+                dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+            except FileNotFoundError:
+                dir_mtime_ns = None
+            
+            if not force and not self._is_stale(dir_mtime_ns):
+                return False
+            
+            self._scan(dir_mtime_ns)
+            return True
+    
+    def find(self, prefix: str, number, course: str) -> List[IndexedFile]:
+        """
+        Retorna todos los archivos (todos los turnos) de una evaluación de un curso.
+        
+        Args:
+            prefix: Prefijo de la evaluación (ej: "TP", "Parcial")
+            number: Número de la evaluación (ej: 1)
+            course: Código del curso (ej: "1K2")
+        
+        Returns:
+            Archivos encontrados: primero el que no tiene turno, luego los turnos en orden
+        """
+        self.refresh()
+        return self._restat(self._groups.get((prefix.lower(), str(number), course.lower()), ()))
+    
+    def find_base(self, base_name: str) -> List[IndexedFile]:
+        """
+        Busca los archivos que corresponden a un nombre base sin distinguir mayúsculas.
+        
+        Por ejemplo, "TP1_1K15" encuentra TP1_1K15.csv, tp1_1k15.csv y
+        Tp1_1K15_1.csv; "TP1_1K15_2" encuentra sólo el turno 2.
+        
+        Args:
+            base_name: Nombre base sin extensión (ej: "TP1_1K15")
+        
+        Returns:
+            Archivos que coinciden con el nombre base
+        """
+        key = parse_evaluation_name(base_name)
+        if key is None:
+            return self._find_unparsed(base_name)
+        
+        prefix, number, course, shift = key
+        files = self.find(prefix, number, course)
+        if shift is not None:
+            files = [f for f in files if f.key[3] == shift]
+        return files
+    
+    def courses(self, prefixes: List[str] = None) -> List[str]:
+        """
+        Retorna los cursos presentes en el directorio.
+        
+        Args:
+            prefixes: Si se indica, sólo considera archivos con estos prefijos
+        
+        Returns:
+            Cursos en mayúsculas, sin repetidos
+        """
+        self.refresh()
+        allowed = {p.lower() for p in prefixes} if prefixes is not None else None
+        return list({
+            course.upper()
+            for prefix, _, course in self._groups
+            if allowed is None or prefix in allowed
+        })
+    
+    def files(self) -> List[IndexedFile]:
+        """Retorna todos los archivos CSV indexados."""
+        self.refresh()
+        return self._restat(self._files)
+    
+    def _restat(self, files) -> List[IndexedFile]:
+        """
+        Actualiza el tamaño y la fecha de los archivos encontrados.
+        
+        Args:
+            files: Archivos del índice
+        
+        Returns:
+            Archivos con su tamaño y mtime actuales, sin los que ya no existen
+        """
+        current = []
+        for indexed in files:
+            try:
+                stat = os.stat(indexed.path)
+            except FileNotFoundError:
+                continue
+            if stat.st_size != indexed.size or stat.st_mtime_ns != indexed.mtime_ns:
+                indexed = replace(indexed, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+            current.append(indexed)
+        return current
+    
+    def _is_stale(self, dir_mtime_ns: Optional[int]) -> bool:
+        """Indica si el índice debe volver a escanearse."""
+        if self.scan_count == 0 or dir_mtime_ns != self._dir_mtime_ns:
+            return True
+        # El directorio cambió justo antes del escaneo: su mtime no es confiable
+        return dir_mtime_ns is not None and self._scan_started_ns - dir_mtime_ns < RACY_WINDOW_NS
+    
+    def _scan(self, dir_mtime_ns: Optional[int]):
+        """Escanea el directorio con os.scandir y reconstruye los grupos."""
+        self._scan_started_ns = time.time_ns()
+        groups = {}
+        files = []
+        
+        if dir_mtime_ns is not None:
+            with os.scandir(self.directory) as entries:
+                for entry in entries:
+                    if not entry.name.lower().endswith('.csv') or not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                    key = parse_evaluation_name(entry.name)
+                    indexed = IndexedFile(
+                        path=entry.path,
+                        name=entry.name,
+                        key=key,
+                        size=stat.st_size,
+                        mtime_ns=stat.st_mtime_ns
+                    )
+                    files.append(indexed)
+                    if key is not None:
+                        groups.setdefault(key[:3], []).append(indexed)
+        
+        for group in groups.values():
+            group.sort(key=lambda f: (f.shift_order, f.name))
+        
+        self._groups = groups
+        self._files = files
+        self._dir_mtime_ns = dir_mtime_ns
+        self.scan_count += 1
+    
+    def _find_unparsed(self, base_name: str) -> List[IndexedFile]:
+        """
+        Búsqueda lineal para nombres base que no respetan el formato estándar.
+        
+        Args:
+            base_name: Nombre base sin extensión
+        
+        Returns:
+            Archivos cuyo nombre es el base o el base con sufijo numérico (_1, _2, ...)
+        """
+        base_lower = base_name.lower()
+        matched = []
+        for indexed in self.files():
+            stem = indexed.name[:-4].lower()
+            if stem == base_lower:
+                matched.append(indexed)
+            elif stem.startswith(base_lower + "_") and stem[len(base_lower) + 1:].isdigit():
+                matched.append(indexed)
+        return matched
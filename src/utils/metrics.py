@@ -0,0 +1,281 @@
+"""
+Módulo con la medición de tiempos y volumen de datos por etapa del procesamiento.
+
+Las funciones principales (búsqueda de archivos, consolidación, unificación y
+planilla final) están decoradas con timed(). Mientras la medición está
+desactivada (lo normal) el decorador sólo consulta una bandera; con
+`acocalculator --metrics out.json ...` se registran por etapa y por curso el
+tiempo real, el tiempo de CPU, las filas y bytes leídos y las filas escritas.
+
+Los tiempos de cada etapa incluyen los de las etapas que llama (por ejemplo,
+merge_tps incluye sus consolidate); las filas y bytes se cuentan sólo en la
+etapa que los lee o escribe.
+"""
+import functools
+import inspect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+@dataclass
+class StageStats:
+    """
+    Totales de una etapa en un curso.
+    
+    Attributes:
+        stage: Nombre de la etapa (ej: "merge_tps")
+        course: Código del curso ("" si la etapa no corresponde a un curso)
+        calls: Cantidad de ejecuciones
+        wall_seconds: Tiempo real acumulado
+        cpu_seconds: Tiempo de CPU acumulado del proceso
+        rows_read: Filas leídas
+        bytes_read: Bytes leídos
+        rows_written: Filas escritas
+    """
+    stage: str
+    course: str = ""
+    calls: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rows_read: int = 0
+    bytes_read: int = 0
+    rows_written: int = 0
+    
+    @property
+    def rows_per_sec(self) -> float:
+        """Filas leídas (o escritas, si la etapa no lee) por segundo."""
+        rows = self.rows_read or self.rows_written
+        return rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+    
+    def add(self, other: 'StageStats'):
+        """Suma los totales de otra medición de la misma etapa."""
+        self.calls += other.calls
+        self.wall_seconds += other.wall_seconds
+        self.cpu_seconds += other.cpu_seconds
+        self.rows_read += other.rows_read
+        self.bytes_read += other.bytes_read
+        self.rows_written += other.rows_written
+
+
+# Etapa en curso del contexto actual (para add_counts y para heredar el curso)
+_current: ContextVar[Optional[StageStats]] = ContextVar("acocalculator_stage", default=None)
+
+
+class MetricsRecorder:
+    """Acumula StageStats por (etapa, curso)."""
+    
+    def __init__(self):
+        self.enabled = False
+        self.started: Optional[float] = None
+        self._stats: Dict[Tuple[str, str], StageStats] = {}
+        self._lock = threading.Lock()
+    
+    def enable(self):
+        """Activa la medición y descarta lo registrado antes."""
+        self.reset()
+        self.enabled = True
+        self.started = time.perf_counter()
+    
+    def disable(self):
+        """Desactiva la medición (lo registrado se conserva)."""
+        self.enabled = False
+    
+    def reset(self):
+        """Descarta lo registrado."""
+        with self._lock:
+            self._stats = {}
+    
+    @contextmanager
+    def stage(self, name: str, course: Optional[str] = None) -> Iterator[Optional[StageStats]]:
+        """
+        Mide un bloque de código como una ejecución de una etapa.
+        
+        Args:
+            name: Nombre de la etapa
+            course: Código del curso (por defecto, el de la etapa que la contiene)
+        
+        Yields:
+            StageStats de esta ejecución (None si la medición está desactivada)
+        """
+        if not self.enabled:
+            yield None
+            return
+        
+        parent = _current.get()
+        if course is None:
+            course = parent.course if parent is not None else ""
+        stats = StageStats(stage=name, course=course.upper(), calls=1)
+        token = _current.set(stats)
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield stats
+        finally:
+            stats.wall_seconds = time.perf_counter() - wall
+            stats.cpu_seconds = time.process_time() - cpu
+            _current.reset(token)
+            self.merge([stats])
+    
+    def merge(self, stats: List[StageStats]):
+        """
+        Suma mediciones a los totales (por ejemplo, las de un proceso hijo).
+        
+        Args:
+            stats: Mediciones a sumar
+        """
+        with self._lock:
+            for item in stats:
+                key = (item.stage, item.course)
+                if key not in self._stats:
+                    self._stats[key] = StageStats(item.stage, item.course)
+                self._stats[key].add(item)
+    
+    def snapshot(self) -> List[StageStats]:
+        """Retorna una copia de los totales, en orden de primera ejecución."""
+        with self._lock:
+            return [StageStats(**asdict(item)) for item in self._stats.values()]
+    
+    def totals_by_stage(self) -> List[StageStats]:
+        """Retorna los totales de cada etapa sumando todos los cursos."""
+        totals: Dict[str, StageStats] = {}
+        for item in self.snapshot():
+            if item.stage not in totals:
+                totals[item.stage] = StageStats(item.stage)
+            totals[item.stage].add(item)
+        return list(totals.values())
+    
+    def summary_table(self) -> str:
+        """
+        Arma la tabla de resumen que se muestra al final de una ejecución.
+        
+        Returns:
+            Tabla en texto con una fila por etapa y curso
+        """
+        header = f"{'Etapa':<28} {'Curso':<8} {'Llam.':>6} {'Tiempo s':>9} {'CPU s':>8} " \
+                 f"{'Filas leídas':>13} {'MB leídos':>10} {'Filas escr.':>12} {'Filas/s':>11}"
+        lines = [header, "-" * len(header)]
+        for item in self.snapshot():
+            lines.append(
+                f"{item.stage[:28]:<28} {item.course or '-':<8} {item.calls:>6} {item.wall_seconds:>9.3f} "
+                f"{item.cpu_seconds:>8.3f} {item.rows_read:>13,} {item.bytes_read / (1024 * 1024):>10.1f} "
+                f"{item.rows_written:>12,} {item.rows_per_sec:>11,.0f}"
+            )
+        return "\n".join(lines)
+    
+    def to_dict(self) -> Dict:
+        """Retorna las mediciones como diccionario serializable a JSON."""
+        def serialize(item: StageStats) -> Dict:
+            values = asdict(item)
+            values["rows_per_sec"] = round(item.rows_per_sec, 1)
+            return values
+        
+        return {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "wall_seconds": time.perf_counter() - self.started if self.started is not None else 0.0,
+            "stages": [serialize(item) for item in self.snapshot()],
+            "totals": [serialize(item) for item in self.totals_by_stage()],
+        }
+    
+    def write_json(self, file_path: str):
+        """
+        Guarda las mediciones en un archivo JSON.
+        
+        Args:
+            file_path: Ruta del archivo
+        """
+        with open(file_path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2, ensure_ascii=False)
+
+
+# Medición del proceso actual
+METRICS = MetricsRecorder()
+
+
+def timed(name: str, course_arg: Optional[str] = None) -> Callable:
+    """
+    Decorador que mide cada llamada a una función como una etapa.
+    
+    Args:
+        name: Nombre de la etapa
+        course_arg: Argumento de la función con el código del curso (por
+            defecto, se hereda de la etapa que la llama)
+    
+    Returns:
+        Decorador
+    """
+    def decorator(function: Callable) -> Callable:
+        signature = inspect.signature(function) if course_arg else None
+        
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            course = None
+            if signature is not None:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                course = bound.arguments.get(course_arg)
+            with METRICS.stage(name, course):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def add_counts(rows_read: int = 0, bytes_read: int = 0, rows_written: int = 0):
+    """
+    Suma filas y bytes a la etapa en curso (no hace nada si no se está midiendo).
+    
+    Args:
+        rows_read: Filas leídas
+        bytes_read: Bytes leídos
+        rows_written: Filas escritas
+    """
+    stats = _current.get()
+    if stats is not None:
+        stats.rows_read += rows_read
+        stats.bytes_read += bytes_read
+        stats.rows_written += rows_written
+
+
+def is_measuring() -> bool:
+    """True si hay una etapa en curso en este contexto (para evitar cálculos de add_counts)."""
+    return _current.get() is not None
+
+
+@contextmanager
+def collect_metrics(enabled: bool) -> Iterator[List[StageStats]]:
+    """
+    Mide un bloque por separado y entrega sus mediciones al terminar.
+    
+    Se usa en las funciones que pueden ejecutarse en procesos hijos: el hijo
+    no comparte METRICS con el proceso principal, así que devuelve la lista
+    junto con su resultado y el principal la suma con METRICS.merge. En el
+    mismo proceso los totales previos se conservan y se restauran al salir.
+    
+    Args:
+        enabled: Si False no se mide nada y la lista queda vacía
+    
+    Yields:
+        Lista que se completa con las mediciones del bloque al salir
+    """
+    collected: List[StageStats] = []
+    if not enabled:
+        yield collected
+        return
+    
+    with METRICS._lock:
+        previous = (METRICS.enabled, METRICS._stats)
+        METRICS._stats = {}
+    METRICS.enabled = True
+    try:
+        yield collected
+    finally:
+        collected.extend(METRICS.snapshot())
+        with METRICS._lock:
+            METRICS.enabled, METRICS._stats = previous
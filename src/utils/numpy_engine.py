@@ -0,0 +1,484 @@
+"""
+Motor opcional basado en NumPy para calcular mejores notas e intentos por alumno.
+
+Se usa con `engine = numpy` en la sección [Procesamiento] de config.ini.
+Si NumPy no está instalado, el sistema sigue funcionando con el motor de Python.
+"""
+import csv
+from itertools import islice
+from operator import itemgetter, methodcaller
+from typing import Dict, List
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depende del entorno
+    np = None
+
+from .grade_parser import GradeIssue, parse_grade
+from .csv_helpers import (
+    BestGradeAccumulator,
+    _last_index,
+    _row_to_dict,
+    detect_grade_scale,
+    get_col_name,
+    get_col_name_safe,
+)
+
+
+_DECIMAL_COMMA_TO_POINT = methodcaller('replace', ',', '.')
+
+
+def numpy_available() -> bool:
+    """Retorna True si NumPy está instalado."""
+    return np is not None
+
+
+class NumpyBestGradeAccumulator(BestGradeAccumulator):
+    """
+    Variante columnar de BestGradeAccumulator.
+    
+    Las filas se leen en bloques; de cada bloque se extraen las columnas de ID
+    y calificación a arrays de NumPy y el cálculo se hace con operaciones
+    vectorizadas: los IDs se factorizan a códigos enteros, los intentos se
+    cuentan por código y el mejor intento de cada alumno sale de un único
+    ordenamiento por (alumno, nota, posición). Sólo se conservan las filas de
+    los mejores intentos, por lo que la memoria no depende del tamaño de los exports.
+    
+    El resultado es idéntico al del motor de Python, incluido el orden de los
+    alumnos y el desempate (gana el primer intento leído).
+    """
+    
+    CHUNK_SIZE = 4096
+    
+    def __init__(self, header_map: Dict, calculate_avg_grades: bool = False):
+        """
+        Inicializa el acumulador.
+        
+        Args:
+            header_map: Mapeo de nombres de columnas
+            calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        
+        Raises:
+            ImportError: Si NumPy no está instalado
+        """
+        if np is None:
+            raise ImportError("El motor 'numpy' requiere la librería NumPy (pip install numpy)")
+        self.header_map = header_map
+        self.calculate_avg_grades = calculate_avg_grades
+        self.fieldnames = None
+        self.issues: List[GradeIssue] = []
+        # ID -> código de alumno, en orden de primera aparición (incluye intentos sin calificar)
+        self._codes: Dict[str, int] = {}
+        # Por código: nota guardada (redondeada), intentos y [fila, columnas, columna de nota].
+        # Los arrays se agrandan al doble cuando hace falta, así que pueden tener más
+        # posiciones que alumnos
+        self._stored = np.full(1024, np.nan)
+        self._counts = np.zeros(1024, dtype=np.int64)
+        # Por código: número de orden del primer intento calificado (-1 si no tiene).
+        # Los resultados se retornan en este orden, como en el motor de Python
+        self._first_graded = np.full(1024, -1, dtype=np.int64)
+        self._graded_seen = 0
+        self._winners: List[list] = []
+        # Código -> [fila, columnas, columna de nota] del primer intento sin calificar
+        # de los alumnos que todavía no tenían un intento calificado
+        self._ungraded: Dict[int, list] = {}
+    
+    @property
+    def attempts(self) -> Dict[str, int]:
+        """ID de alumno -> cantidad de intentos en todos los archivos leídos."""
+        return dict(zip(self._codes, self._counts[:len(self._codes)].tolist()))
+    
+    def add_file(self, file_path: str, encoding: str = 'utf-8-sig') -> List[str]:
+        """
+        Recorre un archivo CSV acumulando mejores intentos e intentos por alumno.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+            encoding: Encoding del archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        
+        Raises:
+            ValueError: Si el archivo está vacío o no tiene headers
+            KeyError: Si no se encuentran las columnas de ID o calificación
+        """
+        with open(file_path, newline='', encoding=encoding) as f:
+            reader = csv.reader(f)
+            fieldnames = self._read_header(reader, file_path)
+            
+            id_col = get_col_name(fieldnames, self.header_map["id"])
+            grade_col = get_col_name(fieldnames, self.header_map["nota"])
+            id_idx = _last_index(fieldnames, id_col)
+            grade_idx = _last_index(fieldnames, grade_col)
+            
+            surname_idx = None
+            if not self.calculate_avg_grades:
+                surname_col = get_col_name_safe(fieldnames, self.header_map["apellido"])
+                if surname_col:
+                    surname_idx = _last_index(fieldnames, surname_col)
+            
+            from_scale_100 = detect_grade_scale(grade_col) == 100.0
+            
+            while True:
+                # La línea de cada fila (la última, si tiene celdas con saltos
+                # de línea) se guarda para ubicar las calificaciones inválidas
+                raw_rows = []
+                line_numbers = []
+                append_row = raw_rows.append
+                append_line = line_numbers.append
+                for row in islice(reader, self.CHUNK_SIZE):
+                    append_row(row)
+                    append_line(reader.line_num)
+                if not raw_rows:
+                    break
+                # Igual que csv.DictReader, se ignoran las líneas vacías
+                rows = [row for row in raw_rows if row]
+                if surname_idx is not None:
+                    rows = self._without_average_rows(rows, surname_idx)
+                if rows:
+                    chunk = (file_path, raw_rows, line_numbers)
+                    self._add_rows(rows, id_idx, grade_idx, from_scale_100, fieldnames, grade_col, chunk)
+        
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def add_parsed(self, parsed) -> List[str]:
+        """
+        Acumula un export ya interpretado (ver ParseCache) sin leer el CSV.
+        
+        Las columnas de la caché se usan directamente como arrays y sólo se
+        leen del archivo las filas de los nuevos mejores intentos.
+        
+        Args:
+            parsed: ParsedExport del archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        """
+        fieldnames = parsed.fieldnames
+        if parsed.ids:
+            codes = self._factorize(parsed.ids)
+            file_codes, file_counts = np.unique(codes, return_counts=True)
+            self._counts[file_codes] += file_counts
+            
+            grades = np.frombuffer(parsed.grades, dtype=np.float64)
+            graded_mask = ~np.isnan(grades)
+            ungraded = self._new_ungraded(codes, graded_mask)
+            if ungraded:
+                rows = parsed.read_rows(list(ungraded.values()))
+                for code, position in ungraded.items():
+                    self._ungraded[code] = [rows[position], fieldnames, parsed.grade_col]
+            graded = np.flatnonzero(graded_mask)
+            if len(graded):
+                codes = codes[graded]
+                grades = grades[graded]
+                self._mark_first_graded(codes)
+                if np.array_equal(np.round(grades, 2), grades):
+                    winner_codes, positions, values = self._first_max(codes, grades)
+                else:
+                    winner_codes, positions, values = self._replay(codes, grades)
+                positions = graded[positions].tolist()
+                self._stored[winner_codes] = values
+                
+                rows = parsed.read_rows(positions)
+                winners = self._winners
+                for code, position in zip(winner_codes.tolist(), positions):
+                    winners[code] = [rows[position], fieldnames, parsed.grade_col]
+        
+        self.issues.extend(parsed.grade_issues())
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def add_partial(self, file_path: str, encoding: str, fieldnames: List[str], grade_col: str, partial) -> List[str]:
+        """
+        Acumula el resumen de un archivo (ver parallel_parse.PartialBest).
+        
+        Args:
+            file_path: Ruta al archivo CSV resumido
+            encoding: Encoding del archivo
+            fieldnames: Columnas del archivo
+            grade_col: Columna de calificación del archivo
+            partial: PartialBest de todo el archivo
+        
+        Returns:
+            Lista de nombres de columnas del archivo
+        """
+        from .parallel_parse import read_records, resolve_entry
+        
+        if partial.attempts:
+            codes = self._factorize(list(partial.attempts))
+            self._counts[codes] += np.fromiter(partial.attempts.values(), dtype=np.int64, count=len(codes))
+        
+        known = self._codes
+        stored_grades = self._stored
+        ungraded = []
+        for student_id, span in partial.ungraded.items():
+            code = known[student_id]
+            if self._first_graded[code] < 0 and student_id not in partial.best and code not in self._ungraded:
+                entry = self._ungraded[code] = [span, fieldnames, grade_col]
+                ungraded.append(entry)
+        winners = []
+        for student_id, entries in partial.best.items():
+            code = known[student_id]
+            stored = stored_grades[code]
+            entry = resolve_entry(entries, None if np.isnan(stored) else float(stored))
+            if entry is not None:
+                if self._first_graded[code] < 0:
+                    # partial.best está en orden de primer intento calificado
+                    self._first_graded[code] = self._graded_seen
+                    self._graded_seen += 1
+                stored_grades[code] = entry[1]
+                winner = [entry[2], fieldnames, grade_col]
+                self._winners[code] = winner
+                winners.append(winner)
+        self.issues.extend(partial.issues)
+        
+        rows = read_records(file_path, encoding, [entry[0] for entry in winners + ungraded])
+        for entry, row in zip(winners + ungraded, rows):
+            entry[0] = row
+        
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+        return fieldnames
+    
+    def best_rows(self) -> Dict[str, Dict]:
+        """
+        Retorna el mejor intento de cada alumno como diccionario.
+        
+        Returns:
+            ID de alumno -> registro del mejor intento, como BestGradeAccumulator.best_rows
+            (al final, los alumnos sin ningún intento calificado, con la nota en None)
+        """
+        count = len(self._codes)
+        student_ids = list(self._codes)
+        first_graded = self._first_graded[:count]
+        codes = np.flatnonzero(first_graded >= 0)
+        codes = codes[np.argsort(first_graded[codes], kind='stable')]
+        
+        result = {}
+        for code, grade in zip(codes.tolist(), self._stored[codes].tolist()):
+            row, fieldnames, grade_col = self._winners[code]
+            record = _row_to_dict(fieldnames, row)
+            record[grade_col] = grade
+            result[student_ids[code]] = record
+        # Los códigos están en orden de aparición
+        for code in sorted(self._ungraded):
+            if first_graded[code] < 0:
+                row, fieldnames, grade_col = self._ungraded[code]
+                record = _row_to_dict(fieldnames, row)
+                record[grade_col] = None
+                result[student_ids[code]] = record
+        return result
+    
+    def _add_rows(self, rows: List[List[str]], id_idx: int, grade_idx: int, from_scale_100: bool,
+                  fieldnames: List[str], grade_col: str, chunk: tuple):
+        """
+        Incorpora un bloque de filas al resultado acumulado.
+        
+        Args:
+            rows: Filas del bloque, en orden de lectura
+            id_idx: Posición de la columna de ID
+            grade_idx: Posición de la columna de calificación
+            from_scale_100: Si las notas están en escala 0-100
+            fieldnames: Columnas del archivo
+            grade_col: Nombre de la columna de calificación
+            chunk: (archivo, filas leídas incluidas las vacías, línea de cada una),
+                usado para ubicar las calificaciones inválidas
+        """
+        ids = list(map(itemgetter(id_idx), rows))
+        try:
+            grades = np.fromiter(
+                map(float, map(_DECIMAL_COMMA_TO_POINT, map(itemgetter(grade_idx), rows))),
+                dtype=np.float64, count=len(rows)
+            )
+            graded = None if np.isfinite(grades).all() else self._parse_chunk(rows, ids, grade_idx, chunk)
+        except ValueError:
+            graded = self._parse_chunk(rows, ids, grade_idx, chunk)
+        if graded is not None:
+            grades, graded = graded
+        if from_scale_100:
+            grades = grades / 10.0
+        
+        codes = self._factorize(ids)
+        chunk_codes, chunk_counts = np.unique(codes, return_counts=True)
+        self._counts[chunk_codes] += chunk_counts
+        
+        if graded is not None:
+            # Los intentos sin calificar o con nota inválida cuentan, pero no compiten
+            graded_mask = np.zeros(len(codes), dtype=bool)
+            graded_mask[graded] = True
+            for code, position in self._new_ungraded(codes, graded_mask).items():
+                self._ungraded[code] = [rows[position], fieldnames, grade_col]
+            codes = codes[graded]
+            grades = grades[graded]
+            if not len(codes):
+                return
+        self._mark_first_graded(codes)
+        
+        if np.array_equal(np.round(grades, 2), grades):
+            winner_codes, positions, values = self._first_max(codes, grades)
+        else:
+            winner_codes, positions, values = self._replay(codes, grades)
+        
+        if graded is not None:
+            positions = graded[positions]
+        self._stored[winner_codes] = values
+        winners = self._winners
+        for code, position in zip(winner_codes.tolist(), positions.tolist()):
+            winners[code] = [rows[position], fieldnames, grade_col]
+    
+    def _parse_chunk(self, rows: List[List[str]], ids: List[str], grade_idx: int, chunk: tuple):
+        """
+        Interpreta celda por celda las notas de un bloque con valores no numéricos.
+        
+        Returns:
+            Tupla (notas, posiciones de las filas con nota válida)
+        """
+        file_path, raw_rows, line_numbers = chunk
+        lines = None
+        
+        grades = np.full(len(rows), np.nan)
+        for position, row in enumerate(rows):
+            grade_text = row[grade_idx]
+            try:
+                grade = parse_grade(grade_text)
+            except ValueError:
+                if lines is None:
+                    # rows es un subconjunto de raw_rows: se ubican por identidad
+                    lines = {id(raw_row): line for raw_row, line in zip(raw_rows, line_numbers)}
+                self.issues.append(GradeIssue(file_path, lines[id(row)], ids[position], grade_text))
+                continue
+            if grade is not None:
+                grades[position] = grade
+        return grades, np.flatnonzero(~np.isnan(grades))
+    
+    @staticmethod
+    def _without_average_rows(rows: List[List[str]], surname_idx: int) -> List[List[str]]:
+        """Quita del bloque las filas "Promedio general" de Moodle."""
+        try:
+            surnames = "\n".join([row[surname_idx] for row in rows])
+        except IndexError:
+            surnames = None
+        if surnames is not None and "promedio general" not in surnames.lower():
+            # Caso habitual: el bloque no tiene la fila de promedios
+            return rows
+        return [
+            row for row in rows
+            if surname_idx >= len(row) or row[surname_idx].strip().lower() != "promedio general"
+        ]
+    
+    def _factorize(self, ids: List[str]):
+        """
+        Convierte los IDs de un bloque en códigos enteros.
+        
+        Los alumnos nuevos reciben el código siguiente en orden de primera
+        aparición, que es el orden en que se retornan los intentos.
+        
+        Args:
+            ids: IDs de alumno del bloque, en orden de lectura
+        
+        Returns:
+            Array con el código de alumno de cada fila
+        """
+        known = self._codes
+        previous_count = len(known)
+        # dict.fromkeys conserva el orden de primera aparición dentro del bloque
+        for student_id in dict.fromkeys(ids):
+            if student_id not in known:
+                known[student_id] = len(known)
+        codes = np.fromiter(map(known.__getitem__, ids), dtype=np.int64, count=len(ids))
+        
+        new_count = len(known) - previous_count
+        if new_count:
+            capacity = len(self._stored)
+            if len(known) > capacity:
+                extra = max(capacity, len(known) - capacity)
+                self._stored = np.concatenate([self._stored, np.full(extra, np.nan)])
+                self._counts = np.concatenate([self._counts, np.zeros(extra, dtype=np.int64)])
+                self._first_graded = np.concatenate([self._first_graded, np.full(extra, -1, dtype=np.int64)])
+            self._winners.extend([None] * new_count)
+        return codes
+    
+    def _new_ungraded(self, codes, graded_mask) -> Dict[int, int]:
+        """
+        Primer intento sin calificar de los alumnos que no tienen ninguno calificado.
+        
+        Args:
+            codes: Códigos de todos los intentos del bloque, en orden de lectura
+            graded_mask: Si cada intento del bloque tiene nota
+        
+        Returns:
+            Código -> posición en el bloque, para los alumnos sin intento sin
+            calificar registrado ni intentos calificados en bloques anteriores
+        """
+        positions = np.flatnonzero(~graded_mask)
+        if not len(positions):
+            return {}
+        unique_codes, first = np.unique(codes[positions], return_index=True)
+        new = self._first_graded[unique_codes] < 0
+        ungraded = {}
+        for code, position in zip(unique_codes[new].tolist(), positions[first[new]].tolist()):
+            if code not in self._ungraded:
+                ungraded[code] = position
+        return ungraded
+    
+    def _mark_first_graded(self, codes):
+        """
+        Registra el orden del primer intento calificado de los alumnos nuevos.
+        
+        Args:
+            codes: Códigos de los intentos calificados del bloque, en orden de lectura
+        """
+        unique_codes, first_positions = np.unique(codes, return_index=True)
+        new = self._first_graded[unique_codes] < 0
+        self._first_graded[unique_codes[new]] = self._graded_seen + first_positions[new]
+        self._graded_seen += len(codes)
+    
+    def _first_max(self, codes, grades):
+        """
+        Mejor intento de cada alumno cuando todas las notas tienen hasta 2 decimales.
+        
+        En ese caso la nota guardada coincide con la leída, por lo que gana el
+        primer intento con la nota máxima del bloque si supera a la guardada.
+        
+        Returns:
+            Tupla (códigos que cambian de mejor intento, posición en el bloque, nota)
+        """
+        positions = np.arange(len(grades))
+        order = np.lexsort((positions, -grades, codes))
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.r_[True, sorted_codes[1:] != sorted_codes[:-1]])
+        best_positions = order[starts]
+        best_codes = sorted_codes[starts]
+        best_grades = grades[best_positions]
+        
+        stored = self._stored[best_codes]
+        improved = np.isnan(stored) | (best_grades > stored)
+        return best_codes[improved], best_positions[improved], best_grades[improved]
+    
+    def _replay(self, codes, grades):
+        """
+        Mejor intento de cada alumno cuando hay notas con más de 2 decimales.
+        
+        Cada intento se compara contra la nota guardada (redondeada a 2
+        decimales), en orden de lectura, igual que el motor de Python.
+        
+        Returns:
+            Tupla (códigos que cambian de mejor intento, posición en el bloque, nota)
+        """
+        unique_codes = np.unique(codes)
+        stored = dict(zip(unique_codes.tolist(), self._stored[unique_codes].tolist()))
+        changed = {}
+        for position, (code, grade) in enumerate(zip(codes.tolist(), grades.tolist())):
+            current = stored[code]
+            if current != current or grade > current:  # NaN: alumno sin intentos previos
+                stored[code] = round(grade, 2)
+                changed[code] = position
+        
+        winner_codes = np.fromiter(changed.keys(), dtype=np.int64, count=len(changed))
+        positions = np.fromiter(changed.values(), dtype=np.int64, count=len(changed))
+        values = np.array([stored[code] for code in changed], dtype=np.float64)
+        return winner_codes, positions, values
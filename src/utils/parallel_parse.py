@@ -0,0 +1,461 @@
+"""
+Módulo para interpretar exports en paralelo: un export grande por rangos de
+bytes, o los turnos de una evaluación a la vez.
+"""
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .csv_helpers import (
+    BestGradeAccumulator,
+    _last_index,
+    detect_grade_scale,
+    get_col_name,
+    get_col_name_safe
+)
+from .grade_parser import GradeIssue, parse_grade, _grade_cache
+from .parse_cache import _body_encoding, ascii_compatible
+
+
+# Por debajo de este tamaño no conviene repartir el archivo entre procesos
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+
+# Tamaño mínimo de cada rango
+MIN_RANGE_BYTES = 4 * 1024 * 1024
+
+# Pools para resumir varios archivos a la vez
+POOLS = ("thread", "process")
+
+# Tamaño de los bloques en que se cuentan comillas y saltos de línea
+_COUNT_BLOCK = 8 * 1024 * 1024
+
+
+@dataclass
+class PartialBest:
+    """
+    Resumen de mejores intentos e intentos de un tramo de un export.
+    
+    El mejor intento se guarda redondeado y sólo lo reemplaza una nota mayor,
+    así que el resultado de un tramo depende de la nota con que llega cada
+    alumno. Por eso, para cada alumno se guarda una lista de entradas
+    [umbral, nota guardada, (inicio, fin) en bytes de la fila ganadora]: una
+    por cada intento que supera a todos los
+    anteriores del tramo (los únicos por los que puede "entrar" una nota
+    previa), con el resultado de recorrer el tramo desde ese intento. Los
+    umbrales quedan en orden creciente y, al final del tramo, todas las
+    entradas de un alumno tienen la misma nota guardada (sólo puede cambiar
+    la fila ganadora).
+    
+    Attributes:
+        attempts: ID de alumno -> cantidad de intentos, en orden de primera aparición
+        best: ID de alumno -> entradas, en orden de primer intento calificado
+        issues: Calificaciones no numéricas, en orden de lectura
+        ungraded: ID de alumno -> (inicio, fin) en bytes del primer intento sin
+            calificar de los alumnos que no tenían un intento calificado antes de él
+    """
+    attempts: Dict[str, int] = field(default_factory=dict)
+    best: Dict[str, List[list]] = field(default_factory=dict)
+    issues: List[GradeIssue] = field(default_factory=list)
+    ungraded: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+
+
+def resolve_entry(entries: List[list], stored: Optional[float]) -> Optional[list]:
+    """
+    Resultado de un tramo para un alumno que llega con una nota guardada.
+    
+    Args:
+        entries: Entradas del alumno en el tramo
+        stored: Nota guardada antes del tramo (None si no tenía intentos calificados)
+    
+    Returns:
+        La entrada cuyo resultado aplica, o None si el tramo no mejora la nota
+    """
+    if stored is None:
+        return entries[0]
+    for entry in entries:
+        if entry[0] > stored:
+            return entry
+    return None
+
+
+def merge_partials(first: PartialBest, second: PartialBest) -> PartialBest:
+    """
+    Combina los resúmenes de dos tramos consecutivos (operación asociativa).
+    
+    Args:
+        first: Resumen del tramo anterior
+        second: Resumen del tramo siguiente
+    
+    Returns:
+        Resumen equivalente a haber leído ambos tramos en orden
+    """
+    merged = PartialBest(dict(first.attempts), dict(first.best), list(first.issues), dict(first.ungraded))
+    _merge_into(merged, second)
+    return merged
+
+
+def _merge_into(target: PartialBest, following: PartialBest):
+    """Agrega a target el resumen del tramo siguiente (sin modificar las listas de entradas)."""
+    attempts = target.attempts
+    for student_id, count in following.attempts.items():
+        attempts[student_id] = attempts.get(student_id, 0) + count
+    
+    best = target.best
+    ungraded = target.ungraded
+    for student_id, span in following.ungraded.items():
+        if student_id not in best and student_id not in ungraded:
+            ungraded[student_id] = span
+    for student_id, entries in following.best.items():
+        current = best.get(student_id)
+        if current is None:
+            best[student_id] = entries
+            continue
+        last_threshold = current[-1][0]
+        # Todas las entradas del primer tramo terminan con la misma nota guardada,
+        # así que continúan igual en el segundo
+        entry = resolve_entry(entries, current[0][1])
+        if entry is not None:
+            # Si el segundo tramo mejora la nota, todas terminan en la misma fila
+            current = [[last_threshold, entry[1], entry[2]]]
+        if entries[-1][0] > last_threshold:
+            # Los intentos del segundo tramo que superan a todos los del primero son nuevas entradas
+            current = current + [entry for entry in entries if entry[0] > last_threshold]
+        best[student_id] = current
+    
+    target.issues.extend(following.issues)
+
+
+def read_header(file_path: str, encoding: str) -> Tuple[List[str], int]:
+    """
+    Lee el encabezado de un export.
+    
+    Args:
+        file_path: Ruta al archivo CSV
+        encoding: Encoding del archivo
+    
+    Returns:
+        Tupla (columnas, posición en bytes donde empiezan los datos)
+    
+    Raises:
+        ValueError: Si el archivo está vacío o no tiene headers
+    """
+    with open(file_path, 'rb') as f:
+        return _read_header(f, file_path, encoding)
+
+
+def _read_header(f, file_path: str, encoding: str) -> Tuple[List[str], int]:
+    """Lee el encabezado desde un archivo binario abierto al comienzo (ver read_header)."""
+    position = 0
+    
+    def lines():
+        nonlocal position
+        decoder_encoding = encoding
+        for raw in f:
+            position += len(raw)
+            yield raw.decode(decoder_encoding)
+            # La marca BOM sólo puede estar en la primera línea
+            decoder_encoding = _body_encoding(encoding)
+    
+    fieldnames = BestGradeAccumulator._read_header(csv.reader(lines()), file_path)
+    return fieldnames, position
+
+
+def _count(data, sub: bytes, start: int, end: int) -> int:
+    """Cuenta apariciones de un byte en data[start:end], por bloques (mmap no tiene count)."""
+    total = 0
+    for position in range(start, end, _COUNT_BLOCK):
+        total += data[position:min(position + _COUNT_BLOCK, end)].count(sub)
+    return total
+
+
+def split_ranges(data, start: int, parts: int) -> List[Tuple[int, int]]:
+    """
+    Divide los datos en rangos que terminan en un fin de registro.
+    
+    Un salto de línea sólo es fin de registro si hay una cantidad par de
+    comillas desde el comienzo de los datos: si no, está dentro de una celda
+    entre comillas. Sólo se cuentan bytes, sin interpretar el CSV.
+    
+    Args:
+        data: Contenido del archivo (mmap o bytes)
+        start: Posición donde empiezan los datos (después del encabezado)
+        parts: Cantidad de rangos buscada
+    
+    Returns:
+        Lista de rangos (inicio, fin) contiguos que cubren [start, len(data))
+    """
+    size = len(data)
+    bounds = [start]
+    position = start
+    parity = 0
+    for part in range(1, parts):
+        target = start + (size - start) * part // parts
+        if target <= position:
+            continue
+        parity = (parity + _count(data, b'"', position, target)) & 1
+        position = target
+        while True:
+            newline = data.find(b"\n", position)
+            if newline < 0:
+                position = size
+                break
+            parity = (parity + _count(data, b'"', position, newline + 1)) & 1
+            position = newline + 1
+            if parity == 0:
+                break
+        if position >= size:
+            break
+        bounds.append(position)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def parse_range(task: tuple) -> PartialBest:
+    """
+    Resume un rango de un export (se ejecuta en un proceso hijo).
+    
+    Args:
+        task: (archivo, inicio, fin, líneas antes del rango, encoding, columnas,
+            header_map, calculate_avg_grades)
+    
+    Returns:
+        PartialBest del rango
+    """
+    file_path, start, end, first_line, encoding, fieldnames, header_map, calculate_avg_grades = task
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        raw = f.read(end - start)
+    return _summarize(raw, start, first_line, file_path, encoding, fieldnames, header_map, calculate_avg_grades)
+
+
+def summarize_file(task: tuple) -> Tuple[List[str], str, PartialBest]:
+    """
+    Resume un export completo (se ejecuta en un hilo o proceso del pool).
+    
+    Args:
+        task: (archivo, encoding, header_map, calculate_avg_grades)
+    
+    Returns:
+        Tupla (columnas, columna de nota, PartialBest del archivo)
+    
+    Raises:
+        ValueError: Si el archivo está vacío o no tiene headers
+        KeyError: Si no se encuentran las columnas de ID o calificación
+    """
+    file_path, encoding, header_map, calculate_avg_grades = task
+    # Una sola lectura del archivo: en carpetas de red la latencia de cada acceso pesa más que el tamaño
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    fieldnames, data_start = _read_header(io.BytesIO(content), file_path, encoding)
+    grade_col = get_col_name(fieldnames, header_map["nota"])
+    get_col_name(fieldnames, header_map["id"])
+    
+    partial = _summarize(content[data_start:], data_start, content.count(b"\n", 0, data_start),
+                         file_path, encoding, fieldnames, header_map, calculate_avg_grades)
+    return fieldnames, grade_col, partial
+
+
+def summarize_files(files: List[str], header_map: Dict, encoding: str = 'utf-8-sig', calculate_avg_grades: bool = False,
+                    max_workers: int = 0, pool: str = 'thread') -> List[Tuple[List[str], str, PartialBest]]:
+    """
+    Resume varios exports a la vez (por ejemplo, los turnos de una evaluación).
+    
+    Args:
+        files: Rutas de los archivos
+        header_map: Mapeo de nombres de columnas
+        encoding: Encoding de los archivos
+        calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        max_workers: Hilos o procesos a usar (0 = uno por núcleo)
+        pool: "thread" (archivos en carpetas de red) o "process" (archivos locales grandes)
+    
+    Returns:
+        Resumen de cada archivo (ver summarize_file), en el orden de files
+    
+    Raises:
+        ValueError: Si el pool no es válido o algún archivo está vacío o no tiene headers
+        KeyError: Si no se encuentran las columnas de ID o calificación
+    """
+    if pool not in POOLS:
+        raise ValueError(f"Pool inválido: '{pool}' (opciones: {', '.join(POOLS)})")
+    executor_class = ThreadPoolExecutor if pool == 'thread' else ProcessPoolExecutor
+    tasks = [(file_path, encoding, header_map, calculate_avg_grades) for file_path in files]
+    with executor_class(max_workers=min(resolve_workers(max_workers), len(tasks))) as executor:
+        return list(executor.map(summarize_file, tasks))
+
+
+def _summarize(raw: bytes, start: int, first_line: int, file_path: str, encoding: str, fieldnames: List[str],
+               header_map: Dict, calculate_avg_grades: bool) -> PartialBest:
+    """
+    Resume los bytes de un rango de datos.
+    
+    Args:
+        raw: Contenido del rango (registros completos)
+        start: Posición del rango en el archivo
+        first_line: Líneas del archivo antes del rango
+        file_path: Ruta al archivo CSV (para las notas inválidas)
+        encoding: Encoding del archivo
+        fieldnames: Columnas del archivo
+        header_map: Mapeo de nombres de columnas
+        calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+    
+    Returns:
+        PartialBest del rango
+    """
+    text = raw.decode(_body_encoding(encoding))
+    
+    grade_col = get_col_name(fieldnames, header_map["nota"])
+    id_idx = _last_index(fieldnames, get_col_name(fieldnames, header_map["id"]))
+    grade_idx = _last_index(fieldnames, grade_col)
+    surname_idx = None
+    if not calculate_avg_grades:
+        surname_col = get_col_name_safe(fieldnames, header_map["apellido"])
+        if surname_col:
+            surname_idx = _last_index(fieldnames, surname_col)
+    from_scale_100 = detect_grade_scale(grade_col) == 100.0
+    
+    cached_grade = _grade_cache.get
+    partial = PartialBest()
+    attempts = partial.attempts
+    best = partial.best
+    ungraded = partial.ungraded
+    reader = csv.reader(io.StringIO(text, newline=''))
+    # Mientras se recorre el rango, cada fila se identifica por sus líneas (primera, siguiente)
+    next_line = 0
+    for row in reader:
+        first_row_line = next_line
+        next_line = reader.line_num
+        if not row:
+            continue
+        if surname_idx is not None and surname_idx < len(row) \
+                and row[surname_idx].strip().lower() == "promedio general":
+            continue
+        
+        student_id = row[id_idx]
+        attempts[student_id] = attempts.get(student_id, 0) + 1
+        
+        grade_text = row[grade_idx]
+        grade = cached_grade(grade_text)
+        if grade is None:
+            try:
+                grade = parse_grade(grade_text)
+            except ValueError:
+                partial.issues.append(GradeIssue(file_path, first_line + reader.line_num, student_id, grade_text))
+                grade = None
+            if grade is None:
+                if student_id not in best and student_id not in ungraded:
+                    ungraded[student_id] = (first_row_line, next_line)
+                continue
+        if from_scale_100:
+            grade = grade / 10.0
+        
+        entries = best.get(student_id)
+        if entries is None:
+            best[student_id] = [[grade, round(grade, 2), (first_row_line, next_line)]]
+            continue
+        if grade <= entries[0][1] and grade <= entries[-1][0]:
+            # No mejora ninguna entrada (la primera tiene la menor nota guardada)
+            # ni supera a todos los intentos anteriores
+            continue
+        for entry in entries:
+            if grade > entry[1]:
+                entry[1] = round(grade, 2)
+                entry[2] = (first_row_line, next_line)
+        if grade > entries[-1][0]:
+            entries.append([grade, round(grade, 2), (first_row_line, next_line)])
+    
+    # Pasar las líneas de las filas a posiciones en bytes, para no enviar las filas
+    # al proceso principal: sólo se leen las que terminan siendo las mejores
+    line_starts = [start]
+    for line in raw.splitlines(True):
+        line_starts.append(line_starts[-1] + len(line))
+    for entries in best.values():
+        for entry in entries:
+            first_row_line, following_line = entry[2]
+            entry[2] = (line_starts[first_row_line], line_starts[following_line])
+    for student_id, (first_row_line, following_line) in ungraded.items():
+        ungraded[student_id] = (line_starts[first_row_line], line_starts[following_line])
+    return partial
+
+
+def read_records(file_path: str, encoding: str, spans: List[Tuple[int, int]]) -> List[List[str]]:
+    """
+    Lee del CSV sólo las filas indicadas.
+    
+    Args:
+        file_path: Ruta al archivo CSV
+        encoding: Encoding del archivo
+        spans: Posiciones (inicio, fin) en bytes de cada fila
+    
+    Returns:
+        Filas como listas de celdas, en el orden de spans
+    """
+    if not spans:
+        return []
+    # Las filas se juntan en un único texto y se interpretan con un solo csv.reader
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        chunks = []
+        for start, end in spans:
+            chunk = data[start:end]
+            chunks.append(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+    text = b"".join(chunks).decode(_body_encoding(encoding))
+    return list(csv.reader(io.StringIO(text, newline='')))
+
+
+def resolve_workers(max_workers: int) -> int:
+    """Cantidad de procesos a usar (0 = uno por núcleo)."""
+    return max_workers if max_workers > 0 else (os.cpu_count() or 1)
+
+
+def parse_file_parallel(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig',
+                        calculate_avg_grades: bool = False, max_workers: int = 0) -> Optional[Tuple[List[str], str, PartialBest]]:
+    """
+    Interpreta un export repartiendo rangos de bytes entre procesos.
+    
+    Args:
+        file_path: Ruta al archivo CSV
+        header_map: Mapeo de nombres de columnas
+        encoding: Encoding del archivo
+        calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+        max_workers: Procesos a usar (0 = uno por núcleo)
+    
+    Returns:
+        Tupla (columnas, columna de nota, resumen de todo el archivo), o None si
+        el archivo es chico, su encoding no permite dividirlo o hay un solo proceso
+    
+    Raises:
+        ValueError: Si el archivo está vacío o no tiene headers
+        KeyError: Si no se encuentran las columnas de ID o calificación
+    """
+    workers = resolve_workers(max_workers)
+    size = os.path.getsize(file_path)
+    if workers < 2 or size < PARALLEL_MIN_BYTES or not ascii_compatible(encoding):
+        return None
+    
+    fieldnames, data_start = read_header(file_path, encoding)
+    grade_col = get_col_name(fieldnames, header_map["nota"])
+    get_col_name(fieldnames, header_map["id"])
+    
+    parts = min(workers, max(1, (size - data_start) // MIN_RANGE_BYTES))
+    with open(file_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ranges = split_ranges(data, data_start, parts)
+        # Número de línea del CSV donde empieza cada rango, para ubicar las notas inválidas
+        first_lines = [_count(data, b"\n", 0, data_start)]
+        for start, end in ranges[:-1]:
+            first_lines.append(first_lines[-1] + _count(data, b"\n", start, end))
+    if len(ranges) < 2:
+        return None
+    
+    tasks = [
+        (file_path, start, end, first_line, encoding, fieldnames, header_map, calculate_avg_grades)
+        for (start, end), first_line in zip(ranges, first_lines)
+    ]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+        partials = executor.map(parse_range, tasks)
+        # Los resúmenes se combinan en orden de rango a medida que terminan
+        merged = next(partials)
+        for partial in partials:
+            _merge_into(merged, partial)
+    return fieldnames, grade_col, merged
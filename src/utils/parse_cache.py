@@ -0,0 +1,559 @@
+"""
+Módulo con una caché binaria en disco de los exports de Moodle ya interpretados.
+"""
+import codecs
+import csv
+import hashlib
+import io
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+from .build_manifest import SourceFingerprint, config_fingerprint, file_sha256
+from .csv_helpers import (
+    BestGradeAccumulator,
+    _last_index,
+    detect_grade_scale,
+    get_col_name,
+    get_col_name_safe
+)
+from .grade_parser import GradeIssue, parse_grade
+
+
+# Incrementar cuando cambie el formato de las entradas para descartar las anteriores
+CACHE_FORMAT = 1
+
+CACHE_DIR_NAME = ".cache"
+DEFAULT_CACHE_SIZE_MB = 256
+
+# Encabezado de cada entrada: marca, versión, orden de bytes de los arrays,
+# tamaño y mtime_ns del export, SHA-256 del contenido, cantidad de intentos
+# y longitudes de las secciones de metadatos e IDs
+_MAGIC = b"ACOPARSE"
+_HEADER = struct.Struct("<8sHBxqq32sIII")
+_BYTE_ORDER = 0 if sys.byteorder == "little" else 1
+_MTIME_OFFSET = struct.calcsize("<8sHBxq")
+
+# Separador de los IDs de alumno dentro de la sección de IDs
+_ID_SEPARATOR = "\x00"
+
+# Una celda de CSV: entre comillas (con "" como comilla escapada) o sin comillas
+_CSV_FIELD = re.compile(rb'"(?:[^"]|"")*"|[^,\r\n]*')
+
+
+def ascii_compatible(encoding: str) -> bool:
+    """
+    Indica si en el encoding las comas, comillas y saltos de línea son los bytes ASCII.
+    
+    Es la condición para ubicar celdas directamente sobre los bytes del archivo
+    (vale para UTF-8 y los encodings de un byte, no para UTF-16).
+    
+    Args:
+        encoding: Nombre del encoding
+    
+    Returns:
+        True si se pueden recortar filas y celdas sobre los bytes
+    """
+    return '",\r\n'.encode(_body_encoding(encoding)) == b'",\r\n'
+
+
+def _body_encoding(encoding: str) -> str:
+    """Encoding para escribir filas sueltas (sin la marca BOM de utf-8-sig)."""
+    name = codecs.lookup(encoding).name
+    return 'utf-8' if name == 'utf-8-sig' else name
+
+
+def replace_field(row: bytes, index: int, value: bytes) -> Optional[bytes]:
+    """
+    Reemplaza una celda de una fila CSV sin interpretar las demás.
+    
+    Args:
+        row: Bytes de la fila (puede incluir el salto de línea final)
+        index: Posición de la celda a reemplazar
+        value: Nuevo contenido de la celda (no debe requerir comillas)
+    
+    Returns:
+        La fila con la celda reemplazada, o None si la fila no tiene esa celda
+        o sus comillas no respetan el formato CSV
+    """
+    position = 0
+    for _ in range(index):
+        position = _CSV_FIELD.match(row, position).end()
+        if row[position:position + 1] != b",":
+            return None
+        position += 1
+    match = _CSV_FIELD.match(row, position)
+    end = match.end()
+    if end < len(row) and row[end:end + 1] not in (b",", b"\r", b"\n"):
+        return None
+    return row[:position] + value + row[end:]
+
+
+@dataclass
+class ParsedExport:
+    """
+    Columnas de un export de Moodle, tal como las necesita el cálculo de mejores notas.
+    
+    Por cada intento (sin líneas vacías ni la fila "Promedio general" si se filtra)
+    se guardan el ID de alumno, la nota normalizada a escala 0-10 (NaN si no está
+    calificado o la nota es inválida) y la posición en bytes de la fila en el
+    archivo, para poder leer sólo las filas de los mejores intentos.
+    
+    Attributes:
+        path: Ruta al archivo CSV
+        encoding: Encoding del archivo
+        fieldnames: Columnas del archivo
+        grade_col: Nombre de la columna de calificación
+        ids: ID de alumno de cada intento, en orden de lectura
+        grades: Nota normalizada de cada intento
+        offsets: Posición en bytes del comienzo de cada intento
+        lengths: Longitud en bytes de cada intento (incluye el salto de línea)
+        invalid: (posición del intento, número de línea, celda) de cada nota inválida
+        source: Tamaño, mtime y hash del archivo en el momento en que se interpretó
+    """
+    path: str
+    encoding: str
+    fieldnames: List[str]
+    grade_col: str
+    ids: List[str] = field(default_factory=list)
+    grades: array = field(default_factory=lambda: array('d'))
+    offsets: array = field(default_factory=lambda: array('q'))
+    lengths: array = field(default_factory=lambda: array('I'))
+    invalid: List[Tuple[int, Optional[int], str]] = field(default_factory=list)
+    source: Optional[SourceFingerprint] = None
+    
+    def grade_issues(self) -> List[GradeIssue]:
+        """Retorna las calificaciones inválidas del archivo como GradeIssue."""
+        return [GradeIssue(self.path, line, self.ids[index], value) for index, line, value in self.invalid]
+    
+    def read_rows(self, indices: List[int]) -> Dict[int, List[str]]:
+        """
+        Lee del CSV sólo las filas indicadas.
+        
+        Args:
+            indices: Posiciones de los intentos a leer
+        
+        Returns:
+            Posición -> fila como lista de celdas
+        """
+        indices = sorted(indices)
+        if not indices:
+            return {}
+        # Las filas se juntan en un único texto y se interpretan con un solo csv.reader
+        with open(self.path, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                chunks = []
+                for index in indices:
+                    offset = self.offsets[index]
+                    chunk = data[offset:offset + self.lengths[index]]
+                    chunks.append(chunk if chunk.endswith(b"\n") else chunk + b"\n")
+        text = b"".join(chunks).decode(self.encoding)
+        rows = dict(zip(indices, csv.reader(io.StringIO(text, newline=''))))
+        return rows
+    
+    def best_attempts(self) -> Dict[str, Tuple[Optional[float], int]]:
+        """
+        Calcula el mejor intento de cada alumno sin armar filas ni diccionarios
+        (ver best_attempts_of).
+        
+        Returns:
+            ID de alumno -> (nota normalizada y redondeada, posición del intento),
+            en el orden de best_attempts_of
+        """
+        return {student_id: (grade, index) for student_id, (grade, _, index) in best_attempts_of([self]).items()}
+    
+    def write_best_rows(self, output_file: str, best: Dict[str, Tuple[Optional[float], int]]):
+        """
+        Escribe el CSV filtrado copiando los bytes originales de cada mejor intento.
+        
+        Args:
+            output_file: Ruta del archivo de salida
+            best: Resultado de best_attempts()
+        """
+        write_best_rows(output_file, [self], {student_id: (grade, 0, index) for student_id, (grade, index) in best.items()})
+    
+    def _rewrite_row(self, row: bytes, grade_idx: int, grade: Optional[float]) -> bytes:
+        """Reescribe con el módulo csv una fila cuyas celdas no se pudieron recortar."""
+        cells = next(csv.reader(io.StringIO(row.decode(self.encoding), newline='')))
+        cells[grade_idx] = "" if grade is None else str(grade)
+        line = io.StringIO()
+        csv.writer(line, lineterminator="").writerow(cells)
+        return line.getvalue().encode(_body_encoding(self.encoding))
+
+
+def best_attempts_of(exports: List[ParsedExport]) -> Dict[str, Tuple[Optional[float], int, int]]:
+    """
+    Calcula el mejor intento de cada alumno entre varios exports leídos en orden.
+    
+    Usa las mismas reglas que BestGradeAccumulator: la nota se guarda
+    redondeada a 2 decimales y sólo la reemplaza una nota mayor, así que
+    ante notas iguales se conserva el primer intento leído. Los alumnos sin
+    ningún intento calificado conservan su primer intento, con la nota en None.
+    
+    Args:
+        exports: Exports de la evaluación, en orden de lectura
+    
+    Returns:
+        ID de alumno -> (nota normalizada y redondeada, posición del export en
+        exports, posición del intento), en orden de primera aparición con nota
+        y al final, en orden de aparición, los alumnos sin intentos calificados
+    """
+    best = {}
+    ungraded = {}
+    for number, parsed in enumerate(exports):
+        for index, (student_id, grade) in enumerate(zip(parsed.ids, parsed.grades)):
+            if grade != grade:
+                # NaN: intento sin calificar o con nota inválida
+                if student_id not in best and student_id not in ungraded:
+                    ungraded[student_id] = (None, number, index)
+                continue
+            current = best.get(student_id)
+            if current is None or grade > current[0]:
+                best[student_id] = (round(grade, 2), number, index)
+    for student_id, entry in ungraded.items():
+        if student_id not in best:
+            best[student_id] = entry
+    return best
+
+
+def write_best_rows(output_file: str, exports: List[ParsedExport], best: Dict[str, Tuple[Optional[float], int, int]]):
+    """
+    Escribe el CSV filtrado copiando los bytes originales de cada mejor intento.
+    
+    De cada fila sólo se reemplaza la celda de calificación por la nota
+    normalizada (vacía si es None); las demás celdas no se interpretan ni se vuelven a
+    escribir. El resultado tiene el mismo contenido que save_csv con los
+    registros del mejor intento (mismo encabezado y saltos de línea "\\r\\n")
+    si todos los exports tienen las mismas columnas que el primero.
+    
+    Args:
+        output_file: Ruta del archivo de salida
+        exports: Exports de la evaluación, en orden de lectura
+        best: Resultado de best_attempts_of(exports)
+    """
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    
+    first = exports[0]
+    grade_idx = _last_index(first.fieldnames, first.grade_col)
+    header = io.StringIO()
+    csv.writer(header).writerow(first.fieldnames)
+    
+    with open(output_file, 'wb') as output, ExitStack() as stack:
+        output.write(header.getvalue().encode(first.encoding))
+        if not best:
+            return
+        # Cada export se mapea recién cuando se necesita su primera fila
+        mapped: Dict[int, mmap.mmap] = {}
+        lines = []
+        for grade, number, index in best.values():
+            parsed = exports[number]
+            data = mapped.get(number)
+            if data is None:
+                source = stack.enter_context(open(parsed.path, 'rb'))
+                data = mapped[number] = stack.enter_context(mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ))
+            offset = parsed.offsets[index]
+            row = data[offset:offset + parsed.lengths[index]].rstrip(b"\r\n")
+            line = replace_field(row, grade_idx, b"" if grade is None else str(grade).encode('ascii'))
+            if line is None:
+                line = parsed._rewrite_row(row, grade_idx, grade)
+            lines.append(line)
+        lines.append(b"")
+        output.write(b"\r\n".join(lines))
+
+
+def parse_export(file_path: str, header_map: Dict, encoding: str = 'utf-8-sig',
+                 calculate_avg_grades: bool = False) -> Tuple[ParsedExport, bytes]:
+    """
+    Interpreta un export registrando la posición en bytes de cada intento.
+    
+    Args:
+        file_path: Ruta al archivo CSV
+        header_map: Mapeo de nombres de columnas
+        encoding: Encoding del archivo
+        calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+    
+    Returns:
+        Tupla (ParsedExport, SHA-256 del contenido), calculados en la misma lectura
+    
+    Raises:
+        ValueError: Si el archivo está vacío o no tiene headers
+        KeyError: Si no se encuentran las columnas de ID o calificación
+    """
+    digest = hashlib.sha256()
+    decoder = codecs.getincrementaldecoder(encoding)()
+    position = 0
+    
+    with open(file_path, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        
+        def lines():
+            # csv.reader pide una línea por vez, así que al terminar cada fila
+            # `position` apunta al byte siguiente a esa fila
+            nonlocal position
+            for raw in f:
+                digest.update(raw)
+                position += len(raw)
+                yield decoder.decode(raw)
+        
+        reader = csv.reader(lines())
+        fieldnames = BestGradeAccumulator._read_header(reader, file_path)
+        
+        id_col = get_col_name(fieldnames, header_map["id"])
+        grade_col = get_col_name(fieldnames, header_map["nota"])
+        id_idx = _last_index(fieldnames, id_col)
+        grade_idx = _last_index(fieldnames, grade_col)
+        
+        # Columna de apellido para detectar la fila "Promedio general"
+        surname_idx = None
+        if not calculate_avg_grades:
+            surname_col = get_col_name_safe(fieldnames, header_map["apellido"])
+            if surname_col:
+                surname_idx = _last_index(fieldnames, surname_col)
+        
+        scale_divisor = 10.0 if detect_grade_scale(grade_col) == 100.0 else 1.0
+        
+        parsed = ParsedExport(file_path, encoding, fieldnames, grade_col)
+        ids, grades, offsets, lengths = parsed.ids, parsed.grades, parsed.offsets, parsed.lengths
+        nan = float('nan')
+        
+        start = position
+        for row in reader:
+            row_start, start = start, position
+            if not row:
+                continue
+            if surname_idx is not None and surname_idx < len(row) \
+                    and row[surname_idx].strip().lower() == "promedio general":
+                continue
+            
+            grade_text = row[grade_idx]
+            try:
+                grade = parse_grade(grade_text)
+            except ValueError:
+                parsed.invalid.append((len(ids), reader.line_num, grade_text))
+                grade = None
+            
+            ids.append(row[id_idx])
+            grades.append(nan if grade is None else grade / scale_divisor)
+            offsets.append(row_start)
+            lengths.append(position - row_start)
+        
+        # Completar el hash si el lector no consumió el archivo hasta el final
+        for _ in lines():
+            pass
+    
+    parsed.source = SourceFingerprint.from_stat(file_path, stat, digest.hexdigest())
+    return parsed, digest.digest()
+
+
+class ParseCache:
+    """
+    Caché en disco de exports interpretados, para no volver a leer CSV que no cambiaron.
+    
+    Cada export se guarda en un archivo binario versionado con sus columnas ya
+    empaquetadas (IDs, notas como array('d') y posiciones de las filas), que se
+    carga sin interpretar el CSV. Una entrada es válida mientras el export tenga
+    el mismo tamaño y mtime; si sólo cambió el mtime se compara el hash del
+    contenido. La configuración de lectura forma parte de la clave, y cuando el
+    total supera el presupuesto se eliminan las entradas usadas hace más tiempo.
+    """
+    
+    def __init__(self, cache_dir: str, header_map: Dict, encoding: str = 'utf-8-sig',
+                 calculate_avg_grades: bool = False, max_size_mb: int = DEFAULT_CACHE_SIZE_MB):
+        """
+        Inicializa la caché (el directorio se crea al guardar la primera entrada).
+        
+        Args:
+            cache_dir: Directorio de la caché (ej: outputs/.cache)
+            header_map: Mapeo de nombres de columnas
+            encoding: Encoding de los archivos CSV
+            calculate_avg_grades: Si False, filtra la fila "Promedio general" de Moodle
+            max_size_mb: Tamaño máximo de la caché en MB
+        """
+        self.cache_dir = cache_dir
+        self.header_map = header_map
+        self.encoding = encoding
+        self.calculate_avg_grades = calculate_avg_grades
+        self.max_bytes = max_size_mb * 1024 * 1024
+        self.config_key = config_fingerprint({
+            "format": CACHE_FORMAT,
+            "header_map": header_map,
+            "encoding": encoding,
+            "calculate_avg_grades": calculate_avg_grades,
+        })
+        self.hits = 0
+        self.misses = 0
+    
+    def load(self, file_path: str) -> ParsedExport:
+        """
+        Retorna el export interpretado, desde la caché si la entrada es válida.
+        
+        Args:
+            file_path: Ruta al archivo CSV
+        
+        Returns:
+            ParsedExport del archivo
+        
+        Raises:
+            ValueError: Si el archivo está vacío o no tiene headers
+            KeyError: Si no se encuentran las columnas de ID o calificación
+        """
+        entry_path = self.entry_path(file_path)
+        stat = os.stat(file_path)
+        
+        parsed = self._read_entry(entry_path, file_path, stat)
+        if parsed is not None:
+            self.hits += 1
+            return parsed
+        
+        self.misses += 1
+        parsed, digest = parse_export(file_path, self.header_map, self.encoding, self.calculate_avg_grades)
+        self._write_entry(entry_path, parsed, stat, digest)
+        return parsed
+    
+    def entry_path(self, file_path: str) -> str:
+        """Ruta de la entrada de un export (depende de su ruta y de la configuración)."""
+        key = hashlib.sha256(f"{os.path.abspath(file_path)}\n{self.config_key}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key[:32]}.bin")
+    
+    def _read_entry(self, entry_path: str, file_path: str, stat: os.stat_result) -> Optional[ParsedExport]:
+        """
+        Carga una entrada si existe y corresponde al contenido actual del export.
+        
+        Returns:
+            ParsedExport, o None si no hay entrada válida
+        """
+        try:
+            with open(entry_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < _HEADER.size:
+            return None
+        
+        magic, version, byte_order, size, mtime_ns, digest, count, meta_len, ids_len = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != CACHE_FORMAT or byte_order != _BYTE_ORDER or size != stat.st_size:
+            return None
+        if len(data) != _HEADER.size + meta_len + ids_len + count * 20:
+            return None
+        if mtime_ns != stat.st_mtime_ns:
+            # Se tocó el archivo: sigue siendo válida si el contenido es el mismo
+            if bytes.fromhex(file_sha256(file_path)) != digest:
+                return None
+            data = bytearray(data)
+            struct.pack_into("<q", data, _MTIME_OFFSET, stat.st_mtime_ns)
+            self._replace(entry_path, bytes(data))
+        
+        view = memoryview(data)
+        offset = _HEADER.size
+        meta = json.loads(bytes(view[offset:offset + meta_len]).decode('utf-8'))
+        offset += meta_len
+        ids_text = bytes(view[offset:offset + ids_len]).decode('utf-8')
+        offset += ids_len
+        
+        parsed = ParsedExport(file_path, self.encoding, meta["fieldnames"], meta["grade_col"])
+        parsed.ids = ids_text.split(_ID_SEPARATOR) if count else []
+        parsed.grades.frombytes(view[offset:offset + count * 8])
+        offset += count * 8
+        parsed.offsets.frombytes(view[offset:offset + count * 8])
+        offset += count * 8
+        parsed.lengths.frombytes(view[offset:offset + count * 4])
+        parsed.invalid = [tuple(issue) for issue in meta["invalid"]]
+        parsed.source = SourceFingerprint.from_stat(file_path, stat, digest.hex())
+        
+        # Marcar la entrada como usada recientemente (orden LRU)
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+        return parsed
+    
+    def _write_entry(self, entry_path: str, parsed: ParsedExport, stat: os.stat_result, digest: bytes):
+        """Guarda una entrada y aplica el presupuesto de tamaño de la caché."""
+        if any(_ID_SEPARATOR in student_id for student_id in parsed.ids):
+            # Un ID con el separador no se podría recuperar: no se guarda en caché
+            return
+        
+        meta = json.dumps({
+            "fieldnames": parsed.fieldnames,
+            "grade_col": parsed.grade_col,
+            "invalid": parsed.invalid,
+        }, ensure_ascii=False).encode('utf-8')
+        ids = _ID_SEPARATOR.join(parsed.ids).encode('utf-8')
+        header = _HEADER.pack(_MAGIC, CACHE_FORMAT, _BYTE_ORDER, stat.st_size, stat.st_mtime_ns, digest,
+                              len(parsed.ids), len(meta), len(ids))
+        data = b"".join([header, meta, ids, parsed.grades.tobytes(), parsed.offsets.tobytes(), parsed.lengths.tobytes()])
+        if len(data) > self.max_bytes:
+            return
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._replace(entry_path, data)
+        self._evict()
+    
+    def _replace(self, entry_path: str, data: bytes):
+        """Escribe una entrada de forma atómica (otro proceso nunca la ve a medias)."""
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        except OSError:
+            # Sin permisos de escritura: la caché simplemente no se actualiza
+            return
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, entry_path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    def _evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta respetar el presupuesto."""
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir) as scan:
+            for entry in scan:
+                if not entry.name.endswith(".bin"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime_ns, entry.path, stat.st_size))
+                total += stat.st_size
+        
+        for _, path, size in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+
+def create_parse_cache(settings) -> Optional[ParseCache]:
+    """
+    Crea la caché de exports configurada.
+    
+    Args:
+        settings: Instancia de Settings
+    
+    Returns:
+        ParseCache en <output_dir>/.cache, o None si la caché está desactivada
+    """
+    if not settings.parse_cache:
+        return None
+    return ParseCache(
+        os.path.join(settings.output_dir, CACHE_DIR_NAME),
+        settings.header_map,
+        settings.csv_encoding,
+        settings.calculate_avg_grades,
+        settings.parse_cache_size_mb
+    )
@@ -0,0 +1,286 @@
+"""
+Módulo con los perfiles de CPU y de memoria por curso.
+
+Con `acocalculator --profile ...` cada curso se ejecuta bajo cProfile y se
+guardan en outputs/<curso>/ el perfil completo (profile.pstats, para abrir con
+pstats o snakeviz) y un resumen con las funciones de mayor tiempo acumulado
+(profile.txt). Con `--memprofile` se sigue la memoria con tracemalloc y se
+guarda en memprofile.txt qué líneas de csv_helpers.py, file_consolidator.py y
+los managers tenían más memoria reservada en el momento de mayor uso.
+
+Los perfiles se toman en el proceso que procesa el curso: con
+evaluation_workers > 1 el trabajo de cada evaluación ocurre en otros procesos
+y el perfil sólo muestra la espera, por lo que conviene perfilar con
+evaluation_workers = 1. Conviene además usar --profile y --memprofile por
+separado: tracemalloc multiplica los tiempos y el hilo que sigue la memoria
+aparece en el perfil de CPU.
+"""
+import cProfile
+import io
+import linecache
+import os
+import pstats
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+PROFILE_FILE = "profile.pstats"
+PROFILE_SUMMARY_FILE = "profile.txt"
+MEMPROFILE_FILE = "memprofile.txt"
+DEFAULT_TOP = 30
+
+# Archivos cuyas líneas se informan en el perfil de memoria
+MEMPROFILE_SOURCES = (
+    os.path.join("utils", "csv_helpers.py"),
+    os.path.join("utils", "file_consolidator.py"),
+    os.path.join("managers", ""),
+)
+
+# Frames guardados por reserva: alcanza para llegar desde el módulo csv
+# hasta la línea de csv_helpers.py o de los managers que la originó. Cada
+# frame extra encarece el seguimiento, que ya hace la ejecución varias veces
+# más lenta.
+TRACEBACK_FRAMES = 10
+
+
+@dataclass(frozen=True)
+class ProfileOptions:
+    """
+    Perfiles a tomar en cada curso.
+    
+    Attributes:
+        cpu: Perfilar el tiempo de CPU con cProfile
+        memory: Seguir el pico de memoria con tracemalloc
+        top: Cantidad de funciones o líneas en los resúmenes de texto
+    """
+    cpu: bool = False
+    memory: bool = False
+    top: int = DEFAULT_TOP
+    
+    @property
+    def enabled(self) -> bool:
+        """True si se toma algún perfil."""
+        return self.cpu or self.memory
+
+
+@dataclass
+class LineAllocation:
+    """
+    Memoria reservada desde una línea de código.
+    
+    Attributes:
+        filename: Ruta del archivo
+        lineno: Número de línea
+        size: Bytes reservados
+        count: Cantidad de bloques reservados
+    """
+    filename: str
+    lineno: int
+    size: int = 0
+    count: int = 0
+
+
+class PeakSampler:
+    """
+    Guarda un snapshot de tracemalloc cerca del pico de memoria.
+    
+    tracemalloc informa el pico total pero no qué estaba reservado en ese
+    momento, así que un hilo revisa la memoria en uso cada `interval`
+    segundos y toma un snapshot nuevo cada vez que supera en más de un 10%
+    la del snapshot anterior.
+    """
+    
+    def __init__(self, interval: float = 0.05, frames: int = TRACEBACK_FRAMES):
+        """
+        Inicializa el muestreador.
+        
+        Args:
+            interval: Segundos entre revisiones de la memoria en uso
+            frames: Frames guardados por cada reserva
+        """
+        self.interval = interval
+        self.frames = frames
+        self.snapshot: Optional[tracemalloc.Snapshot] = None
+        self.snapshot_size = 0
+        self.peak = 0
+        self._was_tracing = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Empieza a seguir la memoria."""
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start(self.frames)
+        tracemalloc.reset_peak()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="acocalculator-memprofile", daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """Deja de seguir la memoria (toma un último snapshot si corresponde)."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._sample()
+        self.peak = tracemalloc.get_traced_memory()[1]
+        if not self._was_tracing:
+            tracemalloc.stop()
+    
+    def _run(self):
+        """Revisa la memoria en uso hasta que se llame a stop()."""
+        while not self._stop.wait(self.interval):
+            self._sample()
+    
+    def _sample(self):
+        """Toma un snapshot si la memoria en uso superó la del anterior."""
+        current = tracemalloc.get_traced_memory()[0]
+        if self.snapshot is None or current > self.snapshot_size * 1.10:
+            self.snapshot = tracemalloc.take_snapshot()
+            self.snapshot_size = current
+
+
+def allocations_by_line(snapshot: tracemalloc.Snapshot,
+                        sources: Tuple[str, ...] = MEMPROFILE_SOURCES) -> List[LineAllocation]:
+    """
+    Agrupa la memoria de un snapshot por la línea de los archivos indicados.
+    
+    Cada reserva se atribuye a la llamada más interna que pasa por alguno de
+    los archivos: una fila leída por el módulo csv queda en la línea de
+    csv_helpers.py que llamó al lector.
+    
+    Args:
+        snapshot: Snapshot de tracemalloc
+        sources: Fragmentos de ruta de los archivos a informar
+    
+    Returns:
+        Lista de LineAllocation ordenada de mayor a menor memoria
+    """
+    matches: Dict[str, bool] = {}
+    lines: Dict[Tuple[str, int], LineAllocation] = {}
+    for trace in snapshot.traces:
+        # Los frames van del más externo al más interno
+        for frame in reversed(trace.traceback):
+            matched = matches.get(frame.filename)
+            if matched is None:
+                matched = matches[frame.filename] = any(source in frame.filename for source in sources)
+            if matched:
+                key = (frame.filename, frame.lineno)
+                if key not in lines:
+                    lines[key] = LineAllocation(frame.filename, frame.lineno)
+                lines[key].size += trace.size
+                lines[key].count += 1
+                break
+    return sorted(lines.values(), key=lambda item: item.size, reverse=True)
+
+
+def write_cpu_profile(profiler: cProfile.Profile, course_dir: str, top: int = DEFAULT_TOP) -> str:
+    """
+    Guarda el perfil de CPU y su resumen de texto.
+    
+    Args:
+        profiler: Perfil ya detenido
+        course_dir: Carpeta del curso en el directorio de salida
+        top: Cantidad de funciones del resumen
+    
+    Returns:
+        Ruta del archivo .pstats
+    """
+    stats_file = os.path.join(course_dir, PROFILE_FILE)
+    profiler.dump_stats(stats_file)
+    
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    with open(os.path.join(course_dir, PROFILE_SUMMARY_FILE), 'w', encoding='utf-8') as f:
+        f.write(f"Funciones con mayor tiempo acumulado (top {top})\n")
+        f.write(buffer.getvalue())
+    return stats_file
+
+
+def write_memory_profile(sampler: PeakSampler, course_dir: str, top: int = DEFAULT_TOP) -> str:
+    """
+    Guarda el resumen de memoria por línea tomado en el pico.
+    
+    Args:
+        sampler: Muestreador ya detenido
+        course_dir: Carpeta del curso en el directorio de salida
+        top: Cantidad de líneas del resumen
+    
+    Returns:
+        Ruta del resumen
+    """
+    lines = allocations_by_line(sampler.snapshot) if sampler.snapshot is not None else []
+    summary_file = os.path.join(course_dir, MEMPROFILE_FILE)
+    with open(summary_file, 'w', encoding='utf-8') as f:
+        f.write(f"Pico de memoria: {_megabytes(sampler.peak)} "
+                f"(snapshot con {_megabytes(sampler.snapshot_size)} en uso)\n")
+        f.write(f"Líneas con más memoria en el snapshot (top {top}):\n\n")
+        for position, item in enumerate(lines[:top], start=1):
+            f.write(f"{position:>3}. {_megabytes(item.size):>10} {item.count:>10,} bloques  "
+                    f"{_short_path(item.filename)}:{item.lineno}\n")
+            source = linecache.getline(item.filename, item.lineno).strip()
+            if source:
+                f.write(f"       {source}\n")
+        if not lines:
+            f.write("Sin memoria reservada desde los archivos seguidos.\n")
+    return summary_file
+
+
+@contextmanager
+def profile_course(output_dir: str, course: str, options: Optional[ProfileOptions]) -> Iterator[None]:
+    """
+    Perfila un bloque de código como la ejecución de un curso.
+    
+    Args:
+        output_dir: Directorio de salida (los perfiles van en <output_dir>/<curso>/)
+        course: Código del curso (ej: "1K2")
+        options: Perfiles a tomar (None o sin perfiles: no se hace nada)
+    
+    Yields:
+        None
+    """
+    if options is None or not options.enabled:
+        yield
+        return
+    
+    sampler = PeakSampler() if options.memory else None
+    profiler = cProfile.Profile() if options.cpu else None
+    if sampler is not None:
+        sampler.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        if sampler is not None:
+            sampler.stop()
+        
+        course_dir = os.path.join(output_dir, course.upper())
+        try:
+            os.makedirs(course_dir, exist_ok=True)
+            if profiler is not None:
+                print(f"🔬 Perfil de CPU guardado en {write_cpu_profile(profiler, course_dir, options.top)}")
+            if sampler is not None:
+                print(f"🧠 Perfil de memoria guardado en {write_memory_profile(sampler, course_dir, options.top)}")
+        except OSError as e:
+            # Un perfil que no se puede guardar no debe hacer fallar el curso
+            print(f"⚠️ No se pudieron guardar los perfiles de {course.upper()}: {e}")
+
+
+def _megabytes(size: int) -> str:
+    """Formatea una cantidad de bytes en MB."""
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def _short_path(filename: str) -> str:
+    """Acorta la ruta de un archivo del paquete a partir de src/."""
+    marker = os.sep + "src" + os.sep
+    index = filename.rfind(marker)
+    return filename[index + 1:] if index >= 0 else filename
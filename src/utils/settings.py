@@ -0,0 +1,166 @@
+"""
+Módulo con la configuración compilada e inmutable del sistema.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+from .grade_conversion import DEFAULT_CONVERSION_TABLE, GradeConversionTable
+
+
+# Formatos de la columna de calificación que exporta Moodle (escala 0-10 y 0-100)
+GRADE_HEADERS = ("Calificación/10,00", "Calificación/100,00", "Calificación/10.00", "Calificación/100.00")
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Foto inmutable de la configuración, compilada una sola vez desde ConfigLoader.
+    
+    Los headers se guardan ya separados y sin espacios, y la tabla de conversión
+    ya compilada. Construirla no imprime ni escribe archivos, y sólo contiene
+    tipos simples, por lo que se puede enviar barata a procesos hijos.
+    
+    Attributes:
+        config_path: Ruta del archivo de configuración del que se leyó
+        source_dir: Directorio de entrada
+        output_dir: Directorio de salida
+        header_apellido: Headers posibles para el apellido, en orden de prioridad
+        header_nombre: Headers posibles para el nombre
+        header_id: Headers posibles para el ID
+        header_nota: Headers posibles para la calificación
+        cantidad_tps: Cantidad de TPs
+        tp_prefix: Prefijo de los archivos de TPs
+        cantidad_parciales: Cantidad de parciales
+        cantidad_recuperatorios: Cantidad de recuperatorios
+        parcial_prefix: Prefijo de los archivos de parciales
+        recuperatorio_prefix: Prefijo de los archivos de recuperatorios
+        csv_encoding: Encoding de los CSV
+        output_format: Formato de la planilla final
+        calculate_avg_grades: Mantener la fila "Promedio general" de Moodle
+        write_intermediate_files: Escribir los CSV unificados intermedios
+        max_workers: Procesos para generar varios cursos (0 = automático)
+        incremental: Reutilizar los archivos generados cuyas fuentes no cambiaron
+        engine: Motor para calcular mejores notas
+        attempt_store: Ruta de la base SQLite de intentos ("" = leer los CSV directamente)
+        parse_cache: Guardar en caché (outputs/.cache) los exports ya interpretados
+        parse_cache_size_mb: Tamaño máximo de la caché de exports en MB
+        parse_workers: Procesos para leer por partes un export grande (1 = no dividir, 0 = automático)
+        shift_workers: Hilos o procesos para leer a la vez los turnos de una evaluación (1 = de a uno, 0 = automático)
+        shift_pool: Tipo de pool para leer los turnos ("thread" o "process")
+        evaluation_workers: Procesos para calcular a la vez las evaluaciones de un curso (1 = de a una, 0 = automático)
+        conversion_table: Tabla de conversión de notas compilada
+    """
+    config_path: str = "config.ini"
+    source_dir: str = "inputs"
+    output_dir: str = "outputs"
+    header_apellido: Tuple[str, ...] = ("Apellido(s)", "Apellidos", "Last Name")
+    header_nombre: Tuple[str, ...] = ("Nombre", "First Name")
+    header_id: Tuple[str, ...] = ("Número de ID", "ID")
+    header_nota: Tuple[str, ...] = GRADE_HEADERS
+    cantidad_tps: int = 4
+    tp_prefix: str = "TP"
+    cantidad_parciales: int = 2
+    cantidad_recuperatorios: int = 2
+    parcial_prefix: str = "Parcial"
+    recuperatorio_prefix: str = "Recuperatorio"
+    csv_encoding: str = "utf-8-sig"
+    output_format: str = "xls"
+    calculate_avg_grades: bool = False
+    write_intermediate_files: bool = True
+    max_workers: int = 0
+    incremental: bool = False
+    engine: str = "python"
+    attempt_store: str = ""
+    parse_cache: bool = False
+    parse_cache_size_mb: int = 256
+    parse_workers: int = 1
+    shift_workers: int = 1
+    shift_pool: str = "thread"
+    evaluation_workers: int = 1
+    conversion_table: GradeConversionTable = DEFAULT_CONVERSION_TABLE
+    
+    @classmethod
+    def from_config(cls, config) -> 'Settings':
+        """
+        Compila la configuración de un ConfigLoader.
+        
+        Args:
+            config: Instancia de ConfigLoader
+        
+        Returns:
+            Settings con todos los valores ya interpretados
+        """
+        header_map = config.get_header_map()
+        return cls(
+            config_path=config.config_path,
+            source_dir=config.get_source_dir(),
+            output_dir=config.get_output_dir(),
+            header_apellido=tuple(header_map["apellido"]),
+            header_nombre=tuple(header_map["nombre"]),
+            header_id=tuple(header_map["id"]),
+            header_nota=tuple(header_map["nota"]),
+            cantidad_tps=config.get_cantidad_tps(),
+            tp_prefix=config.get_tp_prefix(),
+            cantidad_parciales=config.get_cantidad_parciales(),
+            cantidad_recuperatorios=config.get_cantidad_recuperatorios(),
+            parcial_prefix=config.get_parcial_prefix(),
+            recuperatorio_prefix=config.get_recuperatorio_prefix(),
+            csv_encoding=config.get_csv_encoding(),
+            output_format=config.get_output_format(),
+            calculate_avg_grades=config.get_calculate_avg_grades(),
+            write_intermediate_files=config.get_write_intermediate_files(),
+            max_workers=config.get_max_workers(),
+            incremental=config.get_incremental(),
+            engine=config.get_engine(),
+            attempt_store=config.get_attempt_store(),
+            parse_cache=config.get_parse_cache(),
+            parse_cache_size_mb=config.get_parse_cache_size_mb(),
+            parse_workers=config.get_parse_workers(),
+            shift_workers=config.get_shift_workers(),
+            shift_pool=config.get_shift_pool(),
+            evaluation_workers=config.get_evaluation_workers(),
+            conversion_table=config.get_conversion_table(),
+        )
+    
+    @classmethod
+    def from_file(cls, config_path: str = "config.ini") -> 'Settings':
+        """
+        Lee y compila un archivo de configuración sin mostrar mensajes ni crear archivos.
+        
+        Args:
+            config_path: Ruta al archivo de configuración (si no existe, se usan los valores por defecto)
+        
+        Returns:
+            Settings compilada
+        """
+        from .config_loader import ConfigLoader
+        return ConfigLoader(config_path, quiet=True).get_settings()
+    
+    @property
+    def header_map(self) -> Dict[str, List[str]]:
+        """Mapeo de encabezados en el formato que usan los helpers de CSV."""
+        return {
+            "apellido": list(self.header_apellido),
+            "nombre": list(self.header_nombre),
+            "id": list(self.header_id),
+            "nota": list(self.header_nota),
+        }
+    
+    @property
+    def evaluation_prefixes(self) -> List[str]:
+        """Prefijos de todos los tipos de evaluación (TPs, parciales y recuperatorios)."""
+        return [self.tp_prefix, self.parcial_prefix, self.recuperatorio_prefix]
+
+
+def as_settings(config: Union['Settings', object]) -> Settings:
+    """
+    Retorna la configuración compilada de un ConfigLoader, o el mismo Settings.
+    
+    Args:
+        config: Instancia de ConfigLoader o de Settings
+    
+    Returns:
+        Instancia de Settings
+    """
+    if isinstance(config, Settings):
+        return config
+    return config.get_settings()
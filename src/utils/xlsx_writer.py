@@ -0,0 +1,361 @@
+"""
+Módulo para escribir planillas XLSX en streaming usando sólo la biblioteca estándar.
+
+Un .xlsx es un zip con archivos XML (SpreadsheetML). Las filas se escriben en
+la entrada del zip de su hoja a medida que se producen (en bloques de pocas
+filas), por lo que la memoria no crece con la cantidad de filas. Los textos se escriben como
+"inline strings" para no tener que acumular una tabla de textos compartidos.
+
+La planilla se escribe en <ruta>.tmp y sólo reemplaza a la ruta final al
+cerrarse sin errores, así una corrida interrumpida no deja un .xlsx roto.
+"""
+import math
+import os
+import re
+import zipfile
+from typing import Iterable, List, Optional
+from xml.sax.saxutils import escape, quoteattr
+
+
+# Límites del formato XLSX
+XLSX_MAX_ROWS = 1_048_576
+XLSX_MAX_COLUMNS = 16_384
+XLSX_MAX_SHEET_NAME = 31
+
+# Filas que se acumulan antes de escribirlas en el zip
+FLUSH_ROWS = 256
+
+# Nivel de compresión del zip: el XML de las hojas es muy repetitivo, y el
+# nivel 1 comprime casi igual que el 6 en una fracción del tiempo
+ZIP_COMPRESSLEVEL = 1
+
+# Las notas, intentos y "FALTA" se repiten en casi todas las filas: el XML de
+# cada valor se arma una sola vez; el límite evita que nombres e IDs (únicos)
+# hagan crecer la caché sin fin
+MAX_CACHED_CELLS = 65536
+
+# Estilos definidos en styles.xml (índice de cellXfs)
+STYLE_DEFAULT = 0
+STYLE_HEADER = 1
+
+# Caracteres de control que XML 1.0 no admite
+_ILLEGAL_XML_CHARS = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+_INVALID_SHEET_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+_SHEET_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<sheetData>'
+)
+_SHEET_FOOTER = '</sheetData></worksheet>'
+
+_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1">'
+    '<alignment horizontal="center"/></xf></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+
+
+_cell_cache = {}
+
+
+def _cell_body(value) -> str:
+    """
+    Arma el XML de una celda a partir de su tipo, sin la referencia ni el estilo.
+    
+    Args:
+        value: Valor de la celda
+    
+    Returns:
+        Resto del elemento <c> (tipo y valor), o "" si la celda queda vacía
+    """
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f' t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and math.isfinite(value):
+        return f'><v>{value!r}</v></c>'
+    text = _ILLEGAL_XML_CHARS.sub("", str(value))
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f' t="inlineStr"><is><t{space}>{escape(text)}</t></is></c>'
+
+
+def column_letter(index: int) -> str:
+    """
+    Convierte un índice de columna (desde 0) a su letra de Excel.
+    
+    Args:
+        index: Índice de la columna (0 = A, 26 = AA)
+    
+    Returns:
+        Letras de la columna
+    """
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+class XlsxSheet:
+    """
+    Hoja de una planilla XLSX que se escribe fila por fila.
+    
+    Se obtiene con XlsxWriter.add_sheet; sólo la última hoja agregada admite filas.
+    """
+    
+    def __init__(self, stream, name: str):
+        """
+        Abre la hoja sobre la entrada del zip.
+        
+        Args:
+            stream: Entrada del zip abierta en modo escritura
+            name: Nombre visible de la hoja
+        """
+        self.name = name
+        self.row_count = 0
+        self._stream = stream
+        self._columns: List[str] = []
+        self._pending: List[str] = [_SHEET_HEADER]
+    
+    def write_row(self, values: Iterable, style: int = STYLE_DEFAULT):
+        """
+        Agrega una fila al final de la hoja.
+        
+        Los números se escriben como números, los textos como texto y las
+        celdas None o "" quedan vacías.
+        
+        Args:
+            values: Valores de la fila
+            style: STYLE_DEFAULT o STYLE_HEADER (negrita y centrado)
+        
+        Raises:
+            ValueError: Si se supera el límite de filas o columnas de XLSX
+            RuntimeError: Si la hoja ya fue cerrada
+        """
+        if self._stream is None:
+            raise RuntimeError(f"La hoja '{self.name}' ya fue cerrada")
+        if self.row_count >= XLSX_MAX_ROWS:
+            raise ValueError(f"La hoja '{self.name}' supera el límite de {XLSX_MAX_ROWS} filas de XLSX")
+        
+        self.row_count += 1
+        row_number = str(self.row_count)
+        style_attr = f' s="{style}"' if style else ""
+        values = values if isinstance(values, (list, tuple)) else list(values)
+        columns = self._columns
+        if len(values) > len(columns):
+            if len(values) > XLSX_MAX_COLUMNS:
+                raise ValueError(f"La hoja '{self.name}' supera el límite de {XLSX_MAX_COLUMNS} columnas de XLSX")
+            columns.extend(column_letter(i) for i in range(len(columns), len(values)))
+        
+        cache = _cell_cache
+        parts = [f'<row r="{row_number}">']
+        append = parts.append
+        for column, value in zip(columns, values):
+            cls = value.__class__
+            # Sólo se cachean tipos simples (True == 1 no debe compartir entrada con 1)
+            cacheable = cls is str or cls is float or cls is int
+            body = cache.get(value) if cacheable else None
+            if body is None:
+                body = _cell_body(value)
+                if cacheable and len(cache) < MAX_CACHED_CELLS:
+                    cache[value] = body
+            if body:
+                append(f'<c r="{column}{row_number}"{style_attr}{body}')
+        
+        append('</row>')
+        self._pending.append("".join(parts))
+        if len(self._pending) >= FLUSH_ROWS:
+            self._flush()
+    
+    def write_rows(self, rows: Iterable[Iterable], style: int = STYLE_DEFAULT):
+        """
+        Agrega varias filas, consumiendo el iterable de a una.
+        
+        Args:
+            rows: Filas a escribir (puede ser un generador)
+            style: Estilo de las celdas
+        """
+        for values in rows:
+            self.write_row(values, style)
+    
+    def close(self):
+        """Cierra la hoja; no admite más filas."""
+        if self._stream is not None:
+            self._pending.append(_SHEET_FOOTER)
+            self._flush()
+            self._stream.close()
+            self._stream = None
+    
+    def _flush(self):
+        """Escribe en el zip las filas acumuladas."""
+        self._stream.write("".join(self._pending).encode("utf-8"))
+        self._pending = []
+
+
+class XlsxWriter:
+    """
+    Planilla XLSX escrita en streaming.
+    
+    Las hojas se escriben de a una y en orden: agregar una hoja cierra la
+    anterior. Los archivos del libro (workbook.xml, estilos, relaciones) se
+    escriben al cerrar, cuando ya se conocen todas las hojas. Si el bloque
+    with termina con una excepción se descarta el archivo temporal.
+    
+    Ejemplo:
+        with XlsxWriter("Planilla.xlsx") as workbook:
+            sheet = workbook.add_sheet("Notas 1K2")
+            sheet.write_row(["Apellido(s)", "Nombre"], STYLE_HEADER)
+            sheet.write_rows(rows)
+    """
+    
+    def __init__(self, file_path: str):
+        """
+        Crea el archivo temporal de salida.
+        
+        Args:
+            file_path: Ruta de la planilla a generar
+        """
+        self.file_path = file_path
+        self._tmp_path = file_path + ".tmp"
+        self._zip = zipfile.ZipFile(
+            self._tmp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL
+        )
+        self._sheet_names: List[str] = []
+        self._current: Optional[XlsxSheet] = None
+    
+    def add_sheet(self, name: str) -> XlsxSheet:
+        """
+        Agrega una hoja nueva, cerrando la anterior.
+        
+        Args:
+            name: Nombre de la hoja (se recorta a 31 caracteres y sin caracteres inválidos)
+        
+        Returns:
+            Hoja lista para escribir filas
+        
+        Raises:
+            ValueError: Si ya existe una hoja con ese nombre
+        """
+        name = _INVALID_SHEET_CHARS.sub("_", name)[:XLSX_MAX_SHEET_NAME] or f"Hoja{len(self._sheet_names) + 1}"
+        if name.lower() in (existing.lower() for existing in self._sheet_names):
+            raise ValueError(f"Ya existe una hoja llamada '{name}'")
+        
+        if self._current is not None:
+            self._current.close()
+        self._sheet_names.append(name)
+        stream = self._zip.open(f"xl/worksheets/sheet{len(self._sheet_names)}.xml", "w", force_zip64=True)
+        self._current = XlsxSheet(stream, name)
+        return self._current
+    
+    def close(self):
+        """Cierra la última hoja, escribe los archivos del libro y lo mueve a file_path."""
+        if self._zip is None:
+            return
+        if self._current is not None:
+            self._current.close()
+        if not self._sheet_names:
+            # Un libro sin hojas no es válido para Excel
+            self.add_sheet("Hoja1").close()
+        
+        count = len(self._sheet_names)
+        self._zip.writestr("[Content_Types].xml", self._content_types(count))
+        self._zip.writestr("_rels/.rels", _ROOT_RELS)
+        self._zip.writestr("xl/workbook.xml", self._workbook())
+        self._zip.writestr("xl/_rels/workbook.xml.rels", self._workbook_rels(count))
+        self._zip.writestr("xl/styles.xml", _STYLES)
+        self._zip.close()
+        self._zip = None
+        os.replace(self._tmp_path, self.file_path)
+    
+    def abort(self):
+        """Descarta la planilla: cierra el zip y borra el archivo temporal."""
+        if self._zip is None:
+            return
+        try:
+            if self._current is not None and self._current._stream is not None:
+                self._current._stream.close()
+                self._current._stream = None
+            self._zip.close()
+        finally:
+            self._zip = None
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def _workbook(self) -> str:
+        """Arma xl/workbook.xml con la lista de hojas."""
+        sheets = "".join(
+            f'<sheet name={quoteattr(name)} sheetId="{i}" r:id="rId{i}"/>'
+            for i, name in enumerate(self._sheet_names, start=1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        )
+    
+    @staticmethod
+    def _workbook_rels(count: int) -> str:
+        """Arma xl/_rels/workbook.xml.rels (hojas y estilos)."""
+        sheets = "".join(
+            f'<Relationship Id="rId{i}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+            f'Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, count + 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{sheets}<Relationship Id="rId{count + 1}" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+            'Target="styles.xml"/></Relationships>'
+        )
+    
+    @staticmethod
+    def _content_types(count: int) -> str:
+        """Arma [Content_Types].xml."""
+        sheets = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+            for i in range(1, count + 1)
+        )
+        return (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            '<Override PartName="/xl/styles.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+            f'{sheets}</Types>'
+        )
@@ -3,11 +3,14 @@ Factories para generar datos de prueba.
 """
 from .student_factory import StudentFactory, StudentRecordFactory
 from .csv_factory import CSVFileFactory, MoodleGradeFactory
+from .xlsx_reader import read_sheet, sheet_names
 
 __all__ = [
     'StudentFactory',
     'StudentRecordFactory',
     'CSVFileFactory',
     'MoodleGradeFactory',
+    'read_sheet',
+    'sheet_names',
 ]
 
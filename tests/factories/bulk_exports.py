@@ -0,0 +1,302 @@
+"""
+Generador masivo de exports de Moodle para pruebas de carga.
+
+A diferencia de CSVFileFactory, que llama a Faker por cada fila, los nombres
+se generan una sola vez en un NamePool y las notas, intentos y respuestas se
+eligen con random.choices sobre tablas precalculadas. Las filas se arman como
+texto y se escriben en tandas, así que un cuatrimestre de varios millones de
+intentos se genera en segundos y es reproducible con la misma semilla.
+
+Uso desde la línea de comandos:
+    python -m tests.factories.bulk_exports --courses 4 --students 2000 --output inputs_carga
+"""
+import argparse
+import os
+import random
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+from faker import Faker
+
+
+# Columnas de un export de Moodle antes de la calificación
+BASE_COLUMNS = ["Apellido(s)", "Nombre", "Número de ID", "Dirección de correo", "Estado"]
+
+# Nota vacía que Moodle exporta para los intentos sin calificar
+EMPTY_GRADE = "-"
+
+# Filas distintas de respuestas por export y filas por escritura
+ANSWER_VARIANTS = 256
+WRITE_BATCH = 50_000
+
+
+@dataclass
+class TermSpec:
+    """
+    Forma de los exports de un cuatrimestre sintético.
+    
+    Attributes:
+        courses: Códigos de los cursos (ej: ["1K1", "1K2"])
+        students: Alumnos por curso
+        tps: TPs por curso
+        exams: Parciales por curso
+        makeups: Recuperatorios por curso
+        shifts: Archivos (turnos) por evaluación; cada alumno rinde en uno
+        attempt_weights: Peso de tener 1, 2, 3... intentos en una evaluación
+        participation: Probabilidad de que un alumno rinda cada evaluación
+        missing_rate: Probabilidad de que un intento tenga nota "-"
+        scale_100_rate: Probabilidad de que una evaluación use la escala 0-100
+        average_rows: Si True, cada export termina con la fila "Promedio general"
+        questions: Columnas de preguntas ("P. 1 /1,00", ...) por export
+        name_pool: Cantidad de apellidos y de nombres distintos a combinar
+        encoding: Encoding de los archivos
+        seed: Semilla; con la misma semilla se generan los mismos archivos
+    """
+    courses: List[str] = field(default_factory=lambda: ["1K1"])
+    students: int = 1000
+    tps: int = 4
+    exams: int = 2
+    makeups: int = 2
+    shifts: int = 1
+    attempt_weights: Sequence[float] = (60, 25, 10, 5)
+    participation: float = 0.95
+    missing_rate: float = 0.02
+    scale_100_rate: float = 0.0
+    average_rows: bool = True
+    questions: int = 10
+    name_pool: int = 500
+    encoding: str = "utf-8-sig"
+    seed: int = 0
+    
+    def evaluations(self, course: str) -> List[str]:
+        """Nombres base de las evaluaciones de un curso (ej: "TP1_1K1")."""
+        names = [f"TP{i}" for i in range(1, self.tps + 1)]
+        names += [f"Parcial{i}" for i in range(1, self.exams + 1)]
+        names += [f"Recuperatorio{i}" for i in range(1, self.makeups + 1)]
+        return [f"{name}_{course}" for name in names]
+
+
+@dataclass
+class TermSummary:
+    """
+    Resultado de write_term.
+    
+    Attributes:
+        files: Rutas de los exports generados, en orden de escritura
+        rows: Intentos escritos (sin encabezados ni promedios)
+        bytes: Tamaño total de los exports
+    """
+    files: List[str] = field(default_factory=list)
+    rows: int = 0
+    bytes: int = 0
+
+
+class NamePool:
+    """Apellidos y nombres generados una sola vez con Faker y combinados al azar."""
+    
+    def __init__(self, size: int, seed: int):
+        """
+        Genera los apellidos y nombres del pool.
+        
+        Args:
+            size: Cantidad de apellidos y de nombres distintos
+            seed: Semilla de Faker
+        """
+        fake = Faker('es_ES')
+        fake.seed_instance(seed)
+        # Sin comas ni comillas, para poder armar las filas CSV sin escapar
+        self.last_names = [self._clean(fake.last_name()) for _ in range(size)]
+        self.first_names = [self._clean(fake.first_name()) for _ in range(size)]
+    
+    @staticmethod
+    def _clean(name: str) -> str:
+        return name.replace(",", "").replace('"', "")
+    
+    def sample(self, rnd: random.Random, count: int) -> List[Tuple[str, str]]:
+        """
+        Elige count pares (apellido(s), nombre).
+        
+        Args:
+            rnd: Generador aleatorio
+            count: Cantidad de pares
+        
+        Returns:
+            Lista de (apellido(s), nombre); los apellidos son dos del pool
+        """
+        first = rnd.choices(self.last_names, k=count)
+        second = rnd.choices(self.last_names, k=count)
+        names = rnd.choices(self.first_names, k=count)
+        return [(f"{a} {b}", name) for a, b, name in zip(first, second, names)]
+
+
+def _grade_table(scale: int) -> List[str]:
+    """Notas de 0 a la escala con 2 decimales, ya como celdas CSV ("7,50" entre comillas)."""
+    steps = scale * 100
+    return [f'"{value // 100},{value % 100:02d}"' for value in range(steps + 1)]
+
+
+def _course_students(spec: TermSpec, pool: NamePool, rnd: random.Random, course_index: int) -> List[Tuple[str, int]]:
+    """
+    Arma los alumnos de un curso como el comienzo de su fila CSV.
+    
+    Returns:
+        Lista de (columnas fijas terminadas en coma, turno)
+    """
+    first_id = 100000 + course_index * spec.students
+    students = []
+    for offset, (last_name, first_name) in enumerate(pool.sample(rnd, spec.students)):
+        student_id = first_id + offset
+        prefix = f"{last_name},{first_name},{student_id},{student_id}@example.com,Finalizado,"
+        students.append((prefix, offset % spec.shifts))
+    return students
+
+
+def _write_export(file_path: str, spec: TermSpec, rnd: random.Random, prefixes: List[str], scale: int) -> int:
+    """
+    Escribe un export con un intento por elemento de prefixes, en orden aleatorio.
+    
+    Returns:
+        Cantidad de intentos escritos
+    """
+    grades = _grade_table(scale) + [EMPTY_GRADE]
+    step = (1.0 - spec.missing_rate) / (len(grades) - 1)
+    cum_weights = [step * (i + 1) for i in range(len(grades) - 1)] + [1.0]
+    answers = [
+        "".join(f',"0,{rnd.randint(0, 99):02d}"' for _ in range(spec.questions))
+        for _ in range(ANSWER_VARIANTS)
+    ]
+    header = BASE_COLUMNS + [f"Calificación/{scale},00"] + [f"P. {i} /1,00" for i in range(1, spec.questions + 1)]
+    
+    rnd.shuffle(prefixes)
+    count = len(prefixes)
+    indices = rnd.choices(range(len(grades)), cum_weights=cum_weights, k=count)
+    answer_rows = rnd.choices(answers, k=count)
+    
+    with open(file_path, 'w', newline='', encoding=spec.encoding, buffering=1 << 20) as f:
+        f.write(",".join(f'"{column}"' if "," in column else column for column in header) + "\r\n")
+        for start in range(0, count, WRITE_BATCH):
+            end = min(start + WRITE_BATCH, count)
+            f.write("".join([
+                f"{prefixes[i]}{grades[indices[i]]}{answer_rows[i]}\r\n" for i in range(start, end)
+            ]))
+        
+        if spec.average_rows:
+            graded = [index for index in indices if index < len(grades) - 1]
+            average = sum(graded) / len(graded) / 100 if graded else 0.0
+            f.write(f'Promedio general,,,,,"{average:.2f}"'.replace(".", ",") + "," * spec.questions + "\r\n")
+    return count
+
+
+def write_term(spec: TermSpec, output_dir: str) -> TermSummary:
+    """
+    Escribe los exports de todas las evaluaciones de todos los cursos.
+    
+    Los archivos se llaman como los exporta la cátedra: "TP1_1K1.csv", o
+    "TP1_1K1_1.csv", "TP1_1K1_2.csv"... si hay varios turnos.
+    
+    Args:
+        spec: Forma del cuatrimestre
+        output_dir: Directorio donde escribir los CSV
+    
+    Returns:
+        TermSummary con los archivos, intentos y bytes generados
+    
+    Raises:
+        ValueError: Si la especificación no es válida
+    """
+    if spec.students < 1 or spec.shifts < 1 or not spec.attempt_weights or min(spec.attempt_weights) < 0:
+        raise ValueError("Se necesitan alumnos, turnos y pesos de intentos positivos")
+    if not 0 <= spec.missing_rate < 1 or not 0 <= spec.participation <= 1 or not 0 <= spec.scale_100_rate <= 1:
+        raise ValueError("Las probabilidades deben estar entre 0 y 1")
+    
+    os.makedirs(output_dir, exist_ok=True)
+    rnd = random.Random(spec.seed)
+    pool = NamePool(spec.name_pool, spec.seed)
+    attempt_counts = range(1, len(spec.attempt_weights) + 1)
+    summary = TermSummary()
+    
+    for course_index, course in enumerate(spec.courses):
+        students = _course_students(spec, pool, rnd, course_index)
+        for evaluation in spec.evaluations(course):
+            # Todos los turnos de una evaluación comparten la escala, como en Moodle
+            scale = 100 if rnd.random() < spec.scale_100_rate else 10
+            attempts = rnd.choices(attempt_counts, weights=spec.attempt_weights, k=len(students))
+            shifts: Dict[int, List[str]] = {shift: [] for shift in range(spec.shifts)}
+            for (prefix, shift), count in zip(students, attempts):
+                if rnd.random() < spec.participation:
+                    shifts[shift].extend([prefix] * count)
+            
+            for shift, prefixes in shifts.items():
+                suffix = f"_{shift + 1}" if spec.shifts > 1 else ""
+                file_path = os.path.join(output_dir, f"{evaluation}{suffix}.csv")
+                summary.rows += _write_export(file_path, spec, rnd, prefixes, scale)
+                summary.files.append(file_path)
+                summary.bytes += os.path.getsize(file_path)
+    return summary
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Construye el parser de argumentos del generador."""
+    parser = argparse.ArgumentParser(
+        prog="python -m tests.factories.bulk_exports",
+        description="Genera exports de Moodle sintéticos de un cuatrimestre completo para pruebas de carga.",
+    )
+    parser.add_argument("-o", "--output", required=True, metavar="DIR", help="Directorio donde escribir los CSV")
+    parser.add_argument("--courses", type=int, default=1, help="Cantidad de cursos (1K1, 1K2, ...)")
+    parser.add_argument("--students", type=int, default=1000, help="Alumnos por curso")
+    parser.add_argument("--tps", type=int, default=4, help="TPs por curso")
+    parser.add_argument("--parciales", type=int, default=2, help="Parciales por curso")
+    parser.add_argument("--recuperatorios", type=int, default=2, help="Recuperatorios por curso")
+    parser.add_argument("--shifts", type=int, default=1, help="Turnos (archivos) por evaluación")
+    parser.add_argument("--attempts", default="60,25,10,5", metavar="P1,P2,...",
+                        help="Pesos de tener 1, 2, 3... intentos (por defecto: 60,25,10,5)")
+    parser.add_argument("--participation", type=float, default=0.95, help="Probabilidad de rendir cada evaluación")
+    parser.add_argument("--missing", type=float, default=0.02, help='Probabilidad de una nota "-"')
+    parser.add_argument("--scale100", type=float, default=0.0, help="Probabilidad de que una evaluación use la escala 0-100")
+    parser.add_argument("--no-average", action="store_true", help='No agregar la fila "Promedio general"')
+    parser.add_argument("--questions", type=int, default=10, help="Columnas de preguntas por export")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla para reproducir los mismos archivos")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Genera un cuatrimestre desde la línea de comandos.
+    
+    Args:
+        argv: Argumentos (None = sys.argv)
+    
+    Returns:
+        Código de salida
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        weights = [float(weight) for weight in args.attempts.split(",")]
+        spec = TermSpec(
+            courses=[f"1K{i}" for i in range(1, args.courses + 1)],
+            students=args.students,
+            tps=args.tps,
+            exams=args.parciales,
+            makeups=args.recuperatorios,
+            shifts=args.shifts,
+            attempt_weights=weights,
+            participation=args.participation,
+            missing_rate=args.missing,
+            scale_100_rate=args.scale100,
+            average_rows=not args.no_average,
+            questions=args.questions,
+            seed=args.seed,
+        )
+        summary = write_term(spec, args.output)
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        return 2
+    
+    print(f"✅ {len(summary.files)} exports generados en {args.output}")
+    print(f"   Intentos: {summary.rows:,}")
+    print(f"   Tamaño: {summary.bytes / (1024 * 1024):.1f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,33 @@
+"""
+Exports de Moodle con intentos aleatorios reproducibles (para tests de equivalencia).
+"""
+import csv
+import random
+
+
+HEADER_MAP = {
+    "apellido": ["Apellido(s)"],
+    "nombre": ["Nombre"],
+    "id": ["Número de ID"],
+    "nota": ["Calificación/10,00", "Calificación/100,00"],
+}
+
+
+def write_export(file_path, rows, scale="10"):
+    """Escribe un export de Moodle con una columna extra de respuestas."""
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(["Apellido(s)", "Nombre", "Número de ID", f"Calificación/{scale},00", "P. 1 /1,00"])
+        writer.writerows(rows)
+
+
+def random_rows(seed, count, scale, decimals):
+    """Genera intentos aleatorios con alumnos repetidos y una fila de promedios."""
+    rnd = random.Random(seed)
+    rows = []
+    for _ in range(count):
+        student_id = str(rnd.randint(1, count // 4))
+        grade = rnd.randint(0, int(scale) * 10 ** decimals) / 10 ** decimals
+        rows.append([f"Ap{student_id}", "N", student_id, f"{grade:.{decimals}f}".replace(".", ","), "1,00"])
+    rows.append(["Promedio general", "", "", "5,00", ""])
+    return rows
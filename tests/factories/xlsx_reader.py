@@ -0,0 +1,33 @@
+"""
+Lectura mínima de planillas XLSX para verificar su contenido en los tests.
+"""
+import zipfile
+import xml.etree.ElementTree as ET
+
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+
+def read_sheet(file_path, index=1):
+    """Lee una hoja como lista de filas de (referencia, tipo, valor, estilo)."""
+    with zipfile.ZipFile(file_path) as z:
+        root = ET.fromstring(z.read(f"xl/worksheets/sheet{index}.xml"))
+    rows = []
+    for row in root.iterfind(".//m:row", NS):
+        cells = []
+        for cell in row.iterfind("m:c", NS):
+            kind = cell.get("t", "n")
+            if kind == "inlineStr":
+                value = cell.find("m:is/m:t", NS).text
+            else:
+                value = cell.find("m:v", NS).text
+            cells.append((cell.get("r"), kind, value, cell.get("s")))
+        rows.append(cells)
+    return rows
+
+
+def sheet_names(file_path):
+    """Retorna los nombres de las hojas del libro."""
+    with zipfile.ZipFile(file_path) as z:
+        root = ET.fromstring(z.read("xl/workbook.xml"))
+    return [sheet.get("name") for sheet in root.iterfind(".//m:sheet", NS)]
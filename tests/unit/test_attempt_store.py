@@ -0,0 +1,155 @@
+"""
+Tests unitarios para la base SQLite de intentos.
+"""
+import pytest
+import os
+import random
+from src.utils import Settings
+from src.utils.attempt_store import AttemptStore, evaluation_key
+from src.utils.csv_helpers import BestGradeAccumulator
+from src.utils.file_consolidator import FileConsolidator
+from src.managers import TPManager
+from tests.factories.random_exports import HEADER_MAP, random_rows, write_export
+
+
+def write_shifts(temp_dir, scale="10", decimals=2, count=400):
+    """Escribe dos turnos de un TP con alumnos repetidos entre ambos."""
+    files = []
+    for shift in (1, 2):
+        file_path = os.path.join(temp_dir, f"TP1_1K2_{shift}.csv")
+        write_export(file_path, random_rows(shift, count, scale, decimals), scale)
+        files.append(file_path)
+    return files
+
+
+@pytest.mark.unit
+class TestAttemptStore:
+    """Tests para AttemptStore."""
+    
+    @pytest.fixture
+    def store(self, temp_dir):
+        """Base de intentos en el directorio temporal."""
+        with AttemptStore(os.path.join(temp_dir, "db", "attempts.sqlite"), HEADER_MAP) as store:
+            yield store
+    
+    def test_evaluation_key(self):
+        """Debe obtener curso y evaluación del nombre, con o sin turno."""
+        assert evaluation_key("Tp1_1k2_3.csv") == ("1K2", "tp1")
+        assert evaluation_key("Parcial2_1K15") == ("1K15", "parcial2")
+        assert evaluation_key("notas.csv") == ("", "notas")
+    
+    @pytest.mark.parametrize("scale", ["10", "100"])
+    def test_mismo_resultado_que_acumulador(self, store, temp_dir, scale):
+        """Las consultas deben dar los mismos registros, intentos y orden que leer los CSV."""
+        files = write_shifts(temp_dir, scale)
+        expected = BestGradeAccumulator(HEADER_MAP)
+        for file_path in files:
+            expected.add_file(file_path)
+        
+        assert store.ingest(files) == 2
+        assert list(store.best_attempts("1K2", "TP1", files).items()) == list(expected.best_rows().items())
+        assert list(store.attempt_counts("1K2", "tp1", files).items()) == list(expected.attempts.items())
+        # Sin indicar archivos se usan todos los de la evaluación, en orden de turno
+        assert list(store.best_attempts("1k2", "tp1")) == list(expected.best_rows())
+    
+    def test_empates_al_redondear(self, store, temp_dir):
+        """Con más de 2 decimales debe elegir el mismo intento que el acumulador, y en el mismo orden."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        rnd = random.Random(3)
+        values = ["85,004", "85,001", "85,0049", "84,996", "85,006", "84,994", "-"]
+        rows = [["García", f"Intento {line}", "1", value, ""] for line, value in enumerate(values[:3])]
+        for line in range(600):
+            student_id = str(rnd.randint(2, 60))
+            rows.append([f"Ap{student_id}", f"Intento {line}", student_id, rnd.choice(values), ""])
+        write_export(file_path, rows, "100")
+        expected = BestGradeAccumulator(HEADER_MAP)
+        expected.add_file(file_path)
+        
+        store.ingest([file_path])
+        
+        assert store.best_attempts("1K2", "TP1")["1"]["Nombre"] == "Intento 2"
+        assert list(store.best_attempts("1K2", "TP1").items()) == list(expected.best_rows().items())
+    
+    def test_base_de_otra_version(self, temp_dir):
+        """Una base con otro esquema se vacía y los exports se vuelven a cargar."""
+        db_path = os.path.join(temp_dir, "attempts.sqlite")
+        files = write_shifts(temp_dir, count=40)
+        with AttemptStore(db_path, HEADER_MAP) as store:
+            store.ingest(files)
+            store.connection.execute("PRAGMA user_version = 0")
+        
+        with AttemptStore(db_path, HEADER_MAP) as store:
+            assert store.fieldnames(files[0]) is None
+            assert store.ingest(files) == 2
+    
+    def test_carga_incremental(self, store, temp_dir):
+        """Sólo debe volver a cargar los archivos que cambiaron."""
+        files = write_shifts(temp_dir)
+        assert store.ingest(files) == 2
+        assert store.ingest(files) == 0
+        
+        write_export(files[1], [["Pérez", "Ana", "999", "7,00", "1,00"]])
+        assert store.ingest(files) == 1
+        assert "999" in store.attempt_counts("1K2", "TP1", files[1:])
+    
+    def test_sin_calificar_e_invalidas(self, store, temp_dir):
+        """Los intentos sin calificar cuentan, y las notas inválidas se informan."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_export(file_path, [
+            ["Pérez", "Ana", "1", "-", ""],
+            ["Pérez", "Ana", "1", "6,00", ""],
+            ["Gómez", "Luis", "2", "abc", ""],
+        ])
+        store.ingest([file_path])
+        
+        assert store.attempt_counts("1K2", "TP1") == {"1": 2, "2": 1}
+        best = store.best_attempts("1K2", "TP1")
+        assert list(best) == ["1", "2"]
+        assert best["2"]["Calificación/10,00"] is None
+        issues = store.grade_issues("1K2", "TP1")
+        assert [(issue.line, issue.student_id, issue.value) for issue in issues] == [(4, "2", "abc")]
+    
+    def test_archivo_invalido_no_modifica_la_base(self, store, temp_dir):
+        """Si un archivo falla, no debe quedar nada cargado de esa transacción."""
+        good = write_shifts(temp_dir)[0]
+        bad = os.path.join(temp_dir, "TP2_1K2.csv")
+        open(bad, 'w').close()
+        
+        with pytest.raises(ValueError):
+            store.ingest([good, bad])
+        assert store.fieldnames(good) is None
+
+
+@pytest.mark.unit
+class TestAttemptStoreConsolidation:
+    """Tests para el uso de la base desde FileConsolidator y los managers."""
+    
+    def test_consolidacion_igual_que_csv(self, test_dirs):
+        """Con attempt_store configurado el unificado debe ser idéntico."""
+        rnd = random.Random(7)
+        for tp in (1, 2):
+            for shift in (1, 2):
+                rows = random_rows(rnd.randint(0, 1000), 200, "10", 2)
+                write_export(os.path.join(test_dirs['input'], f"TP{tp}_1K2_{shift}.csv"), rows)
+        
+        header_map = {**Settings().header_map, "apellido": ["Apellido(s)"]}
+        csv_consolidator = FileConsolidator(test_dirs['input'], test_dirs['output'], header_map, "tps")
+        store_consolidator = FileConsolidator(test_dirs['input'], test_dirs['output'], header_map, "tps",
+                                              attempt_store=os.path.join(test_dirs['output'], "attempts.sqlite"))
+        for base_name in ("TP1_1K2", "TP2_1K2"):
+            expected = csv_consolidator.consolidate(base_name, "1K2")
+            result = store_consolidator.consolidate(base_name, "1K2")
+            assert list(result.best_attempts.items()) == list(expected.best_attempts.items())
+            assert result.attempts == expected.attempts
+            assert result.fieldnames == expected.fieldnames
+        
+        settings = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'])
+        with_store = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'],
+                              attempt_store=os.path.join(test_dirs['output'], "attempts.sqlite"))
+        expected = TPManager(settings).merge_tps("1K2", write_csv=False)
+        manager = TPManager(with_store)
+        assert manager.merge_tps("1K2", write_csv=False).students == expected.students
+        # La conexión con la base se cierra al terminar la consolidación
+        assert manager.consolidator._store is None
+        store_consolidator.close()
+        assert store_consolidator._store is None
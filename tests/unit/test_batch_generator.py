@@ -0,0 +1,155 @@
+"""
+Tests unitarios para BatchReportGenerator.
+"""
+import pytest
+import os
+from src.generators import batch_generator
+from src.generators.batch_generator import BatchReportGenerator
+from src.generators.report_generator import ReportGenerator
+from src.managers import TPManager, ParcialManager
+from src.utils import Settings
+from src.utils.config_loader import ConfigLoader
+from src.utils.file_consolidator import discover_courses
+from tests.factories import CSVFileFactory, read_sheet, sheet_names
+
+
+@pytest.mark.unit
+class TestDiscoverCourses:
+    """Tests para la detección de cursos en inputs/."""
+    
+    def test_detecta_cursos_en_orden_natural(self, test_dirs):
+        """Debe detectar cursos sin repetir y en orden natural."""
+        for name in ["TP1_1K10.csv", "tp2_1k2.csv", "Parcial1_1K2_1.csv", "Recuperatorio1_2K1.csv", "notas.csv"]:
+            open(os.path.join(test_dirs['input'], name), 'w').close()
+        
+        courses = discover_courses(test_dirs['input'], ["TP", "Parcial", "Recuperatorio"])
+        
+        assert courses == ["1K2", "1K10", "2K1"]
+    
+    def test_directorio_inexistente(self, temp_dir):
+        """Debe retornar lista vacía si el directorio no existe."""
+        assert discover_courses(os.path.join(temp_dir, "no_existe"), ["TP"]) == []
+
+
+@pytest.mark.unit
+class TestBatchReportGenerator:
+    """Tests para la generación por lotes."""
+    
+    @pytest.fixture
+    def batch_generator(self, test_config_path, test_dirs):
+        """Crea un generador por lotes con dos cursos válidos y uno inválido."""
+        os.chdir(test_dirs['root'])
+        input_dir = test_dirs['input']
+        CSVFileFactory.create_tp_file(os.path.join(input_dir, "TP1_1K1.csv"), "1K1", 1, num_students=3)
+        CSVFileFactory.create_parcial_file(os.path.join(input_dir, "Parcial1_1K2.csv"), "1K2", 1, num_students=3)
+        # Curso con headers inválidos
+        with open(os.path.join(input_dir, "TP1_1K3.csv"), 'w', encoding='utf-8-sig') as f:
+            f.write("ColumnaA,ColumnaB\nx,y\n")
+        return BatchReportGenerator(ConfigLoader(test_config_path))
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_un_curso_con_error_no_detiene_al_resto(self, batch_generator, test_dirs, workers):
+        """Debe generar los cursos válidos y reportar el error del inválido."""
+        results = batch_generator.generate_all_reports(max_workers=workers)
+        
+        by_course = {result.course: result for result in results}
+        assert [result.course for result in results] == ["1K1", "1K2", "1K3"]
+        assert by_course["1K1"].ok
+        assert by_course["1K2"].ok
+        assert not by_course["1K3"].ok
+        assert "KeyError" in by_course["1K3"].error
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K1", "Planilla_Final_1K1.xls"))
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K2", "Planilla_Final_1K2.xls"))
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_muestra_la_salida_de_cada_curso(self, batch_generator, capsys, workers):
+        """La salida capturada de cada curso debe mostrarse junto a su línea de progreso."""
+        results = batch_generator.generate_all_reports(max_workers=workers)
+        out = capsys.readouterr().out
+        
+        for result in results:
+            assert result.log
+            assert result.log in out
+        # La salida de un curso se muestra antes de su línea de progreso
+        by_course = {result.course: result for result in results}
+        assert out.index(by_course["1K1"].log) < out.index("✅ 1K1")
+        assert out.index(by_course["1K3"].log) < out.index("❌ 1K3")
+
+
+@pytest.mark.unit
+class TestCampusReport:
+    """Tests para la planilla única con una hoja por curso."""
+    
+    @pytest.fixture
+    def input_dir(self, test_dirs):
+        """Crea exports de tres cursos válidos (en desorden) y uno inválido."""
+        input_dir = test_dirs['input']
+        for course in ("1K10", "1K1", "1K2"):
+            CSVFileFactory.create_tp_file(os.path.join(input_dir, f"TP1_{course}.csv"), course, 1, num_students=4)
+        CSVFileFactory.create_parcial_file(os.path.join(input_dir, "Parcial1_1K2.csv"), "1K2", 1, num_students=4)
+        with open(os.path.join(input_dir, "TP1_1K3.csv"), 'w', encoding='utf-8-sig') as f:
+            f.write("ColumnaA,ColumnaB\nx,y\n")
+        return input_dir
+    
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_una_hoja_por_curso_en_orden(self, input_dir, test_dirs, workers):
+        """Debe escribir las hojas en orden natural y reportar el curso inválido."""
+        settings = Settings(source_dir=input_dir, output_dir=test_dirs['output'], output_format="xlsx")
+        
+        results = BatchReportGenerator(settings).generate_campus_report(max_workers=workers)
+        
+        output_file = os.path.join(test_dirs['output'], "Planilla_Campus.xlsx")
+        assert [result.course for result in results] == ["1K1", "1K2", "1K3", "1K10"]
+        assert [result.ok for result in results] == [True, True, False, True]
+        assert results[0].output_file == output_file
+        assert sheet_names(output_file) == ["Notas 1K1", "Notas 1K2", "Notas 1K10"]
+        
+        # Cada hoja debe tener las mismas filas que la planilla individual del curso
+        expected = ReportGenerator(settings).build_course_sheet("1K2", TPManager(settings), ParcialManager(settings))
+        rows = read_sheet(output_file, 2)
+        assert len(rows) == len(expected.rows) + 1
+        assert [cell[2] for cell in rows[1][:3]] == expected.rows[0][:3]
+    
+    def test_formato_xls(self, input_dir, test_dirs):
+        """También debe poder generar el libro en formato XLS."""
+        settings = Settings(source_dir=input_dir, output_dir=test_dirs['output'])
+        output_file = os.path.join(test_dirs['output'], "campus", "Todos.xls")
+        
+        results = BatchReportGenerator(settings).generate_campus_report(["1K1", "1K2"], max_workers=1, output_file=output_file)
+        
+        assert all(result.ok for result in results)
+        assert os.path.getsize(output_file) > 0
+    
+    def test_sin_cursos_validos(self, input_dir, test_dirs):
+        """Si ningún curso tiene datos no debe crear el libro."""
+        settings = Settings(source_dir=input_dir, output_dir=test_dirs['output'], output_format="xlsx")
+        
+        results = BatchReportGenerator(settings).generate_campus_report(["1K3"], max_workers=1)
+        
+        assert not results[0].ok
+        assert not os.path.exists(os.path.join(test_dirs['output'], "Planilla_Campus.xlsx"))
+    
+    def test_xls_supera_limite_de_columnas(self, input_dir, test_dirs, monkeypatch, capsys):
+        """Si las columnas no entran en XLS no debe procesar cursos ni crear el libro."""
+        monkeypatch.setattr(batch_generator, "XLS_MAX_COLUMNS", 3)
+        settings = Settings(source_dir=input_dir, output_dir=test_dirs['output'])
+        
+        assert BatchReportGenerator(settings).generate_campus_report(["1K1"], max_workers=1) == []
+        assert "output_format = xlsx" in capsys.readouterr().out
+        assert not os.path.exists(os.path.join(test_dirs['output'], "Planilla_Campus.xls"))
+    
+    @pytest.mark.parametrize("output_format", ["xlsx", "xls"])
+    def test_interrupcion_no_deja_libro(self, input_dir, test_dirs, monkeypatch, output_format):
+        """Si se interrumpe después de la primera hoja no debe quedar el libro ni el temporal."""
+        settings = Settings(source_dir=input_dir, output_dir=test_dirs['output'], output_format=output_format)
+        generator = BatchReportGenerator(settings)
+        
+        def interrupt(result):
+            if result.course == "1K2":
+                raise KeyboardInterrupt
+        monkeypatch.setattr(generator, "_print_progress", interrupt)
+        
+        with pytest.raises(KeyboardInterrupt):
+            generator.generate_campus_report(["1K1", "1K2"], max_workers=1)
+        
+        assert not [name for name in os.listdir(test_dirs['output']) if name.startswith("Planilla_Campus")]
@@ -0,0 +1,55 @@
+"""
+Tests unitarios para la suite de benchmarks.
+"""
+import pytest
+import csv
+import json
+import os
+from benchmarks.datasets import DatasetSpec, write_dataset
+from benchmarks.run import STAGES, main
+
+
+@pytest.mark.unit
+class TestBenchmarks:
+    """Tests para los datasets sintéticos y la corrida de benchmarks."""
+    
+    def test_dataset_reproducible(self, temp_dir):
+        """Con la misma semilla se deben generar los mismos exports."""
+        spec = DatasetSpec(rows=300, shifts=3, questions=4, seed=7)
+        first = write_dataset(spec, os.path.join(temp_dir, "a"))
+        second = write_dataset(spec, os.path.join(temp_dir, "b"))
+        
+        assert len(first.files["TP1_1K1"]) == 3
+        for evaluation in spec.evaluations:
+            for path_a, path_b in zip(first.files[evaluation], second.files[evaluation]):
+                with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+                    assert a.read() == b.read()
+        
+        rows = 0
+        for path in first.files["TP1_1K1"]:
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                content = list(csv.reader(f))
+            assert len(content[0]) == 10
+            assert content[-1][0] == "Promedio general"
+            rows += len(content) - 2
+        assert rows == 300
+    
+    def test_corrida_guarda_json(self, temp_dir, capsys):
+        """Debe medir todas las etapas y guardar los resultados en JSON."""
+        output = os.path.join(temp_dir, "results", "run.json")
+        
+        assert main(["--sizes", "200", "--repeat", "1", "--questions", "2", "--output", output]) == 0
+        
+        with open(output, encoding='utf-8') as f:
+            report = json.load(f)
+        assert [result["stage"] for result in report["results"]] == list(STAGES)
+        assert all(result["size"] == 200 and result["rows_per_sec"] > 0 for result in report["results"])
+        assert all(result["peak_memory_mb"] is not None for result in report["results"])
+        
+        assert main(["--sizes", "200", "--repeat", "1", "--no-memory", "--stage", "merge_tps", "--compare", output]) == 0
+        assert "merge_tps" in capsys.readouterr().out.split("Comparación")[1]
+    
+    def test_argumentos_invalidos(self, capsys):
+        """Debe rechazar tamaños o intentos inválidos."""
+        assert main(["--sizes", "mil"]) == 2
+        assert main(["--sizes", "100", "--attempts", "3-1"]) == 2
@@ -0,0 +1,171 @@
+"""
+Tests unitarios para el modo incremental (BuildManifest).
+"""
+import pytest
+import os
+import csv
+from src.utils import build_manifest
+from src.utils.build_manifest import BuildManifest, SourceFingerprint
+from src.utils.file_consolidator import FileConsolidator
+from tests.factories import CSVFileFactory
+
+
+def write_file(path, content):
+    """Escribe un archivo de texto."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+@pytest.mark.unit
+class TestBuildManifest:
+    """Tests para el registro de artefactos."""
+    
+    @pytest.fixture
+    def files(self, temp_dir):
+        """Crea una fuente y un artefacto registrados en el manifiesto."""
+        source = os.path.join(temp_dir, "fuente.csv")
+        artifact = os.path.join(temp_dir, "salida.csv")
+        write_file(source, "a,b\n1,2\n")
+        write_file(artifact, "resultado")
+        manifest = BuildManifest(temp_dir)
+        manifest.record(artifact, [source], "config-1", payload={"x": 1})
+        return manifest, source, artifact
+    
+    def test_vigente_si_nada_cambia(self, files, temp_dir):
+        """Debe considerar vigente el artefacto, también tras recargar el manifiesto."""
+        manifest, source, artifact = files
+        
+        assert manifest.is_fresh(artifact, [source], "config-1")
+        reloaded = BuildManifest(temp_dir)
+        assert reloaded.is_fresh(artifact, [source], "config-1")
+        assert reloaded.get_payload(artifact) == {"x": 1}
+    
+    def test_invalida_si_cambia_el_contenido(self, files):
+        """Debe invalidar el artefacto si cambia el contenido de la fuente."""
+        manifest, source, artifact = files
+        write_file(source, "a,b\n1,3\n")
+        
+        assert not manifest.is_fresh(artifact, [source], "config-1")
+    
+    def test_mtime_sin_cambio_de_contenido(self, files):
+        """Un cambio sólo de fecha no debe invalidar el artefacto."""
+        manifest, source, artifact = files
+        stat = os.stat(source)
+        os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+        
+        assert manifest.is_fresh(artifact, [source], "config-1")
+    
+    def test_invalida_si_cambia_la_configuracion_o_las_fuentes(self, files, temp_dir):
+        """Debe invalidar el artefacto si cambia la configuración o la lista de fuentes."""
+        manifest, source, artifact = files
+        other = os.path.join(temp_dir, "otra.csv")
+        write_file(other, "a,b\n")
+        
+        assert not manifest.is_fresh(artifact, [source], "config-2")
+        assert not manifest.is_fresh(artifact, [source, other], "config-1")
+    
+    def test_invalida_si_se_modifica_el_artefacto(self, files):
+        """Debe invalidar el artefacto si fue editado o eliminado."""
+        manifest, source, artifact = files
+        write_file(artifact, "editado a mano")
+        
+        assert not manifest.is_fresh(artifact, [source], "config-1")
+    
+    def test_fuente_modificada_durante_la_generacion(self, files):
+        """Si la fuente cambia entre la lectura y el registro, el artefacto no debe quedar vigente."""
+        manifest, source, artifact = files
+        read_stat = os.stat(source)
+        write_file(source, "a,b\n1,3\n")
+        os.utime(source, ns=(read_stat.st_atime_ns, read_stat.st_mtime_ns + 5_000_000_000))
+        
+        # Sin hash: no se puede saber qué contenido se leyó
+        manifest.record(artifact, [SourceFingerprint.from_stat(source, read_stat)], "config-1")
+        assert not manifest.is_fresh(artifact, [source], "config-1")
+        
+        # Con el hash del contenido leído: se compara contra el actual
+        read = SourceFingerprint.from_stat(source, read_stat, "0" * 64)
+        manifest.record(artifact, [read], "config-1")
+        assert not manifest.is_fresh(artifact, [source], "config-1")
+        assert manifest.sources(artifact) == [read]
+    
+    def test_no_vuelve_a_leer_fuentes_con_hash(self, files, mocker):
+        """El hash tomado al leer la fuente debe registrarse sin volver a leerla."""
+        manifest, source, artifact = files
+        write_file(source, "a,b\n9,9\n")
+        sha256 = mocker.patch("src.utils.build_manifest.file_sha256")
+        
+        manifest.record(artifact, [SourceFingerprint.from_stat(source, os.stat(source), "ab" * 32)], "config-1")
+        
+        sha256.assert_not_called()
+        assert manifest.sources(artifact)[0].sha256 == "ab" * 32
+
+
+@pytest.mark.unit
+class TestIncrementalConsolidation:
+    """Tests del modo incremental en FileConsolidator."""
+    
+    @pytest.fixture
+    def consolidator(self, test_dirs, sample_header_map):
+        """Crea un consolidador en modo incremental."""
+        return FileConsolidator(test_dirs['input'], test_dirs['output'], sample_header_map, "tps", incremental=True)
+    
+    def test_reutiliza_filtrado_sin_cambios(self, consolidator, test_dirs, mocker):
+        """No debe volver a leer los exports si no cambiaron."""
+        CSVFileFactory.create_moodle_csv_with_attempts(
+            os.path.join(test_dirs['input'], "TP1_1K2.csv"), {"10001": 3, "10002": 1}
+        )
+        first = consolidator.consolidate("TP1_1K2", "1K2")
+        scan = mocker.spy(consolidator, "_scan_files")
+        
+        second = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        scan.assert_not_called()
+        assert second.attempts == first.attempts
+        assert second.best_attempts == first.best_attempts
+    
+    def test_regenera_si_cambia_un_export(self, consolidator, test_dirs, mocker):
+        """Debe regenerar el filtrado cuando cambia uno de los exports."""
+        tp_file = os.path.join(test_dirs['input'], "TP1_1K2.csv")
+        CSVFileFactory.create_moodle_csv_with_attempts(tp_file, {"10001": 1})
+        consolidator.consolidate("TP1_1K2", "1K2")
+        CSVFileFactory.create_moodle_csv_with_attempts(tp_file, {"10001": 2, "10003": 1})
+        scan = mocker.spy(consolidator, "_scan_files")
+        
+        result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        scan.assert_called_once()
+        assert result.attempts == {"10001": 2, "10003": 1}
+        with open(result.output_file, encoding='utf-8-sig') as f:
+            assert len(list(csv.DictReader(f))) == 2
+    
+    @pytest.mark.parametrize("engine", ["python", "numpy"])
+    def test_export_modificado_durante_la_consolidacion(self, consolidator, test_dirs, mocker, engine):
+        """El manifiesto debe guardar el estado de los exports al leerlos, no al registrar el filtrado."""
+        if engine == "numpy":
+            pytest.importorskip("numpy")
+        consolidator.engine = engine
+        tp_file = os.path.join(test_dirs['input'], "TP1_1K2.csv")
+        CSVFileFactory.create_moodle_csv_with_attempts(tp_file, {"10001": 2, "10002": 1})
+        read_stat = os.stat(tp_file)
+        scan_files = consolidator._scan_files
+        
+        def scan_and_rewrite(*args):
+            result = scan_files(*args)
+            # El export cambia después de leerlo y antes de registrar el filtrado
+            CSVFileFactory.create_moodle_csv_with_attempts(tp_file, {"10001": 1, "10003": 1})
+            os.utime(tp_file, ns=(read_stat.st_atime_ns, read_stat.st_mtime_ns + 5_000_000_000))
+            return result
+        mocker.patch.object(consolidator, "_scan_files", side_effect=scan_and_rewrite)
+        sha256 = mocker.spy(build_manifest, "file_sha256")
+        
+        result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        source = result.sources[0]
+        assert (source.size, source.mtime_ns) == (read_stat.st_size, read_stat.st_mtime_ns)
+        if engine == "python":
+            # parse_export calcula el hash en la misma lectura
+            assert source.sha256 is not None
+            sha256.assert_not_called()
+        manifest = consolidator.manifest_for(os.path.dirname(result.output_file))
+        assert not manifest.is_fresh(result.output_file, [tp_file], consolidator.config_key)
+        assert consolidator.consolidate("TP1_1K2", "1K2").attempts == {"10001": 1, "10003": 1}
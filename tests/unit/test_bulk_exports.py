@@ -0,0 +1,87 @@
+"""
+Tests unitarios para el generador masivo de exports.
+"""
+import pytest
+import csv
+import os
+from src.utils import Settings, count_student_attempts
+from src.managers import TPManager
+from tests.factories.bulk_exports import TermSpec, main, write_term
+
+
+def read_rows(file_path):
+    """Lee un export generado como lista de filas."""
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.unit
+class TestBulkExports:
+    """Tests para write_term y su línea de comandos."""
+    
+    def test_reproducible_con_la_misma_semilla(self, temp_dir):
+        """La misma semilla debe generar los mismos archivos y otra semilla, otros."""
+        spec = TermSpec(courses=["1K1", "1K2"], students=50, tps=2, exams=1, makeups=0, shifts=2, seed=5)
+        first = write_term(spec, os.path.join(temp_dir, "a"))
+        second = write_term(spec, os.path.join(temp_dir, "b"))
+        other = write_term(TermSpec(courses=["1K1"], students=50, tps=1, exams=0, makeups=0, shifts=2, seed=6),
+                           os.path.join(temp_dir, "c"))
+        
+        names = [os.path.basename(path) for path in first.files]
+        assert names[:4] == ["TP1_1K1_1.csv", "TP1_1K1_2.csv", "TP2_1K1_1.csv", "TP2_1K1_2.csv"]
+        assert len(names) == 12
+        assert first.rows == second.rows and first.bytes == second.bytes
+        for path_a, path_b in zip(first.files, second.files):
+            assert read_rows(path_a) == read_rows(path_b)
+        assert read_rows(other.files[0]) != read_rows(first.files[0])
+    
+    def test_formato_de_moodle(self, temp_dir):
+        """Debe incluir notas "-", la escala 0-100 y la fila de promedios."""
+        spec = TermSpec(students=300, tps=1, exams=0, makeups=0, missing_rate=0.2, scale_100_rate=1.0, questions=3)
+        summary = write_term(spec, temp_dir)
+        rows = read_rows(summary.files[0])
+        
+        assert rows[0] == ["Apellido(s)", "Nombre", "Número de ID", "Dirección de correo", "Estado",
+                           "Calificación/100,00", "P. 1 /1,00", "P. 2 /1,00", "P. 3 /1,00"]
+        assert rows[-1][0] == "Promedio general"
+        attempts = rows[1:-1]
+        assert len(attempts) == summary.rows
+        assert any(row[5] == "-" for row in attempts)
+        assert all(row[5] == "-" or 0 <= float(row[5].replace(",", ".")) <= 100 for row in attempts)
+        assert all(len(row) == 9 for row in attempts)
+        
+        without_average = write_term(TermSpec(students=20, tps=1, exams=0, makeups=0, average_rows=False),
+                                     os.path.join(temp_dir, "sin"))
+        assert read_rows(without_average.files[0])[-1][0] != "Promedio general"
+    
+    def test_intentos_segun_pesos(self, temp_dir):
+        """Con pesos sólo para 3 intentos, cada alumno que rinde debe tener 3."""
+        spec = TermSpec(students=40, tps=1, exams=0, makeups=0, attempt_weights=(0, 0, 1), participation=1.0)
+        summary = write_term(spec, temp_dir)
+        settings = Settings()
+        
+        attempts = count_student_attempts(summary.files[0], settings.header_map)
+        assert len(attempts) == 40
+        assert set(attempts.values()) == {3}
+    
+    def test_procesable_por_los_managers(self, temp_dir):
+        """Los exports generados deben poder unificarse."""
+        spec = TermSpec(students=60, tps=2, exams=0, makeups=0, shifts=3, scale_100_rate=0.5, seed=2)
+        write_term(spec, os.path.join(temp_dir, "inputs"))
+        settings = Settings(source_dir=os.path.join(temp_dir, "inputs"), output_dir=os.path.join(temp_dir, "outputs"),
+                            cantidad_tps=2)
+        
+        result = TPManager(settings).merge_tps("1K1", write_csv=False)
+        assert 0 < len(result) <= 60
+    
+    def test_linea_de_comandos(self, temp_dir, capsys):
+        """La CLI debe generar los archivos y rechazar parámetros inválidos."""
+        output = os.path.join(temp_dir, "carga")
+        
+        assert main(["-o", output, "--courses", "2", "--students", "10", "--tps", "1",
+                     "--parciales", "0", "--recuperatorios", "0"]) == 0
+        assert sorted(os.listdir(output)) == ["TP1_1K1.csv", "TP1_1K2.csv"]
+        assert "2 exports generados" in capsys.readouterr().out
+        
+        assert main(["-o", output, "--missing", "1.5"]) == 2
+        assert main(["-o", output, "--attempts", "uno"]) == 2
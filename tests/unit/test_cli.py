@@ -0,0 +1,102 @@
+"""
+Tests unitarios para la línea de comandos no interactiva.
+"""
+import pytest
+import os
+from src.cli import run, EXIT_OK, EXIT_FAILURE, EXIT_USAGE
+from tests.factories import CSVFileFactory
+
+
+@pytest.mark.unit
+class TestCli:
+    """Tests para los subcomandos y códigos de salida."""
+    
+    @pytest.fixture
+    def config_path(self, test_config_path, test_dirs):
+        """Crea exports de TPs y parciales para los cursos 1K1 y 1K2."""
+        os.chdir(test_dirs['root'])
+        input_dir = test_dirs['input']
+        for course in ("1K1", "1K2"):
+            CSVFileFactory.create_tp_file(os.path.join(input_dir, f"TP1_{course}.csv"), course, 1, num_students=3)
+            CSVFileFactory.create_parcial_file(os.path.join(input_dir, f"Parcial1_{course}.csv"), course, 1, num_students=3)
+        return test_config_path
+    
+    def test_report_un_curso(self, config_path, test_dirs):
+        """Debe generar la planilla del curso indicado."""
+        assert run(["--config", config_path, "report", "--course", "1k2"]) == EXIT_OK
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K2", "Planilla_Final_1K2.xls"))
+        assert not os.path.exists(os.path.join(test_dirs['output'], "1K1"))
+    
+    def test_report_todos_los_cursos(self, config_path, test_dirs):
+        """Debe generar las planillas de todos los cursos detectados."""
+        assert run(["--config", config_path, "report", "--all", "--jobs", "1"]) == EXIT_OK
+        for course in ("1K1", "1K2"):
+            assert os.path.exists(os.path.join(test_dirs['output'], course, f"Planilla_Final_{course}.xls"))
+    
+    def test_report_campus(self, config_path, test_dirs):
+        """Debe generar un único libro con todos los cursos."""
+        output_file = os.path.join(test_dirs['root'], "campus.xls")
+        
+        assert run(["--config", config_path, "-q", "report", "--all", "--campus", "-o", output_file]) == EXIT_OK
+        assert os.path.exists(output_file)
+        assert not os.path.exists(os.path.join(test_dirs['output'], "1K1", "Planilla_Final_1K1.xls"))
+    
+    def test_report_con_curso_fallido(self, config_path, test_dirs, capsys):
+        """Si algún curso falla debe terminar con error e informarlo por stderr."""
+        with open(os.path.join(test_dirs['input'], "TP1_1K3.csv"), 'w', encoding='utf-8-sig') as f:
+            f.write("ColumnaA,ColumnaB\nx,y\n")
+        
+        assert run(["--config", config_path, "-q", "report", "--all", "--jobs", "1"]) == EXIT_FAILURE
+        
+        captured = capsys.readouterr()
+        assert captured.out == ""
+        assert "1K3" in captured.err
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K1", "Planilla_Final_1K1.xls"))
+    
+    def test_filter(self, config_path, test_dirs):
+        """Debe filtrar el archivo indicado en su carpeta de curso."""
+        assert run(["--config", config_path, "filter", "TP1_1K1.csv"]) == EXIT_OK
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K1", "TP1_1K1_filtrado.csv"))
+    
+    def test_filter_archivo_inexistente(self, config_path):
+        """Debe terminar con error si el archivo no existe."""
+        assert run(["--config", config_path, "--quiet", "filter", "TP9_1K1.csv"]) == EXIT_FAILURE
+    
+    def test_merge_tps_y_merge_exams(self, config_path, test_dirs):
+        """Debe generar los unificados del curso indicado."""
+        assert run(["--config", config_path, "merge-tps", "--course", "1K1"]) == EXIT_OK
+        assert run(["--config", config_path, "merge-exams", "--course", "1K1"]) == EXIT_OK
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K1", "tps", "TPs_1K1_unificado.csv"))
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K1", "parciales", "Parciales_1K1_unificado.csv"))
+    
+    def test_merge_curso_sin_datos(self, config_path):
+        """Debe terminar con error si el curso no tiene exports."""
+        assert run(["--config", config_path, "-q", "merge-tps", "--course", "9Z9"]) == EXIT_FAILURE
+    
+    def test_ingest(self, config_path, test_dirs, capsys):
+        """Debe cargar los exports una sola vez en la base de intentos."""
+        db_path = os.path.join(test_dirs['root'], "attempts.sqlite")
+        
+        assert run(["--config", config_path, "ingest", "--db", db_path]) == EXIT_OK
+        assert "4 archivo(s)" in capsys.readouterr().out
+        assert run(["--config", config_path, "ingest", "--db", db_path]) == EXIT_OK
+        assert "0 archivo(s)" in capsys.readouterr().out
+    
+    def test_config_inexistente(self, temp_dir, capsys):
+        """Debe terminar con error de uso si el archivo de configuración no existe."""
+        config_path = os.path.join(temp_dir, "no_existe.ini")
+        
+        assert run(["--config", config_path, "report", "--all"]) == EXIT_USAGE
+        assert "no_existe.ini" in capsys.readouterr().err
+    
+    @pytest.mark.parametrize("argv", [
+        [],
+        ["report"],
+        ["report", "--course", "1K2", "--all"],
+        ["merge-tps"],
+        ["report", "--all", "--jobs", "-1"],
+        ["report", "--all", "--output", "x.xls"],
+    ])
+    def test_argumentos_invalidos(self, config_path, argv):
+        """Debe terminar con error de uso ante argumentos inválidos."""
+        assert run(["--config", config_path] + argv) == EXIT_USAGE
@@ -4,6 +4,7 @@ Tests unitarios para el módulo ConfigLoader.
 import pytest
 import os
 from src.utils.config_loader import ConfigLoader
+from src.utils.grade_conversion import DEFAULT_CONVERSION_TABLE
 
 
 @pytest.mark.unit
@@ -73,4 +74,23 @@ class TestConfigLoader:
         assert config.get_output_dir() == "outputs"
         assert config.get_tp_prefix() == "TP"
         assert config.get_cantidad_tps() == 4
-
+    
+    
+    def test_tabla_de_conversion_por_defecto(self, test_config_path):
+        """Sin sección [Conversion] debe usar la tabla por defecto."""
+        config = ConfigLoader(test_config_path)
+        
+        assert config.get_conversion_table() == DEFAULT_CONVERSION_TABLE
+    
+    def test_tabla_de_conversion_personalizada(self, temp_dir):
+        """La sección [Conversion] debe reemplazar por completo a la tabla por defecto."""
+        custom_config = os.path.join(temp_dir, "custom.ini")
+        with open(custom_config, 'w') as f:
+            f.write("[Conversion]\nconversion_59_99 = 2\nconversion_100_00 = 6\n")
+        
+        config = ConfigLoader(custom_config)
+        table = config.get_conversion_table()
+        
+        assert table.bands == ((59.99, 2), (100.0, 6))
+        assert table.convert_many([5.99, 6.0, 10.0]) == [2, 6, 6]
+        assert config.get_conversion_table() is table
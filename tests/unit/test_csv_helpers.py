@@ -128,3 +128,32 @@ class TestSaveCSV:
         
         assert os.path.exists(file_path)
 
+
+
+@pytest.mark.unit
+class TestBestGradeAccumulator:
+    """Tests para la lectura rápida basada en tuplas."""
+    
+    def test_mismo_registro_que_dictreader(self, temp_dir, sample_header_map):
+        """El mejor registro debe coincidir con el que arma csv.DictReader."""
+        import os
+        import csv
+        from src.utils.csv_helpers import BestGradeAccumulator
+        
+        file_path = os.path.join(temp_dir, "tp.csv")
+        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+            f.write('Apellido(s),Nombre,Número de ID,"Calificación/10,00",Extra\n')
+            f.write('García,Juan,1,"7,50",a\n')
+            f.write("\n")
+            f.write('García,Juan,1,"9,00"\n')
+            f.write('López,Ana,2,"6,00",b,sobrante\n')
+        
+        accumulator = BestGradeAccumulator(sample_header_map)
+        accumulator.add_file(file_path)
+        rows = accumulator.best_rows()
+        
+        with open(file_path, newline='', encoding='utf-8-sig') as f:
+            expected = [row for row in csv.DictReader(f)]
+        assert rows["1"] == {**expected[1], "Calificación/10,00": 9.0}
+        assert rows["2"] == {**expected[2], "Calificación/10,00": 6.0}
+        assert accumulator.attempts == {"1": 2, "2": 1}
@@ -0,0 +1,63 @@
+"""
+Tests unitarios para el cálculo en paralelo de las evaluaciones de un curso.
+"""
+import pytest
+import json
+import os
+from dataclasses import replace
+from src.utils import Settings
+from src.managers import ParcialManager, TPManager
+from src.managers.evaluation_pool import resolve_evaluation_workers
+from tests.factories.random_exports import random_rows, write_export
+
+
+@pytest.mark.unit
+class TestEvaluationPool:
+    """Tests para grade_evaluations desde los managers."""
+    
+    @pytest.fixture
+    def settings(self, test_dirs):
+        """Tres TPs (uno con dos turnos y otro faltante), dos parciales y un recuperatorio."""
+        input_dir = test_dirs['input']
+        exports = ["TP1_1K2_1", "TP1_1K2_2", "TP2_1K2", "TP4_1K2", "Parcial1_1K2", "Parcial2_1K2", "Recuperatorio1_1K2"]
+        for seed, name in enumerate(exports):
+            write_export(os.path.join(input_dir, f"{name}.csv"), random_rows(seed, 80 + 20 * seed, "10", 2))
+        return Settings(source_dir=input_dir, output_dir=test_dirs['output'], header_apellido=("Apellido(s)",))
+    
+    def test_resolve_evaluation_workers(self):
+        """Debe limitar los procesos a la cantidad de evaluaciones."""
+        assert resolve_evaluation_workers(8, 4) == 4
+        assert resolve_evaluation_workers(1, 4) == 1
+        assert 1 <= resolve_evaluation_workers(0, 2) <= 2
+    
+    def test_mismo_resultado_que_de_a_una(self, settings, test_dirs, capsys):
+        """En paralelo se deben obtener los mismos unificados, en el mismo orden."""
+        parallel = replace(settings, evaluation_workers=4)
+        for manager_class, merge in ((TPManager, "merge_tps"), (ParcialManager, "merge_exams")):
+            expected = getattr(manager_class(settings), merge)("1K2")
+            with open(expected.output_file, 'rb') as f:
+                expected_content = f.read()
+            os.remove(expected.output_file)
+            
+            result = getattr(manager_class(parallel), merge)("1K2")
+            assert list(result.students.items()) == list(expected.students.items())
+            with open(result.output_file, 'rb') as f:
+                assert f.read() == expected_content
+        
+        # La salida de cada evaluación se muestra en orden de evaluación
+        output = capsys.readouterr().out
+        last_run = output[output.rindex("TP1_1K2_1.csv"):]
+        assert last_run.index("TP2_1K2") < last_run.index("TP3_1K2") < last_run.index("TP4_1K2")
+    
+    def test_incremental_registra_todas_las_evaluaciones(self, settings, test_dirs, capsys):
+        """Con procesos hijos, el proceso principal debe registrar cada filtrado en el manifiesto."""
+        incremental = replace(settings, incremental=True, evaluation_workers=3)
+        TPManager(incremental).merge_tps("1K2")
+        
+        with open(os.path.join(test_dirs['output'], "1K2", "tps", ".manifest.json"), encoding='utf-8') as f:
+            entries = json.load(f)["entries"]
+        assert {"TP1_1K2_filtrado.csv", "TP2_1K2_filtrado.csv", "TP4_1K2_filtrado.csv"} <= set(entries)
+        
+        capsys.readouterr()
+        TPManager(incremental).merge_tps("1K2")
+        assert capsys.readouterr().out.count("♻️  Sin cambios: TP") == 3
@@ -0,0 +1,120 @@
+"""
+Tests unitarios para FileConsolidator.
+"""
+import pytest
+import os
+import csv
+from src.utils.file_consolidator import FileConsolidator
+
+
+def write_csv(file_path, rows, fieldnames=None):
+    """Escribe un CSV con formato Moodle para los tests."""
+    fieldnames = fieldnames or ["Apellido(s)", "Nombre", "Número de ID", "Calificación/10,00"]
+    with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def moodle_row(student_id, grade, last_name="García", first_name="Juan"):
+    """Crea una fila de Moodle."""
+    return {
+        "Apellido(s)": last_name,
+        "Nombre": first_name,
+        "Número de ID": student_id,
+        "Calificación/10,00": grade,
+    }
+
+
+@pytest.mark.unit
+class TestConsolidate:
+    """Tests para la consolidación en una sola pasada."""
+    
+    @pytest.fixture
+    def consolidator(self, test_dirs, sample_header_map):
+        """Crea un consolidador sobre los directorios de test."""
+        return FileConsolidator(test_dirs['input'], test_dirs['output'], sample_header_map, "tps")
+    
+    def test_consolida_turnos_con_intentos(self, consolidator, test_dirs):
+        """Debe obtener mejor nota e intentos de todos los turnos en el mismo resultado."""
+        write_csv(os.path.join(test_dirs['input'], "TP1_1K2_1.csv"), [
+            moodle_row("100", "6,00"),
+            moodle_row("100", "8,50"),
+            moodle_row("200", "4,00"),
+        ])
+        write_csv(os.path.join(test_dirs['input'], "tp1_1k2_2.csv"), [
+            moodle_row("100", "7,00"),
+            moodle_row("300", "9,00"),
+        ])
+        
+        result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        assert result is not None
+        assert len(result.source_files) == 2
+        assert result.attempts == {"100": 3, "200": 1, "300": 1}
+        assert result.best_attempts["100"]["Calificación/10,00"] == 8.5
+        assert result.best_attempts["300"]["Calificación/10,00"] == 9.0
+        assert os.path.exists(result.output_file)
+    
+    def test_empate_conserva_primer_intento(self, consolidator, test_dirs):
+        """Ante notas iguales debe conservar el primer intento leído."""
+        write_csv(os.path.join(test_dirs['input'], "TP1_1K2.csv"), [
+            moodle_row("100", "8,00", first_name="Primero"),
+            moodle_row("100", "8,00", first_name="Segundo"),
+        ])
+        
+        result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        assert result.best_attempts["100"]["Nombre"] == "Primero"
+        assert result.attempts["100"] == 2
+    
+    @pytest.mark.parametrize("options", [
+        {"engine": "numpy"}, {"parse_cache": True}, {"shift_workers": 2}, {"attempt_store": True},
+        {"engine": "numpy", "parse_cache": True}, {"engine": "numpy", "shift_workers": 2},
+    ])
+    def test_alumnos_sin_intentos_calificados(self, test_dirs, sample_header_map, options):
+        """Todos los motores deben conservar, al final y sin nota, a los alumnos sin intentos calificados."""
+        if options.get("engine") == "numpy":
+            pytest.importorskip("numpy")
+        write_csv(os.path.join(test_dirs['input'], "TP1_1K2_1.csv"), [
+            moodle_row("3", "-"), moodle_row("1", "-"), moodle_row("2", "abc"), moodle_row("1", "6,00"),
+        ])
+        write_csv(os.path.join(test_dirs['input'], "TP1_1K2_2.csv"), [
+            moodle_row("4", ""), moodle_row("3", "-"), moodle_row("2", "7,50"), moodle_row("5", "9,00"),
+        ])
+        options = dict(options)
+        if options.get("parse_cache"):
+            from src.utils.parse_cache import ParseCache
+            options["parse_cache"] = ParseCache(os.path.join(test_dirs['output'], ".cache"), sample_header_map)
+        if options.get("attempt_store"):
+            options["attempt_store"] = os.path.join(test_dirs['output'], "attempts.sqlite")
+        
+        reference = FileConsolidator(test_dirs['input'], os.path.join(test_dirs['output'], "ref"), sample_header_map, "tps")
+        expected = reference.consolidate("TP1_1K2", "1K2")
+        with FileConsolidator(test_dirs['input'], test_dirs['output'], sample_header_map, "tps", **options) as consolidator:
+            result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        grades = {student_id: row["Calificación/10,00"] for student_id, row in result.best_attempts.items()}
+        assert grades == {"1": 6.0, "2": 7.5, "5": 9.0, "3": None, "4": None}
+        assert list(grades) == ["1", "2", "5", "3", "4"]
+        assert list(result.best_attempts.items()) == list(expected.best_attempts.items())
+        assert result.attempts == {"3": 2, "1": 2, "2": 2, "4": 1, "5": 1}
+        with open(result.output_file, 'rb') as f, open(expected.output_file, 'rb') as g:
+            assert f.read() == g.read()
+    
+    def test_sin_archivos_retorna_none(self, consolidator):
+        """Debe retornar None si no hay archivos para la evaluación."""
+        assert consolidator.consolidate("TP4_1K2", "1K2") is None
+        assert consolidator.consolidate_multiple_files("TP4_1K2", "1K2") is False
+    
+    def test_excluye_promedio_general(self, consolidator, test_dirs):
+        """No debe contar la fila "Promedio general" como intento."""
+        write_csv(os.path.join(test_dirs['input'], "TP1_1K2.csv"), [
+            moodle_row("100", "8,00"),
+            moodle_row("", "7,00", last_name="Promedio general", first_name=""),
+        ])
+        
+        result = consolidator.consolidate("TP1_1K2", "1K2")
+        
+        assert list(result.best_attempts) == ["100"]
+        assert result.attempts == {"100": 1}
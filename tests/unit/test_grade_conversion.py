@@ -0,0 +1,70 @@
+"""
+Tests unitarios para la tabla de conversión de notas.
+"""
+import pytest
+from src.utils.grade_conversion import DEFAULT_CONVERSION_TABLE, GradeConversionTable
+
+
+def legacy_conversion(grade_100):
+    """Cadena de comparaciones original de convert_grade_to_integer."""
+    if 0 <= grade_100 <= 54.44:
+        return 2
+    elif 54.45 <= grade_100 <= 57.44:
+        return 4
+    elif 57.45 <= grade_100 <= 59.44:
+        return 5
+    elif 59.45 <= grade_100 <= 68.44:
+        return 6
+    elif 68.45 <= grade_100 <= 77.44:
+        return 7
+    elif 77.45 <= grade_100 <= 86.44:
+        return 8
+    elif 86.45 <= grade_100 <= 95.44:
+        return 9
+    elif 95.45 <= grade_100 <= 100:
+        return 10
+    return "FALTA"
+
+
+@pytest.mark.unit
+class TestGradeConversionTable:
+    """Tests para GradeConversionTable."""
+    
+    def test_equivale_a_la_conversion_original(self):
+        """La tabla por defecto debe dar lo mismo que la cadena original en toda la escala."""
+        grades = [round(hundredths / 100, 2) for hundredths in range(-100, 1101)]
+        grades += [5.4445, 5.4449, 5.7445, 9.5449, 10.0001]
+        
+        expected = [legacy_conversion(grade * 10) for grade in grades]
+        
+        assert [DEFAULT_CONVERSION_TABLE.convert(grade) for grade in grades] == expected
+        assert DEFAULT_CONVERSION_TABLE.convert_many(grades) == expected
+    
+    def test_escala_100(self):
+        """Con escala 0-100 no debe multiplicar la nota."""
+        assert DEFAULT_CONVERSION_TABLE.convert(95.45, scale_max=100.0) == 10
+        assert DEFAULT_CONVERSION_TABLE.convert_many([54.44, 54.45], scale_max=100.0) == [2, 4]
+    
+    def test_nota_ausente_retorna_falta(self):
+        """None y NaN deben convertirse a "FALTA"."""
+        assert DEFAULT_CONVERSION_TABLE.convert_many([None, float("nan"), 7.0]) == ["FALTA", "FALTA", 7]
+    
+    def test_compila_desde_config(self):
+        """Debe interpretar las claves conversion_<entero>_<decimales> en cualquier orden."""
+        table = GradeConversionTable.from_config_items({
+            "conversion_100_00": "10",
+            "conversion_59_99": "2",
+        })
+        
+        assert table.bands == ((59.99, 2), (100.0, 10))
+        assert table.convert(6.0) == 10
+    
+    @pytest.mark.parametrize("items", [
+        {},
+        {"limite_54_44": "2"},
+        {"conversion_54_44": "dos"},
+    ])
+    def test_config_invalida(self, items):
+        """Debe lanzar ValueError con una sección [Conversion] inválida."""
+        with pytest.raises(ValueError):
+            GradeConversionTable.from_config_items(items)
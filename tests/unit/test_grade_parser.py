@@ -0,0 +1,72 @@
+"""
+Tests unitarios para el parser de calificaciones.
+"""
+import pytest
+import os
+from src.utils.grade_parser import GradeIssue, format_grade_issues, parse_grade
+from src.utils.csv_helpers import BestGradeAccumulator
+
+
+@pytest.mark.unit
+class TestParseGrade:
+    """Tests para la función parse_grade."""
+    
+    @pytest.mark.parametrize("text,expected", [
+        ("8,50", 8.5),
+        ("7.25", 7.25),
+        (" 10,00 ", 10.0),
+        ("0", 0.0),
+        ("100,00", 100.0),
+    ])
+    def test_notas_validas(self, text, expected):
+        """Debe aceptar coma o punto decimal y espacios alrededor."""
+        assert parse_grade(text) == expected
+    
+    @pytest.mark.parametrize("text", ["-", "", "   ", " - "])
+    def test_intentos_sin_calificar(self, text):
+        """Debe retornar None para "-", vacío y espacios."""
+        assert parse_grade(text) is None
+    
+    @pytest.mark.parametrize("text", ["abc", "8,5,0", "nan", "inf"])
+    def test_notas_invalidas(self, text):
+        """Debe lanzar ValueError para celdas que no son notas."""
+        with pytest.raises(ValueError):
+            parse_grade(text)
+    
+    def test_resultado_memorizado_consistente(self):
+        """Llamadas repetidas deben dar el mismo resultado."""
+        assert parse_grade("6,75") == parse_grade("6,75") == 6.75
+        assert parse_grade("-") is None and parse_grade("-") is None
+
+
+@pytest.mark.unit
+class TestGradeIssues:
+    """Tests para el reporte de calificaciones inválidas."""
+    
+    def test_acumulador_reporta_linea(self, temp_dir, sample_header_map):
+        """El acumulador debe ignorar las celdas inválidas, registrar su línea y conservar a los alumnos sin nota."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        with open(file_path, 'w', newline='', encoding='utf-8-sig') as f:
+            f.write('Apellido(s),Nombre,Número de ID,"Calificación/10,00"\n')
+            f.write('García,Juan,100,"8,00"\n')
+            f.write('López,Ana,200,-\n')
+            f.write('Pérez,Luis,300,pendiente\n')
+        
+        accumulator = BestGradeAccumulator(sample_header_map)
+        accumulator.add_file(file_path)
+        
+        best_rows = accumulator.best_rows()
+        assert list(best_rows) == ["100", "200", "300"]
+        assert [row["Calificación/10,00"] for row in best_rows.values()] == [8.0, None, None]
+        assert accumulator.attempts == {"100": 1, "200": 1, "300": 1}
+        assert accumulator.issues == [GradeIssue(file_path, 4, "300", "pendiente")]
+    
+    def test_formato_del_aviso(self):
+        """El aviso debe resumir la cantidad y limitar el detalle."""
+        issues = [GradeIssue("TP1.csv", line, str(line), "x") for line in range(2, 7)]
+        
+        text = format_grade_issues(issues, limit=2)
+        
+        assert "5 calificación(es)" in text
+        assert "TP1.csv:2 (ID 2): 'x'" in text
+        assert "... y 3 más" in text
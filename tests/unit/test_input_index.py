@@ -0,0 +1,137 @@
+"""
+Tests unitarios para InputIndex.
+"""
+import pytest
+import os
+from src.utils.input_index import InputIndex, parse_evaluation_name
+from src.utils.file_consolidator import find_files_case_insensitive
+
+
+def touch(directory, name):
+    """Crea un archivo vacío en el directorio."""
+    path = os.path.join(directory, name)
+    open(path, 'w').close()
+    return path
+
+
+@pytest.mark.unit
+class TestParseEvaluationName:
+    """Tests para el parseo de nombres de archivo."""
+    
+    @pytest.mark.parametrize("name,expected", [
+        ("TP1_1K2.csv", ("tp", "1", "1k2", None)),
+        ("parcial2_1K15_3.csv", ("parcial", "2", "1k15", "3")),
+        ("Recuperatorio1_2K1", ("recuperatorio", "1", "2k1", None)),
+        ("notas.csv", None),
+        ("TP1_1K2_x.csv", None),
+    ])
+    def test_parseo(self, name, expected):
+        """Debe separar prefijo, número, curso y turno."""
+        assert parse_evaluation_name(name) == expected
+
+
+@pytest.mark.unit
+class TestInputIndex:
+    """Tests para el índice del directorio de entrada."""
+    
+    def test_encuentra_turnos_en_orden(self, temp_dir):
+        """Debe encontrar todos los turnos, primero el archivo sin turno."""
+        touch(temp_dir, "tp1_1k2_2.csv")
+        touch(temp_dir, "TP1_1K2.csv")
+        touch(temp_dir, "Tp1_1K2_1.csv")
+        touch(temp_dir, "TP1_1K22.csv")
+        touch(temp_dir, "TP11_1K2.csv")
+        
+        index = InputIndex(temp_dir)
+        names = [f.name for f in index.find("TP", 1, "1k2")]
+        
+        assert names == ["TP1_1K2.csv", "Tp1_1K2_1.csv", "tp1_1k2_2.csv"]
+    
+    def test_find_base_con_turno(self, temp_dir):
+        """Un nombre base con turno debe encontrar sólo ese turno."""
+        touch(temp_dir, "TP1_1K2.csv")
+        touch(temp_dir, "TP1_1K2_2.csv")
+        
+        index = InputIndex(temp_dir)
+        
+        assert [f.name for f in index.find_base("tp1_1k2_2")] == ["TP1_1K2_2.csv"]
+    
+    def test_guarda_informacion_de_stat(self, temp_dir):
+        """Debe guardar tamaño y fecha de modificación de cada archivo."""
+        path = touch(temp_dir, "TP1_1K2.csv")
+        with open(path, 'w') as f:
+            f.write("abc")
+        
+        indexed = InputIndex(temp_dir).find("TP", 1, "1K2")[0]
+        
+        assert indexed.size == 3
+        assert indexed.mtime_ns == os.stat(path).st_mtime_ns
+    
+    def test_archivo_reescrito_sin_cambiar_el_directorio(self, temp_dir):
+        """Debe informar el tamaño y la fecha actuales de un archivo reescrito, sin volver a escanear."""
+        path = touch(temp_dir, "TP1_1K2.csv")
+        old = 1_000_000_000_000_000_000
+        os.utime(temp_dir, ns=(old, old))
+        index = InputIndex(temp_dir)
+        assert index.find("TP", 1, "1K2")[0].size == 0
+        
+        with open(path, 'w') as f:
+            f.write("abcde")
+        os.utime(temp_dir, ns=(old, old))
+        
+        assert [(f.size, f.mtime_ns) for f in index.find("TP", 1, "1K2")] == [(5, os.stat(path).st_mtime_ns)]
+        assert [f.size for f in index.files()] == [5]
+        assert index.scan_count == 1
+    
+    def test_rutas_relativas_al_directorio_configurado(self, temp_dir, monkeypatch):
+        """find_files_case_insensitive debe unir el directorio indicado con cada nombre, como antes del índice."""
+        os.makedirs(os.path.join(temp_dir, "inputs"))
+        touch(os.path.join(temp_dir, "inputs"), "tp1_1k2_1.csv")
+        touch(os.path.join(temp_dir, "inputs"), "TP1_1K2.csv")
+        monkeypatch.chdir(temp_dir)
+        
+        assert find_files_case_insensitive("inputs", "TP1_1K2") == [
+            os.path.join("inputs", "TP1_1K2.csv"), os.path.join("inputs", "tp1_1k2_1.csv")
+        ]
+    
+    def test_no_reescanea_si_no_cambia_el_directorio(self, temp_dir):
+        """Debe reutilizar el escaneo mientras el mtime del directorio no cambie."""
+        touch(temp_dir, "TP1_1K2.csv")
+        old = 1_000_000_000_000_000_000
+        os.utime(temp_dir, ns=(old, old))
+        index = InputIndex(temp_dir)
+        
+        index.find("TP", 1, "1K2")
+        index.find("TP", 2, "1K2")
+        
+        assert index.scan_count == 1
+    
+    def test_reescanea_cuando_cambia_el_directorio(self, temp_dir):
+        """Debe detectar archivos nuevos cuando cambia el mtime del directorio."""
+        touch(temp_dir, "TP1_1K2.csv")
+        old = 1_000_000_000_000_000_000
+        os.utime(temp_dir, ns=(old, old))
+        index = InputIndex(temp_dir)
+        assert index.find("TP", 2, "1K2") == []
+        
+        touch(temp_dir, "TP2_1K2.csv")
+        
+        assert len(index.find("TP", 2, "1K2")) == 1
+        assert index.scan_count == 2
+    
+    def test_directorio_inexistente(self, temp_dir):
+        """Debe comportarse como un directorio vacío si no existe."""
+        index = InputIndex(os.path.join(temp_dir, "no_existe"))
+        
+        assert index.find("TP", 1, "1K2") == []
+        assert find_files_case_insensitive(os.path.join(temp_dir, "no_existe"), "TP1_1K2") == []
+    
+    def test_cursos_filtrados_por_prefijo(self, temp_dir):
+        """Debe listar los cursos de los prefijos indicados."""
+        touch(temp_dir, "TP1_1K2.csv")
+        touch(temp_dir, "Otro1_3K1.csv")
+        
+        index = InputIndex(temp_dir)
+        
+        assert index.courses(["TP"]) == ["1K2"]
+        assert sorted(index.courses()) == ["1K2", "3K1"]
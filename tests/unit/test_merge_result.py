@@ -0,0 +1,63 @@
+"""
+Tests unitarios para el resultado en memoria de las unificaciones.
+"""
+import pytest
+import sys
+from src.managers import MergedGrades, StudentRecord
+
+
+def make_tps():
+    """Unificado de dos TPs con un alumno en ambos y otro sólo en el segundo."""
+    fieldnames = ["Apellido(s)", "Nombre", "Número de ID",
+                  "TP1", "TP1_Nota", "TP1_Intentos", "TP2", "TP2_Nota", "TP2_Intentos"]
+    result = MergedGrades(course="1K2", fieldnames=fieldnames, evaluations=["TP1", "TP2"], with_attempts=True)
+    first = result.add_student("10001", "García", "Ana")
+    result.set_grade(first, 0, 7.5, 6, 2)
+    second = result.add_student("10002", "López", "Juan")
+    result.set_grade(second, 1, 1.0, "FALTA", 1)
+    result.set_grade(first, 1, 9.25, 9, 1)
+    return result
+
+
+@pytest.mark.unit
+class TestMergedGrades:
+    """Tests para MergedGrades y StudentRecord."""
+    
+    def test_valores_por_alumno(self):
+        """Debe devolver los valores tipados y "" en las evaluaciones no rendidas."""
+        result = make_tps()
+        first, second = result.records.values()
+        
+        assert len(result) == 2
+        assert result.values(first) == [7.5, 6, 2, 9.25, 9, 1]
+        assert result.values(second) == ["", "", "", 1.0, "FALTA", 1]
+    
+    def test_vista_por_columnas(self):
+        """La vista students debe tener las mismas filas que el unificado anterior."""
+        students = make_tps().students
+        
+        assert list(students) == ["10001", "10002"]
+        assert students["10002"] == {
+            "Apellido(s)": "López", "Nombre": "Juan", "Número de ID": "10002",
+            "TP1": "", "TP1_Nota": "", "TP1_Intentos": "",
+            "TP2": 1.0, "TP2_Nota": "FALTA", "TP2_Intentos": 1,
+        }
+    
+    def test_posiciones_y_aprobados(self):
+        """Las evaluaciones ajenas al unificado deben quedar vacías y no contar como aprobadas."""
+        result = make_tps()
+        first = result.records["10001"]
+        positions = result.positions(["TP2", "TP3"])
+        
+        assert positions == [1, None]
+        assert result.values(first, positions) == [9.25, 9, 1, "", "", ""]
+        assert result.count_at_least(first, 4) == 2
+        assert result.count_at_least(first, 4, positions) == 1
+        assert result.count_at_least(result.records["10002"], 4) == 0
+    
+    def test_textos_internados(self):
+        """El ID y los nombres deben guardarse internados."""
+        record = StudentRecord("".join(["100", "01"]), "García", "Ana", 0)
+        
+        assert record.student_id is sys.intern("10001")
+        assert not hasattr(record, "__dict__")
@@ -0,0 +1,117 @@
+"""
+Tests unitarios para la medición por etapa.
+"""
+import pytest
+import json
+import os
+from dataclasses import replace
+from src.cli import run, EXIT_OK
+from src.generators import BatchReportGenerator
+from src.utils import Settings
+from src.utils.metrics import METRICS, add_counts, collect_metrics, timed
+from tests.factories.random_exports import random_rows, write_export
+
+
+@timed("etapa_curso", course_arg="course")
+def course_stage(base_name, course, rows=0):
+    """Etapa de prueba con el curso como argumento."""
+    add_counts(rows_read=rows, bytes_read=10 * rows)
+    return inner_stage(rows)
+
+
+@timed("etapa_interna")
+def inner_stage(rows):
+    """Etapa de prueba que hereda el curso."""
+    add_counts(rows_written=rows // 2)
+    return rows
+
+
+@pytest.mark.unit
+class TestMetrics:
+    """Tests para MetricsRecorder, timed y --metrics."""
+    
+    @pytest.fixture(autouse=True)
+    def clean_metrics(self):
+        """Deja la medición desactivada y vacía después de cada test."""
+        yield
+        METRICS.disable()
+        METRICS.reset()
+    
+    def test_desactivada_no_registra(self):
+        """Sin activar, las etapas se ejecutan igual pero no se registra nada."""
+        assert course_stage("TP1_1K2", "1K2", rows=4) == 4
+        assert METRICS.snapshot() == []
+    
+    def test_etapas_por_curso(self):
+        """Debe acumular llamadas y contadores por etapa y curso, heredando el curso."""
+        METRICS.enable()
+        course_stage("TP1_1k2", "1k2", rows=10)
+        course_stage("TP2_1K2", course="1K2", rows=6)
+        course_stage("TP1_1K4", "1K4", rows=2)
+        
+        stats = {(item.stage, item.course): item for item in METRICS.snapshot()}
+        assert stats[("etapa_curso", "1K2")].calls == 2
+        assert stats[("etapa_curso", "1K2")].rows_read == 16
+        assert stats[("etapa_curso", "1K2")].bytes_read == 160
+        assert stats[("etapa_interna", "1K2")].rows_written == 8
+        assert stats[("etapa_interna", "1K4")].calls == 1
+        assert stats[("etapa_curso", "1K2")].wall_seconds >= stats[("etapa_interna", "1K2")].wall_seconds
+        
+        totals = {item.stage: item for item in METRICS.totals_by_stage()}
+        assert totals["etapa_curso"].rows_read == 18
+        assert "etapa_interna" in METRICS.summary_table()
+    
+    def test_collect_metrics_conserva_los_totales(self):
+        """Las mediciones de un bloque separado no se mezclan hasta hacer merge."""
+        METRICS.enable()
+        course_stage("TP1_1K1", "1K1", rows=1)
+        
+        with collect_metrics(True) as collected:
+            course_stage("TP1_1K2", "1K2", rows=3)
+        with collect_metrics(False) as ignored:
+            course_stage("TP1_1K3", "1K3", rows=3)
+        
+        assert {item.course for item in collected} == {"1K2"}
+        assert ignored == []
+        assert {item.course for item in METRICS.snapshot()} == {"1K1", "1K3"}
+        METRICS.merge(collected)
+        assert {item.course for item in METRICS.snapshot()} == {"1K1", "1K2", "1K3"}
+    
+    def test_procesos_hijos(self, test_dirs):
+        """Las etapas de los cursos generados en otros procesos deben sumarse al proceso principal."""
+        for course in ("1K1", "1K2"):
+            for index, name in enumerate(["TP1", "Parcial1"]):
+                write_export(os.path.join(test_dirs['input'], f"{name}_{course}.csv"), random_rows(index, 40, "10", 2))
+        settings = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'], output_format="xlsx",
+                            header_apellido=("Apellido(s)",))
+        
+        METRICS.enable()
+        BatchReportGenerator(replace(settings, evaluation_workers=2)).generate_all_reports(["1K1", "1K2"], max_workers=2)
+        
+        stats = {(item.stage, item.course): item for item in METRICS.snapshot()}
+        for course in ("1K1", "1K2"):
+            assert stats[("generate_final_report", course)].rows_written > 0
+            # Se consultan las 8 evaluaciones configuradas; sólo TP1 y Parcial1 tienen archivos
+            assert stats[("consolidate", course)].calls == 8
+            assert stats[("consolidate", course)].rows_read == 80
+            assert stats[("merge_tps", course)].calls == 1
+            # Las filas se cuentan sólo en la etapa que lee los archivos
+            assert stats[("merge_tps", course)].rows_read == 0
+    
+    def test_cli_guarda_json(self, test_config_path, test_dirs, capsys):
+        """--metrics debe guardar el JSON y mostrar la tabla de resumen."""
+        os.chdir(test_dirs['root'])
+        write_export(os.path.join(test_dirs['input'], "TP1_1K1.csv"), random_rows(1, 30, "10", 2))
+        metrics_file = os.path.join(test_dirs['root'], "metricas", "run.json")
+        
+        assert run(["--config", test_config_path, "--metrics", metrics_file, "merge-tps", "--course", "1K1"]) == EXIT_OK
+        
+        with open(metrics_file, encoding='utf-8') as f:
+            report = json.load(f)
+        stages = {item["stage"]: item for item in report["stages"]}
+        assert stages["consolidate"]["rows_read"] == 30
+        assert stages["consolidate"]["bytes_read"] == os.path.getsize(os.path.join(test_dirs['input'], "TP1_1K1.csv"))
+        assert stages["merge_tps"]["course"] == "1K1"
+        assert stages["find_files_case_insensitive"]["calls"] == 4
+        assert "Tiempos por etapa" in capsys.readouterr().out
+        assert not METRICS.enabled
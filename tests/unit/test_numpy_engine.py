@@ -0,0 +1,171 @@
+"""
+Tests unitarios para el motor opcional basado en NumPy.
+"""
+import pytest
+import os
+from src.utils.csv_helpers import BestGradeAccumulator, create_best_grade_accumulator
+from src.utils.file_consolidator import FileConsolidator
+from tests.factories.random_exports import HEADER_MAP, random_rows, write_export
+
+
+def accumulate(engine, files):
+    """Lee los archivos con el motor indicado."""
+    accumulator = create_best_grade_accumulator(HEADER_MAP, engine=engine)
+    for file_path in files:
+        accumulator.add_file(file_path)
+    return accumulator
+
+
+@pytest.mark.unit
+class TestNumpyBestGradeAccumulator:
+    """Tests de equivalencia con el motor de Python."""
+    
+    @pytest.fixture(autouse=True)
+    def require_numpy(self):
+        """Los tests de equivalencia necesitan NumPy instalado."""
+        pytest.importorskip("numpy")
+    
+    @pytest.mark.parametrize("scale,decimals", [("10", 2), ("10", 3), ("100", 2)])
+    def test_mismo_resultado_que_motor_python(self, temp_dir, monkeypatch, scale, decimals):
+        """Debe obtener los mismos registros, intentos y orden, también entre bloques y archivos."""
+        from src.utils.numpy_engine import NumpyBestGradeAccumulator
+        monkeypatch.setattr(NumpyBestGradeAccumulator, "CHUNK_SIZE", 64)
+        
+        files = []
+        for shift in (1, 2):
+            file_path = os.path.join(temp_dir, f"TP1_1K2_{shift}.csv")
+            write_export(file_path, random_rows(shift, 500, scale, decimals), scale)
+            files.append(file_path)
+        
+        expected = accumulate("python", files)
+        result = accumulate("numpy", files)
+        
+        assert isinstance(result, NumpyBestGradeAccumulator)
+        assert list(result.best_rows().items()) == list(expected.best_rows().items())
+        assert list(result.attempts.items()) == list(expected.attempts.items())
+        assert result.fieldnames == expected.fieldnames
+    
+    def test_empate_conserva_primer_intento(self, temp_dir):
+        """Ante notas iguales debe conservar el primer intento leído."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_export(file_path, [
+            ["García", "Primero", "100", "8,00", "1,00"],
+            ["García", "Segundo", "100", "8,00", "0,00"],
+        ])
+        
+        result = accumulate("numpy", [file_path])
+        
+        assert result.best_rows()["100"]["Nombre"] == "Primero"
+        assert result.attempts == {"100": 2}
+    
+    def test_notas_sin_calificar_e_invalidas(self, temp_dir):
+        """Debe tratar "-" e inválidas igual que el motor de Python, con el mismo reporte."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_export(file_path, [
+            ["García", "Juan", "100", "-", ""],
+            ["García", "Juan", "100", "6,50", ""],
+            ["López", "Ana", "200", "abc", ""],
+            ["López", "Ana", "200", "", ""],
+            ["Pérez", "Luis", "300", "9,00", ""],
+        ])
+        
+        expected = accumulate("python", [file_path])
+        result = accumulate("numpy", [file_path])
+        
+        assert list(result.best_rows().items()) == list(expected.best_rows().items())
+        # Los alumnos sin intentos calificados van al final, sin nota
+        assert list(result.best_rows()) == ["100", "300", "200"]
+        assert result.best_rows()["200"]["Calificación/10,00"] is None
+        assert result.attempts == expected.attempts == {"100": 2, "200": 2, "300": 1}
+        assert result.issues == expected.issues
+        assert [issue.line for issue in result.issues] == [4]
+    
+    def test_linea_de_nota_invalida_con_celdas_multilinea(self, temp_dir, monkeypatch):
+        """Las notas inválidas deben llevar la misma línea que en el motor de Python aunque haya celdas con saltos de línea."""
+        from src.utils.numpy_engine import NumpyBestGradeAccumulator
+        monkeypatch.setattr(NumpyBestGradeAccumulator, "CHUNK_SIZE", 3)
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_export(file_path, [
+            ["García", "Juan", "100", "abc", "línea 1\nlínea 2"],
+            ["López", "Ana", "200", "7,00", "a\nb\nc"],
+            ["Pérez", "Luis", "300", "xyz", ""],
+            ["Díaz", "Eva", "400", "?", "x\ny"],
+        ])
+        
+        expected = accumulate("python", [file_path])
+        result = accumulate("numpy", [file_path])
+        
+        assert [issue.line for issue in result.issues] == [3, 7, 9]
+        assert result.issues == expected.issues
+    
+    @pytest.mark.parametrize("source", ["csv", "cache"])
+    def test_orden_con_primeros_intentos_sin_calificar(self, temp_dir, monkeypatch, source):
+        """Un alumno cuyo primer intento es "-" debe ubicarse según su primer intento calificado."""
+        from src.utils.numpy_engine import NumpyBestGradeAccumulator
+        from src.utils.parse_cache import ParseCache
+        monkeypatch.setattr(NumpyBestGradeAccumulator, "CHUNK_SIZE", 64)
+        
+        first = os.path.join(temp_dir, "TP1_1K2_1.csv")
+        write_export(first, [["A", "Uno", "1", "-", ""], ["B", "Dos", "2", "5,00", ""], ["A", "Uno", "1", "7,00", ""]])
+        files = [first]
+        for shift in (2, 3):
+            rows = random_rows(shift, 400, "10", 2)
+            seen = set()
+            for row in rows[:-1]:
+                # Sin calificar el primer intento de cada alumno con ID par
+                if row[2] not in seen and int(row[2]) % 2 == 0:
+                    row[3] = "-"
+                seen.add(row[2])
+            files.append(os.path.join(temp_dir, f"TP1_1K2_{shift}.csv"))
+            write_export(files[-1], rows)
+        
+        expected = accumulate("python", files)
+        if source == "csv":
+            result = accumulate("numpy", files)
+        else:
+            cache = ParseCache(os.path.join(temp_dir, ".cache"), HEADER_MAP)
+            result = create_best_grade_accumulator(HEADER_MAP, engine="numpy")
+            for file_path in files:
+                result.add_parsed(cache.load(file_path))
+        
+        assert list(expected.best_rows())[:2] == ["2", "1"]
+        assert list(result.best_rows().items()) == list(expected.best_rows().items())
+        assert list(result.attempts.items()) == list(expected.attempts.items())
+    
+    def test_filtrado_identico_en_consolidador(self, test_dirs):
+        """El _filtrado.csv generado debe ser idéntico byte a byte con ambos motores."""
+        write_export(os.path.join(test_dirs['input'], "TP1_1K2.csv"), random_rows(7, 300, "100", 2), "100")
+        
+        contents = []
+        for engine in ("python", "numpy"):
+            output_dir = os.path.join(test_dirs['output'], engine)
+            consolidator = FileConsolidator(test_dirs['input'], output_dir, HEADER_MAP, "tps", engine=engine)
+            result = consolidator.consolidate("TP1_1K2", "1K2")
+            with open(result.output_file, 'rb') as f:
+                contents.append(f.read())
+        
+        assert contents[0] == contents[1]
+
+
+@pytest.mark.unit
+class TestCreateBestGradeAccumulator:
+    """Tests para la selección del motor."""
+    
+    def test_motor_python_por_defecto(self):
+        """Sin indicar motor debe usar el acumulador de Python."""
+        assert type(create_best_grade_accumulator(HEADER_MAP)) is BestGradeAccumulator
+    
+    def test_sin_numpy_usa_motor_python(self, mocker, capsys):
+        """Si NumPy no está instalado debe avisar y usar el motor de Python."""
+        mocker.patch("src.utils.numpy_engine.numpy_available", return_value=False)
+        mocker.patch("src.utils.csv_helpers._numpy_warning_shown", False)
+        
+        accumulator = create_best_grade_accumulator(HEADER_MAP, engine="numpy")
+        
+        assert type(accumulator) is BestGradeAccumulator
+        assert "NumPy no está instalado" in capsys.readouterr().out
+    
+    def test_motor_invalido(self):
+        """Debe lanzar ValueError con un motor desconocido."""
+        with pytest.raises(ValueError):
+            create_best_grade_accumulator(HEADER_MAP, engine="pandas")
@@ -0,0 +1,177 @@
+"""
+Tests unitarios para la lectura de un export por rangos de bytes en paralelo.
+"""
+import pytest
+import csv
+import io
+import os
+from dataclasses import replace
+from functools import reduce
+from src.utils import Settings
+from src.utils import parallel_parse
+from src.utils.csv_helpers import BestGradeAccumulator, read_csv_with_best_grades
+from src.utils.file_consolidator import FileConsolidator
+from src.utils.parallel_parse import merge_partials, parse_range, read_header, resolve_entry, split_ranges, summarize_files
+from src.managers import TPManager
+from tests.factories.random_exports import HEADER_MAP, random_rows, write_export
+
+
+def write_big_export(file_path, scale="10", decimals=3, count=4000):
+    """Export con celdas de varias líneas, notas inválidas y sin calificar."""
+    rows = random_rows(5, count, scale, decimals)
+    for position in range(0, len(rows), 97):
+        rows[position][4] = "línea 1\nlínea \"2\"\r\n\"3\""
+    rows.insert(50, ["Ap1", "N", "1", "abc", ""])
+    rows.insert(70, ["Ap2", "N", "2", "-", ""])
+    rows.insert(90, [])
+    write_export(file_path, rows, scale)
+
+
+def parse_in_ranges(file_path, parts):
+    """Resume cada rango del archivo en este proceso."""
+    fieldnames, data_start = read_header(file_path, 'utf-8-sig')
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    return [
+        parse_range((file_path, start, end, data.count(b"\n", 0, start), 'utf-8-sig', fieldnames, HEADER_MAP, False))
+        for start, end in split_ranges(data, data_start, parts)
+    ]
+
+
+def apply(partial):
+    """Mejor nota y fila de cada alumno partiendo sin intentos previos."""
+    return {student_id: resolve_entry(entries, None)[1:] for student_id, entries in partial.best.items()}
+
+
+@pytest.mark.unit
+class TestParallelParse:
+    """Tests para parallel_parse."""
+    
+    @pytest.fixture
+    def small_ranges(self, monkeypatch):
+        """Permite dividir archivos chicos."""
+        monkeypatch.setattr(parallel_parse, "PARALLEL_MIN_BYTES", 0)
+        monkeypatch.setattr(parallel_parse, "MIN_RANGE_BYTES", 1)
+    
+    def test_rangos_terminan_en_fin_de_registro(self):
+        """Un salto de línea dentro de comillas no debe ser límite de rango."""
+        data = b'h\n"a\n\n\n\nb",1\n"x""\ny",2\nz,3\n'
+        
+        for parts in range(1, 12):
+            ranges = split_ranges(data, 2, parts)
+            assert ranges[0][0] == 2 and ranges[-1][1] == len(data)
+            rows = []
+            for start, end in ranges:
+                rows.extend(csv.reader(io.StringIO(data[start:end].decode(), newline='')))
+            assert rows == [["a\n\n\n\nb", "1"], ["x\"\ny", "2"], ["z", "3"]]
+    
+    @pytest.mark.parametrize("scale,decimals", [("10", 3), ("100", 2)])
+    def test_mismo_resultado_que_lectura_secuencial(self, temp_dir, small_ranges, scale, decimals):
+        """Debe dar los mismos registros, intentos, orden e issues que add_file."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_big_export(file_path, scale, decimals)
+        expected = BestGradeAccumulator(HEADER_MAP)
+        expected.add_file(file_path)
+        
+        result = BestGradeAccumulator(HEADER_MAP)
+        result.add_file_parallel(file_path, max_workers=4)
+        
+        assert list(result.best_rows().items()) == list(expected.best_rows().items())
+        assert list(result.attempts.items()) == list(expected.attempts.items())
+        assert result.issues == expected.issues
+        assert result.fieldnames == expected.fieldnames
+    
+    def test_sobre_notas_de_otro_archivo(self, temp_dir, small_ranges):
+        """Cada alumno debe continuar desde la nota guardada de los archivos anteriores."""
+        files = [os.path.join(temp_dir, f"TP1_1K2_{shift}.csv") for shift in (1, 2)]
+        write_export(files[0], random_rows(8, 2000, "10", 3))
+        write_big_export(files[1])
+        expected = BestGradeAccumulator(HEADER_MAP)
+        result = BestGradeAccumulator(HEADER_MAP)
+        for file_path in files:
+            expected.add_file(file_path)
+            result.add_file_parallel(file_path, max_workers=3)
+        
+        assert list(result.best_rows().items()) == list(expected.best_rows().items())
+    
+    def test_combinacion_asociativa(self, temp_dir):
+        """Combinar los rangos en cualquier agrupación debe dar lo mismo que un solo rango."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_big_export(file_path)
+        whole = parse_in_ranges(file_path, 1)[0]
+        partials = parse_in_ranges(file_path, 40)
+        assert len(partials) == 40
+        
+        left = reduce(merge_partials, partials)
+        half = len(partials) // 2
+        grouped = merge_partials(reduce(merge_partials, partials[:half]), reduce(merge_partials, partials[half:]))
+        
+        for merged in (left, grouped):
+            assert list(apply(merged).items()) == list(apply(whole).items())
+            assert list(merged.attempts.items()) == list(whole.attempts.items())
+            assert merged.issues == whole.issues
+    
+    def test_archivo_chico_se_lee_de_corrido(self, temp_dir):
+        """Por debajo del umbral se debe usar la lectura secuencial."""
+        file_path = os.path.join(temp_dir, "TP1_1K2.csv")
+        write_export(file_path, random_rows(1, 100, "10", 2))
+        
+        assert parallel_parse.parse_file_parallel(file_path, HEADER_MAP, max_workers=4) is None
+        assert read_csv_with_best_grades(file_path, HEADER_MAP, max_workers=4) == read_csv_with_best_grades(file_path, HEADER_MAP)
+    
+    def test_configuracion(self, test_dirs, small_ranges):
+        """Con parse_workers los managers deben obtener el mismo resultado."""
+        write_big_export(os.path.join(test_dirs['input'], "TP1_1K2.csv"))
+        settings = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'],
+                            header_apellido=("Apellido(s)",))
+        
+        expected = TPManager(settings).merge_tps("1K2", write_csv=False)
+        assert TPManager(replace(settings, parse_workers=2)).merge_tps("1K2", write_csv=False).students == expected.students
+
+
+@pytest.mark.unit
+class TestShiftFiles:
+    """Tests para la lectura simultánea de los turnos de una evaluación."""
+    
+    @pytest.fixture
+    def shift_files(self, test_dirs):
+        """Tres turnos de un TP con alumnos repetidos, notas inválidas y celdas de varias líneas."""
+        files = []
+        for shift in (1, 2, 3):
+            file_path = os.path.join(test_dirs['input'], f"TP1_1K2_{shift}.csv")
+            if shift == 2:
+                write_big_export(file_path, count=1200)
+            else:
+                write_export(file_path, random_rows(shift, 600, "10", 3))
+            files.append(file_path)
+        return files
+    
+    @pytest.mark.parametrize("pool", ["thread", "process"])
+    @pytest.mark.parametrize("engine", ["python", "numpy"])
+    def test_mismo_resultado_que_lectura_secuencial(self, test_dirs, shift_files, pool, engine):
+        """Debe dar el mismo consolidado, en el mismo orden, que leer los turnos de a uno."""
+        if engine == "numpy":
+            pytest.importorskip("numpy")
+        sequential = FileConsolidator(test_dirs['input'], test_dirs['output'], HEADER_MAP, "tps", engine=engine)
+        concurrent = FileConsolidator(test_dirs['input'], test_dirs['output'], HEADER_MAP, "tps", engine=engine,
+                                      shift_workers=3, shift_pool=pool)
+        
+        expected = sequential.consolidate("TP1_1K2", "1K2")
+        result = concurrent.consolidate("TP1_1K2", "1K2")
+        
+        assert result.source_files == expected.source_files == shift_files
+        assert list(result.best_attempts.items()) == list(expected.best_attempts.items())
+        assert list(result.attempts.items()) == list(expected.attempts.items())
+        # El motor NumPy no ubica la línea en bloques con celdas de varias líneas; los resúmenes sí
+        assert [(i.student_id, i.value) for i in result.issues] == [(i.student_id, i.value) for i in expected.issues]
+        assert [i.line for i in result.issues] == [54]
+    
+    def test_errores(self, temp_dir, shift_files):
+        """Un pool inválido o un archivo sin headers deben informarse como en la lectura secuencial."""
+        with pytest.raises(ValueError, match="Pool inválido"):
+            summarize_files(shift_files, HEADER_MAP, pool="fiber")
+        
+        empty = os.path.join(temp_dir, "TP1_1K2_4.csv")
+        open(empty, 'w').close()
+        with pytest.raises(ValueError, match="vacío"):
+            summarize_files(shift_files + [empty], HEADER_MAP, max_workers=2)
@@ -0,0 +1,233 @@
+"""
+Tests unitarios para la caché binaria de exports interpretados.
+"""
+import pytest
+import csv
+import io
+import os
+from dataclasses import replace
+from src.utils import Settings
+from src.utils import parse_cache as parse_cache_module
+from src.utils.csv_helpers import count_student_attempts, create_best_grade_accumulator
+from src.utils import file_consolidator
+from src.utils.file_consolidator import FileConsolidator
+from src.utils.parse_cache import ParseCache, create_parse_cache, replace_field
+from src.managers import TPManager
+from tests.factories.random_exports import HEADER_MAP, random_rows, write_export
+
+
+def accumulate(engine, files, cache=None):
+    """Lee los archivos desde el CSV o, si se indica, desde la caché."""
+    accumulator = create_best_grade_accumulator(HEADER_MAP, engine=engine)
+    for file_path in files:
+        if cache is None:
+            accumulator.add_file(file_path)
+        else:
+            accumulator.add_parsed(cache.load(file_path))
+    return accumulator
+
+
+@pytest.mark.unit
+class TestParseCache:
+    """Tests para ParseCache."""
+    
+    @pytest.fixture
+    def cache(self, temp_dir):
+        """Caché en el directorio temporal."""
+        return ParseCache(os.path.join(temp_dir, ".cache"), HEADER_MAP)
+    
+    @pytest.fixture
+    def files(self, temp_dir):
+        """Dos turnos de un TP, uno con una celda con saltos de línea y otro con notas inválidas."""
+        first = os.path.join(temp_dir, "TP1_1K2_1.csv")
+        rows = random_rows(1, 300, "10", 3)
+        rows.insert(5, ["Pérez", "Ana", "1", "9,99", "línea 1\nlínea \"2\""])
+        rows.insert(9, ["Pérez", "Ana", "1", "abc", ""])
+        rows.insert(12, [])
+        write_export(first, rows)
+        second = os.path.join(temp_dir, "TP1_1K2_2.csv")
+        write_export(second, random_rows(2, 300, "10", 2) + [["Pérez", "Ana", "1", "-", ""]])
+        return [first, second]
+    
+    @pytest.mark.parametrize("engine", ["python", "numpy"])
+    def test_mismo_resultado_que_csv(self, cache, files, engine):
+        """Desde la caché se deben obtener los mismos registros, intentos, orden e issues."""
+        if engine == "numpy":
+            pytest.importorskip("numpy")
+        expected = accumulate(engine, files)
+        
+        for _ in range(2):
+            result = accumulate(engine, files, cache)
+            assert list(result.best_rows().items()) == list(expected.best_rows().items())
+            assert list(result.attempts.items()) == list(expected.attempts.items())
+            # El motor NumPy no ubica la línea en bloques con celdas de varias líneas
+            assert [(i.student_id, i.value) for i in result.issues] == [(i.student_id, i.value) for i in expected.issues]
+            assert [i.line for i in result.issues] == [12]
+            assert result.fieldnames == expected.fieldnames
+        assert (cache.misses, cache.hits) == (2, 2)
+    
+    def test_no_vuelve_a_interpretar(self, cache, files, monkeypatch):
+        """Con la entrada vigente no se debe leer el CSV completo."""
+        cache.load(files[0])
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("no debería interpretar el CSV")
+        monkeypatch.setattr(parse_cache_module, "parse_export", fail)
+        
+        assert len(cache.load(files[0]).ids) == 302
+    
+    def test_invalidacion(self, cache, files):
+        """Un cambio de contenido invalida la entrada; tocar el archivo no."""
+        cache.load(files[0])
+        stat = os.stat(files[0])
+        
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        cache.load(files[0])
+        assert cache.hits == 1
+        
+        with open(files[0], 'r+b') as f:
+            content = f.read()
+            f.seek(0)
+            f.write(content.replace(b"Ap", b"Xp", 1))
+        os.utime(files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        cache.load(files[0])
+        assert cache.misses == 2
+    
+    def test_entrada_corrupta(self, cache, files):
+        """Una entrada truncada se descarta y se vuelve a generar."""
+        expected = cache.load(files[0]).ids
+        entry = cache.entry_path(files[0])
+        with open(entry, 'r+b') as f:
+            f.truncate(os.path.getsize(entry) - 3)
+        
+        assert cache.load(files[0]).ids == expected
+        assert cache.misses == 2
+    
+    def test_desalojo_lru(self, temp_dir, files):
+        """Al superar el presupuesto se debe descartar la entrada usada hace más tiempo."""
+        cache = ParseCache(os.path.join(temp_dir, ".cache"), HEADER_MAP)
+        cache.load(files[0])
+        cache.load(files[1])
+        sizes = [os.path.getsize(cache.entry_path(f)) for f in files]
+        os.utime(cache.entry_path(files[0]), ns=(0, 0))
+        
+        cache.max_bytes = sum(sizes)
+        third = os.path.join(temp_dir, "TP2_1K2.csv")
+        write_export(third, random_rows(1, 300, "10", 3))
+        cache.load(third)
+        
+        assert not os.path.exists(cache.entry_path(files[0]))
+        assert os.path.exists(cache.entry_path(files[1]))
+        assert os.path.exists(cache.entry_path(third))
+    
+    def test_count_student_attempts(self, cache, files):
+        """Debe contar los intentos igual desde la caché."""
+        expected = count_student_attempts(files[0], HEADER_MAP)
+        assert count_student_attempts(files[0], HEADER_MAP, cache=cache) == expected
+        assert count_student_attempts(files[0], HEADER_MAP, cache=cache) == expected
+        assert cache.hits == 1
+    
+    def test_configuracion(self, test_dirs):
+        """Con parse_cache los managers deben usar outputs/.cache."""
+        write_export(os.path.join(test_dirs['input'], "TP1_1K2.csv"), random_rows(3, 100, "100", 2), "100")
+        settings = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'],
+                            header_apellido=("Apellido(s)",), parse_cache=True)
+        
+        assert create_parse_cache(Settings()) is None
+        expected = TPManager(replace(settings, parse_cache=False)).merge_tps("1K2", write_csv=False)
+        assert TPManager(settings).merge_tps("1K2", write_csv=False).students == expected.students
+        assert os.listdir(os.path.join(test_dirs['output'], ".cache"))
+
+
+@pytest.mark.unit
+class TestFilteredRows:
+    """Tests para el filtrado que copia los bytes originales de cada mejor intento."""
+    
+    def filter_both_ways(self, temp_dir, input_file, monkeypatch):
+        """Filtra con recorte de bytes y con csv.DictWriter; retorna ambos contenidos."""
+        consolidator = FileConsolidator(temp_dir, temp_dir, HEADER_MAP, "tps")
+        fast = os.path.join(temp_dir, "rapido.csv")
+        consolidator._filter_best_grade(input_file, fast)
+        
+        monkeypatch.setattr(file_consolidator, "ascii_compatible", lambda encoding: False)
+        slow = os.path.join(temp_dir, "lento.csv")
+        consolidator._filter_best_grade(input_file, slow)
+        
+        with open(fast, 'rb') as f_fast, open(slow, 'rb') as f_slow:
+            return f_fast.read(), f_slow.read()
+    
+    @pytest.mark.parametrize("scale,decimals", [("10", 2), ("10", 3), ("100", 2)])
+    def test_mismo_archivo_que_dictwriter(self, temp_dir, monkeypatch, scale, decimals):
+        """Debe generar exactamente los mismos bytes que save_csv."""
+        input_file = os.path.join(temp_dir, "TP1_1K2.csv")
+        rows = random_rows(4, 400, scale, decimals)
+        rows.insert(3, ["Pérez, \"Ana\"", "N", "7", "10,00" if scale == "10" else "100,00", "línea 1\r\nlínea 2"])
+        rows.insert(8, ["Gómez", "N", "3", "-", ""])
+        write_export(input_file, rows, scale)
+        
+        fast, slow = self.filter_both_ways(temp_dir, input_file, monkeypatch)
+        assert fast == slow
+    
+    def test_filas_con_otro_formato(self, temp_dir, monkeypatch):
+        """Con comillas en todas las celdas y saltos "\\n" el contenido debe ser el mismo."""
+        input_file = os.path.join(temp_dir, "TP1_1K2.csv")
+        with open(input_file, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, quoting=csv.QUOTE_ALL, lineterminator="\n")
+            writer.writerow(["Apellido(s)", "Nombre", "Número de ID", "Calificación/10,00", "P. 1 /1,00"])
+            writer.writerows([["A", "N", "1", "5,00", "1"], ["A", "N", "1", "8,50", "2"], ["B", "N", "2", "7,00", "3"]])
+            f.write('"C","N","3","9,00","4"')  # Última fila sin salto de línea
+        
+        fast, slow = self.filter_both_ways(temp_dir, input_file, monkeypatch)
+        assert fast != slow
+        assert list(csv.reader(io.StringIO(fast.decode('utf-8-sig')))) == list(csv.reader(io.StringIO(slow.decode('utf-8-sig'))))
+        assert fast.endswith(b'"C","N","3",9.0,"4"\r\n')
+    
+    def test_replace_field(self):
+        """Debe reemplazar sólo la celda indicada, respetando comillas."""
+        assert replace_field(b'a,"b,""c""",8,50\r\n', 2, b"8.5") == b'a,"b,""c""",8.5,50\r\n'
+        assert replace_field(b'"x\ny",,"9,5"', 2, b"9.5") == b'"x\ny",,9.5'
+        assert replace_field(b"a,b", 3, b"1") is None
+        assert replace_field(b'"a"b,c', 1, b"1") is None
+    
+    @pytest.mark.parametrize("use_cache", [False, True])
+    def test_consolidacion_con_varios_turnos(self, test_dirs, monkeypatch, use_cache):
+        """consolidate() debe escribir el mismo filtrado y resultado que con csv.DictWriter."""
+        for shift, scale in ((1, "100"), (2, "100"), (3, "100")):
+            rows = random_rows(shift, 300, scale, 3)
+            rows.insert(2, ["Pérez, \"Ana\"", "N", "7", "99,99", "línea 1\r\nlínea 2"])
+            rows.insert(5, ["Gómez", "N", str(shift), "-", ""])
+            write_export(os.path.join(test_dirs['input'], f"TP1_1K2_{shift}.csv"), rows, scale)
+        cache = ParseCache(os.path.join(test_dirs['output'], ".cache"), HEADER_MAP) if use_cache else None
+        
+        results, contents = [], []
+        for name in ("rapido", "lento"):
+            if name == "lento":
+                monkeypatch.setattr(file_consolidator, "ascii_compatible", lambda encoding: False)
+            consolidator = FileConsolidator(test_dirs['input'], os.path.join(test_dirs['output'], name), HEADER_MAP,
+                                            "tps", parse_cache=cache)
+            result = consolidator.consolidate("TP1_1K2", "1K2")
+            results.append(result)
+            with open(result.output_file, 'rb') as f:
+                contents.append(f.read())
+        
+        fast, slow = results
+        assert contents[0] == contents[1]
+        assert list(fast.best_attempts.items()) == list(slow.best_attempts.items())
+        assert list(fast.attempts.items()) == list(slow.attempts.items())
+        assert fast.fieldnames == slow.fieldnames
+    
+    def test_consolidacion_con_columnas_distintas(self, test_dirs, monkeypatch):
+        """Si los turnos no tienen las mismas columnas se usa csv.DictWriter sin volver a leer."""
+        write_export(os.path.join(test_dirs['input'], "TP1_1K2_1.csv"), random_rows(1, 40, "10", 2))
+        with open(os.path.join(test_dirs['input'], "TP1_1K2_2.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(["Nombre", "Apellido(s)", "Número de ID", "Calificación/10,00", "P. 1 /1,00"])
+            writer.writerows([["N", "Ap1", "1", "9,50", "1,00"], ["N", "Ap999", "999", "4,00", "1,00"]])
+        monkeypatch.setattr(file_consolidator, "write_best_rows", None)
+        
+        result = FileConsolidator(test_dirs['input'], test_dirs['output'], HEADER_MAP, "tps").consolidate("TP1_1K2", "1K2")
+        
+        with open(result.output_file, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        assert rows[-1]["Número de ID"] == "999" and rows[-1]["Apellido(s)"] == "Ap999"
+        assert result.attempts["999"] == 1
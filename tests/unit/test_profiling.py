@@ -0,0 +1,100 @@
+"""
+Tests unitarios para los perfiles de CPU y memoria por curso.
+"""
+import pytest
+import os
+import pstats
+import tracemalloc
+from src.cli import run, EXIT_OK, EXIT_USAGE
+from src.generators import BatchReportGenerator
+from src.utils import Settings
+from src.utils.profiling import (
+    MEMPROFILE_FILE,
+    PROFILE_FILE,
+    PROFILE_SUMMARY_FILE,
+    ProfileOptions,
+    allocations_by_line,
+    profile_course,
+)
+from tests.factories.random_exports import random_rows, write_export
+
+
+def allocate_rows(count):
+    """Reserva memoria desde una línea de este archivo."""
+    return [bytearray(1000) for _ in range(count)]
+
+
+@pytest.mark.unit
+class TestProfiling:
+    """Tests para profile_course y las opciones --profile / --memprofile."""
+    
+    def test_sin_perfiles_no_escribe_nada(self, temp_dir):
+        """Sin perfiles pedidos no se debe crear la carpeta del curso."""
+        with profile_course(temp_dir, "1k2", ProfileOptions()):
+            pass
+        with profile_course(temp_dir, "1k2", None):
+            pass
+        assert os.listdir(temp_dir) == []
+    
+    def test_perfil_de_cpu(self, temp_dir):
+        """Debe guardar el .pstats y un resumen con las funciones del bloque."""
+        with profile_course(temp_dir, "1k2", ProfileOptions(cpu=True, top=5)):
+            allocate_rows(10)
+        
+        course_dir = os.path.join(temp_dir, "1K2")
+        stats = pstats.Stats(os.path.join(course_dir, PROFILE_FILE))
+        assert any(name == "allocate_rows" for _, _, name in stats.stats)
+        with open(os.path.join(course_dir, PROFILE_SUMMARY_FILE), encoding='utf-8') as f:
+            assert "allocate_rows" in f.read()
+        assert not os.path.exists(os.path.join(course_dir, MEMPROFILE_FILE))
+    
+    def test_memoria_por_linea(self, temp_dir):
+        """Las reservas se atribuyen a la línea más interna de los archivos seguidos."""
+        tracemalloc.start(10)
+        try:
+            rows = allocate_rows(200)
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+        
+        lines = allocations_by_line(snapshot, sources=("test_profiling.py",))
+        assert lines[0].filename.endswith("test_profiling.py")
+        assert lines[0].size >= 200 * 1000
+        assert lines[0].count >= 200
+        assert len(rows) == 200
+    
+    def test_perfil_de_memoria_en_procesos_hijos(self, test_dirs):
+        """Cada curso generado en otro proceso debe guardar su propio perfil de memoria."""
+        for course in ("1K1", "1K2"):
+            write_export(os.path.join(test_dirs['input'], f"TP1_{course}.csv"), random_rows(1, 300, "10", 3))
+        settings = Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'], output_format="xlsx",
+                            header_apellido=("Apellido(s)",))
+        
+        results = BatchReportGenerator(settings, profile=ProfileOptions(memory=True)).generate_all_reports(max_workers=2)
+        
+        assert all(result.ok for result in results)
+        for course in ("1K1", "1K2"):
+            with open(os.path.join(test_dirs['output'], course, MEMPROFILE_FILE), encoding='utf-8') as f:
+                content = f.read()
+            assert content.startswith("Pico de memoria:")
+            assert os.path.join("src", "utils", "csv_helpers.py") in content
+        assert not tracemalloc.is_tracing()
+    
+    def test_cli(self, test_config_path, test_dirs):
+        """--profile y --memprofile deben guardar los perfiles del curso y rechazar otros comandos."""
+        os.chdir(test_dirs['root'])
+        write_export(os.path.join(test_dirs['input'], "TP1_1K1.csv"), random_rows(1, 30, "10", 2))
+        
+        assert run(["--config", test_config_path, "--profile", "--memprofile", "--profile-top", "5",
+                    "merge-tps", "--course", "1k1"]) == EXIT_OK
+        
+        course_dir = os.path.join(test_dirs['output'], "1K1")
+        for name in (PROFILE_FILE, PROFILE_SUMMARY_FILE, MEMPROFILE_FILE):
+            assert os.path.exists(os.path.join(course_dir, name))
+        stats = pstats.Stats(os.path.join(course_dir, PROFILE_FILE))
+        assert any(name == "merge_tps" for _, _, name in stats.stats)
+        with open(os.path.join(course_dir, PROFILE_SUMMARY_FILE), encoding='utf-8') as f:
+            assert "(top 5)" in f.read()
+        
+        assert run(["--config", test_config_path, "--profile", "ingest"]) == EXIT_USAGE
+        assert run(["--config", test_config_path, "--profile-top", "0", "merge-tps", "--course", "1K1"]) == EXIT_USAGE
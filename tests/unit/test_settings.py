@@ -0,0 +1,63 @@
+"""
+Tests unitarios para la configuración compilada (Settings).
+"""
+import pytest
+import os
+import pickle
+import dataclasses
+from src.utils.config_loader import ConfigLoader
+from src.utils.settings import Settings
+from src.managers import TPManager
+
+
+@pytest.mark.unit
+class TestSettings:
+    """Tests para la clase Settings."""
+    
+    def test_compila_desde_config_loader(self, test_config_path):
+        """Debe tomar todos los valores del ConfigLoader."""
+        config = ConfigLoader(test_config_path)
+        settings = config.get_settings()
+        
+        assert settings.source_dir == "test_inputs"
+        assert settings.output_dir == "test_outputs"
+        assert settings.header_map == config.get_header_map()
+        assert settings.cantidad_tps == 4
+        assert settings.conversion_table == config.get_conversion_table()
+        assert config.get_settings() is settings
+    
+    def test_es_inmutable(self, test_config_path):
+        """No debe permitir modificar valores."""
+        settings = ConfigLoader(test_config_path).get_settings()
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            settings.source_dir = "otro"
+    
+    def test_se_puede_serializar(self, test_config_path):
+        """Debe poder enviarse a procesos hijos con pickle."""
+        settings = ConfigLoader(test_config_path).get_settings()
+        
+        restored = pickle.loads(pickle.dumps(settings))
+        
+        assert restored == settings
+        assert restored.conversion_table.convert(7.0) == 7
+    
+    def test_from_file_sin_efectos_secundarios(self, temp_dir, capsys):
+        """Leer la configuración no debe imprimir ni crear archivos."""
+        config_path = os.path.join(temp_dir, "no_existe.ini")
+        
+        settings = Settings.from_file(config_path)
+        
+        assert settings.source_dir == "inputs"
+        assert not os.path.exists(config_path)
+        assert capsys.readouterr().out == ""
+    
+    def test_managers_aceptan_settings(self, test_config_path):
+        """Los managers deben poder construirse directamente con Settings."""
+        settings = Settings.from_file(test_config_path)
+        
+        manager = TPManager(settings)
+        
+        assert manager.source_dir == "test_inputs"
+        assert manager.tp_prefix == "TP"
+        assert manager.header_map == settings.header_map
@@ -99,3 +99,67 @@ class TestTPManagerAttempts:
         assert student_attempts.get("10002") == "2"
         assert student_attempts.get("10003") == "1"
 
+
+
+@pytest.mark.unit
+class TestTPManagerInMemory:
+    """Tests para el resultado en memoria de merge_tps."""
+    
+    @pytest.fixture
+    def tp_manager(self, test_config_path, test_dirs):
+        """Crea una instancia de TPManager para tests."""
+        os.chdir(test_dirs['root'])
+        config = ConfigLoader(test_config_path)
+        return TPManager(config)
+    
+    def test_retorna_valores_tipados(self, tp_manager, test_dirs):
+        """Debe retornar notas e intentos tipados sin necesidad de releer el CSV."""
+        tp_file = os.path.join(test_dirs['input'], "TP1_1K2.csv")
+        CSVFileFactory.create_moodle_csv_with_attempts(tp_file, {"10001": 2})
+        
+        result = tp_manager.merge_tps("1k2")
+        
+        assert result.course == "1K2"
+        student = result.students["10001"]
+        assert isinstance(student["TP1"], float)
+        assert student["TP1_Intentos"] == 2
+        assert student["TP1_Nota"] in (2, 4, 5, 6, 7, 8, 9, 10)
+        assert student["TP2"] == ""
+        assert result.output_file is not None
+    
+    def test_alumno_sin_intentos_calificados(self, tp_manager, test_dirs):
+        """Un alumno con todos sus intentos en "-" debe quedar, sin nota y con sus intentos."""
+        from src.generators.report_generator import ReportGenerator
+        with open(os.path.join(test_dirs['input'], "TP1_1K2.csv"), 'w', newline='', encoding='utf-8-sig') as f:
+            f.write('Apellido(s),Nombre,Número de ID,"Calificación/10,00"\n')
+            f.write('García,Juan,1,"8,00"\n')
+            f.write('López,Ana,2,-\n')
+            f.write('López,Ana,2,-\n')
+        
+        result = tp_manager.merge_tps("1K2")
+        
+        assert list(result.records) == ["1", "2"]
+        with open(result.output_file, encoding='utf-8-sig') as f:
+            rows = {row["Número de ID"]: row for row in csv.DictReader(f)}
+        assert (rows["2"]["TP1"], rows["2"]["TP1_Nota"], rows["2"]["TP1_Intentos"]) == ("", "", "2")
+        assert rows["1"]["TP1"] == "8.0"
+        # En la planilla final la nota entera del alumno sin calificar es FALTA
+        report = ReportGenerator(tp_manager.settings)
+        row = dict(zip(report.build_columns(), list(report.iter_student_rows(["2"], result, None))[0]))
+        assert (row["TP1"], row["TP1_Nota"], row["TP1_Intentos"], row["TPs_Aprobados"]) == ("", "FALTA", 2, 0)
+    
+    def test_no_escribe_csv_si_se_desactiva(self, tp_manager, test_dirs):
+        """Con write_csv=False no debe escribir el archivo unificado."""
+        tp_file = os.path.join(test_dirs['input'], "TP1_1K2.csv")
+        CSVFileFactory.create_tp_file(tp_file, "1K2", 1, num_students=3)
+        
+        result = tp_manager.merge_tps("1K2", write_csv=False)
+        
+        output_file = os.path.join(test_dirs['output'], "1K2", "tps", "TPs_1K2_unificado.csv")
+        assert len(result) == 3
+        assert result.output_file is None
+        assert not os.path.exists(output_file)
+    
+    def test_sin_datos_retorna_none(self, tp_manager):
+        """Debe retornar None si no hay archivos de TPs."""
+        assert tp_manager.merge_tps("9Z9") is None
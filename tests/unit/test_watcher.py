@@ -0,0 +1,90 @@
+"""
+Tests unitarios para el modo watch (DirectoryWatcher y CourseWatcher).
+"""
+import pytest
+import os
+import threading
+import time
+from src.generators.course_watcher import CourseWatcher
+from src.utils.config_loader import ConfigLoader
+from src.utils.directory_watcher import DirectoryWatcher, changed_files, snapshot_directory
+from tests.factories import CSVFileFactory
+
+
+def write_later(paths, delay):
+    """Escribe los archivos desde otro hilo, separados por `delay` segundos."""
+    def write():
+        for path in paths:
+            time.sleep(delay)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write("Apellido(s),Nombre\n")
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+@pytest.mark.unit
+class TestDirectoryWatcher:
+    """Tests para la detección de cambios en el directorio."""
+    
+    def test_changed_files(self):
+        """Debe detectar archivos agregados, modificados y eliminados."""
+        before = {"a.csv": (1, 1), "b.csv": (1, 1), "c.csv": (1, 1)}
+        after = {"a.csv": (1, 1), "b.csv": (2, 5), "d.csv": (1, 1)}
+        
+        assert changed_files(before, after) == ["b.csv", "c.csv", "d.csv"]
+    
+    def test_snapshot_solo_csv(self, temp_dir):
+        """La foto sólo debe incluir archivos CSV."""
+        for name in ("TP1_1K2.csv", "notas.txt"):
+            open(os.path.join(temp_dir, name), 'w').close()
+        os.mkdir(os.path.join(temp_dir, "viejos.csv"))
+        
+        assert list(snapshot_directory(temp_dir)) == ["TP1_1K2.csv"]
+        assert snapshot_directory(os.path.join(temp_dir, "no_existe")) == {}
+    
+    @pytest.mark.parametrize("use_inotify", [True, False])
+    def test_rafaga_se_entrega_en_un_lote(self, temp_dir, use_inotify):
+        """Varios archivos copiados seguidos deben entregarse juntos tras el debounce."""
+        names = ["TP1_1K2.csv", "TP2_1K2.csv", "Parcial1_1K4.csv"]
+        
+        with DirectoryWatcher(temp_dir, debounce=0.3, interval=0.05, use_inotify=use_inotify) as watcher:
+            if not use_inotify:
+                assert not watcher.uses_inotify
+            thread = write_later([os.path.join(temp_dir, name) for name in names], 0.05)
+            changes = watcher.wait_for_changes()
+            thread.join()
+        
+        assert changes == sorted(names)
+
+
+@pytest.mark.unit
+class TestCourseWatcher:
+    """Tests para la regeneración de los cursos afectados."""
+    
+    @pytest.fixture
+    def watcher(self, test_config_path, test_dirs):
+        """Crea exports para los cursos 1K1 y 1K2."""
+        os.chdir(test_dirs['root'])
+        for course in ("1K1", "1K2"):
+            CSVFileFactory.create_tp_file(os.path.join(test_dirs['input'], f"TP1_{course}.csv"), course, 1, num_students=3)
+        return CourseWatcher(ConfigLoader(test_config_path), max_workers=1)
+    
+    def test_courses_for(self, watcher):
+        """Debe traducir los archivos a sus cursos e ignorar los que no son exports."""
+        names = ["tp2_1k10.csv", "Parcial1_1K2_2.csv", "Recuperatorio1_1K2.csv", "notas.csv", "Otro1_3K1.csv"]
+        
+        assert watcher.courses_for(names) == ["1K2", "1K10"]
+    
+    def test_regenera_solo_el_curso_afectado(self, watcher, test_dirs):
+        """Sólo debe regenerar la planilla del curso cuyo export cambió."""
+        results = watcher.process_changes(["TP1_1K2.csv"])
+        
+        assert [result.course for result in results] == ["1K2"]
+        assert results[0].ok
+        assert os.path.exists(os.path.join(test_dirs['output'], "1K2", "Planilla_Final_1K2.xls"))
+        assert not os.path.exists(os.path.join(test_dirs['output'], "1K1"))
+    
+    def test_cambios_sin_cursos(self, watcher):
+        """Archivos que no son exports no deben regenerar nada."""
+        assert watcher.process_changes(["notas.csv"]) == []
@@ -0,0 +1,150 @@
+"""
+Tests unitarios para el escritor XLSX en streaming y su uso en ReportGenerator.
+"""
+import pytest
+import os
+from src.generators import report_generator
+from src.generators.report_generator import ReportGenerator
+from src.managers import TPManager, ParcialManager
+from src.utils import Settings
+from src.utils import xlsx_writer
+from src.utils.xlsx_writer import STYLE_HEADER, XlsxWriter, column_letter
+from tests.factories import CSVFileFactory, read_sheet, sheet_names
+
+
+@pytest.mark.unit
+class TestXlsxWriter:
+    """Tests para XlsxWriter."""
+    
+    def test_column_letter(self):
+        """Debe convertir índices a letras de columna de Excel."""
+        assert [column_letter(i) for i in (0, 25, 26, 51, 701, 702)] == ["A", "Z", "AA", "AZ", "ZZ", "AAA"]
+    
+    def test_tipos_de_celda(self, temp_dir):
+        """Números como números, textos escapados y celdas vacías omitidas."""
+        file_path = os.path.join(temp_dir, "test.xlsx")
+        with XlsxWriter(file_path) as workbook:
+            sheet = workbook.add_sheet("Notas 1K2")
+            sheet.write_row(["Apellido(s)", "Nota"], STYLE_HEADER)
+            sheet.write_row(["Pérez & <Hijos>", 8.5, 9, "", None, "FALTA", " con espacios ", True])
+        
+        header, data = read_sheet(file_path)
+        assert header == [("A1", "inlineStr", "Apellido(s)", "1"), ("B1", "inlineStr", "Nota", "1")]
+        assert data == [
+            ("A2", "inlineStr", "Pérez & <Hijos>", None),
+            ("B2", "n", "8.5", None),
+            ("C2", "n", "9", None),
+            ("F2", "inlineStr", "FALTA", None),
+            ("G2", "inlineStr", " con espacios ", None),
+            ("H2", "b", "1", None),
+        ]
+    
+    def test_varias_hojas_en_orden(self, temp_dir):
+        """Debe escribir una hoja tras otra, generando un libro con todas."""
+        file_path = os.path.join(temp_dir, "test.xlsx")
+        with XlsxWriter(file_path) as workbook:
+            for course in ("1K1", "1K2", "1K10"):
+                workbook.add_sheet(f"Notas {course}").write_rows(([course, i] for i in range(300)))
+        
+        assert sheet_names(file_path) == ["Notas 1K1", "Notas 1K2", "Notas 1K10"]
+        rows = read_sheet(file_path, 3)
+        assert len(rows) == 300
+        assert rows[-1] == [("A300", "inlineStr", "1K10", None), ("B300", "n", "299", None)]
+    
+    def test_nombres_de_hoja(self, temp_dir):
+        """Debe limpiar nombres inválidos y rechazar repetidos."""
+        with XlsxWriter(os.path.join(temp_dir, "test.xlsx")) as workbook:
+            assert workbook.add_sheet("Notas 1K2/1K3: [final]").name == "Notas 1K2_1K3_ _final_"
+            assert len(workbook.add_sheet("x" * 40).name) == 31
+            with pytest.raises(ValueError):
+                workbook.add_sheet("NOTAS 1K2_1K3_ _FINAL_")
+    
+    def test_limite_de_filas(self, temp_dir, monkeypatch):
+        """Debe lanzar ValueError al superar el límite de filas."""
+        monkeypatch.setattr(xlsx_writer, "XLSX_MAX_ROWS", 2)
+        with XlsxWriter(os.path.join(temp_dir, "test.xlsx")) as workbook:
+            sheet = workbook.add_sheet("Notas")
+            sheet.write_rows([[1], [2]])
+            with pytest.raises(ValueError):
+                sheet.write_row([3])
+    
+    def test_libro_sin_hojas(self, temp_dir):
+        """Un libro vacío debe tener igualmente una hoja."""
+        file_path = os.path.join(temp_dir, "test.xlsx")
+        XlsxWriter(file_path).close()
+        
+        assert sheet_names(file_path) == ["Hoja1"]
+    
+    def test_error_no_deja_planilla(self, temp_dir):
+        """Si el bloque with falla no debe quedar la planilla ni el temporal."""
+        file_path = os.path.join(temp_dir, "test.xlsx")
+        with pytest.raises(RuntimeError):
+            with XlsxWriter(file_path) as workbook:
+                workbook.add_sheet("Notas").write_row([1, 2])
+                raise RuntimeError("interrumpido")
+        
+        assert os.listdir(temp_dir) == []
+    
+    def test_error_conserva_planilla_anterior(self, temp_dir):
+        """Una corrida fallida no debe pisar la planilla que ya existía."""
+        file_path = os.path.join(temp_dir, "test.xlsx")
+        with XlsxWriter(file_path) as workbook:
+            workbook.add_sheet("Anterior")
+        with pytest.raises(KeyboardInterrupt):
+            with XlsxWriter(file_path) as workbook:
+                workbook.add_sheet("Nueva")
+                raise KeyboardInterrupt
+        
+        assert sheet_names(file_path) == ["Anterior"]
+        assert os.listdir(temp_dir) == ["test.xlsx"]
+
+
+@pytest.mark.unit
+class TestReportGeneratorFormats:
+    """Tests para la elección del formato de la planilla final."""
+    
+    @pytest.fixture
+    def settings_for(self, test_dirs):
+        """Crea exports de un curso y retorna una fábrica de Settings por formato."""
+        CSVFileFactory.create_tp_file(os.path.join(test_dirs['input'], "TP1_1K2.csv"), "1K2", 1, num_students=5)
+        CSVFileFactory.create_parcial_file(os.path.join(test_dirs['input'], "Parcial1_1K2.csv"), "1K2", 1, num_students=5)
+        
+        def build(output_format):
+            return Settings(source_dir=test_dirs['input'], output_dir=test_dirs['output'], output_format=output_format)
+        return build
+    
+    def generate(self, settings):
+        """Genera la planilla del curso 1K2."""
+        return ReportGenerator(settings).generate_final_report("1K2", TPManager(settings), ParcialManager(settings))
+    
+    def test_planilla_xlsx(self, settings_for):
+        """La planilla XLSX debe tener los encabezados y las filas del curso."""
+        settings = settings_for("xlsx")
+        generator = ReportGenerator(settings)
+        output_file = self.generate(settings)
+        
+        assert output_file.endswith("Planilla_Final_1K2.xlsx")
+        rows = read_sheet(output_file)
+        assert sheet_names(output_file) == ["Notas 1K2"]
+        assert [cell[2] for cell in rows[0]] == generator.build_columns()
+        assert len(rows) == 6
+        
+        tps = TPManager(settings).merge_tps("1K2", write_csv=False)
+        exams = ParcialManager(settings).merge_exams("1K2", write_csv=False)
+        expected = list(generator.iter_student_rows(set(tps.records) | set(exams.records), tps, exams))
+        first = {ref.rstrip("0123456789"): value for ref, _, value, _ in rows[1]}
+        assert first["A"] == expected[0][0]
+        assert first["C"] == expected[0][2]
+        assert float(first["D"]) == expected[0][3]
+    
+    def test_formato_no_soportado(self, settings_for, capsys):
+        """Debe informar el error y no generar nada con un formato desconocido."""
+        assert self.generate(settings_for("ods")) is None
+        assert "no soportado" in capsys.readouterr().out
+    
+    def test_xls_supera_limite(self, settings_for, monkeypatch, capsys):
+        """Si el curso no entra en XLS debe sugerir usar XLSX."""
+        monkeypatch.setattr(report_generator, "XLS_MAX_ROWS", 3)
+        
+        assert self.generate(settings_for("xls")) is None
+        assert "output_format = xlsx" in capsys.readouterr().out